@@ -137,7 +137,8 @@ class DeepDeliberation:
 
     def __init__(self, model_config: ModelConfig):
         """Initialize discovery engine with model configuration."""
-        self.client = LiteClient(model_config=model_config)
+        # Parallel probes often repeat the same check; share identical in-flight calls
+        self.client = LiteClient(model_config=model_config, coalesce_requests=True)
         self.agent = DiscoveryAgent(self.client)
 
     def _execute_single_probe(
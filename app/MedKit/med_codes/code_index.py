@@ -0,0 +1,656 @@
+"""
+Offline index of medical codes built from the public release files.
+
+Importers read the ICD-10-CM, ICD-11 MMS, LOINC and RxNorm releases, and
+build_index() writes a compact on-disk index per coding system:
+
+  records.dat / records.off   "code<TAB>name<TAB>id" records and their offsets
+  keys.dat / keys.off         sorted normalized codes and titles (a flattened
+                              prefix trie, searched by binary search)
+  keys.ids                    record id of every key
+  tokens.dat / tokens.off     sorted title tokens
+  postings.off / postings.ids inverted index: record ids of every token
+  meta.json                   system, size and source of the index
+
+CodeIndex memory-maps these files, so opening an index is instant, and only
+the pages a lookup touches are read. search() returns the same shape as the
+live lookups of MedicalCodeExtractor ([{"code": ..., "name": ...}]), and
+icd11_response() the shape of ICD11Client.search().
+
+Release files:
+  icd10   https://www.cms.gov/medicare/coding-billing/icd-10-codes (icd10cm_order_*.txt or icd10cm_codes_*.txt)
+  icd11   https://icd.who.int/browse (SimpleTabulation-ICD-11-MMS-en.txt)
+  loinc   https://loinc.org/downloads/ (Loinc.csv)
+  rxnorm  https://www.nlm.nih.gov/research/umls/rxnorm/docs/rxnormfiles.html (RXNCONSO.RRF)
+
+Usage:
+  python code_index.py build icd10 icd10cm_order_2025.txt
+  python code_index.py search icd10 "asthma exacerbation"
+"""
+
+import argparse
+import bisect
+import csv
+import heapq
+import json
+import logging
+import math
+import mmap
+import os
+import re
+import shutil
+import sys
+import threading
+import time
+from array import array
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+# Directory holding one index per coding system; MEDKIT_CODE_INDEX overrides it
+DEFAULT_INDEX_DIR = Path(
+    os.environ.get("MEDKIT_CODE_INDEX", Path(__file__).parent / "index")
+)
+INDEX_VERSION = 1
+SYSTEMS = ("icd10", "icd11", "loinc", "rxnorm")
+
+# Words too common in medical titles to help ranking
+STOPWORDS = frozenset(
+    "a an and as at by for from in of on or other the to with without due".split()
+)
+# Index tokens a query token may expand to by prefix
+MAX_PREFIX_EXPANSIONS = 64
+# Query tokens shorter than this are matched exactly only
+MIN_PREFIX_LENGTH = 3
+MIN_FUZZY_LENGTH = 4
+# Score weights of exact, prefix and one-typo token matches
+EXACT_WEIGHT = 1.0
+PREFIX_WEIGHT = 0.7
+FUZZY_WEIGHT = 0.5
+# Bonus for titles starting with the whole query
+TITLE_PREFIX_BONUS = 2.0
+
+# Display-name preference of RxNorm term types, lowest first. Concept names (IN,
+# SCD, BN...) rank 0; synonyms such as SY and TMSY (tall man) are only searchable.
+RXNORM_TTY_RANKS = {"PSN": 1, "SY": 2, "TMSY": 3}
+RXNORM_OTHER_RANK = 0
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+
+def normalize(text: str) -> str:
+    """Lowercase text and collapse everything but letters and digits to single spaces."""
+    return " ".join(_TOKEN.findall(text.lower()))
+
+
+def normalize_code(code: str) -> str:
+    """Normalize a code for lookup: lowercase without dots or spaces."""
+    return re.sub(r"[\s.]", "", code.lower())
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into normalized tokens, dropping stopwords."""
+    return [token for token in _TOKEN.findall(text.lower()) if token not in STOPWORDS]
+
+
+# ============================================================================
+# IMPORTERS
+# ============================================================================
+
+# (code, name, id), optionally followed by a rank: the lowest-ranked name of a
+# code is its display name, the others are indexed as synonyms
+Record = Union[Tuple[str, str, str], Tuple[str, str, str, int]]
+
+
+def _dotted_icd10(code: str) -> str:
+    """Insert the dot of an ICD-10-CM code (A000 -> A00.0)."""
+    return f"{code[:3]}.{code[3:]}" if len(code) > 3 else code
+
+
+def read_icd10cm(path: Path) -> Iterator[Record]:
+    """Read ICD-10-CM codes from the CMS order file or the plain codes file."""
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        for line in f:
+            line = line.rstrip("\n")
+            if not line.strip():
+                continue
+            if len(line) > 77 and line[:5].isdigit():
+                # Order file: order number, code, header flag, short and long title
+                code, name = line[6:13].strip(), line[77:].strip()
+            else:
+                code, _, name = line.partition(" ")
+                name = name.strip()
+            if code and name:
+                yield _dotted_icd10(code), name, ""
+
+
+def read_icd11_mms(path: Path) -> Iterator[Record]:
+    """Read coded ICD-11 MMS entities from the WHO simple tabulation (tab-separated)."""
+    with open(path, "r", encoding="utf-8-sig", errors="replace") as f:
+        for row in csv.DictReader(f, delimiter="\t"):
+            code = (row.get("Code") or "").strip()
+            title = (row.get("Title") or "").lstrip("- ").strip()
+            if code and title:
+                yield (
+                    code,
+                    title,
+                    (
+                        row.get("Linearization URI") or row.get("Foundation URI") or ""
+                    ).strip(),
+                )
+
+
+def read_loinc(path: Path) -> Iterator[Record]:
+    """Read active LOINC terms from Loinc.csv."""
+    with open(path, "r", encoding="utf-8-sig", errors="replace", newline="") as f:
+        for row in csv.DictReader(f):
+            if (row.get("STATUS") or "").upper() == "DEPRECATED":
+                continue
+            code = (row.get("LOINC_NUM") or "").strip()
+            name = (row.get("LONG_COMMON_NAME") or row.get("COMPONENT") or "").strip()
+            if code and name:
+                yield code, name, ""
+
+
+def read_rxnorm(path: Path) -> Iterator[Record]:
+    """Read current RxNorm concept names and synonyms from RXNCONSO.RRF."""
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        for line in f:
+            fields = line.rstrip("\n").split("|")
+            if len(fields) < 17:
+                continue
+            rxcui, language, source, tty, name, suppress = (
+                fields[0],
+                fields[1],
+                fields[11],
+                fields[12],
+                fields[14],
+                fields[16],
+            )
+            if source == "RXNORM" and language == "ENG" and suppress == "N" and name:
+                yield rxcui, name, "", RXNORM_TTY_RANKS.get(tty, RXNORM_OTHER_RANK)
+
+
+READERS = {
+    "icd10": read_icd10cm,
+    "icd11": read_icd11_mms,
+    "loinc": read_loinc,
+    "rxnorm": read_rxnorm,
+}
+
+
+# ============================================================================
+# INDEX FILES
+# ============================================================================
+
+
+def _write_strings(directory: Path, name: str, strings: Sequence[str]) -> None:
+    """Write strings as concatenated UTF-8 bytes plus an offsets array."""
+    offsets = array("Q", [0])
+    with open(directory / f"{name}.dat", "wb") as f:
+        for value in strings:
+            data = value.encode("utf-8")
+            f.write(data)
+            offsets.append(offsets[-1] + len(data))
+    with open(directory / f"{name}.off", "wb") as f:
+        offsets.tofile(f)
+
+
+def _write_ids(path: Path, ids: Iterable[int]) -> None:
+    with open(path, "wb") as f:
+        array("I", ids).tofile(f)
+
+
+def build_index(
+    records: Iterable[Record], out_dir: Path, system: str, source: str = ""
+) -> Path:
+    """
+    Build an index from (code, name, id) records.
+
+    The index is written next to out_dir and moved into place at the end, so
+    readers never see a half-written index.
+
+    Every name of a code is searchable. The display name is the name with the
+    lowest rank (the first one among equals), e.g. the RxNorm concept name
+    rather than one of its synonyms.
+
+    Args:
+        records: Records from one of the importers.
+        out_dir: Directory of the index, e.g. DEFAULT_INDEX_DIR / "icd10".
+        system: Name of the coding system, stored in meta.json.
+        source: Release file the records came from, stored in meta.json.
+
+    Returns:
+        Path to the index directory.
+    """
+    out_dir = Path(out_dir)
+    # code -> [rank, display name, id, every name]
+    by_code: Dict[str, List[Any]] = {}
+    for code, name, entity_id, *rank in records:
+        name = " ".join(name.split())
+        rank = rank[0] if rank else 0
+        entry = by_code.get(code)
+        if entry is None:
+            by_code[code] = [rank, name, entity_id, [name]]
+            continue
+        if name not in entry[3]:
+            entry[3].append(name)
+        if rank < entry[0]:
+            entry[:3] = [rank, name, entity_id]
+    entries = [
+        (code, name, entity_id) for code, (_, name, entity_id, _) in by_code.items()
+    ]
+
+    keys: List[Tuple[str, int]] = []
+    postings: Dict[str, List[int]] = {}
+    for record_id, (code, (_, _, _, names)) in enumerate(by_code.items()):
+        keys.append((normalize_code(code), record_id))
+        for key in dict.fromkeys(normalize(name) for name in names):
+            keys.append((key, record_id))
+        for token in dict.fromkeys(token for name in names for token in tokenize(name)):
+            postings.setdefault(token, []).append(record_id)
+    keys.sort()
+    tokens = sorted(postings)
+
+    tmp_dir = out_dir.with_name(out_dir.name + ".tmp")
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    tmp_dir.mkdir(parents=True)
+    _write_strings(tmp_dir, "records", ["\t".join(entry) for entry in entries])
+    _write_strings(tmp_dir, "keys", [key for key, _ in keys])
+    _write_ids(tmp_dir / "keys.ids", (record_id for _, record_id in keys))
+    _write_strings(tmp_dir, "tokens", tokens)
+    posting_offsets = array("Q", [0])
+    with open(tmp_dir / "postings.ids", "wb") as f:
+        for token in tokens:
+            ids = array("I", postings[token])
+            ids.tofile(f)
+            posting_offsets.append(posting_offsets[-1] + len(ids))
+    with open(tmp_dir / "postings.off", "wb") as f:
+        posting_offsets.tofile(f)
+    meta = {
+        "version": INDEX_VERSION,
+        "system": system,
+        "records": len(entries),
+        "tokens": len(tokens),
+        "source": str(source),
+        "built_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+    (tmp_dir / "meta.json").write_text(json.dumps(meta, indent=2))
+
+    shutil.rmtree(out_dir, ignore_errors=True)
+    os.replace(tmp_dir, out_dir)
+    logger.info(
+        f"Built {system} index with {len(entries)} codes and {len(tokens)} tokens in {out_dir}"
+    )
+    return out_dir
+
+
+def import_release(
+    system: str, release_file: Path, index_dir: Path = DEFAULT_INDEX_DIR
+) -> Path:
+    """Build the index of a coding system from its release file."""
+    if system not in READERS:
+        raise ValueError(
+            f"Unknown coding system '{system}'; expected one of {', '.join(SYSTEMS)}"
+        )
+    return build_index(
+        READERS[system](Path(release_file)),
+        Path(index_dir) / system,
+        system,
+        release_file,
+    )
+
+
+class _MappedFile:
+    """A read-only memory map; empty files map to an empty buffer."""
+
+    def __init__(self, path: Path):
+        self._file = open(path, "rb")
+        size = os.fstat(self._file.fileno()).st_size
+        self._map = (
+            mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else None
+        )
+        self.buffer = (
+            memoryview(self._map) if self._map is not None else memoryview(b"")
+        )
+
+    def ints(self, typecode: str) -> memoryview:
+        return self.buffer.cast(typecode)
+
+    def close(self) -> None:
+        self.buffer.release()
+        if self._map is not None:
+            self._map.close()
+        self._file.close()
+
+
+class _StringTable(Sequence):
+    """Memory-mapped strings addressed by index, usable with bisect."""
+
+    def __init__(self, directory: Path, name: str, files: List[_MappedFile]):
+        data = _MappedFile(directory / f"{name}.dat")
+        offsets = _MappedFile(directory / f"{name}.off")
+        files.extend([data, offsets])
+        self._data = data.buffer
+        self._offsets = offsets.ints("Q")
+
+    def __len__(self) -> int:
+        return max(0, len(self._offsets) - 1)
+
+    def __getitem__(self, index: int) -> str:
+        return bytes(
+            self._data[self._offsets[index] : self._offsets[index + 1]]
+        ).decode("utf-8")
+
+    def size(self, index: int) -> int:
+        """Length in bytes of an entry, without decoding it."""
+        return self._offsets[index + 1] - self._offsets[index]
+
+
+def _prefix_range(table: Sequence[str], prefix: str, lo: int = 0) -> Tuple[int, int]:
+    """Positions of the sorted table entries starting with prefix."""
+    start = bisect.bisect_left(table, prefix, lo=lo)
+    return start, bisect.bisect_left(table, prefix + "\uffff", lo=start)
+
+
+def _within_one_edit(a: str, b: str) -> bool:
+    """Whether two strings differ by at most one insertion, deletion, substitution or transposition."""
+    if abs(len(a) - len(b)) > 1:
+        return False
+    if len(a) > len(b):
+        a, b = b, a
+    i = 0
+    while i < len(a) and a[i] == b[i]:
+        i += 1
+    if len(a) == len(b):
+        return a[i + 1 :] == b[i + 1 :] or (
+            i + 1 < len(a)
+            and a[i] == b[i + 1]
+            and a[i + 1] == b[i]
+            and a[i + 2 :] == b[i + 2 :]
+        )
+    return a[i:] == b[i + 1 :]
+
+
+class CodeIndex:
+    """
+    Read-only, memory-mapped index of one coding system.
+
+    Example:
+        >>> index = CodeIndex.open("icd10")
+        >>> index.search("asthma", limit=3)
+        [{'code': 'J45', 'name': 'Asthma'}, ...]
+        >>> index.lookup("J45.909")
+        {'code': 'J45.909', 'name': 'Unspecified asthma, uncomplicated'}
+    """
+
+    def __init__(self, path: Path):
+        """
+        Open an index directory written by build_index().
+
+        Raises:
+            FileNotFoundError: If the directory does not hold an index.
+        """
+        self.path = Path(path)
+        meta_file = self.path / "meta.json"
+        if not meta_file.exists():
+            raise FileNotFoundError(f"No code index at {self.path}")
+        self.meta = json.loads(meta_file.read_text())
+        self.system = self.meta.get("system", self.path.name)
+        self._files: List[_MappedFile] = []
+        self.records = _StringTable(self.path, "records", self._files)
+        self.keys = _StringTable(self.path, "keys", self._files)
+        self.tokens = _StringTable(self.path, "tokens", self._files)
+        for name in ("keys.ids", "postings.off", "postings.ids"):
+            self._files.append(_MappedFile(self.path / name))
+        self._key_ids = self._files[-3].ints("I")
+        self._posting_offsets = self._files[-2].ints("Q")
+        self._postings = self._files[-1].ints("I")
+
+    @classmethod
+    def open(cls, system: str, index_dir: Path = DEFAULT_INDEX_DIR) -> "CodeIndex":
+        """Open the index of a coding system in an index directory."""
+        return cls(Path(index_dir) / system)
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def record(self, record_id: int) -> Dict[str, str]:
+        """Return a record as {"code", "name"} plus "id" when the release has one."""
+        code, name, entity_id = self.records[record_id].split("\t")
+        result = {"code": code, "name": name}
+        if entity_id:
+            result["id"] = entity_id
+        return result
+
+    def lookup(self, code: str) -> Optional[Dict[str, str]]:
+        """Resolve an exact code (dots and case are ignored)."""
+        key = normalize_code(code)
+        start, end = _prefix_range(self.keys, key)
+        for position in range(start, end):
+            if self.keys[position] != key:
+                break
+            record = self.record(self._key_ids[position])
+            if normalize_code(record["code"]) == key:
+                return record
+        return None
+
+    def prefix(self, text: str, limit: int = 10) -> List[Dict[str, str]]:
+        """Return records whose code or title starts with text, in key order."""
+        key = normalize(text) if " " in text.strip() else normalize_code(text)
+        start, end = _prefix_range(self.keys, key)
+        results, seen = [], set()
+        for position in range(start, end):
+            record_id = self._key_ids[position]
+            if record_id not in seen:
+                seen.add(record_id)
+                results.append(self.record(record_id))
+                if len(results) >= limit:
+                    break
+        return results
+
+    def _postings_for(self, token_position: int) -> memoryview:
+        return self._postings[
+            self._posting_offsets[token_position] : self._posting_offsets[
+                token_position + 1
+            ]
+        ]
+
+    def _expand(self, token: str) -> List[Tuple[int, float]]:
+        """Index tokens matching a query token: exact, else by prefix, else within one typo."""
+        start = bisect.bisect_left(self.tokens, token)
+        if start < len(self.tokens) and self.tokens[start] == token:
+            matches = [(start, EXACT_WEIGHT)]
+            start += 1
+        else:
+            matches = []
+        if len(token) >= MIN_PREFIX_LENGTH:
+            start, end = _prefix_range(self.tokens, token, lo=start)
+            matches += [
+                (position, PREFIX_WEIGHT)
+                for position in range(start, min(end, start + MAX_PREFIX_EXPANSIONS))
+            ]
+        if not matches and len(token) >= MIN_FUZZY_LENGTH:
+            first, last = _prefix_range(self.tokens, token[0])
+            matches = [
+                (position, FUZZY_WEIGHT)
+                for position in range(first, last)
+                if _within_one_edit(token, self.tokens[position])
+            ]
+        return matches
+
+    def search(self, query: str, limit: int = 10) -> Optional[List[Dict[str, str]]]:
+        """
+        Fuzzy search by code or title words.
+
+        Every query word is matched exactly, by prefix, or with one typo, and
+        records are ranked by the inverse document frequency of the words they
+        match. A query that is a code returns that code first.
+
+        Returns:
+            List of {"code", "name"} dicts (plus "id" for ICD-11), or None if
+            nothing matches, like the live lookups of MedicalCodeExtractor.
+        """
+        results: List[Dict[str, str]] = []
+        exact = self.lookup(query)
+        if exact is not None:
+            results.append(exact)
+
+        total = max(1, len(self.records))
+        scores: Dict[int, float] = {}
+        for token in dict.fromkeys(tokenize(query)):
+            matches = []
+            for position, weight in self._expand(token):
+                ids = self._postings_for(position)
+                matches.append((weight * math.log(1 + total / max(1, len(ids))), ids))
+            # Best match first, so each record keeps the first score it gets
+            token_scores: Dict[int, float] = {}
+            for score, ids in sorted(matches, key=lambda match: -match[0]):
+                if token_scores:
+                    for record_id in ids:
+                        token_scores.setdefault(record_id, score)
+                else:
+                    token_scores = dict.fromkeys(ids, score)
+            if scores:
+                for record_id, score in token_scores.items():
+                    scores[record_id] = scores.get(record_id, 0.0) + score
+            else:
+                scores = token_scores
+
+        # Records whose code or any name starts with the whole query; ranking
+        # uses only scores and entry sizes so just the winners get decoded
+        normalized_query = normalize(query)
+        if normalized_query:
+            start, end = _prefix_range(self.keys, normalized_query)
+            for record_id in {
+                self._key_ids[position] for position in range(start, end)
+            }:
+                if record_id in scores:
+                    scores[record_id] += TITLE_PREFIX_BONUS
+        # Only records tied with the last kept score need the size tie-break
+        top = heapq.nlargest(limit + 1, scores.values())
+        cutoff = top[-1] if top else 0.0
+        ranked = heapq.nlargest(
+            limit + 1,
+            [record_id for record_id, score in scores.items() if score >= cutoff],
+            key=lambda record_id: (
+                scores[record_id],
+                -self.records.size(record_id),
+                -record_id,
+            ),
+        )
+
+        for record_id in ranked:
+            if len(results) >= limit:
+                break
+            record = self.record(record_id)
+            if exact is None or record["code"] != exact["code"]:
+                results.append(record)
+        return results or None
+
+    def icd11_response(self, query: str, limit: int = 10) -> Dict[str, Any]:
+        """search() results in the shape returned by ICD11Client.search()."""
+        return {
+            "destinationEntities": [
+                {
+                    "theCode": record["code"],
+                    "title": record["name"],
+                    "id": record.get("id", ""),
+                }
+                for record in self.search(query, limit) or []
+            ],
+            "error": False,
+            "offline": True,
+        }
+
+    def close(self) -> None:
+        """Release the memory maps."""
+        for view in (
+            self._key_ids,
+            self._posting_offsets,
+            self._postings,
+            self.records._offsets,
+            self.keys._offsets,
+            self.tokens._offsets,
+        ):
+            view.release()
+        for mapped in self._files:
+            mapped.close()
+
+    def __enter__(self) -> "CodeIndex":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+
+_open_indexes: Dict[Tuple[str, str], CodeIndex] = {}
+_open_indexes_lock = threading.Lock()
+
+
+def get_index(system: str, index_dir: Path = DEFAULT_INDEX_DIR) -> Optional[CodeIndex]:
+    """
+    Return the shared index of a coding system, or None if it has not been imported.
+
+    Misses are not cached, so an index imported while the process runs is
+    picked up by the next call.
+    """
+    key = (system, str(index_dir))
+    with _open_indexes_lock:
+        index = _open_indexes.get(key)
+        if index is None:
+            try:
+                index = CodeIndex.open(system, index_dir)
+            except FileNotFoundError:
+                return None
+            _open_indexes[key] = index
+        return index
+
+
+def main():
+    """Command line entry point: build an index or search one."""
+    parser = argparse.ArgumentParser(
+        description="Build and query the offline medical code index"
+    )
+    parser.add_argument(
+        "--index-dir", default=str(DEFAULT_INDEX_DIR), help="Index directory"
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    build = commands.add_parser("build", help="Import a release file")
+    build.add_argument("system", choices=SYSTEMS)
+    build.add_argument("release_file", help="Path to the release file")
+
+    search = commands.add_parser("search", help="Search an index")
+    search.add_argument("system", choices=SYSTEMS)
+    search.add_argument("query")
+    search.add_argument("-n", "--limit", type=int, default=10)
+
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    if args.command == "build":
+        path = import_release(
+            args.system, Path(args.release_file), Path(args.index_dir)
+        )
+        print(f"Index written to {path}")
+        return 0
+
+    try:
+        index = CodeIndex.open(args.system, Path(args.index_dir))
+    except FileNotFoundError as e:
+        print(f"Error: {e}. Run 'build {args.system} <release file>' first.")
+        return 1
+    with index:
+        started = time.perf_counter()
+        results = index.search(args.query, args.limit) or []
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        for record in results:
+            print(f"Code: {record['code'].ljust(10)} | {record['name']}")
+        print(f"\n{len(results)} result(s) in {elapsed_ms:.2f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,20 +1,144 @@
+import copy
 import os
 import sys
+import threading
+import time
+from collections import OrderedDict
 
 import requests
+from requests.adapters import HTTPAdapter
+
+TOKEN_URL = "https://icdaccessmanagement.who.int/connect/token"
+# Tokens are refreshed this many seconds before they expire
+TOKEN_REFRESH_MARGIN = 60
+# Token lifetime assumed when the token response has no expires_in
+DEFAULT_TOKEN_LIFETIME = 3600
+# Search results kept in the process-wide LRU cache
+DEFAULT_SEARCH_CACHE_SIZE = 512
+# Connections kept open to each WHO host
+POOL_MAXSIZE = 8
+REQUEST_TIMEOUT = 15
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session():
+    """Return the process-wide pooled HTTP session used for all ICD-11 requests."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=2, pool_maxsize=POOL_MAXSIZE)
+            session.mount("https://", adapter)
+            _session = session
+        return _session
+
+
+class _TokenCache:
+    """Access tokens per client id, shared by every ICD11Client in the process."""
+
+    def __init__(self):
+        self._tokens = {}
+        self._lock = threading.Lock()
+
+    def get(self, client_id):
+        """Return a token that is valid for at least TOKEN_REFRESH_MARGIN seconds, or None."""
+        with self._lock:
+            entry = self._tokens.get(client_id)
+        if entry and entry[1] - time.monotonic() > TOKEN_REFRESH_MARGIN:
+            return entry[0]
+        return None
+
+    def put(self, client_id, token, lifetime):
+        with self._lock:
+            self._tokens[client_id] = (token, time.monotonic() + lifetime)
+
+    def invalidate(self, client_id):
+        with self._lock:
+            self._tokens.pop(client_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._tokens.clear()
+
+
+class _SearchCache:
+    """Thread-safe LRU cache of search responses; callers get their own copy of each."""
+
+    def __init__(self, max_size=DEFAULT_SEARCH_CACHE_SIZE):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return copy.deepcopy(self._entries[key])
+            self.misses += 1
+            return None
+
+    def put(self, key, value):
+        value = copy.deepcopy(value)
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": len(self._entries),
+            }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+_tokens = _TokenCache()
+_auth_lock = threading.Lock()
+_search_cache = _SearchCache()
 
 
 class ICD11Client:
     """
     A simple client for interacting with the WHO ICD-11 API.
     You can get your credentials by registering at https://icdaccessmanagement.who.int/
+
+    All clients share one pooled session, a token cache that renews tokens
+    shortly before they expire, and an LRU cache of search results, so
+    creating a client is free and repeated searches make no requests. Use
+    get_client() to share a single client across the process.
     """
 
     def __init__(self, client_id, client_secret):
         self.client_id = client_id
         self.client_secret = client_secret
-        self.token_url = "https://icdaccessmanagement.who.int/connect/token"
-        self.access_token = None
+        self.token_url = TOKEN_URL
+        self.session = get_session()
+
+    @property
+    def access_token(self):
+        """The cached access token, or None if there is none or it is about to expire."""
+        return _tokens.get(self.client_id)
+
+    @access_token.setter
+    def access_token(self, token):
+        """Store a token obtained elsewhere, assumed valid for DEFAULT_TOKEN_LIFETIME; None forgets it."""
+        if token is None:
+            _tokens.invalidate(self.client_id)
+        else:
+            _tokens.put(self.client_id, token, DEFAULT_TOKEN_LIFETIME)
 
     def authenticate(self):
         """Authenticates with the WHO API and retrieves an access token."""
@@ -25,9 +149,20 @@ class ICD11Client:
             "grant_type": "client_credentials",
         }
         try:
-            response = requests.post(self.token_url, data=payload)
+            response = self.session.post(
+                self.token_url, data=payload, timeout=REQUEST_TIMEOUT
+            )
             if response.status_code == 200:
-                self.access_token = response.json().get("access_token")
+                data = response.json()
+                token = data.get("access_token")
+                if not token:
+                    print("Authentication failed: no access token in response")
+                    return False
+                _tokens.put(
+                    self.client_id,
+                    token,
+                    data.get("expires_in", DEFAULT_TOKEN_LIFETIME),
+                )
                 return True
             else:
                 print(f"Authentication failed: {response.status_code}")
@@ -37,21 +172,26 @@ class ICD11Client:
             print(f"An error occurred during authentication: {e}")
             return False
 
+    def _token(self):
+        """Return a valid access token, authenticating when it is missing or about to expire."""
+        token = self.access_token
+        if token is None:
+            # One thread renews the token while the others wait for it
+            with _auth_lock:
+                token = self.access_token
+                if token is None and self.authenticate():
+                    token = self.access_token
+        return token
+
     def search(self, query, release_id="2024-01", linearization="mms"):
         """
         Searches for a medical condition in the specified ICD-11 linearization.
         Default is the 2024-01 release of the MMS (Mortality and Morbidity Statistics).
         """
-        if not self.access_token:
-            if not self.authenticate():
-                return None
-
-        headers = {
-            "Authorization": f"Bearer {self.access_token}",
-            "Accept": "application/json",
-            "Accept-Language": "en",
-            "API-Version": "v2",
-        }
+        cache_key = (release_id, linearization, " ".join(query.lower().split()))
+        cached = _search_cache.get(cache_key)
+        if cached is not None:
+            return cached
 
         # Search URL for the specific linearization
         search_url = (
@@ -59,25 +199,78 @@ class ICD11Client:
         )
         params = {"q": query}
 
-        try:
-            response = requests.get(search_url, headers=headers, params=params)
-            if response.status_code == 200:
-                return response.json()
-            else:
-                print(f"Search failed: {response.status_code}")
-                print(response.text)
+        # A token revoked before its expiry is renewed once
+        for attempt in range(2):
+            token = self._token()
+            if not token:
                 return None
-        except Exception as e:
-            print(f"An error occurred during search: {e}")
-            return None
+
+            headers = {
+                "Authorization": f"Bearer {token}",
+                "Accept": "application/json",
+                "Accept-Language": "en",
+                "API-Version": "v2",
+            }
+
+            try:
+                response = self.session.get(
+                    search_url, headers=headers, params=params, timeout=REQUEST_TIMEOUT
+                )
+                if response.status_code == 401 and attempt == 0:
+                    _tokens.invalidate(self.client_id)
+                    continue
+                if response.status_code == 200:
+                    results = response.json()
+                    _search_cache.put(cache_key, results)
+                    return results
+                else:
+                    print(f"Search failed: {response.status_code}")
+                    print(response.text)
+                    return None
+            except Exception as e:
+                print(f"An error occurred during search: {e}")
+                return None
+        return None
+
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_client(client_id=None, client_secret=None):
+    """
+    Return the process-wide ICD11Client for a set of credentials.
+
+    Credentials default to the ICD11_CLIENT_ID and ICD11_CLIENT_SECRET
+    environment variables. Returns None if they are missing.
+    """
+    client_id = client_id or os.environ.get("ICD11_CLIENT_ID")
+    client_secret = client_secret or os.environ.get("ICD11_CLIENT_SECRET")
+    if not client_id or not client_secret:
+        return None
+    with _clients_lock:
+        key = (client_id, client_secret)
+        if key not in _clients:
+            _clients[key] = ICD11Client(client_id, client_secret)
+        return _clients[key]
+
+
+def search_cache_stats():
+    """Return hits, misses and entries of the shared search cache."""
+    return _search_cache.stats()
+
+
+def clear_caches():
+    """Forget cached tokens and search results."""
+    _tokens.clear()
+    _search_cache.clear()
 
 
 def main():
     # Attempt to get credentials from environment variables
-    client_id = os.environ.get("ICD11_CLIENT_ID")
-    client_secret = os.environ.get("ICD11_CLIENT_SECRET")
+    client = get_client()
 
-    if not client_id or not client_secret:
+    if client is None:
         print("Error: Missing API credentials.")
         print("\nPlease set the following environment variables:")
         print("  export ICD11_CLIENT_ID='your_client_id'")
@@ -87,8 +280,6 @@ def main():
         )
         sys.exit(1)
 
-    client = ICD11Client(client_id, client_secret)
-
     condition = input("Enter a medical condition to search for: ").strip()
     if not condition:
         print("Please enter a valid condition.")
@@ -0,0 +1,186 @@
+import shutil
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+# Add the MedKit root to sys.path
+medkit_root = Path(__file__).parent.parent.parent
+if str(medkit_root) not in sys.path:
+    sys.path.append(str(medkit_root))
+
+from med_codes import code_index
+from med_codes.code_index import CodeIndex, build_index, get_index, import_release
+
+ICD10_CODES = """\
+J45909  Unspecified asthma, uncomplicated
+J45901  Unspecified asthma with (acute) exacerbation
+J449    Chronic obstructive pulmonary disease, unspecified
+E119    Type 2 diabetes mellitus without complications
+E109    Type 1 diabetes mellitus without complications
+I10     Essential (primary) hypertension
+"""
+
+ICD11_TABULATION = (
+    "Foundation URI\tLinearization URI\tCode\tBlockId\tTitle\tClassKind\n"
+    "http://id.who.int/icd/entity/1\thttp://id.who.int/icd/release/11/mms/1\tCA23\t\t- Asthma\tcategory\n"
+    "http://id.who.int/icd/entity/2\thttp://id.who.int/icd/release/11/mms/2\t\tBlockL1\tRespiratory block\tblock\n"
+    "http://id.who.int/icd/entity/3\thttp://id.who.int/icd/release/11/mms/3\t5A11\t\t- - Type 2 diabetes mellitus\tcategory\n"
+)
+
+
+def rxnconso_row(rxcui, tty, name):
+    fields = [
+        rxcui,
+        "ENG",
+        "",
+        "",
+        "",
+        "",
+        "",
+        "",
+        "",
+        "",
+        "",
+        "RXNORM",
+        tty,
+        rxcui,
+        name,
+        "",
+        "N",
+        "",
+    ]
+    return "|".join(fields) + "\n"
+
+
+RXNCONSO = (
+    rxnconso_row("435", "TMSY", "ALBUTerol")
+    + rxnconso_row("435", "SY", "salbutamol")
+    + rxnconso_row("435", "IN", "albuterol")
+    + rxnconso_row("745679", "PSN", "albuterol 90 MCG/ACTUAT Metered Dose Inhaler")
+    + rxnconso_row("745679", "SCD", "albuterol 0.09 MG/ACTUAT Metered Dose Inhaler")
+)
+
+
+class TestCodeIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = Path(tempfile.mkdtemp())
+        release = self.tmp_dir / "icd10cm_codes_2025.txt"
+        release.write_text(ICD10_CODES)
+        import_release("icd10", release, self.tmp_dir / "index")
+        self.index = CodeIndex.open("icd10", self.tmp_dir / "index")
+
+    def tearDown(self):
+        self.index.close()
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def codes(self, results):
+        return [r["code"] for r in results or []]
+
+    def test_search_returns_live_lookup_shape(self):
+        results = self.index.search("asthma")
+        self.assertEqual(self.codes(results), ["J45.909", "J45.901"])
+        self.assertEqual(
+            results[0], {"code": "J45.909", "name": "Unspecified asthma, uncomplicated"}
+        )
+        self.assertIsNone(self.index.search("fracture"))
+
+    def test_ranking_prefix_and_typos(self):
+        self.assertEqual(self.codes(self.index.search("type 2 diabetes"))[0], "E11.9")
+        self.assertEqual(self.codes(self.index.search("diab")), ["E11.9", "E10.9"])
+        self.assertEqual(self.codes(self.index.search("hypertenson")), ["I10"])
+        self.assertEqual(
+            self.codes(self.index.search("asthma exacerbation"))[0], "J45.901"
+        )
+
+    def test_code_lookup_and_prefix(self):
+        self.assertEqual(
+            self.index.lookup("j45909")["name"], "Unspecified asthma, uncomplicated"
+        )
+        self.assertEqual(self.codes(self.index.search("J45.901"))[0], "J45.901")
+        self.assertEqual(self.codes(self.index.prefix("J45")), ["J45.901", "J45.909"])
+        self.assertEqual(self.codes(self.index.prefix("chronic obstr")), ["J44.9"])
+        self.assertIsNone(self.index.lookup("Z99"))
+
+    def test_lookups_are_sub_millisecond(self):
+        build_index(
+            (
+                (f"X{i:05d}", f"condition number {i} of organ {i % 97}", "")
+                for i in range(20000)
+            ),
+            self.tmp_dir / "index" / "large",
+            "large",
+        )
+        with CodeIndex(self.tmp_dir / "index" / "large") as index:
+            index.search("condition organ 42")
+            started = time.perf_counter()
+            for _ in range(100):
+                index.lookup("X12345")
+                index.prefix("condition number 1234")
+            elapsed_ms = (time.perf_counter() - started) * 1000 / 100
+            self.assertEqual(len(index), 20000)
+        self.assertLess(elapsed_ms, 1.0)
+
+    def test_search_decodes_only_returned_records(self):
+        build_index(
+            ((f"X{i:05d}", f"condition number {i}", "") for i in range(5000)),
+            self.tmp_dir / "index" / "large",
+            "large",
+        )
+        with CodeIndex(self.tmp_dir / "index" / "large") as index:
+            table = code_index._StringTable
+            with patch.object(
+                table, "__getitem__", autospec=True, side_effect=table.__getitem__
+            ) as getitem:
+                results = index.search("condition number 4", limit=3)
+            decoded = [c for c in getitem.call_args_list if c.args[0] is index.records]
+        self.assertEqual(self.codes(results), ["X00004", "X00040", "X00041"])
+        self.assertLessEqual(len(decoded), 4)
+
+    def test_icd11_response_shape(self):
+        release = self.tmp_dir / "SimpleTabulation-ICD-11-MMS-en.txt"
+        release.write_text(ICD11_TABULATION)
+        import_release("icd11", release, self.tmp_dir / "index")
+        with CodeIndex.open("icd11", self.tmp_dir / "index") as index:
+            self.assertEqual(len(index), 2)
+            response = index.icd11_response("asthma")
+        self.assertEqual(
+            response["destinationEntities"],
+            [
+                {
+                    "theCode": "CA23",
+                    "title": "Asthma",
+                    "id": "http://id.who.int/icd/release/11/mms/1",
+                }
+            ],
+        )
+
+    def test_rxnorm_synonyms_share_the_preferred_record(self):
+        release = self.tmp_dir / "RXNCONSO.RRF"
+        release.write_text(RXNCONSO)
+        import_release("rxnorm", release, self.tmp_dir / "index")
+        with CodeIndex.open("rxnorm", self.tmp_dir / "index") as index:
+            self.assertEqual(len(index), 2)
+            albuterol = {"code": "435", "name": "albuterol"}
+            self.assertEqual(index.search("salbutamol"), [albuterol])
+            self.assertEqual(index.prefix("salbutamol"), [albuterol])
+            self.assertEqual(index.lookup("435"), albuterol)
+            self.assertEqual(
+                index.search("90 mcg inhaler")[0]["name"],
+                "albuterol 0.09 MG/ACTUAT Metered Dose Inhaler",
+            )
+
+    def test_get_index_picks_up_later_imports(self):
+        index_dir = self.tmp_dir / "later"
+        self.assertIsNone(get_index("icd10", index_dir))
+        import_release("icd10", self.tmp_dir / "icd10cm_codes_2025.txt", index_dir)
+        index = get_index("icd10", index_dir)
+        self.assertIsNotNone(index)
+        self.assertIs(get_index("icd10", index_dir), index)
+        code_index._open_indexes.pop(("icd10", str(index_dir))).close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,130 @@
+import sys
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+# Add the MedKit root to sys.path
+medkit_root = Path(__file__).parent.parent.parent
+if str(medkit_root) not in sys.path:
+    sys.path.append(str(medkit_root))
+
+from med_codes import get_icd11
+from med_codes.get_icd11 import (
+    ICD11Client,
+    clear_caches,
+    get_client,
+    search_cache_stats,
+)
+
+SEARCH_RESPONSE = {"destinationEntities": [{"theCode": "CA23", "title": "Asthma"}]}
+
+
+def make_response(status_code, data=None):
+    response = MagicMock()
+    response.status_code = status_code
+    response.json.return_value = data
+    response.text = ""
+    return response
+
+
+class TestICD11Client(unittest.TestCase):
+    def setUp(self):
+        clear_caches()
+        self.addCleanup(clear_caches)
+        session = get_icd11.get_session()
+        post = patch.object(
+            session,
+            "post",
+            return_value=make_response(200, {"access_token": "t1", "expires_in": 3600}),
+        )
+        get = patch.object(
+            session, "get", return_value=make_response(200, SEARCH_RESPONSE)
+        )
+        self.post = post.start()
+        self.get = get.start()
+        self.addCleanup(post.stop)
+        self.addCleanup(get.stop)
+
+    def test_clients_share_session_and_token(self):
+        first = ICD11Client("id", "secret")
+        second = ICD11Client("id", "secret")
+        self.assertIs(first.session, second.session)
+
+        first.search("asthma")
+        second.search("diabetes")
+
+        self.assertEqual(self.post.call_count, 1)
+        self.assertEqual(self.get.call_count, 2)
+
+    def test_token_is_refreshed_before_expiry(self):
+        self.post.return_value = make_response(
+            200, {"access_token": "t1", "expires_in": get_icd11.TOKEN_REFRESH_MARGIN}
+        )
+        client = ICD11Client("id", "secret")
+        client.search("asthma")
+        client.search("diabetes")
+        # A token inside the refresh margin is never sent
+        self.assertEqual(self.post.call_count, 2)
+
+    def test_revoked_token_is_renewed_once(self):
+        self.get.side_effect = [make_response(401), make_response(200, SEARCH_RESPONSE)]
+        self.post.side_effect = [
+            make_response(200, {"access_token": "old", "expires_in": 3600}),
+            make_response(200, {"access_token": "new", "expires_in": 3600}),
+        ]
+        results = ICD11Client("id", "secret").search("asthma")
+
+        self.assertEqual(results, SEARCH_RESPONSE)
+        self.assertEqual(
+            self.get.call_args.kwargs["headers"]["Authorization"], "Bearer new"
+        )
+
+    def test_repeated_search_is_served_from_cache(self):
+        client = ICD11Client("id", "secret")
+        self.assertEqual(client.search("Asthma"), SEARCH_RESPONSE)
+        self.assertEqual(client.search("  asthma "), SEARCH_RESPONSE)
+
+        self.assertEqual(self.get.call_count, 1)
+        self.assertEqual(search_cache_stats(), {"hits": 1, "misses": 1, "entries": 1})
+
+    def test_cached_results_are_not_shared(self):
+        self.get.return_value = make_response(
+            200, {"destinationEntities": [{"theCode": "CA23"}]}
+        )
+        client = ICD11Client("id", "secret")
+        client.search("asthma")["destinationEntities"].clear()
+        client.search("asthma")["destinationEntities"].append({"theCode": "X"})
+        self.assertEqual(
+            client.search("asthma"), {"destinationEntities": [{"theCode": "CA23"}]}
+        )
+        self.assertEqual(self.get.call_count, 1)
+
+    def test_access_token_can_be_assigned(self):
+        client = ICD11Client("id", "secret")
+        client.access_token = "preset"
+        client.search("asthma")
+        self.assertEqual(self.post.call_count, 0)
+        self.assertEqual(
+            self.get.call_args.kwargs["headers"]["Authorization"], "Bearer preset"
+        )
+        client.access_token = None
+        self.assertIsNone(ICD11Client("id", "secret").access_token)
+
+    def test_failed_search_is_not_cached(self):
+        self.get.return_value = make_response(500)
+        client = ICD11Client("id", "secret")
+        self.assertIsNone(client.search("asthma"))
+        self.assertIsNone(client.search("asthma"))
+        self.assertEqual(self.get.call_count, 2)
+
+    def test_get_client_reads_environment(self):
+        with patch.dict(
+            "os.environ", {"ICD11_CLIENT_ID": "id", "ICD11_CLIENT_SECRET": "secret"}
+        ):
+            self.assertIs(get_client(), get_client("id", "secret"))
+        with patch.dict("os.environ", clear=True):
+            self.assertIsNone(get_client())
+
+
+if __name__ == "__main__":
+    unittest.main()
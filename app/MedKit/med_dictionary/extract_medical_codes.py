@@ -20,21 +20,42 @@ Input can be:
   - Path to a text file with one term per line
 
 Output: JSON file with term and codes from all available systems
+
+All coding systems are queried in parallel for each term, and many terms are
+processed at once. Requests go through one pooled session per host with a
+politeness limit (requests in flight and spacing between them), and responses
+are cached on disk so a rerun over the same terms makes no network calls.
 """
 
 import argparse
+import hashlib
 import json
 import logging
 import os
 import sys
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import urlsplit
 
 import requests
+from requests.adapters import HTTPAdapter
 from tqdm import tqdm
 
+# Add the project and MedKit roots to sys.path to support absolute imports
+project_root = Path(__file__).parent.parent.parent.parent
+for path in [project_root, Path(__file__).parent.parent]:
+    if str(path) not in sys.path:
+        sys.path.append(str(path))
+
+from lite.cache import CompletionCache
+
+from med_codes.code_index import DEFAULT_INDEX_DIR, get_index
+
 # Configure logging
 log_dir = Path(__file__).parent / "logs"
 log_dir.mkdir(exist_ok=True)
@@ -64,19 +85,117 @@ LOINC_ENDPOINT = f"{CLINICAL_TABLES_BASE}/loinc_items/v3/search"
 # UMLS API endpoint
 UMLS_SEARCH_ENDPOINT = f"{SNOMED_UMLS_BASE}/search/current"
 
+# Politeness limits per host: (requests in flight, minimum seconds between request starts).
+# NLM asks for no more than 20 requests per second per IP address.
+HOST_LIMITS = {
+    "rxnav.nlm.nih.gov": (4, 0.05),
+    "clinicaltables.nlm.nih.gov": (4, 0.05),
+    "uts-ws.nlm.nih.gov": (2, 0.05),
+}
+DEFAULT_HOST_LIMIT = (2, 0.5)
+
+# Terms processed at the same time
+DEFAULT_TERM_CONCURRENCY = 8
+
+# On-disk cache of API responses
+DEFAULT_CACHE_PATH = Path(__file__).parent / "outputs" / "medical_codes_cache.lmdb"
+DEFAULT_CACHE_TTL_DAYS = 30
+# Query parameters left out of cache keys
+SECRET_PARAMS = ("apiKey",)
+
+
+class HostLimiter:
+    """Politeness limit for one host: bounded concurrency and a minimum gap between request starts."""
+
+    def __init__(self, max_concurrent: int, min_interval: float):
+        self.max_concurrent = max_concurrent
+        self.min_interval = min_interval
+        self._slots = threading.BoundedSemaphore(max_concurrent)
+        self._lock = threading.Lock()
+        self._next_start = 0.0
+
+    @contextmanager
+    def slot(self) -> Iterator[None]:
+        """Hold one of the host's slots, waiting for the start spacing."""
+        with self._slots:
+            with self._lock:
+                now = time.monotonic()
+                wait = self._next_start - now
+                self._next_start = max(now, self._next_start) + self.min_interval
+            if wait > 0:
+                time.sleep(wait)
+            yield
+
+
+def make_request_key(url: str, params: Dict[str, Any]) -> str:
+    """Build a cache key for a GET request, leaving out credentials."""
+    public = {k: v for k, v in params.items() if k not in SECRET_PARAMS}
+    payload = json.dumps({"url": url, "params": public}, sort_keys=True, default=str)
+    return "http:" + hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
 
 class MedicalCodeExtractor:
     """Extract medical codes from medical terms."""
 
-    def __init__(self):
-        """Initialize the extractor."""
-        self.rxnorm_session = requests.Session()
-        self.clinical_session = requests.Session()
-        self.umls_session = requests.Session()
+    def __init__(
+        self,
+        term_concurrency: int = DEFAULT_TERM_CONCURRENCY,
+        cache_path: Optional[Path] = DEFAULT_CACHE_PATH,
+        cache_ttl_days: Optional[float] = DEFAULT_CACHE_TTL_DAYS,
+        index_dir: Optional[Path] = DEFAULT_INDEX_DIR,
+    ):
+        """
+        Initialize the extractor.
+
+        Args:
+            term_concurrency: Number of terms processed at the same time.
+            cache_path: LMDB database caching API responses. None disables the cache.
+            cache_ttl_days: Age after which cached responses are refetched. None keeps them forever.
+            index_dir: Directory of offline code indexes (see med_codes.code_index).
+                Systems with an imported index are resolved locally instead of
+                over HTTP. None always uses the live APIs.
+        """
+        if term_concurrency <= 0:
+            raise ValueError("term_concurrency must be greater than 0")
+
+        self.term_concurrency = term_concurrency
+        self.limiters: Dict[str, HostLimiter] = {}
+        self.sessions: Dict[str, requests.Session] = {}
+        self._hosts_lock = threading.Lock()
+        for host in HOST_LIMITS:
+            self._host(host)
+        self.rxnorm_session = self.sessions["rxnav.nlm.nih.gov"]
+        self.clinical_session = self.sessions["clinicaltables.nlm.nih.gov"]
+        self.umls_session = self.sessions["uts-ws.nlm.nih.gov"]
         self.umls_api_key = os.getenv("UMLS_API_KEY")
-        self.rate_limit_delay = 0.5  # 500ms between API calls
         self.output_data = []
 
+        self.indexes = {}
+        if index_dir is not None:
+            for system in ("rxnorm", "icd10", "icd11", "loinc"):
+                index = get_index(system, index_dir)
+                if index is not None:
+                    self.indexes[system] = index
+                    logger.info(f"Using offline {system} index with {len(index)} codes")
+
+        self.cache: Optional[CompletionCache] = None
+        if cache_path is not None:
+            Path(cache_path).parent.mkdir(parents=True, exist_ok=True)
+            self.cache = CompletionCache(
+                str(cache_path),
+                ttl_seconds=cache_ttl_days * 24 * 3600 if cache_ttl_days else None,
+                max_entries=None,
+            )
+
+        # Lookups are bounded by the host limiters, so one thread per host slot is enough
+        lookup_workers = sum(limit[0] for limit in HOST_LIMITS.values())
+        self._lookup_pool = ThreadPoolExecutor(
+            lookup_workers, thread_name_prefix="code-lookup"
+        )
+        self._term_pool = ThreadPoolExecutor(
+            term_concurrency, thread_name_prefix="code-term"
+        )
+
         if self.umls_api_key:
             logger.info("UMLS API key found - SNOMED CT/MeSH lookups enabled")
         else:
@@ -84,6 +203,53 @@ class MedicalCodeExtractor:
 
         logger.info("MedicalCodeExtractor initialized")
 
+    def _host(self, host: str) -> Tuple[requests.Session, HostLimiter]:
+        """Return the pooled session and politeness limiter of a host, creating them on first use."""
+        if host not in self.sessions:
+            max_concurrent, min_interval = HOST_LIMITS.get(host, DEFAULT_HOST_LIMIT)
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_concurrent)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            self.sessions[host] = session
+            self.limiters[host] = HostLimiter(max_concurrent, min_interval)
+        return self.sessions[host], self.limiters[host]
+
+    def _search_index(self, system: str, term: str) -> Optional[List[Dict[str, str]]]:
+        """Look a term up in an offline index, in the shape of the live lookups."""
+        results = self.indexes[system].search(term, limit=10)
+        if not results:
+            return None
+        logger.info(
+            f"Found {len(results)} {system} codes for '{term}' in the offline index"
+        )
+        return [{"code": r["code"], "name": r["name"]} for r in results]
+
+    def _get_json(self, url: str, params: Dict[str, Any]) -> Any:
+        """
+        GET a JSON API response through the cache, the host's session and its politeness limit.
+
+        Raises:
+            requests.exceptions.RequestException: If the request fails.
+            json.JSONDecodeError: If the response is not JSON.
+        """
+        key = make_request_key(url, params)
+        if self.cache is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return json.loads(cached)
+
+        host = urlsplit(url).hostname or ""
+        with self._hosts_lock:
+            session, limiter = self._host(host)
+        with limiter.slot():
+            response = session.get(url, params=params, timeout=10)
+        response.raise_for_status()
+        data = response.json()
+        if self.cache is not None:
+            self.cache.put(key, response.text)
+        return data
+
     def get_rxnorm_codes(self, term: str) -> Optional[List[Dict[str, str]]]:
         """
         Get RxNorm codes for a medical term.
@@ -91,14 +257,14 @@ class MedicalCodeExtractor:
         Returns:
             List of dicts with 'code' (RXCUI) and 'name' keys, or None if not found
         """
+        if "rxnorm" in self.indexes:
+            return self._search_index("rxnorm", term)
+
         try:
             endpoint = f"{RXNORM_API_BASE}/drugs.json"
             params = {"name": term, "search": 1}
 
-            response = self.rxnorm_session.get(endpoint, params=params, timeout=10)
-            response.raise_for_status()
-
-            data = response.json()
+            data = self._get_json(endpoint, params)
 
             if "drugGroup" in data and data["drugGroup"].get("conceptGroup"):
                 results = []
@@ -118,20 +284,16 @@ class MedicalCodeExtractor:
         except json.JSONDecodeError as e:
             logger.warning(f"Error parsing RxNorm response for '{term}': {e}")
             return None
-        finally:
-            time.sleep(self.rate_limit_delay)
 
     def get_icd10_codes(self, term: str) -> Optional[List[Dict[str, str]]]:
         """Get ICD-10-CM codes for a medical term using Clinical Tables API."""
+        if "icd10" in self.indexes:
+            return self._search_index("icd10", term)
+
         try:
             params = {"sf": "code,name", "terms": term, "maxList": 10}
 
-            response = self.clinical_session.get(
-                ICD10_ENDPOINT, params=params, timeout=10
-            )
-            response.raise_for_status()
-
-            data = response.json()
+            data = self._get_json(ICD10_ENDPOINT, params)
             # Clinical Tables returns: [count, codes[], null, [[code, name]...]]
             if len(data) >= 4 and data[3]:
                 results = [{"code": item[0], "name": item[1]} for item in data[3]]
@@ -145,20 +307,16 @@ class MedicalCodeExtractor:
         except (json.JSONDecodeError, IndexError, KeyError, TypeError) as e:
             logger.warning(f"Error parsing ICD-10 response for '{term}': {e}")
             return None
-        finally:
-            time.sleep(self.rate_limit_delay)
 
     def get_icd11_codes(self, term: str) -> Optional[List[Dict[str, str]]]:
         """Get ICD-11 codes for a medical term using Clinical Tables API."""
+        if "icd11" in self.indexes:
+            return self._search_index("icd11", term)
+
         try:
             params = {"sf": "code,name", "terms": term, "maxList": 10}
 
-            response = self.clinical_session.get(
-                ICD11_ENDPOINT, params=params, timeout=10
-            )
-            response.raise_for_status()
-
-            data = response.json()
+            data = self._get_json(ICD11_ENDPOINT, params)
             # Clinical Tables returns: [count, codes[], null, [[code, name]...]]
             if len(data) >= 4 and data[3]:
                 results = [{"code": item[0], "name": item[1]} for item in data[3]]
@@ -172,20 +330,16 @@ class MedicalCodeExtractor:
         except (json.JSONDecodeError, IndexError, KeyError, TypeError) as e:
             logger.warning(f"Error parsing ICD-11 response for '{term}': {e}")
             return None
-        finally:
-            time.sleep(self.rate_limit_delay)
 
     def get_loinc_codes(self, term: str) -> Optional[List[Dict[str, str]]]:
         """Get LOINC codes for a medical term using Clinical Tables API."""
+        if "loinc" in self.indexes:
+            return self._search_index("loinc", term)
+
         try:
             params = {"type": "question", "terms": term, "maxList": 10}
 
-            response = self.clinical_session.get(
-                LOINC_ENDPOINT, params=params, timeout=10
-            )
-            response.raise_for_status()
-
-            data = response.json()
+            data = self._get_json(LOINC_ENDPOINT, params)
             # Clinical Tables returns: [count, codes[], null, [[name]...]]
             if len(data) >= 4 and data[1] and data[3]:
                 results = []
@@ -206,8 +360,6 @@ class MedicalCodeExtractor:
         except (json.JSONDecodeError, IndexError, KeyError, TypeError) as e:
             logger.warning(f"Error parsing LOINC response for '{term}': {e}")
             return None
-        finally:
-            time.sleep(self.rate_limit_delay)
 
     def get_snomed_codes(self, term: str) -> Optional[List[Dict[str, str]]]:
         """Get SNOMED CT codes using UMLS API. Requires UMLS_API_KEY environment variable."""
@@ -224,12 +376,7 @@ class MedicalCodeExtractor:
                 "pageSize": 10,
             }
 
-            response = self.umls_session.get(
-                UMLS_SEARCH_ENDPOINT, params=params, timeout=10
-            )
-            response.raise_for_status()
-
-            data = response.json()
+            data = self._get_json(UMLS_SEARCH_ENDPOINT, params)
             results = []
 
             if "result" in data and "results" in data["result"]:
@@ -248,8 +395,6 @@ class MedicalCodeExtractor:
         except (json.JSONDecodeError, KeyError, TypeError) as e:
             logger.warning(f"Error parsing SNOMED response for '{term}': {e}")
             return None
-        finally:
-            time.sleep(self.rate_limit_delay)
 
     def get_mesh_codes(self, term: str) -> Optional[List[Dict[str, str]]]:
         """Get MeSH codes using UMLS API. Requires UMLS_API_KEY environment variable."""
@@ -266,12 +411,7 @@ class MedicalCodeExtractor:
                 "pageSize": 10,
             }
 
-            response = self.umls_session.get(
-                UMLS_SEARCH_ENDPOINT, params=params, timeout=10
-            )
-            response.raise_for_status()
-
-            data = response.json()
+            data = self._get_json(UMLS_SEARCH_ENDPOINT, params)
             results = []
 
             if "result" in data and "results" in data["result"]:
@@ -290,14 +430,15 @@ class MedicalCodeExtractor:
         except (json.JSONDecodeError, KeyError, TypeError) as e:
             logger.warning(f"Error parsing MeSH response for '{term}': {e}")
             return None
-        finally:
-            time.sleep(self.rate_limit_delay)
 
     def extract_codes_for_term(self, term: str) -> Optional[Dict[str, Any]]:
         """
-        Extract all available medical codes for a term from 5 coding systems:
+        Extract all available medical codes for a term from 6 coding systems:
         RxNorm, ICD-10, ICD-11, LOINC, SNOMED CT, and MeSH.
 
+        The systems are queried in parallel, so the latency is that of the
+        slowest one rather than the sum of all of them.
+
         Returns:
             Dictionary with term and codes, or None if no codes found from any system
         """
@@ -305,16 +446,19 @@ class MedicalCodeExtractor:
 
         codes_dict = {}
 
-        # Extract from all 5 systems
-        for system_name, method in [
-            ("rxnorm", self.get_rxnorm_codes),
-            ("icd10", self.get_icd10_codes),
-            ("icd11", self.get_icd11_codes),
-            ("loinc", self.get_loinc_codes),
-            ("snomed_ct", self.get_snomed_codes),
-            ("mesh", self.get_mesh_codes),
-        ]:
-            codes = method(term)
+        futures = [
+            (system_name, self._lookup_pool.submit(method, term))
+            for system_name, method in [
+                ("rxnorm", self.get_rxnorm_codes),
+                ("icd10", self.get_icd10_codes),
+                ("icd11", self.get_icd11_codes),
+                ("loinc", self.get_loinc_codes),
+                ("snomed_ct", self.get_snomed_codes),
+                ("mesh", self.get_mesh_codes),
+            ]
+        ]
+        for system_name, future in futures:
+            codes = future.result()
             if codes:
                 codes_dict[system_name] = codes
 
@@ -327,17 +471,56 @@ class MedicalCodeExtractor:
 
         return {"term": term, "codes": codes_dict}
 
-    def process_single_term(self, term: str) -> bool:
-        """Process a single medical term."""
+    def _extract_term(self, term: str) -> Optional[Dict[str, Any]]:
+        """Extract codes for a term, logging and swallowing any error."""
         try:
-            result = self.extract_codes_for_term(term)
-            if result:
-                self.output_data.append(result)
-                return True
-            return False
+            return self.extract_codes_for_term(term)
         except Exception as e:
             logger.error(f"Error processing term '{term}': {e}")
-            return False
+            return None
+
+    def process_single_term(self, term: str) -> bool:
+        """Process a single medical term."""
+        result = self._extract_term(term)
+        if result:
+            self.output_data.append(result)
+            return True
+        return False
+
+    def extract_many(
+        self, terms: List[str]
+    ) -> Iterator[Tuple[str, Optional[Dict[str, Any]]]]:
+        """
+        Extract codes for many terms, term_concurrency terms at a time.
+
+        Yields:
+            Tuples of (term, result of extract_codes_for_term) in input order.
+            A term whose extraction raised yields None.
+        """
+        # Submit lazily so a long term list does not queue every term up front
+        pending = []
+        term_iter = iter(terms)
+        for term in term_iter:
+            pending.append((term, self._term_pool.submit(self._extract_term, term)))
+            if len(pending) >= self.term_concurrency * 2:
+                break
+        while pending:
+            term, future = pending.pop(0)
+            next_term = next(term_iter, None)
+            if next_term is not None:
+                pending.append(
+                    (next_term, self._term_pool.submit(self._extract_term, next_term))
+                )
+            yield term, future.result()
+
+    def close(self) -> None:
+        """Stop the worker threads and release the sessions and the cache."""
+        self._term_pool.shutdown(wait=True, cancel_futures=True)
+        self._lookup_pool.shutdown(wait=True, cancel_futures=True)
+        for session in self.sessions.values():
+            session.close()
+        if self.cache is not None:
+            self.cache.close()
 
     def load_terms_from_text_file(self, file_path: Path) -> List[str]:
         """Load medical terms from a text file (one per line)."""
@@ -403,10 +586,16 @@ class MedicalCodeExtractor:
                 logger.error(f"No terms found in file: {input_data}")
                 return False
 
-            # Process all terms
+            # Process all terms concurrently, keeping the input order
             successful = 0
-            for term in tqdm(terms, desc="Processing terms", unit="term"):
-                if self.process_single_term(term):
+            for _, result in tqdm(
+                self.extract_many(terms),
+                total=len(terms),
+                desc="Processing terms",
+                unit="term",
+            ):
+                if result:
+                    self.output_data.append(result)
                     successful += 1
 
             print(f"\nProcessed {successful}/{len(terms)} terms successfully")
@@ -464,11 +653,27 @@ def main():
     parser.add_argument(
         "-o", "--output", help="Output JSON file path (auto-generated if not specified)"
     )
+    parser.add_argument(
+        "-c",
+        "--concurrency",
+        type=int,
+        default=DEFAULT_TERM_CONCURRENCY,
+        help=f"Number of terms processed at the same time (default: {DEFAULT_TERM_CONCURRENCY})",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Do not read or write the on-disk response cache",
+    )
 
     args = parser.parse_args()
 
+    extractor = None
     try:
-        extractor = MedicalCodeExtractor()
+        extractor = MedicalCodeExtractor(
+            term_concurrency=args.concurrency,
+            cache_path=None if args.no_cache else DEFAULT_CACHE_PATH,
+        )
 
         # Process input
         if extractor.process_input(args.input):
@@ -489,6 +694,9 @@ def main():
         logger.error(f"Unexpected error: {e}")
         print(f"Error: {e}")
         return 1
+    finally:
+        if extractor is not None:
+            extractor.close()
 
 
 if __name__ == "__main__":
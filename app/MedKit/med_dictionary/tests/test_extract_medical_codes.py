@@ -0,0 +1,142 @@
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+# Add project roots to sys.path
+project_root = Path(__file__).parent.parent
+for path in [project_root, project_root.parent.parent.parent]:
+    if str(path) not in sys.path:
+        sys.path.append(str(path))
+
+from extract_medical_codes import HostLimiter, MedicalCodeExtractor
+
+ICD10_RESPONSE = [1, ["J45"], None, [["J45", "Asthma"]]]
+RXNORM_RESPONSE = {
+    "drugGroup": {
+        "conceptGroup": [{"conceptProperties": [{"rxcui": "1", "name": "albuterol"}]}]
+    }
+}
+
+
+class FakeGet:
+    """Stand-in for requests.Session.get that records concurrency."""
+
+    def __init__(self, delay=0.05):
+        self.delay = delay
+        self.calls = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, url, params=None, timeout=None):
+        with self._lock:
+            self.calls.append(url)
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        time.sleep(self.delay)
+        with self._lock:
+            self.in_flight -= 1
+        if "icd10cm" in url:
+            data = ICD10_RESPONSE
+        elif "rxnav" in url:
+            data = RXNORM_RESPONSE
+        else:
+            data = [0, [], None, []]
+        response = MagicMock()
+        response.json.return_value = data
+        response.text = json.dumps(data)
+        return response
+
+
+class TestMedicalCodeExtractor(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = Path(tempfile.mkdtemp())
+        self.cache_path = self.tmp_dir / "cache.lmdb"
+        self.fake_get = FakeGet()
+        patcher = patch("requests.Session.get", new=self.fake_get)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        env = patch.dict("os.environ")
+        env.start()
+        self.addCleanup(env.stop)
+        os.environ.pop("UMLS_API_KEY", None)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def make_extractor(self, **kwargs):
+        extractor = MedicalCodeExtractor(cache_path=self.cache_path, **kwargs)
+        self.addCleanup(extractor.close)
+        return extractor
+
+    def test_systems_are_queried_in_parallel(self):
+        extractor = self.make_extractor()
+        started = time.monotonic()
+        result = extractor.extract_codes_for_term("asthma")
+        elapsed = time.monotonic() - started
+
+        self.assertEqual(result["codes"]["icd10"], [{"code": "J45", "name": "Asthma"}])
+        self.assertEqual(
+            result["codes"]["rxnorm"], [{"code": "1", "name": "albuterol"}]
+        )
+        # Four keyless systems, at most 0.05 s apart on the shared clinical tables host
+        self.assertEqual(len(self.fake_get.calls), 4)
+        self.assertGreater(self.fake_get.max_in_flight, 1)
+        self.assertLess(elapsed, 4 * self.fake_get.delay + 0.15)
+
+    def test_many_terms_keep_order_and_rerun_hits_cache(self):
+        terms = [f"term {i}" for i in range(12)]
+        extractor = self.make_extractor(term_concurrency=4)
+        first = list(extractor.extract_many(terms))
+        extractor.close()
+
+        self.assertEqual([term for term, _ in first], terms)
+        self.assertEqual(len(self.fake_get.calls), 4 * len(terms))
+
+        rerun = self.make_extractor(term_concurrency=4)
+        self.assertEqual(list(rerun.extract_many(terms)), first)
+        self.assertEqual(len(self.fake_get.calls), 4 * len(terms))
+
+    def test_cache_can_be_disabled(self):
+        extractor = MedicalCodeExtractor(cache_path=None)
+        self.addCleanup(extractor.close)
+        extractor.extract_codes_for_term("asthma")
+        extractor.extract_codes_for_term("asthma")
+        self.assertEqual(len(self.fake_get.calls), 8)
+
+    def test_host_limiter_spaces_and_bounds_requests(self):
+        limiter = HostLimiter(max_concurrent=2, min_interval=0.02)
+        starts = []
+        in_flight = []
+        lock = threading.Lock()
+
+        def request():
+            with limiter.slot():
+                with lock:
+                    starts.append(time.monotonic())
+                    in_flight.append(1)
+                    self.assertLessEqual(len(in_flight), 2)
+                time.sleep(0.01)
+                with lock:
+                    in_flight.pop()
+
+        threads = [threading.Thread(target=request) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        starts.sort()
+        gaps = [b - a for a, b in zip(starts, starts[1:])]
+        self.assertTrue(all(gap >= 0.015 for gap in gaps))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,9 +1,12 @@
 import argparse
 import json
 import logging
-from typing import Any, Dict, List
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Tuple
 
 from lite.config import ModelConfig
+from lite.http_client import install_http_client
 
 # External dependencies
 from litellm import completion
@@ -17,6 +20,9 @@ from recognizers.recognizer_factory import RecognizerFactory
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Tool calls from one model turn that run at the same time
+DEFAULT_MAX_PARALLEL_TOOLS = 5
+
 
 class ToolOutput(BaseModel):
     tool_name: str
@@ -28,30 +34,47 @@ class MedKitOrchestrator:
     """
     A professional agentic layer that coordinates specialized medical tools.
     Implements a ReAct (Reason-Act) loop for multi-step reasoning.
+
+    The model may request several tools in one turn; they run concurrently
+    and their observations are appended together before the next step.
     """
 
     def __init__(
-        self, model: str = "ollama/gemma3", temperature: float = 0.2, max_steps: int = 5
+        self,
+        model: str = "ollama/gemma3",
+        temperature: float = 0.2,
+        max_steps: int = 5,
+        max_parallel_tools: int = DEFAULT_MAX_PARALLEL_TOOLS,
     ):
+        if max_parallel_tools < 1:
+            raise ValueError("max_parallel_tools must be at least 1")
         self.model = model
         self.temperature = temperature
         self.max_steps = max_steps
         self.history = []
         self.tools = self._register_tools()
+        self.model_config = ModelConfig(model=self.model)
+        self._tool_pool = ThreadPoolExecutor(
+            max_parallel_tools, thread_name_prefix="medkit-tool"
+        )
+        # Recognizers are built once per entity type and reused across calls
+        self._recognizers: Dict[str, Any] = {}
+        self._recognizers_lock = threading.Lock()
+        install_http_client()
 
         self.system_prompt = """You are the MedKit Orchestrator, a high-reasoning medical agent.
 Your goal is to assist clinicians by coordinating specialized medical tools.
 
 ### Operational Protocol:
 1. **Analyze**: Break down complex queries into logical steps.
-2. **Execute**: Use the appropriate tools to gather evidence.
-3. **Reason**: After each tool call, analyze the observation and decide if more data is needed.
+2. **Execute**: Use the appropriate tools to gather evidence. Request independent tools together in one turn; they run in parallel.
+3. **Reason**: After each round of tool calls, analyze the observations and decide if more data is needed.
 4. **Synthesize**: Provide a professional, structured clinical response.
 
 ### Available Tools:
 - get_medicine_info: Explains a drug's mechanism, use, and side effects.
 - identify_medical_entity: Identifies a specific medical entity (disease, sign, pathogen, etc.).
-- search_icd11: Searches the official WHO ICD-11 database for codes (Requires credentials).
+- search_icd11: Searches the official WHO ICD-11 database for codes (uses the offline index when imported, otherwise requires credentials).
 - anatomical_lookup: Provides detailed info on body parts and structures.
 
 ### Guidelines:
@@ -114,6 +137,20 @@ Your goal is to assist clinicians by coordinating specialized medical tools.
             },
         ]
 
+    def close(self):
+        """Shut down the tool pool."""
+        self._tool_pool.shutdown(wait=True)
+
+    def _get_recognizer(self, entity_type: str):
+        """Return the cached recognizer for an entity type, creating it on first use."""
+        key = entity_type.lower()
+        with self._recognizers_lock:
+            recognizer = self._recognizers.get(key)
+            if recognizer is None:
+                recognizer = RecognizerFactory.get(key, self.model_config)
+                self._recognizers[key] = recognizer
+            return recognizer
+
     def call_tool(self, tool_name: str, args: Dict) -> ToolOutput:
         logger.info(f"🔧 Executing: {tool_name}({args})")
 
@@ -123,29 +160,30 @@ Your goal is to assist clinicians by coordinating specialized medical tools.
                 return ToolOutput(tool_name=tool_name, result=res)
 
             elif tool_name == "identify_medical_entity":
-                config = ModelConfig(model=self.model)
-                recognizer = RecognizerFactory.get(args["entity_type"], config)
+                recognizer = self._get_recognizer(args["entity_type"])
                 result = recognizer.identify(args["entity_name"])
                 if hasattr(result, "markdown") and result.markdown:
                     return ToolOutput(tool_name=tool_name, result=result.markdown)
                 return ToolOutput(tool_name=tool_name, result=str(result))
 
             elif tool_name == "search_icd11":
-                import os
-
-                from med_codes.get_icd11 import ICD11Client
-
-                client_id = os.environ.get("ICD11_CLIENT_ID")
-                client_secret = os.environ.get("ICD11_CLIENT_SECRET")
-                if not client_id or not client_secret:
-                    return ToolOutput(
-                        tool_name=tool_name,
-                        status="error",
-                        result="ICD-11 API credentials missing in environment.",
-                    )
-
-                client = ICD11Client(client_id, client_secret)
-                results = client.search(args["query"])
+                from med_codes.code_index import get_index
+                from med_codes.get_icd11 import get_client
+
+                # An imported offline index answers without credentials or network
+                index = get_index("icd11")
+                if index is not None:
+                    results = index.icd11_response(args["query"])
+                else:
+                    # Shared client: its token and search results outlive this call
+                    client = get_client()
+                    if client is None:
+                        return ToolOutput(
+                            tool_name=tool_name,
+                            status="error",
+                            result="ICD-11 API credentials missing in environment.",
+                        )
+                    results = client.search(args["query"])
                 if results and "destinationEntities" in results:
                     summary = []
                     for entity in results["destinationEntities"][:5]:
@@ -171,6 +209,59 @@ Your goal is to assist clinicians by coordinating specialized medical tools.
             logger.error(f"Tool execution failed: {e}")
             return ToolOutput(tool_name=tool_name, result=str(e), status="error")
 
+    @staticmethod
+    def _field(obj, name, default=None):
+        """Read a field from a litellm object or a plain dict."""
+        if isinstance(obj, dict):
+            return obj.get(name, default)
+        return getattr(obj, name, default)
+
+    def _tool_calls(self, message) -> List[Tuple[Any, str, str]]:
+        """Return (id, name, arguments) for every tool the model requested."""
+        calls = []
+        for tool_call in self._field(message, "tool_calls") or []:
+            function = self._field(tool_call, "function")
+            calls.append(
+                (
+                    self._field(tool_call, "id"),
+                    self._field(function, "name"),
+                    self._field(function, "arguments") or "{}",
+                )
+            )
+        # Providers that still answer with the legacy single function_call
+        function_call = self._field(message, "function_call")
+        if not calls and function_call:
+            calls.append(
+                (
+                    None,
+                    self._field(function_call, "name"),
+                    self._field(function_call, "arguments") or "{}",
+                )
+            )
+        return calls
+
+    def _execute(self, tool_name: str, args_str: str) -> ToolOutput:
+        try:
+            tool_args = json.loads(args_str)
+        except json.JSONDecodeError as e:
+            return ToolOutput(
+                tool_name=tool_name,
+                result=f"Invalid tool arguments: {e}",
+                status="error",
+            )
+        return self.call_tool(tool_name, tool_args)
+
+    def run_tools(self, calls: List[Tuple[Any, str, str]]) -> List[ToolOutput]:
+        """Execute tool calls concurrently, returning observations in call order."""
+        if len(calls) == 1:
+            _, tool_name, args_str = calls[0]
+            return [self._execute(tool_name, args_str)]
+        futures = [
+            self._tool_pool.submit(self._execute, tool_name, args_str)
+            for _, tool_name, args_str in calls
+        ]
+        return [future.result() for future in futures]
+
     def run(self, query: str):
         print(f"\n[USER]: {query}")
         self.history.append({"role": "user", "content": query})
@@ -182,54 +273,44 @@ Your goal is to assist clinicians by coordinating specialized medical tools.
                 model=self.model,
                 messages=[{"role": "system", "content": self.system_prompt}]
                 + self.history,
-                functions=self.tools,
-                function_call="auto",
+                tools=[{"type": "function", "function": tool} for tool in self.tools],
+                tool_choice="auto",
                 temperature=self.temperature,
             )
 
             message = response.choices[0].message
+            calls = self._tool_calls(message)
 
-            # Check for tool call
-            function_call = (
-                message.get("function_call")
-                if isinstance(message, dict)
-                else getattr(message, "function_call", None)
-            )
-
-            if function_call:
-                tool_name = (
-                    function_call["name"]
-                    if isinstance(function_call, dict)
-                    else function_call.name
-                )
-                args_str = (
-                    function_call["arguments"]
-                    if isinstance(function_call, dict)
-                    else function_call.arguments
-                )
-                tool_args = json.loads(args_str)
-
-                observation = self.call_tool(tool_name, tool_args)
+            if calls:
+                observations = self.run_tools(calls)
 
-                # Update history with tool call and result
+                # Update history with the tool calls and all of their results
                 self.history.append(message)
-                self.history.append(
-                    {
-                        "role": "function",
-                        "name": tool_name,
-                        "content": str(observation.result),
-                    }
-                )
-
-                print(f"[OBSERVATION]: {str(observation.result)[:200]}...")
+                for (call_id, tool_name, _), observation in zip(calls, observations):
+                    if call_id is None:
+                        self.history.append(
+                            {
+                                "role": "function",
+                                "name": tool_name,
+                                "content": str(observation.result),
+                            }
+                        )
+                    else:
+                        self.history.append(
+                            {
+                                "role": "tool",
+                                "tool_call_id": call_id,
+                                "name": tool_name,
+                                "content": str(observation.result),
+                            }
+                        )
+                    print(
+                        f"[OBSERVATION] {tool_name}: {str(observation.result)[:200]}..."
+                    )
 
             else:
                 # No more tools needed, this is the final answer
-                content = (
-                    message.get("content")
-                    if isinstance(message, dict)
-                    else getattr(message, "content", "")
-                )
+                content = self._field(message, "content", "")
                 print(f"\n[ORCHESTRATOR]: {content}")
                 return content
 
@@ -257,27 +338,40 @@ def main():
     parser.add_argument(
         "-s", "--steps", type=int, default=5, help="Max reasoning steps"
     )
+    parser.add_argument(
+        "-p",
+        "--parallel-tools",
+        type=int,
+        default=DEFAULT_MAX_PARALLEL_TOOLS,
+        help="Tool calls from one step that run concurrently",
+    )
 
     args = parser.parse_args()
 
     orchestrator = MedKitOrchestrator(
-        model=args.model, temperature=args.temperature, max_steps=args.steps
+        model=args.model,
+        temperature=args.temperature,
+        max_steps=args.steps,
+        max_parallel_tools=args.parallel_tools,
     )
 
-    if args.query:
-        orchestrator.run(args.query)
-    else:
-        print("Welcome to MedKit Orchestrator. Type 'exit' to quit.")
-        while True:
-            try:
-                user_input = input("\n> ").strip()
-                if user_input.lower() in ["exit", "quit"]:
+    try:
+        if args.query:
+            orchestrator.run(args.query)
+        else:
+            print("Welcome to MedKit Orchestrator. Type 'exit' to quit.")
+            while True:
+                try:
+                    user_input = input("\n> ").strip()
+                    if user_input.lower() in ["exit", "quit"]:
+                        break
+                    if not user_input:
+                        continue
+                    orchestrator.run(user_input)
+                except KeyboardInterrupt:
                     break
-                if not user_input:
-                    continue
-                orchestrator.run(user_input)
-            except KeyboardInterrupt:
-                break
+    finally:
+        orchestrator.close()
 
 
 if __name__ == "__main__":
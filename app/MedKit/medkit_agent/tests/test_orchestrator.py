@@ -0,0 +1,201 @@
+import sys
+import threading
+import time
+import types
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+# Add the MedKit root to sys.path
+medkit_root = Path(__file__).parent.parent.parent
+if str(medkit_root) not in sys.path:
+    sys.path.append(str(medkit_root))
+
+# Loaded before the stubs below so they stay imported once the stubs are removed
+import lite.config  # noqa: F401
+import lite.http_client  # noqa: F401
+
+# The tool implementations are replaced in every test; keep their heavy
+# imports out of the orchestrator under test
+_tool_modules = {
+    "drug.medicine_explainer": types.SimpleNamespace(explain_medicine=MagicMock()),
+    "recognizers.recognizer_factory": types.SimpleNamespace(
+        RecognizerFactory=MagicMock()
+    ),
+}
+with patch.dict(sys.modules, _tool_modules):
+    from medkit_agent import orchestrator
+    from medkit_agent.orchestrator import MedKitOrchestrator, ToolOutput
+
+
+def make_response(message):
+    response = MagicMock()
+    response.choices[0].message = message
+    return response
+
+
+def tool_call(call_id, name, arguments):
+    return {
+        "id": call_id,
+        "type": "function",
+        "function": {"name": name, "arguments": arguments},
+    }
+
+
+FINAL = {"role": "assistant", "content": "Done.", "tool_calls": None}
+
+
+class TestMedKitOrchestrator(unittest.TestCase):
+    def setUp(self):
+        install = patch.object(orchestrator, "install_http_client")
+        install.start()
+        self.addCleanup(install.stop)
+        self.completion = patch.object(orchestrator, "completion").start()
+        self.addCleanup(patch.stopall)
+
+    def make_orchestrator(self, **kwargs):
+        agent = MedKitOrchestrator(**kwargs)
+        self.addCleanup(agent.close)
+        return agent
+
+    def tool_messages(self, agent):
+        return [
+            message
+            for message in agent.history
+            if isinstance(message, dict) and message["role"] in ("tool", "function")
+        ]
+
+    def test_tool_calls_run_concurrently_up_to_limit(self):
+        calls = [
+            tool_call(f"call_{i}", "search_icd11", f'{{"query": "q{i}"}}')
+            for i in range(6)
+        ]
+        self.completion.side_effect = [
+            make_response({"role": "assistant", "content": None, "tool_calls": calls}),
+            make_response(FINAL),
+        ]
+        agent = self.make_orchestrator(max_parallel_tools=3)
+
+        lock = threading.Lock()
+        active = peak = 0
+
+        def call_tool(tool_name, args):
+            nonlocal active, peak
+            with lock:
+                active += 1
+                peak = max(peak, active)
+            time.sleep(0.05)
+            with lock:
+                active -= 1
+            return ToolOutput(tool_name=tool_name, result=args["query"])
+
+        with patch.object(agent, "call_tool", side_effect=call_tool):
+            self.assertEqual(agent.run("codes?"), "Done.")
+        self.assertEqual(peak, 3)
+
+    def test_tool_messages_follow_call_order(self):
+        calls = [
+            tool_call("call_a", "search_icd11", '{"query": "slow"}'),
+            tool_call("call_b", "get_medicine_info", '{"medicine_name": "fast"}'),
+            tool_call("call_c", "search_icd11", '{"query": "medium"}'),
+        ]
+        request = {"role": "assistant", "content": None, "tool_calls": calls}
+        self.completion.side_effect = [make_response(request), make_response(FINAL)]
+        agent = self.make_orchestrator()
+        delays = {"slow": 0.2, "fast": 0.0, "medium": 0.1}
+
+        def call_tool(tool_name, args):
+            value = args.get("query") or args.get("medicine_name")
+            time.sleep(delays[value])
+            return ToolOutput(tool_name=tool_name, result=value)
+
+        with patch.object(agent, "call_tool", side_effect=call_tool):
+            agent.run("codes?")
+
+        self.assertIs(agent.history[1], request)
+        self.assertEqual(
+            [
+                (m["role"], m["tool_call_id"], m["name"], m["content"])
+                for m in self.tool_messages(agent)
+            ],
+            [
+                ("tool", "call_a", "search_icd11", "slow"),
+                ("tool", "call_b", "get_medicine_info", "fast"),
+                ("tool", "call_c", "search_icd11", "medium"),
+            ],
+        )
+        # The observations are sent back to the model on the next step
+        messages = self.completion.call_args_list[1].kwargs["messages"]
+        self.assertEqual(messages[1:], agent.history)
+
+    def test_legacy_function_call(self):
+        request = {
+            "role": "assistant",
+            "content": None,
+            "function_call": {
+                "name": "get_medicine_info",
+                "arguments": '{"medicine_name": "aspirin"}',
+            },
+        }
+        self.completion.side_effect = [make_response(request), make_response(FINAL)]
+        agent = self.make_orchestrator()
+
+        with patch.object(
+            agent,
+            "call_tool",
+            return_value=ToolOutput(tool_name="get_medicine_info", result="NSAID"),
+        ) as call_tool:
+            self.assertEqual(agent.run("aspirin?"), "Done.")
+
+        call_tool.assert_called_once_with(
+            "get_medicine_info", {"medicine_name": "aspirin"}
+        )
+        self.assertEqual(
+            self.tool_messages(agent),
+            [{"role": "function", "name": "get_medicine_info", "content": "NSAID"}],
+        )
+
+    def test_invalid_arguments_become_error_observation(self):
+        calls = [
+            tool_call("call_a", "search_icd11", '{"query": '),
+            tool_call("call_b", "search_icd11", '{"query": "asthma"}'),
+        ]
+        self.completion.side_effect = [
+            make_response({"role": "assistant", "content": None, "tool_calls": calls}),
+            make_response(FINAL),
+        ]
+        agent = self.make_orchestrator()
+
+        with patch.object(
+            agent,
+            "call_tool",
+            return_value=ToolOutput(tool_name="search_icd11", result="CA23"),
+        ) as call_tool:
+            agent.run("asthma?")
+
+        call_tool.assert_called_once_with("search_icd11", {"query": "asthma"})
+        first, second = self.tool_messages(agent)
+        self.assertEqual(first["tool_call_id"], "call_a")
+        self.assertTrue(first["content"].startswith("Invalid tool arguments"))
+        self.assertEqual(
+            (second["tool_call_id"], second["content"]), ("call_b", "CA23")
+        )
+
+    def test_max_parallel_tools_validation(self):
+        with self.assertRaises(ValueError):
+            MedKitOrchestrator(max_parallel_tools=0)
+
+
+class TestMain(unittest.TestCase):
+    def test_main_closes_orchestrator(self):
+        agent = MagicMock()
+        agent.run.side_effect = RuntimeError("model unavailable")
+        argv = ["orchestrator", "what is asthma?"]
+        with patch.object(orchestrator, "MedKitOrchestrator", return_value=agent):
+            with patch.object(sys, "argv", argv), self.assertRaises(RuntimeError):
+                orchestrator.main()
+        agent.close.assert_called_once_with()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -4,7 +4,6 @@ Guardrail System - Analyzes text and images for safety violations.
 Uses LiteClient to perform content moderation.
 """
 
-import asyncio
 import logging
 import re
 import hashlib
@@ -69,8 +68,7 @@ class GuardrailAnalyzer:
                 response_format=GuardrailResponse
             )
 
-            loop = asyncio.get_event_loop()
-            response = await loop.run_in_executor(None, self.client.generate_text, model_input)
+            response = await self.client.agenerate_text(model_input)
 
             if isinstance(response, GuardrailResponse):
                 response.text = cleaned_text
@@ -105,8 +103,7 @@ class GuardrailAnalyzer:
                 response_format=ImageGuardrailResponse
             )
 
-            loop = asyncio.get_event_loop()
-            response = await loop.run_in_executor(None, self.client.generate_text, model_input)
+            response = await self.client.agenerate_text(model_input)
 
             if isinstance(response, ImageGuardrailResponse):
                 response.image_path = str(path.absolute())
@@ -20,7 +20,7 @@ def run_async(coro):
 
 @pytest.fixture
 def mock_generate_text():
-    with patch("lite.lite_client.LiteClient.generate_text") as mock:
+    with patch("lite.lite_client.LiteClient.agenerate_text") as mock:
         yield mock
 
 
@@ -2,11 +2,15 @@
 Dictionary Builder
 
 Encapsulates functionality for building and managing dictionary definitions
-using LLM-generated content.
+using LLM-generated content. Definitions are fetched concurrently and written
+to an append-only journal that is periodically compacted into the sorted JSON
+dictionary, so large term lists build at the speed of the provider and an
+interrupted build resumes where it stopped.
 """
 
 import sys
 import json
+import logging
 import os
 import re
 from pathlib import Path
@@ -22,7 +26,16 @@ from lite.logging_config import configure_logging as setup_logging
 
 # Configure logging
 log_file = Path(__file__).parent / "logs" / "medical_dictionary.log"
-logger = setup_logging(str(log_file))
+setup_logging(str(log_file))
+logger = logging.getLogger(__name__)
+
+
+# Definitions fetched concurrently by the build pipeline
+DEFAULT_MAX_CONCURRENCY = 8
+# Definitions appended to the journal before it is compacted into the JSON file
+DEFAULT_COMPACT_EVERY = 500
+# Journal lines written between fsync calls
+JOURNAL_SYNC_EVERY = 50
 
 
 # Default regex patterns for cleaning conversational text (can be customized via DictConfig)
@@ -340,6 +353,12 @@ def parse_response(response_content: str, conversational_patterns: list = None)
         return None
 
 
+def build_model_input(term: str, config: DictConfig) -> ModelInput:
+    """Build the definition request for a term from the prompt templates."""
+    user_prompt = config.user_prompt_template.format(term=term)
+    return ModelInput(user_prompt=user_prompt, system_prompt=config.system_prompt_template)
+
+
 def fetch_definition(
     client: LiteClient,
     term: str,
@@ -357,8 +376,7 @@ def fetch_definition(
         Definition text or None if failed
     """
     try:
-        user_prompt = config.user_prompt_template.format(term=term)
-        model_input = ModelInput(user_prompt=user_prompt, system_prompt=config.system_prompt_template)
+        model_input = build_model_input(term, config)
         response_content = client.generate_text(model_input=model_input)
 
         if not isinstance(response_content, str):
@@ -372,20 +390,65 @@ def fetch_definition(
         return None
 
 
+def clean_definition(term: str, raw_response: str, config: DictConfig) -> str | None:
+    """
+    Clean a fetched definition: strip conversational text and a leading repeat of the term.
+
+    Args:
+        term: The term that was defined
+        raw_response: Raw model response
+        config: DictConfig instance with cleaning patterns
+
+    Returns:
+        Cleaned definition or None if nothing usable is left
+    """
+    parsed_content = parse_response(raw_response, config.conversational_patterns)
+    if parsed_content is None:
+        logger.warning(f"Failed to parse response for '{term}'")
+        return None
+
+    if definition_starts_with_term(term, parsed_content, config.term_prefix_patterns):
+        parsed_content = remove_term_from_definition(
+            term, parsed_content, config.term_prefix_patterns
+        )
+
+    if not parsed_content or not parsed_content.strip():
+        logger.warning(f"Definition for '{term}' is empty after cleaning")
+        return None
+    return parsed_content
+
+
 # ============================================================================
 # DICTIONARY BUILDER CLASS
 # ============================================================================
 
 class DictionaryBuilder:
-    """Encapsulates dictionary building functionality (domain-agnostic)."""
+    """
+    Encapsulates dictionary building functionality (domain-agnostic).
 
-    def __init__(self, config: DictConfig, model_config: ModelConfig):
+    Definitions are fetched concurrently, cleaned as they arrive and appended
+    to a JSONL journal next to the definitions JSON file. The journal is
+    compacted into the sorted JSON file every compact_every definitions and at
+    the end of a run. It doubles as the checkpoint: a crashed or interrupted
+    run replays it on start-up and only fetches the terms still missing.
+    """
+
+    def __init__(
+        self,
+        config: DictConfig,
+        model_config: ModelConfig,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        compact_every: int = DEFAULT_COMPACT_EVERY,
+    ):
         """
         Initialize the DictionaryBuilder.
 
         Args:
             config: DictConfig object with prompts and file configuration (required)
             model_config: ModelConfig instance with model and temperature settings (required)
+            max_concurrency: Number of definitions fetched at the same time
+            compact_every: Definitions appended to the journal between rewrites
+                of the definitions JSON file
 
         Raises:
             ValueError: If config or model_config is invalid or missing
@@ -396,12 +459,22 @@ class DictionaryBuilder:
         if not isinstance(model_config, ModelConfig):
             raise ValueError("model_config must be a ModelConfig instance")
 
+        if max_concurrency <= 0:
+            raise ValueError("max_concurrency must be greater than 0")
+
+        if compact_every <= 0:
+            raise ValueError("compact_every must be greater than 0")
+
         self.config = config
         self.model_config = model_config
+        self.max_concurrency = max_concurrency
+        self.compact_every = compact_every
 
         # Set up instance variables from config
         self.config.output_dir.mkdir(exist_ok=True)
-        self.client = LiteClient(model_config=model_config)
+        self.client = LiteClient(model_config=model_config, max_concurrency=max_concurrency)
+        self._journal = None
+        self._journal_entries = 0
         self.definitions = self.load_definitions()
         self.existing_terms = {d.get("term", "").lower() for d in self.definitions}
         logger.info(f"DictionaryBuilder initialized with model: {model_config.model}")
@@ -412,8 +485,12 @@ class DictionaryBuilder:
         filename = f"{self.config.file_name}_{safe_model}.json"
         return self.config.output_dir / filename
 
+    def _get_journal_file(self) -> Path:
+        """Get the path to the append-only journal of definitions not yet compacted."""
+        return self._get_definitions_file().with_suffix(".jsonl")
+
     def load_definitions(self) -> list:
-        """Load existing dictionary definitions from JSON file."""
+        """Load existing dictionary definitions from JSON file and the journal of an unfinished run."""
         try:
             json_file = self._get_definitions_file()
 
@@ -421,24 +498,66 @@ class DictionaryBuilder:
                 with open(json_file, 'r') as f:
                     definitions = json.load(f)
                     logger.info(f"Loaded {len(definitions)} definitions from {json_file}")
-                    return definitions
-
-            logger.info(f"No existing definitions file found at {json_file}")
-            return []
+            else:
+                logger.info(f"No existing definitions file found at {json_file}")
+                definitions = []
         except Exception as e:
             logger.error(f"Failed to load definitions: {e}")
-            return []
+            definitions = []
+
+        self._replay_journal(definitions)
+        return definitions
+
+    def _replay_journal(self, definitions: list) -> None:
+        """Add journal entries missing from definitions, tolerating a torn last line."""
+        journal_file = self._get_journal_file()
+        if not journal_file.exists():
+            return
+
+        known = {d.get("term", "").lower() for d in definitions}
+        recovered = 0
+        with open(journal_file, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    logger.warning(f"Skipping incomplete journal line in {journal_file}")
+                    continue
+                term = entry.get("term", "")
+                if term and term.lower() not in known:
+                    definitions.append(entry)
+                    known.add(term.lower())
+                    recovered += 1
+                self._journal_entries += 1
+        logger.info(f"Recovered {recovered} definitions from journal {journal_file}")
+
+    def _append_to_journal(self, entry: dict) -> bool:
+        """Append one definition to the journal."""
+        try:
+            if self._journal is None:
+                self._journal = open(self._get_journal_file(), 'a', encoding='utf-8')
+            self._journal.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            self._journal.flush()
+            self._journal_entries += 1
+            if self._journal_entries % JOURNAL_SYNC_EVERY == 0:
+                os.fsync(self._journal.fileno())
+            return True
+        except Exception as e:
+            logger.error(f"Failed to append '{entry.get('term')}' to journal: {e}")
+            return False
 
     def save_definitions(self) -> bool:
-        """Save current definitions to JSON file."""
+        """Atomically save current definitions to JSON file."""
         try:
             json_file = self._get_definitions_file()
+            tmp_file = json_file.with_suffix(".json.tmp")
 
             sorted_definitions = sorted(self.definitions, key=lambda x: x.get("term", "").lower())
-            with open(json_file, 'w', encoding='utf-8') as f:
+            with open(tmp_file, 'w', encoding='utf-8') as f:
                 json.dump(sorted_definitions, f, indent=2, ensure_ascii=False)
                 f.flush()
                 os.fsync(f.fileno())
+            os.replace(tmp_file, json_file)
 
             logger.info(f"Saved {len(sorted_definitions)} definitions to {json_file}")
             return True
@@ -446,6 +565,27 @@ class DictionaryBuilder:
             logger.error(f"Failed to save definitions: {e}")
             return False
 
+    def compact(self) -> bool:
+        """
+        Fold the journal into the definitions JSON file and truncate it.
+
+        The JSON file is replaced before the journal is removed, so a crash in
+        between only leaves entries that are replayed as duplicates and skipped.
+
+        Returns:
+            True if the definitions file is up to date
+        """
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+        if self._journal_entries == 0:
+            return True
+        if not self.save_definitions():
+            return False
+        self._get_journal_file().unlink(missing_ok=True)
+        self._journal_entries = 0
+        return True
+
     def process_input(self, input_data: str | Path) -> Set[str]:
         """
         (1) Process input and return a set of terms.
@@ -484,7 +624,12 @@ class DictionaryBuilder:
 
     def process_and_save_terms(self, new_terms: Set[str]) -> int:
         """
-        (4-5) Process new terms incrementally: fetch, clean, and save one at a time.
+        (4-5) Process new terms in a pipeline: fetch concurrently, clean, and journal.
+
+        Definitions are fetched max_concurrency at a time and handled in
+        completion order. Each cleaned definition is appended to the journal,
+        which is compacted into the JSON file every compact_every definitions
+        and when the run ends, even if it is interrupted.
 
         Args:
             new_terms: Set of new terms to process
@@ -494,58 +639,44 @@ class DictionaryBuilder:
         """
         saved_count = 0
         sorted_terms = sorted(new_terms)
+        inputs = [build_model_input(term, self.config) for term in sorted_terms]
 
-        for term in tqdm(sorted_terms, desc="Processing terms", unit="term"):
-            try:
-                # Fetch definition from LLM
-                raw_response = fetch_definition(self.client, term, self.config)
-                if not raw_response:
-                    logger.warning(f"Failed to fetch definition for term: {term}")
-                    continue
-
-                # Clean response using conversational patterns
-                parsed_content = parse_response(
-                    raw_response, self.config.conversational_patterns
-                )
-                if parsed_content is None:
-                    logger.warning(f"Failed to parse response for '{term}'")
-                    continue
+        try:
+            results = self.client.generate_many(
+                inputs, max_concurrency=self.max_concurrency, ordered=False
+            )
+            for item in tqdm(results, total=len(inputs), desc="Processing terms", unit="term"):
+                term = sorted_terms[item.index]
+                try:
+                    if not item.ok or not isinstance(item.result, str) or not item.result:
+                        logger.warning(f"Failed to fetch definition for term '{term}': {item.error}")
+                        continue
+
+                    parsed_content = clean_definition(term, item.result, self.config)
+                    if parsed_content is None:
+                        continue
+
+                    # Check for duplicates (case-insensitive)
+                    if term.lower() in self.existing_terms:
+                        logger.info(f"Term '{term}' already exists in dictionary, skipping")
+                        continue
+
+                    new_entry = {"term": term, "definition": parsed_content}
+                    if not self._append_to_journal(new_entry):
+                        continue
+                    self.definitions.append(new_entry)
+                    self.existing_terms.add(term.lower())
+                    saved_count += 1
+                    logger.info(f"Saved definition for '{term}'")
 
-                # Remove term from definition if present using term prefix patterns
-                if definition_starts_with_term(
-                    term, parsed_content, self.config.term_prefix_patterns
-                ):
-                    parsed_content = remove_term_from_definition(
-                        term, parsed_content, self.config.term_prefix_patterns
-                    )
-
-                # Validate definition has content
-                if not parsed_content or not parsed_content.strip():
-                    logger.warning(f"Definition for '{term}' is empty after cleaning")
-                    continue
+                    if self._journal_entries >= self.compact_every:
+                        self.compact()
 
-                # Check for duplicates (case-insensitive)
-                if term.lower() in self.existing_terms:
-                    logger.info(f"Term '{term}' already exists in dictionary, skipping")
+                except Exception as e:
+                    logger.error(f"Error processing term '{term}': {e}")
                     continue
-
-                # Append to definitions
-                new_entry = {"term": term, "definition": parsed_content}
-                self.definitions.append(new_entry)
-                self.existing_terms.add(term.lower())
-
-                # Save immediately to file
-                if self.save_definitions():
-                    logger.info(f"Saved definition for '{term}'")
-                    saved_count += 1
-                else:
-                    # Remove the entry from definitions if save failed
-                    self.definitions.pop()
-                    self.existing_terms.discard(term.lower())
-
-            except Exception as e:
-                logger.error(f"Error processing term '{term}': {e}")
-                continue
+        finally:
+            self.compact()
 
         logger.info(f"Successfully processed {saved_count}/{len(new_terms)} definitions")
         return saved_count
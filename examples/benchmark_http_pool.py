@@ -0,0 +1,117 @@
+"""Benchmark connection reuse of the shared LiteLLM HTTP client.
+
+Starts a local OpenAI-compatible stub server that counts TCP connections,
+then sends the same number of completions through LiteClient with LiteLLM's
+default HTTP client and with the shared pool installed. LiteLLM's default
+client already keeps connections alive, so expect similar connection counts;
+the runs compare the two clients, not keep-alive off versus on.
+
+Usage:
+    python examples/benchmark_http_pool.py --requests 200
+"""
+
+import argparse
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+
+import litellm
+
+from lite import LiteClient, ModelConfig, lite_client
+from lite.config import ModelInput
+from lite.http_client import close_http_clients, configure_http_client
+
+
+class StubServer(ThreadingHTTPServer):
+    """HTTP/1.1 server answering chat completions and counting accepted connections."""
+
+    daemon_threads = True
+
+    def __init__(self, address):
+        super().__init__(address, StubHandler)
+        self.connections = 0
+        self._count_lock = threading.Lock()
+
+    def get_request(self):
+        request = super().get_request()
+        with self._count_lock:
+            self.connections += 1
+        return request
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body are written separately; without this, delayed ACKs stall keep-alive
+    disable_nagle_algorithm = True
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        body = json.dumps({
+            "id": "stub",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": "stub",
+            "choices": [{"index": 0, "finish_reason": "stop",
+                         "message": {"role": "assistant", "content": "ok"}}],
+            "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2},
+        }).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_stub_server() -> StubServer:
+    """Start the stub server on a free local port in a background thread."""
+    server = StubServer(("127.0.0.1", 0))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def run(server: StubServer, requests: int) -> tuple:
+    """Send completions and return (seconds, new connections)."""
+    client = LiteClient(ModelConfig(model="openai/stub", temperature=0.0))
+    before = server.connections
+    start = time.perf_counter()
+    for i in range(requests):
+        client.generate_text(ModelInput(user_prompt=f"ping {i}"))
+    return time.perf_counter() - start, server.connections - before
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the shared HTTP connection pool")
+    parser.add_argument("--requests", type=int, default=200, help="Completions per run")
+    args = parser.parse_args()
+
+    server = start_stub_server()
+    os.environ["OPENAI_API_BASE"] = f"http://127.0.0.1:{server.server_port}/v1"
+    os.environ.setdefault("OPENAI_API_KEY", "stub")
+
+    # Baseline: LiteLLM's own default client, which already keeps connections alive.
+    # LiteClient would install the shared pool over it, so that step is skipped here.
+    close_http_clients()
+    litellm.client_session = None
+    opened = server.connections
+    with patch.object(lite_client, "install_http_client"):
+        run(server, 1)  # Warm up LiteLLM's lazy imports outside the timed runs
+        elapsed, _ = run(server, args.requests)
+    connections = server.connections - opened
+    print(f"litellm default: {elapsed:.2f}s, {connections} connections for {args.requests} requests")
+
+    configure_http_client()
+    elapsed, connections = run(server, args.requests)
+    print(f"shared pool:     {elapsed:.2f}s, {connections} connections for {args.requests} requests")
+
+    close_http_clients()
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
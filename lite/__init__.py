@@ -3,7 +3,9 @@
 __version__ = "0.1.0"
 
 from .lite_client import LiteClient
+from .cache import CompletionCache, LRUCache, TieredCache
 from .config import ModelConfig
+from .router import ModelRouter
 from .image_utils import ImageUtils
 from .logging_config import configure_logging
 from .utils import save_model_response
@@ -11,7 +13,11 @@ from .lite_response_judge import ResponseJudge, EvaluationModel
 
 __all__ = [
     "LiteClient",
+    "CompletionCache",
+    "LRUCache",
+    "TieredCache",
     "ModelConfig",
+    "ModelRouter",
     "ImageUtils",
     "configure_logging",
     "save_model_response",
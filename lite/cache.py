@@ -0,0 +1,471 @@
+"""Content-addressed completion caches for LiteClient."""
+
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+from pydantic import BaseModel
+
+from .storage.lmdb_storage import LMDBStorage
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_PATH = "completion_cache.lmdb"
+DEFAULT_CACHE_MAX_ENTRIES = 10000
+DEFAULT_CACHE_CAPACITY_MB = 500
+DEFAULT_MEMORY_CACHE_MB = 64
+# Fraction of entries removed in one eviction pass, so the O(n) scan is amortized
+EVICTION_FRACTION = 0.1
+
+
+def make_cache_key(
+    model: str,
+    temperature: float,
+    messages: List[Dict[str, Any]],
+    response_format: Any = None,
+) -> str:
+    """
+    Build a stable cache key for a completion request.
+
+    The key is a SHA-256 digest over the model name, temperature, full message
+    list and the JSON schema of the response format, so any change to the
+    prompt or the expected structure produces a different key.
+
+    Args:
+        model: Model identifier.
+        temperature: Sampling temperature.
+        messages: Message list sent to the completion API.
+        response_format: Optional Pydantic model class or provider response_format.
+
+    Returns:
+        str: Hex digest prefixed with "completion:".
+    """
+    if isinstance(response_format, type) and issubclass(response_format, BaseModel):
+        schema = response_format.model_json_schema()
+    else:
+        schema = response_format
+
+    payload = json.dumps(
+        {
+            "model": model,
+            "temperature": temperature,
+            "messages": messages,
+            "response_format": schema,
+        },
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str,
+    )
+    return "completion:" + hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class CompletionCache:
+    """
+    Persistent completion cache stored in an LMDBStorage database.
+
+    Entries hold the raw model output together with their creation time. Expired
+    entries are treated as misses and removed on read. When the number of entries
+    exceeds max_entries, the oldest entries are evicted in one batch.
+
+    Example:
+        >>> cache = CompletionCache("completions.lmdb", ttl_seconds=7 * 24 * 3600)
+        >>> client = LiteClient(ModelConfig(model="gemini/gemini-2.5-flash"), cache=cache)
+        >>> client.generate_text(ModelInput(user_prompt="Define asthma"))  # miss
+        >>> client.generate_text(ModelInput(user_prompt="Define asthma"))  # hit
+        >>> cache.stats()["hits"]
+        1
+    """
+
+    def __init__(
+        self,
+        db_path: str = DEFAULT_CACHE_PATH,
+        ttl_seconds: Optional[float] = None,
+        max_entries: Optional[int] = DEFAULT_CACHE_MAX_ENTRIES,
+        capacity_mb: int = DEFAULT_CACHE_CAPACITY_MB,
+        storage: Optional[LMDBStorage] = None,
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            db_path: Path to the LMDB database used when no storage is given.
+            ttl_seconds: Lifetime of an entry in seconds. None disables expiry.
+            max_entries: Maximum number of entries kept. None disables eviction.
+            capacity_mb: LMDB map size used when no storage is given.
+            storage: Optional existing LMDBStorage to store entries in.
+        """
+        if ttl_seconds is not None and ttl_seconds <= 0:
+            raise ValueError("ttl_seconds must be greater than 0")
+        if max_entries is not None and max_entries <= 0:
+            raise ValueError("max_entries must be greater than 0")
+
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.storage = storage or LMDBStorage(
+            db_path=db_path, capacity_mb=capacity_mb, enable_logging=False
+        )
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._expired = 0
+        self._evictions = 0
+        # Entries created at or before this time may have been evicted
+        self._evicted_before = 0.0
+
+    def _is_expired(self, created_at: float) -> bool:
+        """Return True if an entry created at the given time has outlived the TTL."""
+        return self.ttl_seconds is not None and time.time() - created_at > self.ttl_seconds
+
+    def is_current(self, created_at: float) -> bool:
+        """
+        Return True if an entry created at the given time is neither expired nor evicted.
+
+        Used by TieredCache to validate copies of entries held in memory.
+        """
+        return created_at > self._evicted_before and not self._is_expired(created_at)
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Look up a cached completion.
+
+        Args:
+            key: Cache key from make_cache_key().
+
+        Returns:
+            str or None: The cached content, or None on a miss or expired entry.
+        """
+        entry = self.get_entry(key)
+        return entry[0] if entry is not None else None
+
+    def get_entry(self, key: str) -> Optional[Tuple[str, float]]:
+        """
+        Look up a cached completion together with its creation time.
+
+        Args:
+            key: Cache key from make_cache_key().
+
+        Returns:
+            tuple or None: (content, created_at), or None on a miss or expired entry.
+        """
+        stored = self.storage.get(key)
+        entry = None
+        if stored is not None:
+            try:
+                entry = json.loads(stored)
+            except json.JSONDecodeError:
+                logger.warning(f"Discarding unreadable cache entry {key}")
+
+        if entry is not None and self._is_expired(entry.get("created_at", 0)):
+            self.storage.delete(key)
+            with self._lock:
+                self._expired += 1
+            entry = None
+
+        with self._lock:
+            if entry is None:
+                self._misses += 1
+                return None
+            self._hits += 1
+        return entry.get("content"), entry.get("created_at", 0)
+
+    def put(self, key: str, content: str) -> bool:
+        """
+        Store a completion.
+
+        Args:
+            key: Cache key from make_cache_key().
+            content: Raw model output.
+
+        Returns:
+            bool: True if the entry was stored.
+        """
+        entry = json.dumps({"created_at": time.time(), "content": content})
+        stored = self.storage.put(key, entry)
+        if stored and self.max_entries is not None and self.storage.num_keys() > self.max_entries:
+            self._evict()
+        return stored
+
+    def _evict(self) -> int:
+        """
+        Remove the oldest entries so the cache drops below max_entries.
+
+        Returns:
+            int: Number of entries removed.
+        """
+        entries = []
+        for key, stored in self.storage.get_many(self.storage.get_keys()).items():
+            try:
+                created_at = json.loads(stored).get("created_at", 0) if stored else 0
+            except json.JSONDecodeError:
+                created_at = 0
+            entries.append((created_at, key))
+
+        excess = len(entries) - self.max_entries
+        if excess <= 0:
+            return 0
+        count = max(excess, int(self.max_entries * EVICTION_FRACTION))
+        entries.sort()
+        removed = self.storage.delete_many(key for _, key in entries[:count])
+
+        with self._lock:
+            self._evictions += removed
+            self._evicted_before = max(self._evicted_before, entries[count - 1][0])
+        logger.info(f"Evicted {removed} completion cache entries")
+        return removed
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return cache counters.
+
+        Returns:
+            dict: hits, misses, expired, evictions, entries and hit_rate.
+        """
+        with self._lock:
+            hits, misses = self._hits, self._misses
+            stats = {
+                "hits": hits,
+                "misses": misses,
+                "expired": self._expired,
+                "evictions": self._evictions,
+            }
+        stats["entries"] = self.storage.num_keys()
+        stats["hit_rate"] = hits / (hits + misses) if hits + misses else 0.0
+        return stats
+
+    def clear(self) -> int:
+        """Remove all cached entries and return how many were deleted."""
+        return self.storage.clear()
+
+    def close(self) -> None:
+        """Close the underlying storage."""
+        self.storage.close()
+
+    def __enter__(self):
+        """Context manager entry."""
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """Context manager exit."""
+        self.close()
+
+
+class LRUCache:
+    """
+    Thread-safe in-memory LRU cache bounded by the total size of its contents.
+
+    Sizes are measured in UTF-8 bytes of keys and values, so a few very large
+    completions cannot crowd the process the way an entry-count bound would allow.
+
+    Example:
+        >>> memory = LRUCache(max_bytes=32 * 1024 * 1024)
+        >>> memory.put("k", "value")
+        >>> memory.get("k")
+        'value'
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MEMORY_CACHE_MB * 1024 * 1024):
+        """
+        Initialize the cache.
+
+        Args:
+            max_bytes: Upper bound on the combined size of cached keys and values.
+        """
+        if max_bytes <= 0:
+            raise ValueError("max_bytes must be greater than 0")
+        self.max_bytes = max_bytes
+        # key -> (value, size, created_at)
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    @staticmethod
+    def _entry_size(key: str, value: str) -> int:
+        """Return the accounted size of an entry in bytes."""
+        return len(key.encode("utf-8")) + len(value.encode("utf-8"))
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Look up a value and mark it as most recently used.
+
+        Args:
+            key: Cache key.
+
+        Returns:
+            str or None: The cached value, or None on a miss.
+        """
+        entry = self.get_entry(key)
+        return entry[0] if entry is not None else None
+
+    def get_entry(
+        self, key: str, is_current: Optional[Callable[[float], bool]] = None
+    ) -> Optional[Tuple[str, float]]:
+        """
+        Look up a value with its creation time and mark it as most recently used.
+
+        Args:
+            key: Cache key.
+            is_current: Optional check of the creation time; entries failing it
+                are dropped and counted as misses.
+
+        Returns:
+            tuple or None: (value, created_at), or None on a miss.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and is_current is not None and not is_current(entry[2]):
+                del self._entries[key]
+                self._size -= entry[1]
+                entry = None
+            if entry is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry[0], entry[2]
+
+    def put(self, key: str, value: str, created_at: Optional[float] = None) -> bool:
+        """
+        Insert or replace a value, evicting least recently used entries as needed.
+
+        Args:
+            key: Cache key.
+            value: Value to store.
+            created_at: Creation time of the value. Defaults to now.
+
+        Returns:
+            bool: False if the entry alone is larger than max_bytes, True otherwise.
+        """
+        size = self._entry_size(key, value)
+        if size > self.max_bytes:
+            return False
+
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= previous[1]
+            self._entries[key] = (value, size, time.time() if created_at is None else created_at)
+            self._size += size
+            while self._size > self.max_bytes:
+                _, (_, evicted_size, _) = self._entries.popitem(last=False)
+                self._size -= evicted_size
+                self._evictions += 1
+        return True
+
+    def delete(self, key: str) -> bool:
+        """Remove a key; returns True if it was present."""
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is None:
+                return False
+            self._size -= entry[1]
+            return True
+
+    def clear(self) -> int:
+        """Remove all entries and return how many were dropped."""
+        with self._lock:
+            count = len(self._entries)
+            self._entries.clear()
+            self._size = 0
+        return count
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return cache counters.
+
+        Returns:
+            dict: hits, misses, evictions, entries, bytes, max_bytes and hit_rate.
+        """
+        with self._lock:
+            hits, misses = self._hits, self._misses
+            return {
+                "hits": hits,
+                "misses": misses,
+                "evictions": self._evictions,
+                "entries": len(self._entries),
+                "bytes": self._size,
+                "max_bytes": self.max_bytes,
+                "hit_rate": hits / (hits + misses) if hits + misses else 0.0,
+            }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def close(self) -> None:
+        """Release all entries."""
+        self.clear()
+
+
+class TieredCache:
+    """
+    Two-level cache: an in-memory LRU in front of a persistent cache.
+
+    Reads are served from memory when possible, so hot keys never reach LMDB
+    or pay for decompression. Persistent hits are promoted into memory, and
+    writes go to both tiers. Memory entries keep the creation time of the
+    persistent entry, so they expire with its TTL and are dropped once the
+    persistent tier has evicted entries that old.
+
+    Example:
+        >>> cache = TieredCache(CompletionCache("completions.lmdb"), LRUCache(64 * 1024 * 1024))
+        >>> client = LiteClient(ModelConfig(model="gemini/gemini-2.5-flash"), cache=cache)
+        >>> cache.stats()["memory"]["hit_rate"]
+    """
+
+    def __init__(self, persistent: CompletionCache, memory: Optional[LRUCache] = None):
+        """
+        Initialize the tiered cache.
+
+        Args:
+            persistent: Backing cache, typically a CompletionCache.
+            memory: In-memory tier. Defaults to an LRUCache of DEFAULT_MEMORY_CACHE_MB.
+        """
+        self.persistent = persistent
+        self.memory = memory or LRUCache()
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the value from memory, falling back to the persistent tier."""
+        entry = self.memory.get_entry(key, self.persistent.is_current)
+        if entry is None:
+            entry = self.persistent.get_entry(key)
+            if entry is None:
+                return None
+            self.memory.put(key, *entry)
+        return entry[0]
+
+    def put(self, key: str, value: str) -> bool:
+        """Store the value in both tiers."""
+        self.memory.put(key, value)
+        return self.persistent.put(key, value)
+
+    def clear(self) -> int:
+        """Clear both tiers and return the number of persistent entries removed."""
+        self.memory.clear()
+        return self.persistent.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return per-tier counters under "memory" and "persistent"."""
+        return {"memory": self.memory.stats(), "persistent": self.persistent.stats()}
+
+    def close(self) -> None:
+        """Close both tiers."""
+        self.memory.close()
+        self.persistent.close()
+
+    def __enter__(self):
+        """Context manager entry."""
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """Context manager exit."""
+        self.close()
+
+
+# Any cache accepted by LiteClient(cache=...)
+CacheBackend = Union[CompletionCache, LRUCache, TieredCache]
@@ -9,6 +9,23 @@ DEFAULT_TEMPERATURE = 0.2
 DEFAULT_MAX_TOKENS = 2000
 DEFAULT_PROMPT = "Describe this image in detail"
 
+# Async client defaults
+DEFAULT_MAX_CONCURRENCY = 64
+
+# Shared HTTP client defaults
+DEFAULT_HTTP_MAX_CONNECTIONS = 100
+DEFAULT_HTTP_MAX_KEEPALIVE = 20
+DEFAULT_HTTP_KEEPALIVE_EXPIRY = 60.0
+DEFAULT_HTTP_TIMEOUT = 600.0
+DEFAULT_HTTP_CONNECT_TIMEOUT = 10.0
+
+# Adaptive rate limiter defaults
+DEFAULT_RATE_LIMIT_INITIAL_CONCURRENCY = 16
+DEFAULT_RATE_LIMIT_MAX_CONCURRENCY = 256
+DEFAULT_RATE_LIMIT_UTILIZATION = 0.95
+DEFAULT_BACKOFF_BASE = 0.5
+DEFAULT_BACKOFF_MAX = 60.0
+
 # Image processing
 SUPPORTED_IMAGE_TYPES = ("jpg", "jpeg", "png", "gif", "webp")
 IMAGE_MIME_TYPE = "image/jpeg"
@@ -68,6 +85,88 @@ class ModelInput:
             self.response_format = None
 
 
+@dataclass
+class BatchResult:
+    """Outcome of a single item processed by LiteClient.generate_many."""
+
+    index: int
+    model_input: ModelInput
+    result: Optional[Any] = None
+    error: Optional[Union[str, Dict[str, Any]]] = None
+
+    @property
+    def ok(self) -> bool:
+        """Whether the item completed without error."""
+        return self.error is None
+
+
+@dataclass
+class HTTPClientConfig:
+    """Connection pool settings for the HTTP client shared by all LiteLLM calls."""
+
+    max_connections: int = DEFAULT_HTTP_MAX_CONNECTIONS
+    max_keepalive_connections: int = DEFAULT_HTTP_MAX_KEEPALIVE
+    keepalive_expiry: float = DEFAULT_HTTP_KEEPALIVE_EXPIRY
+    http2: bool = True
+    timeout: float = DEFAULT_HTTP_TIMEOUT
+    connect_timeout: float = DEFAULT_HTTP_CONNECT_TIMEOUT
+
+    def __post_init__(self):
+        """Validate pool limits."""
+        if self.max_connections <= 0:
+            raise ValueError("max_connections must be greater than 0")
+        if not (0 <= self.max_keepalive_connections <= self.max_connections):
+            raise ValueError("max_keepalive_connections must be between 0 and max_connections")
+
+
+@dataclass
+class RateLimitConfig:
+    """
+    Quota and adaptive concurrency settings for one provider or model.
+
+    Attributes:
+        requests_per_minute: Request quota. None means unknown; it is then learned
+            from x-ratelimit-limit-requests response headers when the provider sends them.
+        tokens_per_minute: Token quota, learned from x-ratelimit-limit-tokens when None.
+        initial_concurrency: Requests allowed in flight before any feedback.
+        min_concurrency: Lower bound for the adaptive concurrency limit.
+        max_concurrency: Upper bound for the adaptive concurrency limit.
+        decrease_factor: Multiplier applied to the concurrency limit on a 429.
+        latency_tolerance: The limit is also reduced (gently) when the smoothed
+            latency exceeds this multiple of the best latency seen. None disables it.
+        utilization: Fraction of the quota to schedule, leaving headroom for
+            clock skew and token estimation errors.
+        backoff_base: First retry delay in seconds for rate-limited or transient errors.
+        backoff_max: Maximum retry delay in seconds.
+    """
+
+    requests_per_minute: Optional[int] = None
+    tokens_per_minute: Optional[int] = None
+    initial_concurrency: int = DEFAULT_RATE_LIMIT_INITIAL_CONCURRENCY
+    min_concurrency: int = 1
+    max_concurrency: int = DEFAULT_RATE_LIMIT_MAX_CONCURRENCY
+    decrease_factor: float = 0.5
+    latency_tolerance: Optional[float] = 4.0
+    utilization: float = DEFAULT_RATE_LIMIT_UTILIZATION
+    backoff_base: float = DEFAULT_BACKOFF_BASE
+    backoff_max: float = DEFAULT_BACKOFF_MAX
+
+    def __post_init__(self):
+        """Validate limits."""
+        if not (1 <= self.min_concurrency <= self.initial_concurrency <= self.max_concurrency):
+            raise ValueError(
+                "concurrency limits must satisfy 1 <= min_concurrency <= initial_concurrency <= max_concurrency"
+            )
+        if not (0.0 < self.decrease_factor < 1.0):
+            raise ValueError("decrease_factor must be between 0 and 1")
+        if not (0.0 < self.utilization <= 1.0):
+            raise ValueError("utilization must be in (0, 1]")
+        for name in ("requests_per_minute", "tokens_per_minute"):
+            value = getattr(self, name)
+            if value is not None and value <= 0:
+                raise ValueError(f"{name} must be greater than 0")
+
+
 @dataclass
 class MCQInput:
     """Input parameters for multiple-choice question solving."""
@@ -0,0 +1,161 @@
+"""Process-wide pooled HTTP clients shared by every LiteLLM call made through lite.
+
+LiteLLM sends requests for OpenAI-compatible providers (OpenAI, Azure, vLLM,
+LM Studio, Ollama's /v1 endpoint, ...) through ``litellm.client_session`` and
+``litellm.aclient_session`` when they are set. Installing one tuned httpx
+client there means every LiteClient, LiteChat and MedKit agent reuses the
+same keep-alive connections instead of paying TCP/TLS setup per request.
+
+httpx async clients are bound to the event loop that created their
+connections, so one async client is kept per running loop.
+"""
+
+import asyncio
+import logging
+import threading
+import weakref
+from typing import Optional
+
+import httpx
+import litellm
+
+from .config import HTTPClientConfig
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_config = HTTPClientConfig()
+_sync_client: Optional[httpx.Client] = None
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = (
+    weakref.WeakKeyDictionary()
+)
+# The async client most recently installed in litellm; its loop may already be gone
+_async_session: Optional[httpx.AsyncClient] = None
+
+
+def _http2_available() -> bool:
+    """Return True if the optional h2 package needed for HTTP/2 is installed."""
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _client_kwargs(config: HTTPClientConfig) -> dict:
+    """Build httpx client arguments from a pool configuration."""
+    return {
+        "limits": httpx.Limits(
+            max_connections=config.max_connections,
+            max_keepalive_connections=config.max_keepalive_connections,
+            keepalive_expiry=config.keepalive_expiry,
+        ),
+        "timeout": httpx.Timeout(config.timeout, connect=config.connect_timeout),
+        "http2": config.http2 and _http2_available(),
+    }
+
+
+def _is_ours(client) -> bool:
+    """Whether a LiteLLM session is one installed by this module."""
+    return client is None or client is _sync_client or client is _async_session
+
+
+def _flush_provider_clients() -> None:
+    """Drop LiteLLM's cached provider SDK clients so they are rebuilt around the current session."""
+    cache = getattr(litellm, "in_memory_llm_clients_cache", None)
+    if cache is not None:
+        cache.flush_cache()
+
+
+def configure_http_client(config: Optional[HTTPClientConfig] = None) -> httpx.Client:
+    """
+    Create the shared HTTP client with the given pool settings and install it in LiteLLM.
+
+    Replaces (and closes) a client previously installed by this module. A
+    session set on litellm directly by the application is replaced as well,
+    since this call is an explicit request to use lite's pool. LiteLLM caches
+    provider SDK clients together with the session they were built on, so
+    that cache is flushed too.
+
+    Args:
+        config: Pool settings. Defaults to HTTPClientConfig().
+
+    Returns:
+        httpx.Client: The installed synchronous client.
+
+    Example:
+        >>> configure_http_client(HTTPClientConfig(max_keepalive_connections=50))
+    """
+    global _config, _sync_client, _async_session
+    with _lock:
+        _config = config or HTTPClientConfig()
+        previous, _sync_client = _sync_client, httpx.Client(**_client_kwargs(_config))
+        _async_clients.clear()
+        _async_session = None
+        litellm.client_session = _sync_client
+        litellm.aclient_session = None
+        _flush_provider_clients()
+    if previous is not None:
+        previous.close()
+    logger.debug(f"Installed shared HTTP client: {_config}")
+    return _sync_client
+
+
+def install_http_client() -> Optional[httpx.Client]:
+    """
+    Install the shared HTTP client in LiteLLM unless one is already in place.
+
+    Called by LiteClient and LiteChat, so it is cheap and idempotent. A session
+    the application set on litellm itself is left untouched.
+
+    Returns:
+        httpx.Client or None: The shared client, or None if the application
+        manages litellm.client_session itself.
+    """
+    global _sync_client
+    with _lock:
+        if not _is_ours(litellm.client_session):
+            return None
+        if _sync_client is None:
+            _sync_client = httpx.Client(**_client_kwargs(_config))
+        litellm.client_session = _sync_client
+        return _sync_client
+
+
+def install_async_http_client() -> Optional[httpx.AsyncClient]:
+    """
+    Install the shared async HTTP client for the running event loop in LiteLLM.
+
+    Must be called from a coroutine, right before awaiting litellm.acompletion.
+
+    Returns:
+        httpx.AsyncClient or None: The loop's client, or None if the application
+        manages litellm.aclient_session itself.
+    """
+    global _async_session
+    loop = asyncio.get_running_loop()
+    with _lock:
+        if not _is_ours(litellm.aclient_session):
+            return None
+        client = _async_clients.get(loop)
+        if client is None:
+            client = _async_clients[loop] = httpx.AsyncClient(**_client_kwargs(_config))
+        litellm.aclient_session = _async_session = client
+        return client
+
+
+def close_http_clients() -> None:
+    """Close the shared clients and remove them from LiteLLM."""
+    global _sync_client, _async_session
+    with _lock:
+        client, _sync_client = _sync_client, None
+        if litellm.client_session is client:
+            litellm.client_session = None
+        if _async_session is not None and litellm.aclient_session is _async_session:
+            litellm.aclient_session = None
+        # Async clients belong to their loops; their sockets close with them
+        _async_clients.clear()
+        _async_session = None
+        _flush_provider_clients()
+    if client is not None:
+        client.close()
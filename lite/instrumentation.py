@@ -0,0 +1,354 @@
+"""Per-call token usage and latency records for every LLM call made through lite.
+
+LiteClient and LiteChat build one CallRecord per request and hand it to every
+registered sink once the call finishes. A record carries the model, token usage, latency
+split into queue (concurrency and rate-limit waits), network and parse time,
+the number of attempts, whether it was a cache hit and whether the output
+parsed into the requested schema.
+
+Records are labelled with the module that made the call ("caller") plus any
+labels set with call_labels(), so spend can be attributed to MedKit modules:
+
+    >>> aggregator = InMemoryAggregator()
+    >>> add_sink(aggregator)
+    >>> with call_labels(module="med_dictionary"):
+    ...     client.generate_text(model_input)
+    >>> aggregator.summary(by="module")["med_dictionary"]["total_tokens"]
+"""
+
+import collections
+import contextvars
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from typing import Any, Deque, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Modules skipped when looking for the code that made a call
+_INTERNAL_PREFIXES = ("lite.", "asyncio", "concurrent.", "threading", "contextlib", "contextvars")
+# Most recent records kept by InMemoryAggregator for inspection
+DEFAULT_MAX_RECORDS = 1000
+_PHASES = ("queue_seconds", "network_seconds", "parse_seconds", "total_seconds")
+
+_labels: contextvars.ContextVar[Dict[str, str]] = contextvars.ContextVar("lite_call_labels", default={})
+
+
+@dataclass
+class CallRecord:
+    """Outcome, usage and timing of one LLM call, including its retries."""
+
+    model: str
+    labels: Dict[str, str] = field(default_factory=dict)
+    timestamp: float = field(default_factory=time.time)
+    prompt_tokens: Optional[int] = None
+    completion_tokens: Optional[int] = None
+    queue_seconds: float = 0.0
+    network_seconds: float = 0.0
+    parse_seconds: float = 0.0
+    total_seconds: float = 0.0
+    attempts: int = 0
+    cache_hit: bool = False
+    coalesced: bool = False
+    stream: bool = False
+    # None when no schema was requested
+    parsed: Optional[bool] = None
+    # Repair stage that made the output parse (see lite.utils.json_repair)
+    repair: Optional[str] = None
+    error: Optional[str] = None
+
+    @property
+    def retries(self) -> int:
+        """Attempts beyond the first."""
+        return max(0, self.attempts - 1)
+
+    @property
+    def total_tokens(self) -> int:
+        return (self.prompt_tokens or 0) + (self.completion_tokens or 0)
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    def add_usage(self, response: Any) -> None:
+        """Add the token usage reported on a completion response."""
+        usage = getattr(response, "usage", None)
+        for name in ("prompt_tokens", "completion_tokens"):
+            value = getattr(usage, name, None)
+            if isinstance(value, int):
+                setattr(self, name, (getattr(self, name) or 0) + value)
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data.update(retries=self.retries, total_tokens=self.total_tokens)
+        return data
+
+
+def caller_module() -> str:
+    """Return the name of the first module on the stack outside lite and the stdlib plumbing."""
+    frame = sys._getframe(1)
+    while frame is not None:
+        name = frame.f_globals.get("__name__", "")
+        if name != "lite" and not name.startswith(_INTERNAL_PREFIXES):
+            return name
+        frame = frame.f_back
+    return "unknown"
+
+
+def current_labels() -> Dict[str, str]:
+    """Labels set by enclosing call_labels() blocks."""
+    return _labels.get()
+
+
+@contextmanager
+def call_labels(**labels: str) -> Iterator[Dict[str, str]]:
+    """
+    Attach labels to every LLM call made inside the block (or decorated function).
+
+    Labels nest, inner values winning, and follow asyncio tasks created inside
+    the block.
+    """
+    merged = {**_labels.get(), **{key: str(value) for key, value in labels.items()}}
+    token = _labels.set(merged)
+    try:
+        yield merged
+    finally:
+        _labels.reset(token)
+
+
+def start_record(model: str, stream: bool = False) -> CallRecord:
+    """Create the record for a call, labelled with its caller and the current labels."""
+    labels = current_labels()
+    if "caller" not in labels:
+        labels = {"caller": caller_module(), **labels}
+    return CallRecord(model=model, labels=labels, stream=stream)
+
+
+def _new_totals() -> Dict[str, Any]:
+    totals: Dict[str, Any] = dict.fromkeys((
+        "calls", "errors", "cache_hits", "coalesced", "retries", "parse_failures", "repairs",
+        "prompt_tokens", "completion_tokens", "total_tokens",
+    ), 0)
+    totals.update(dict.fromkeys(_PHASES, 0.0))
+    return totals
+
+
+def _add_record(totals: Dict[str, Any], record: CallRecord) -> None:
+    totals["calls"] += 1
+    totals["errors"] += not record.ok
+    totals["cache_hits"] += record.cache_hit
+    totals["coalesced"] += record.coalesced
+    totals["retries"] += record.retries
+    totals["parse_failures"] += record.parsed is False
+    totals["repairs"] += record.repair is not None
+    totals["prompt_tokens"] += record.prompt_tokens or 0
+    totals["completion_tokens"] += record.completion_tokens or 0
+    totals["total_tokens"] += record.total_tokens
+    for phase in _PHASES:
+        totals[phase] += getattr(record, phase)
+
+
+class InMemoryAggregator:
+    """
+    Sink keeping running totals that can be grouped by model or any label.
+
+    Totals are updated as records arrive, for the model and for every label
+    name seen, so memory depends on the number of groups, not of calls. Only
+    the most recent max_records records are kept in records.
+    """
+
+    def __init__(self, max_records: int = DEFAULT_MAX_RECORDS):
+        self._lock = threading.Lock()
+        self.records: Deque[CallRecord] = collections.deque(maxlen=max_records)
+        self._all = _new_totals()
+        # Grouping ("model" or a label name) -> group value -> totals
+        self._groups: Dict[str, Dict[str, Dict[str, Any]]] = {"model": {}}
+
+    def __call__(self, record: CallRecord) -> None:
+        with self._lock:
+            self.records.append(record)
+            for name in record.labels:
+                if name not in self._groups:
+                    # Earlier records did not carry this label
+                    self._groups[name] = {"unknown": dict(self._all)} if self._all["calls"] else {}
+            _add_record(self._all, record)
+            for by, groups in self._groups.items():
+                key = record.model if by == "model" else record.labels.get(by, "unknown")
+                if key not in groups:
+                    groups[key] = _new_totals()
+                _add_record(groups[key], record)
+
+    def summary(self, by: str = "model") -> Dict[str, Dict[str, Any]]:
+        """
+        Return the totals of the records seen so far.
+
+        Args:
+            by: "model" or the name of a label such as "caller" or "module".
+
+        Returns:
+            dict: Totals per group (calls, errors, cache hits, retries, tokens
+            and seconds per phase).
+        """
+        with self._lock:
+            if by not in self._groups:
+                return {"unknown": dict(self._all)} if self._all["calls"] else {}
+            return {key: dict(totals) for key, totals in self._groups[by].items()}
+
+    def clear(self) -> None:
+        with self._lock:
+            self.records.clear()
+            self._all = _new_totals()
+            self._groups = {"model": {}}
+
+
+class JSONLSink:
+    """Sink appending one JSON object per call to a file."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = open(path, "a", encoding="utf-8")
+
+    def __call__(self, record: CallRecord) -> None:
+        line = json.dumps(record.to_dict(), ensure_ascii=False)
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            self._file.close()
+
+
+class PrometheusSink:
+    """
+    Sink exposing counters and latency histograms in the Prometheus text format.
+
+    Serve render() from a /metrics endpoint, or write it periodically to a
+    file for the node exporter's textfile collector.
+    """
+
+    BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+    PHASES = ("queue", "network", "parse")
+
+    def __init__(self, namespace: str = "lite_llm", label_names: Tuple[str, ...] = ("caller",)):
+        """
+        Initialize the sink.
+
+        Args:
+            namespace: Prefix of the metric names.
+            label_names: Record labels exported as Prometheus labels, in
+                addition to model. Keep the set small to bound cardinality.
+        """
+        self.namespace = namespace
+        self.label_names = tuple(label_names)
+        self._lock = threading.Lock()
+        self._counters: Dict[Tuple[str, Tuple], float] = {}
+        self._histograms: Dict[Tuple, List[float]] = {}
+
+    def _inc(self, name: str, labels: Tuple, amount: float = 1) -> None:
+        key = (name, labels)
+        self._counters[key] = self._counters.get(key, 0) + amount
+
+    def __call__(self, record: CallRecord) -> None:
+        base = (("model", record.model),) + tuple(
+            (name, record.labels.get(name, "unknown")) for name in self.label_names
+        )
+        status = "ok" if record.ok else "error"
+        with self._lock:
+            self._inc("calls_total", base + (("status", status), ("cache", str(record.cache_hit).lower())))
+            self._inc("retries_total", base, record.retries)
+            if record.parsed is False:
+                self._inc("parse_failures_total", base)
+            if record.repair:
+                self._inc("repairs_total", base + (("stage", record.repair),))
+            self._inc("tokens_total", base + (("type", "prompt"),), record.prompt_tokens or 0)
+            self._inc("tokens_total", base + (("type", "completion"),), record.completion_tokens or 0)
+            for phase in self.PHASES:
+                value = getattr(record, f"{phase}_seconds")
+                key = base + (("phase", phase),)
+                # Per-bucket counts followed by the sum and the count
+                buckets = self._histograms.setdefault(key, [0.0] * (len(self.BUCKETS) + 2))
+                for index, bound in enumerate(self.BUCKETS):
+                    if value <= bound:
+                        buckets[index] += 1
+                buckets[-2] += value
+                buckets[-1] += 1
+
+    @staticmethod
+    def _format_labels(labels: Tuple) -> str:
+        def escape(value: str) -> str:
+            return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        return "{" + ",".join(f'{name}="{escape(value)}"' for name, value in labels) + "}"
+
+    def render(self) -> str:
+        """Return all metrics in the Prometheus text exposition format."""
+        ns = self.namespace
+        help_text = {
+            "calls_total": "LLM calls by outcome and cache use.",
+            "retries_total": "Retried attempts of LLM calls.",
+            "parse_failures_total": "Responses that did not parse into the requested schema.",
+            "repairs_total": "Malformed responses repaired instead of regenerated, by stage.",
+            "tokens_total": "Tokens reported by the provider.",
+        }
+        lines: List[str] = []
+        with self._lock:
+            counters = dict(self._counters)
+            histograms = {key: list(values) for key, values in self._histograms.items()}
+        for name, text in help_text.items():
+            series = [(labels, value) for (metric, labels), value in counters.items() if metric == name]
+            if not series:
+                continue
+            lines.append(f"# HELP {ns}_{name} {text}")
+            lines.append(f"# TYPE {ns}_{name} counter")
+            for labels, value in sorted(series):
+                lines.append(f"{ns}_{name}{self._format_labels(labels)} {value:g}")
+        if histograms:
+            name = f"{ns}_call_seconds"
+            lines.append(f"# HELP {name} Call latency by phase.")
+            lines.append(f"# TYPE {name} histogram")
+            for labels, values in sorted(histograms.items()):
+                for bound, count in zip(self.BUCKETS, values):
+                    lines.append(f"{name}_bucket{self._format_labels(labels + (('le', f'{bound:g}'),))} {count:g}")
+                lines.append(f"{name}_bucket{self._format_labels(labels + (('le', '+Inf'),))} {values[-1]:g}")
+                lines.append(f"{name}_sum{self._format_labels(labels)} {values[-2]:g}")
+                lines.append(f"{name}_count{self._format_labels(labels)} {values[-1]:g}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: str) -> None:
+        """Atomically write render() to a file."""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(self.render())
+        os.replace(tmp_path, path)
+
+
+_sinks: List[Any] = []
+_sinks_lock = threading.Lock()
+
+
+def add_sink(sink) -> None:
+    """Register a callable receiving every CallRecord."""
+    with _sinks_lock:
+        _sinks.append(sink)
+
+
+def remove_sink(sink) -> None:
+    """Unregister a sink added with add_sink()."""
+    with _sinks_lock:
+        if sink in _sinks:
+            _sinks.remove(sink)
+
+
+def emit(record: CallRecord) -> None:
+    """Send a record to every sink; a failing sink is logged and never breaks the call."""
+    for sink in list(_sinks):
+        try:
+            sink(record)
+        except Exception as e:
+            logger.warning(f"Instrumentation sink {sink!r} failed: {e}")
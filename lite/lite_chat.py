@@ -3,14 +3,18 @@
 import argparse
 import logging
 import os
+import time
 from datetime import datetime
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Union
 
-from litellm import completion
+from litellm import acompletion, completion
 
 from lite import __version__
 from lite.config import ModelConfig, ChatConfig, ModelInput, DEFAULT_TEMPERATURE
+from lite.http_client import install_async_http_client, install_http_client
 from lite.image_utils import ImageUtils
+from lite.instrumentation import emit, start_record
+from lite.rate_limiter import estimate_tokens, get_rate_limiter
 
 logger = logging.getLogger(__name__)
 DEFAULT_MAX_HISTORY = 10
@@ -42,6 +46,7 @@ class LiteChat:
         self.conversation_file: Optional[str] = None
         self._file_initialized = False
         self.current_image_path: Optional[str] = None  # Hold the current image for the API call
+        install_http_client()
 
     @staticmethod
     def _format_content(content: Any) -> str:
@@ -120,11 +125,25 @@ class LiteChat:
 
         return messages
 
+    def _resolve_config(self, model_config: Optional[ModelConfig]) -> ModelConfig:
+        """Return the per-call config, falling back to the instance config."""
+        config = model_config or self.model_config
+        if not config:
+            raise ValueError("ModelConfig must be provided either as argument or during initialization")
+        return config
+
+    def _finish_turn(self, assistant_response: str) -> None:
+        """Record the assistant reply and auto-save the conversation if enabled."""
+        self.add_message_to_history("assistant", assistant_response)
+        if self.auto_save:
+            self.save_conversation()
+
     def generate_text(
         self,
         model_input: ModelInput,
         model_config: Optional[ModelConfig] = None,
-    ) -> Union[str, Dict[str, Any]]:
+        stream: bool = False,
+    ) -> Union[str, Dict[str, Any], Iterator[str]]:
         """
         Generate text from a prompt or analyze an image with a prompt.
 
@@ -132,15 +151,19 @@ class LiteChat:
             model_input: ModelInput object containing prompt and image parameters
             model_config: Optional ModelConfig object for model configuration.
                          If not provided, uses the instance's model_config.
+            stream: If True, return a generator of text deltas (see stream_text).
 
         Returns:
-            Generated text response or error message
+            Generated text response or error message, or a generator of text
+            deltas when stream is True.
         """
         # Use provided model_config or instance's model_config
-        config = model_config or self.model_config
-        if not config:
-            raise ValueError("ModelConfig must be provided either as argument or during initialization")
+        config = self._resolve_config(model_config)
+        if stream:
+            return self.stream_text(model_input, config)
 
+        record = start_record(config.model)
+        started = time.monotonic()
         try:
             log_action = "Analyzing image" if model_input.image_path else "Generating text"
             logger.info(f"{log_action} with model: {config.model}")
@@ -148,29 +171,215 @@ class LiteChat:
             # Create message and call completion
             messages = self.create_message(model_input)
 
-            response = completion(
-                model=config.model,
-                messages=messages,
-                temperature=config.temperature,
-                response_format=model_input.response_format,
-            )
+            record.attempts = 1
+            waiting = time.monotonic()
+            with get_rate_limiter(config.model).limit(estimate_tokens(messages)) as permit:
+                sent = time.monotonic()
+                record.queue_seconds = sent - waiting
+                try:
+                    response = completion(
+                        model=config.model,
+                        messages=messages,
+                        temperature=config.temperature,
+                        response_format=model_input.response_format,
+                    )
+                finally:
+                    record.network_seconds = time.monotonic() - sent
+                permit.record(response)
+            record.add_usage(response)
 
             logger.info("Request successful")
             assistant_response = response.choices[0].message.content
 
-            # Add assistant response to history
-            self.add_message_to_history("assistant", assistant_response)
-
-            # Auto-save conversation if enabled
-            if self.auto_save:
-                self.save_conversation()
+            # Add assistant response to history and auto-save if enabled
+            self._finish_turn(assistant_response)
 
             return assistant_response
 
         except Exception as e:
+            record.error = str(e)
             error_msg = f"Error: {str(e)}"
             logger.error(error_msg)
             return error_msg
+        finally:
+            # Only calls that reached the model are recorded
+            if record.attempts:
+                record.total_seconds = time.monotonic() - started
+                emit(record)
+
+    def stream_text(
+        self,
+        model_input: ModelInput,
+        model_config: Optional[ModelConfig] = None,
+    ) -> Iterator[str]:
+        """
+        Stream the assistant reply as text deltas.
+
+        The assembled reply is appended to conversation_history once the stream
+        ends, including when the caller stops iterating early, so history keeps
+        its prompt-response pairs. As with generate_text, a failed request is not
+        recorded; if it fails after some text was streamed, an error message
+        follows the text so the caller can tell the reply is truncated.
+
+        The stream is opened under the model's rate limiter (see
+        lite.rate_limiter), and a rate-limit error raised while it is being
+        consumed is reported to the limiter as well.
+
+        Args:
+            model_input: ModelInput object containing prompt and image parameters
+            model_config: Optional ModelConfig object for model configuration.
+
+        Yields:
+            str: Text deltas, ending with an error message if the request fails.
+        """
+        config = self._resolve_config(model_config)
+        parts: List[str] = []
+        succeeded = False
+        try:
+            log_action = "Analyzing image" if model_input.image_path else "Streaming text"
+            logger.info(f"{log_action} with model: {config.model}")
+            messages = self.create_message(model_input)
+        except Exception as e:
+            error_msg = f"Error: {str(e)}"
+            logger.error(error_msg)
+            yield error_msg
+            return
+
+        limiter = get_rate_limiter(config.model)
+        record = start_record(config.model, stream=True)
+        record.attempts = 1
+        started = time.monotonic()
+        sent = None
+        opened = False
+        try:
+            try:
+                # The limiter slot covers opening the stream, not consuming it
+                with limiter.limit(estimate_tokens(messages)):
+                    sent = time.monotonic()
+                    record.queue_seconds = sent - started
+                    response = completion(
+                        model=config.model,
+                        messages=messages,
+                        temperature=config.temperature,
+                        response_format=model_input.response_format,
+                        stream=True,
+                    )
+                opened = True
+                for chunk in response:
+                    text = self._chunk_text(chunk)
+                    if text:
+                        parts.append(text)
+                        yield text
+            except Exception as e:
+                # Errors opening the stream were fed back when the slot was released
+                if opened:
+                    limiter.report_error(e)
+                raise
+            finally:
+                # Network time runs until the stream is drained
+                if sent is not None:
+                    record.network_seconds = time.monotonic() - sent
+            logger.info("Request successful")
+            succeeded = True
+        except GeneratorExit:
+            # The caller stopped reading; the text it received is the reply
+            succeeded = True
+            raise
+        except Exception as e:
+            record.error = str(e)
+            error_msg = f"Error: {str(e)}"
+            logger.error(error_msg)
+            yield error_msg
+        finally:
+            record.total_seconds = time.monotonic() - started
+            emit(record)
+            if succeeded:
+                self._finish_turn("".join(parts))
+
+    async def astream_text(
+        self,
+        model_input: ModelInput,
+        model_config: Optional[ModelConfig] = None,
+    ) -> AsyncIterator[str]:
+        """
+        Async counterpart of stream_text.
+
+        Args:
+            model_input: ModelInput object containing prompt and image parameters
+            model_config: Optional ModelConfig object for model configuration.
+
+        Yields:
+            str: Text deltas, ending with an error message if the request fails.
+        """
+        config = self._resolve_config(model_config)
+        parts: List[str] = []
+        succeeded = False
+        try:
+            log_action = "Analyzing image" if model_input.image_path else "Streaming text"
+            logger.info(f"{log_action} with model: {config.model}")
+            messages = self.create_message(model_input)
+        except Exception as e:
+            error_msg = f"Error: {str(e)}"
+            logger.error(error_msg)
+            yield error_msg
+            return
+
+        limiter = get_rate_limiter(config.model)
+        record = start_record(config.model, stream=True)
+        record.attempts = 1
+        started = time.monotonic()
+        sent = None
+        opened = False
+        try:
+            try:
+                install_async_http_client()
+                async with limiter.alimit(estimate_tokens(messages)):
+                    sent = time.monotonic()
+                    record.queue_seconds = sent - started
+                    response = await acompletion(
+                        model=config.model,
+                        messages=messages,
+                        temperature=config.temperature,
+                        response_format=model_input.response_format,
+                        stream=True,
+                    )
+                opened = True
+                async for chunk in response:
+                    text = self._chunk_text(chunk)
+                    if text:
+                        parts.append(text)
+                        yield text
+            except Exception as e:
+                if opened:
+                    limiter.report_error(e)
+                raise
+            finally:
+                if sent is not None:
+                    record.network_seconds = time.monotonic() - sent
+            logger.info("Request successful")
+            succeeded = True
+        except GeneratorExit:
+            # The caller stopped reading; the text it received is the reply
+            succeeded = True
+            raise
+        except Exception as e:
+            record.error = str(e)
+            error_msg = f"Error: {str(e)}"
+            logger.error(error_msg)
+            yield error_msg
+        finally:
+            record.total_seconds = time.monotonic() - started
+            emit(record)
+            if succeeded:
+                self._finish_turn("".join(parts))
+
+    @staticmethod
+    def _chunk_text(chunk: Any) -> str:
+        """Extract the text delta from a streamed completion chunk."""
+        try:
+            return chunk.choices[0].delta.content or ""
+        except (AttributeError, IndexError):
+            return ""
 
     def reset_conversation(self) -> None:
         """Clear conversation history and current image."""
@@ -264,6 +473,11 @@ def cli():
         action="store_true",
         help="Automatically save conversation to a markdown file after each turn",
     )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Print the assistant reply token by token as it is generated",
+    )
     parser.add_argument(
         "--save-dir",
         type=str,
@@ -333,8 +547,14 @@ def cli():
                 user_prompt=user_input,
                 image_path=image_path
             )
-            result = client.generate_text(model_input=model_input)
-            print(f"Assistant: {result}\n")
+            if args.stream:
+                print("Assistant: ", end="", flush=True)
+                for delta in client.generate_text(model_input=model_input, stream=True):
+                    print(delta, end="", flush=True)
+                print("\n")
+            else:
+                result = client.generate_text(model_input=model_input)
+                print(f"Assistant: {result}\n")
 
         except KeyboardInterrupt:
             print("\n\nExiting chat...")
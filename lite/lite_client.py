@@ -1,14 +1,24 @@
 """Unified LiteClient for text and vision model interactions."""
 
+import asyncio
 import logging
-from typing import Any, Dict, List, Optional, Union
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, AsyncIterator, Dict, Iterable, Iterator, List, Optional, Tuple, Union
 
-from litellm import APIError, completion
+from litellm import APIError, acompletion, completion
 from pydantic import BaseModel
-from .utils.json_cleaner import JSONCleaner
+from .utils.json_repair import MODEL_FIX, STRICT, build_fix_messages, parse_structured, record_repair
+from .utils.streaming_json import PartialItem, StreamingJSONParser
 
-from .config import ModelConfig, ModelInput
+from .cache import CacheBackend, make_cache_key
+from .config import DEFAULT_MAX_CONCURRENCY, BatchResult, ModelConfig, ModelInput
+from .http_client import install_async_http_client, install_http_client
 from .image_utils import ImageUtils
+from .instrumentation import CallRecord, call_labels, caller_module, current_labels, emit, start_record
+from .rate_limiter import Permit, backoff_delay, estimate_tokens, get_rate_limiter
+from .single_flight import SingleFlight, default_flights
 
 logger = logging.getLogger(__name__)
 
@@ -16,14 +26,54 @@ logger = logging.getLogger(__name__)
 class LiteClient:
     """Unified client for interacting with both text and vision models."""
 
-    def __init__(self, model_config: Optional[ModelConfig] = None):
+    def __init__(
+        self,
+        model_config: Optional[ModelConfig] = None,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        cache: Optional[CacheBackend] = None,
+        rate_limit: bool = True,
+        coalesce_requests: bool = False,
+        flights: Optional[SingleFlight] = None,
+        repair_json: bool = True,
+    ):
         """
         Initialize LiteClient with optional ModelConfig.
 
         Args:
             model_config: Optional ModelConfig instance for model configuration.
+            max_concurrency: Maximum number of requests kept in flight by
+                agenerate_text() on a single event loop.
+            cache: Optional completion cache (CompletionCache, LRUCache or
+                TieredCache). When set, identical requests (model, temperature,
+                messages, response schema) are served from the cache instead
+                of calling the model.
+            rate_limit: Schedule calls through the process-wide adaptive limiter
+                of each model (see lite.rate_limiter), shared by every client.
+                Rate-limited and transient errors are retried with jittered
+                exponential backoff either way.
+            coalesce_requests: Share one upstream call among concurrent identical
+                requests (same model, messages, temperature and response schema),
+                across all coalescing clients in the process. Every caller gets
+                the same answer, so use it where that is acceptable.
+            flights: Optional SingleFlight group to coalesce within instead of
+                the process-wide one.
+            repair_json: When structured output still fails the schema after
+                local repair (see lite.utils.json_repair), send the broken
+                output and the schema back to the model for a short fix-up
+                instead of returning the raw text.
         """
+        if max_concurrency <= 0:
+            raise ValueError("max_concurrency must be greater than 0")
         self.model_config = model_config
+        self.max_concurrency = max_concurrency
+        self.cache = cache
+        self.rate_limit = rate_limit
+        self.coalesce_requests = coalesce_requests
+        self.flights = flights or default_flights()
+        self.repair_json = repair_json
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._semaphore_loop: Optional[asyncio.AbstractEventLoop] = None
+        install_http_client()
 
     @staticmethod
     def create_message(model_input: ModelInput) -> List[Dict[str, Any]]:
@@ -59,12 +109,465 @@ class LiteClient:
 
         return messages
 
+    def _resolve_config(self, model_config: Optional[ModelConfig]) -> ModelConfig:
+        """Return the per-call config, falling back to the instance config."""
+        config = model_config or self.model_config
+        if not config:
+            raise ValueError("ModelConfig must be provided")
+        return config
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        """
+        Return the concurrency semaphore bound to the running event loop.
+
+        A new semaphore is created whenever the client is used from a different
+        loop (e.g. successive asyncio.run() calls), since asyncio primitives
+        cannot be shared across loops.
+        """
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._semaphore_loop = loop
+        return self._semaphore
+
+    @contextmanager
+    def _limited(self, config: ModelConfig, messages: List[Dict[str, Any]]) -> Iterator[Optional[Permit]]:
+        """Hold a slot of the model's rate limiter around one call (yields None when disabled)."""
+        if not self.rate_limit:
+            yield None
+            return
+        with get_rate_limiter(config.model).limit(estimate_tokens(messages)) as permit:
+            yield permit
+
+    @asynccontextmanager
+    async def _alimited(
+        self, config: ModelConfig, messages: List[Dict[str, Any]]
+    ) -> AsyncIterator[Optional[Permit]]:
+        """Async counterpart of _limited."""
+        if not self.rate_limit:
+            yield None
+            return
+        async with get_rate_limiter(config.model).alimit(estimate_tokens(messages)) as permit:
+            yield permit
+
+    def _report_stream_error(self, config: ModelConfig, error: Exception) -> None:
+        """Feed an error raised while consuming a stream back to the model's limiter."""
+        if self.rate_limit:
+            get_rate_limiter(config.model).report_error(error)
+
+    def _retry_delay(self, config: ModelConfig, attempt: int, retries: int, error: Exception) -> float:
+        """Seconds to wait before the next attempt, or 0 after the last one."""
+        if attempt >= retries:
+            return 0.0
+        limit_config = get_rate_limiter(config.model).config if self.rate_limit else None
+        delay = backoff_delay(attempt, error, limit_config)
+        if delay:
+            logger.info(f"Backing off {delay:.2f}s before retrying {config.model}")
+        return delay
+
+    @staticmethod
+    def _wants_model(model_input: ModelInput) -> bool:
+        """Whether the input asks for a Pydantic model as structured output."""
+        return bool(
+            model_input.response_format
+            and isinstance(model_input.response_format, type)
+            and issubclass(model_input.response_format, BaseModel)
+        )
+
+    @staticmethod
+    def _parse_structured(
+        model_input: ModelInput, response_content: str
+    ) -> Tuple[Union[str, BaseModel], Optional[str]]:
+        """
+        Parse raw completion content, repairing malformed JSON where possible.
+
+        Returns:
+            Tuple of (parsed model or raw content, repair stage that succeeded
+            or None). The stage is also None when no schema was requested.
+        """
+        if not LiteClient._wants_model(model_input):
+            return response_content, None
+
+        schema_name = model_input.response_format.__name__
+        result, stage, error = parse_structured(response_content, model_input.response_format)
+        if result is not None:
+            if stage == STRICT:
+                logger.debug(f"Successfully parsed response as {schema_name}")
+            else:
+                logger.info(f"Repaired response into {schema_name} ({stage} stage)")
+            return result, stage
+        logger.warning(
+            "Failed to parse response as %s; returning raw content",
+            schema_name,
+        )
+        logger.debug(f"JSON parsing failed: {error}; raw content: {str(response_content)[:500]!r}")
+        return response_content, None
+
+    @staticmethod
+    def _parse_response(
+        model_input: ModelInput, response_content: str
+    ) -> Union[str, BaseModel]:
+        """
+        Parse raw completion content into the requested response format.
+
+        Args:
+            model_input: ModelInput whose response_format drives parsing
+            response_content: Raw message content returned by the model
+
+        Returns:
+            Parsed Pydantic model, or the raw content if no schema was requested
+            or the content could not be parsed even after repair.
+        """
+        return LiteClient._parse_structured(model_input, response_content)[0]
+
+    def _parse_recorded(
+        self, model_input: ModelInput, response_content: str, record: CallRecord
+    ) -> Union[str, BaseModel]:
+        """_parse_response, timing the parse and noting whether the schema was met."""
+        start = time.monotonic()
+        result, stage = self._parse_structured(model_input, response_content)
+        record.parse_seconds += time.monotonic() - start
+        if self._wants_model(model_input):
+            record.parsed = isinstance(result, BaseModel)
+            record.repair = stage if stage != STRICT else None
+        return result
+
+    def _needs_fix(self, model_input: ModelInput, result: Union[str, BaseModel]) -> bool:
+        """Whether a model fix-up should be requested for a response that failed to parse."""
+        return (
+            self.repair_json
+            and self._wants_model(model_input)
+            and isinstance(result, str)
+            and bool(result.strip())
+        )
+
+    def _fix_output(
+        self,
+        config: ModelConfig,
+        model_input: ModelInput,
+        response_content: str,
+        record: CallRecord,
+    ) -> Tuple[Union[str, BaseModel], str]:
+        """
+        Ask the model to fix output that failed local repair.
+
+        Only the broken output and the schema are sent, not the original prompt.
+
+        Returns:
+            Tuple of (parsed model or the original raw content, content to cache).
+        """
+        _, _, error = parse_structured(response_content, model_input.response_format)
+        messages = build_fix_messages(response_content, model_input.response_format, error)
+        try:
+            fixed_content = self._complete(config, model_input, messages, record)
+        except Exception as e:
+            logger.warning(f"JSON fix-up request failed: {e}")
+            return response_content, response_content
+        return self._accept_fix(model_input, response_content, fixed_content, record)
+
+    async def _afix_output(
+        self,
+        config: ModelConfig,
+        model_input: ModelInput,
+        response_content: str,
+        record: CallRecord,
+    ) -> Tuple[Union[str, BaseModel], str]:
+        """Async counterpart of _fix_output."""
+        _, _, error = parse_structured(response_content, model_input.response_format)
+        messages = build_fix_messages(response_content, model_input.response_format, error)
+        try:
+            fixed_content = await self._acomplete(config, model_input, messages, record)
+        except Exception as e:
+            logger.warning(f"JSON fix-up request failed: {e}")
+            return response_content, response_content
+        return self._accept_fix(model_input, response_content, fixed_content, record)
+
+    def _accept_fix(
+        self,
+        model_input: ModelInput,
+        response_content: str,
+        fixed_content: Optional[str],
+        record: CallRecord,
+    ) -> Tuple[Union[str, BaseModel], str]:
+        """Use the fixed output if it parses, otherwise keep the original."""
+        result = self._parse_recorded(model_input, fixed_content, record)
+        if isinstance(result, BaseModel):
+            logger.info(f"Model fixed its response into {model_input.response_format.__name__}")
+            record.repair = MODEL_FIX
+            return result, fixed_content
+        return response_content, response_content
+
+    @staticmethod
+    def _emit(record: CallRecord) -> None:
+        """Count the record's repair outcome and send it to the instrumentation sinks."""
+        if record.parsed is not None and not record.cache_hit:
+            record_repair((record.repair or STRICT) if record.parsed else None)
+        emit(record)
+
+    @staticmethod
+    def _format_error(
+        model_input: ModelInput, last_exception: Optional[Exception]
+    ) -> Union[str, Dict[str, Any]]:
+        """Build the error value returned after all retries have failed."""
+        has_image = bool(model_input.image_path or model_input.image_paths)
+        if isinstance(last_exception, FileNotFoundError):
+            message = f"File error: {last_exception}"
+            return {"error": message} if has_image else message
+        if isinstance(last_exception, ValueError):
+            message = str(last_exception)
+            return {"error": message} if has_image else message
+        if isinstance(last_exception, APIError):
+            message = f"API Error: {last_exception}"
+            return {"error": message} if has_image else message
+        if last_exception is not None:
+            message = str(last_exception)
+            return {"error": message} if has_image else message
+        return {"error": "Unknown error"} if has_image else "Unknown error"
+
+    def _cache_lookup(
+        self, config: ModelConfig, model_input: ModelInput, messages: List[Dict[str, Any]]
+    ) -> Tuple[Optional[str], Optional[str]]:
+        """
+        Look up a request in the completion cache.
+
+        Returns:
+            Tuple of (cache key, cached content). Both are None when caching is
+            disabled; the content is None on a miss.
+        """
+        if self.cache is None:
+            return None, None
+        key = make_cache_key(
+            config.model, config.temperature, messages, model_input.response_format
+        )
+        return key, self.cache.get(key)
+
+    def _flight_key(
+        self,
+        cache_key: Optional[str],
+        config: ModelConfig,
+        model_input: ModelInput,
+        messages: List[Dict[str, Any]],
+    ) -> str:
+        """
+        Identity of a request for coalescing; reuses the cache key when there is one.
+
+        Flights share the parsed (and possibly model-fixed) result, so clients that
+        would fix unparsable output do not join flights of clients that would not.
+        """
+        key = cache_key or make_cache_key(
+            config.model, config.temperature, messages, model_input.response_format
+        )
+        return f"{key}:fix" if self._wants_model(model_input) and self.repair_json else key
+
+    def coalesce_stats(self) -> Dict[str, int]:
+        """
+        Return counters of the client's single-flight group.
+
+        Returns:
+            dict: "calls" made upstream, "coalesced" callers that shared another
+            caller's call, and "in_flight" calls currently running.
+        """
+        return self.flights.stats()
+
+    def _complete(
+        self,
+        config: ModelConfig,
+        model_input: ModelInput,
+        messages: List[Dict[str, Any]],
+        record: CallRecord,
+    ) -> Optional[str]:
+        """Send one completion request and return the message content."""
+        waiting = time.monotonic()
+        with self._limited(config, messages) as permit:
+            sent = time.monotonic()
+            record.queue_seconds += sent - waiting
+            try:
+                response = completion(
+                    model=config.model,
+                    messages=messages,
+                    temperature=config.temperature,
+                    response_format=model_input.response_format,
+                )
+            finally:
+                record.network_seconds += time.monotonic() - sent
+            record.add_usage(response)
+            if permit is not None:
+                permit.record(response)
+        return response.choices[0].message.content
+
+    async def _acomplete(
+        self,
+        config: ModelConfig,
+        model_input: ModelInput,
+        messages: List[Dict[str, Any]],
+        record: CallRecord,
+    ) -> Optional[str]:
+        """Async counterpart of _complete."""
+        install_async_http_client()
+        waiting = time.monotonic()
+        async with self._alimited(config, messages) as permit:
+            sent = time.monotonic()
+            record.queue_seconds += sent - waiting
+            try:
+                response = await acompletion(
+                    model=config.model,
+                    messages=messages,
+                    temperature=config.temperature,
+                    response_format=model_input.response_format,
+                )
+            finally:
+                record.network_seconds += time.monotonic() - sent
+            record.add_usage(response)
+            if permit is not None:
+                permit.record(response)
+        return response.choices[0].message.content
+
+    def _complete_parsed(
+        self,
+        config: ModelConfig,
+        model_input: ModelInput,
+        messages: List[Dict[str, Any]],
+        record: CallRecord,
+    ) -> Tuple[Union[str, BaseModel], Optional[str]]:
+        """
+        Send one completion request and parse it, asking the model for a fix-up if needed.
+
+        This is the unit shared by coalesced callers, so one malformed response
+        costs one fix-up request however many callers are waiting on it.
+
+        Returns:
+            Tuple of (parsed model or raw content, content to cache).
+        """
+        response_content = self._complete(config, model_input, messages, record)
+        result = self._parse_recorded(model_input, response_content, record)
+        if self._needs_fix(model_input, result):
+            result, response_content = self._fix_output(
+                config, model_input, response_content, record
+            )
+        return result, response_content
+
+    async def _acomplete_parsed(
+        self,
+        config: ModelConfig,
+        model_input: ModelInput,
+        messages: List[Dict[str, Any]],
+        record: CallRecord,
+    ) -> Tuple[Union[str, BaseModel], Optional[str]]:
+        """Async counterpart of _complete_parsed."""
+        response_content = await self._acomplete(config, model_input, messages, record)
+        result = self._parse_recorded(model_input, response_content, record)
+        if self._needs_fix(model_input, result):
+            result, response_content = await self._afix_output(
+                config, model_input, response_content, record
+            )
+        return result, response_content
+
+    @staticmethod
+    def _own_copy(result: Union[str, BaseModel]) -> Union[str, BaseModel]:
+        """Give a coalesced caller its own copy of a parsed model."""
+        return result.model_copy(deep=True) if isinstance(result, BaseModel) else result
+
+    def _cache_store(
+        self,
+        key: Optional[str],
+        model_input: ModelInput,
+        response_content: Optional[str],
+        result: Union[str, BaseModel],
+    ) -> None:
+        """Store a completion unless it is empty or failed to parse into the schema."""
+        if key is None or response_content is None:
+            return
+        if self._wants_model(model_input) and not isinstance(result, BaseModel):
+            return
+        self.cache.put(key, response_content)
+
+    def _generate(
+        self,
+        model_input: ModelInput,
+        config: ModelConfig,
+        retries: int,
+    ) -> Union[str, BaseModel]:
+        """
+        Run the completion with retries, raising the last error if every attempt fails.
+
+        One CallRecord covering all attempts is sent to the instrumentation sinks.
+
+        Args:
+            model_input: ModelInput object containing prompt and image parameters
+            config: Resolved ModelConfig for the call.
+            retries: Number of retries for the model call.
+
+        Returns:
+            Parsed Pydantic model or raw response content.
+        """
+        record = start_record(config.model)
+        started = time.monotonic()
+        try:
+            return self._generate_attempts(model_input, config, retries, record)
+        except Exception as e:
+            record.error = str(e)
+            raise
+        finally:
+            record.total_seconds = time.monotonic() - started
+            self._emit(record)
+
+    def _generate_attempts(
+        self,
+        model_input: ModelInput,
+        config: ModelConfig,
+        retries: int,
+        record: CallRecord,
+    ) -> Union[str, BaseModel]:
+        """Retry loop of _generate."""
+        last_exception = None
+        for attempt in range(retries + 1):
+            record.attempts = attempt + 1
+            try:
+                logger.info(
+                    f"Generating completion (attempt {attempt + 1}) with model: {config.model}"
+                )
+                messages = self.create_message(model_input)
+                cache_key, cached_content = self._cache_lookup(config, model_input, messages)
+                if cached_content is not None:
+                    logger.info(f"Serving cached completion for model: {config.model}")
+                    record.cache_hit = True
+                    return self._parse_recorded(model_input, cached_content, record)
+
+                shared = False
+                if self.coalesce_requests:
+                    waiting = time.monotonic()
+                    (result, response_content), shared = self.flights.do(
+                        self._flight_key(cache_key, config, model_input, messages),
+                        lambda: self._complete_parsed(config, model_input, messages, record),
+                    )
+                    if shared:
+                        record.coalesced = True
+                        record.network_seconds += time.monotonic() - waiting
+                        result = self._own_copy(result)
+                else:
+                    result, response_content = self._complete_parsed(
+                        config, model_input, messages, record
+                    )
+
+                if not shared:
+                    self._cache_store(cache_key, model_input, response_content, result)
+                return result
+            except Exception as e:
+                logger.error(f"Attempt {attempt + 1} failed: {e}")
+                last_exception = e
+                delay = self._retry_delay(config, attempt, retries, e)
+                if delay:
+                    time.sleep(delay)
+                continue
+        raise last_exception or RuntimeError("Unknown error")
+
     def generate_text(
         self,
         model_input: ModelInput,
         model_config: Optional[ModelConfig] = None,
         retries: int = 2,
-    ) -> Union[str, BaseModel, Dict[str, Any]]:
+        stream: bool = False,
+    ) -> Union[str, BaseModel, Dict[str, Any], Iterator[str]]:
         """
         Generate text from a prompt or analyze an image with a prompt.
 
@@ -72,80 +575,462 @@ class LiteClient:
             model_input: ModelInput object containing prompt and image parameters
             model_config: Optional ModelConfig object for model configuration.
             retries: Number of retries for the model call.
+            stream: If True, return a generator of text deltas (see stream_text).
 
         Returns:
-            Generated text response (string, parsed Pydantic model, or error dict)
+            Generated text response (string, parsed Pydantic model, or error dict),
+            or a generator of text deltas when stream is True.
         """
         # Use provided model_config or instance
-        config = model_config or self.model_config
-        if not config:
-            raise ValueError("ModelConfig must be provided")
+        config = self._resolve_config(model_config)
+        if stream:
+            return self.stream_text(model_input, config, retries)
+
+        try:
+            return self._generate(model_input, config, retries)
+        except Exception as e:
+            return self._format_error(model_input, e)
+
+    def generate_many(
+        self,
+        inputs: Iterable[ModelInput],
+        model_config: Optional[ModelConfig] = None,
+        max_concurrency: Optional[int] = None,
+        ordered: bool = True,
+        retries: int = 2,
+    ) -> Iterator[BatchResult]:
+        """
+        Generate responses for many inputs concurrently.
+
+        Requests are fanned out over a thread pool. Each input yields one
+        BatchResult; a failing item records its error instead of aborting the batch.
+
+        Args:
+            inputs: ModelInput objects to process.
+            model_config: Optional ModelConfig object for model configuration.
+            max_concurrency: Number of worker threads. Defaults to the client's
+                max_concurrency.
+            ordered: If True, yield results in input order; otherwise yield each
+                result as soon as it completes.
+            retries: Number of retries for each model call.
+
+        Yields:
+            BatchResult for every input.
+
+        Example:
+            >>> inputs = [ModelInput(user_prompt=f"Define {d}") for d in diseases]
+            >>> for item in client.generate_many(inputs, max_concurrency=16):
+            ...     if item.ok:
+            ...         save(item.result)
+        """
+        config = self._resolve_config(model_config)
+        workers = max_concurrency or self.max_concurrency
+        if workers <= 0:
+            raise ValueError("max_concurrency must be greater than 0")
+        # Worker threads do not inherit the caller's labels or stack
+        labels = {"caller": caller_module(), **current_labels()}
+
+        def run(index: int, model_input: ModelInput) -> BatchResult:
+            try:
+                with call_labels(**labels):
+                    result = self._generate(model_input, config, retries)
+                return BatchResult(index=index, model_input=model_input, result=result)
+            except Exception as e:
+                return BatchResult(
+                    index=index,
+                    model_input=model_input,
+                    error=self._format_error(model_input, e),
+                )
 
+        executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="lite-batch")
+        try:
+            futures = [
+                executor.submit(run, index, model_input)
+                for index, model_input in enumerate(inputs)
+            ]
+            for future in futures if ordered else as_completed(futures):
+                yield future.result()
+        finally:
+            # Stop pending work if the caller abandons the generator early
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    async def _agenerate(
+        self,
+        model_input: ModelInput,
+        config: ModelConfig,
+        retries: int,
+        coalesce: bool = True,
+    ) -> Union[str, BaseModel]:
+        """
+        Async counterpart of _generate, bounded by the client's semaphore.
+
+        coalesce=False sends the request even when an identical one is in flight,
+        as hedged requests must.
+        """
+        record = start_record(config.model)
+        started = time.monotonic()
+        try:
+            return await self._agenerate_attempts(model_input, config, retries, record, coalesce)
+        except Exception as e:
+            record.error = str(e)
+            raise
+        finally:
+            record.total_seconds = time.monotonic() - started
+            self._emit(record)
+
+    async def _agenerate_attempts(
+        self,
+        model_input: ModelInput,
+        config: ModelConfig,
+        retries: int,
+        record: CallRecord,
+        coalesce: bool = True,
+    ) -> Union[str, BaseModel]:
+        """Retry loop of _agenerate."""
+        last_exception = None
+        waiting = time.monotonic()
+        async with self._get_semaphore():
+            record.queue_seconds += time.monotonic() - waiting
+            for attempt in range(retries + 1):
+                record.attempts = attempt + 1
+                try:
+                    logger.info(
+                        f"Generating async completion (attempt {attempt + 1}) with model: {config.model}"
+                    )
+                    messages = self.create_message(model_input)
+                    cache_key, cached_content = self._cache_lookup(config, model_input, messages)
+                    if cached_content is not None:
+                        logger.info(f"Serving cached completion for model: {config.model}")
+                        record.cache_hit = True
+                        return self._parse_recorded(model_input, cached_content, record)
+
+                    shared = False
+                    if self.coalesce_requests and coalesce:
+                        waiting = time.monotonic()
+                        (result, response_content), shared = await self.flights.ado(
+                            self._flight_key(cache_key, config, model_input, messages),
+                            lambda: self._acomplete_parsed(config, model_input, messages, record),
+                        )
+                        if shared:
+                            record.coalesced = True
+                            record.network_seconds += time.monotonic() - waiting
+                            result = self._own_copy(result)
+                    else:
+                        result, response_content = await self._acomplete_parsed(
+                            config, model_input, messages, record
+                        )
+
+                    if not shared:
+                        self._cache_store(cache_key, model_input, response_content, result)
+                    return result
+                except Exception as e:
+                    logger.error(f"Attempt {attempt + 1} failed: {e}")
+                    last_exception = e
+                    delay = self._retry_delay(config, attempt, retries, e)
+                    if delay:
+                        await asyncio.sleep(delay)
+                    continue
+        raise last_exception or RuntimeError("Unknown error")
+
+    async def agenerate_text(
+        self,
+        model_input: ModelInput,
+        model_config: Optional[ModelConfig] = None,
+        retries: int = 2,
+        stream: bool = False,
+    ) -> Union[str, BaseModel, Dict[str, Any], AsyncIterator[str]]:
+        """
+        Asynchronously generate text from a prompt or analyze an image with a prompt.
+
+        Uses litellm.acompletion, so many requests can be awaited concurrently from
+        a single event loop without a thread per call. The number of requests in
+        flight is bounded by the client's max_concurrency.
+
+        Args:
+            model_input: ModelInput object containing prompt and image parameters
+            model_config: Optional ModelConfig object for model configuration.
+            retries: Number of retries for the model call.
+            stream: If True, return an async iterator of text deltas (see astream_text).
+
+        Returns:
+            Generated text response (string, parsed Pydantic model, or error dict),
+            or an async iterator of text deltas when stream is True.
+        """
+        config = self._resolve_config(model_config)
+        if stream:
+            return self.astream_text(model_input, config, retries)
+
+        try:
+            return await self._agenerate(model_input, config, retries)
+        except Exception as e:
+            return self._format_error(model_input, e)
+
+    @staticmethod
+    def _chunk_text(chunk: Any) -> str:
+        """Extract the text delta from a streamed completion chunk."""
+        try:
+            return chunk.choices[0].delta.content or ""
+        except (AttributeError, IndexError):
+            return ""
+
+    def stream_text(
+        self,
+        model_input: ModelInput,
+        model_config: Optional[ModelConfig] = None,
+        retries: int = 2,
+    ) -> Iterator[str]:
+        """
+        Stream a completion as text deltas.
+
+        Deltas are yielded as soon as the provider sends them, which keeps
+        time-to-first-token low for interactive callers. Opening the stream is
+        retried; once text has been yielded, errors propagate to the caller.
+        A cached completion is yielded as a single delta, and a fully consumed
+        stream is written to the cache.
+
+        Args:
+            model_input: ModelInput object containing prompt and image parameters
+            model_config: Optional ModelConfig object for model configuration.
+            retries: Number of retries for opening the stream.
+
+        Yields:
+            str: Text deltas in order.
+
+        Raises:
+            Exception: The last error if the stream could not be opened.
+        """
+        config = self._resolve_config(model_config)
+        record = start_record(config.model, stream=True)
+        started = time.monotonic()
+        try:
+            yield from self._stream(model_input, config, retries, record)
+        except Exception as e:
+            record.error = str(e)
+            raise
+        finally:
+            record.total_seconds = time.monotonic() - started
+            self._emit(record)
+
+    def _stream(
+        self,
+        model_input: ModelInput,
+        config: ModelConfig,
+        retries: int,
+        record: CallRecord,
+    ) -> Iterator[str]:
+        """Body of stream_text; network time runs until the stream is drained."""
         last_exception = None
         for attempt in range(retries + 1):
+            record.attempts = attempt + 1
             try:
                 logger.info(
-                    f"Generating completion (attempt {attempt + 1}) with model: {config.model}"
+                    f"Streaming completion (attempt {attempt + 1}) with model: {config.model}"
                 )
                 messages = self.create_message(model_input)
+                cache_key, cached_content = self._cache_lookup(config, model_input, messages)
+                if cached_content is not None:
+                    record.cache_hit = True
+                    yield cached_content
+                    return
 
-                response = completion(
-                    model=config.model,
-                    messages=messages,
-                    temperature=config.temperature,
-                    response_format=model_input.response_format,
-                )
+                # The limiter slot covers opening the stream, not consuming it
+                waiting = time.monotonic()
+                with self._limited(config, messages):
+                    sent = time.monotonic()
+                    record.queue_seconds += sent - waiting
+                    response = completion(
+                        model=config.model,
+                        messages=messages,
+                        temperature=config.temperature,
+                        response_format=model_input.response_format,
+                        stream=True,
+                    )
+                break
+            except Exception as e:
+                logger.error(f"Attempt {attempt + 1} failed: {e}")
+                last_exception = e
+                delay = self._retry_delay(config, attempt, retries, e)
+                if delay:
+                    time.sleep(delay)
+        else:
+            raise last_exception or RuntimeError("Unknown error")
 
-                response_content = response.choices[0].message.content
-
-                if (
-                    model_input.response_format
-                    and isinstance(model_input.response_format, type)
-                    and issubclass(model_input.response_format, BaseModel)
-                ):
-                    try:
-                        cleaned_json = JSONCleaner.extract_json(response_content)
-                        # DEBUG: Log what we're trying to parse
-                        print(
-                            f"DEBUG: Attempting to parse JSON: '{cleaned_json[:200]}...'"
-                        )
-                        parsed_response = (
-                            model_input.response_format.model_validate_json(
-                                cleaned_json
-                            )
-                        )
-                        logger.info(
-                            f"Successfully parsed response as {model_input.response_format.__name__}"
-                        )
-                        return parsed_response
-                    except Exception as e:
-                        logger.warning(
-                            "Failed to parse response as %s; returning raw content",
-                            model_input.response_format.__name__,
-                        )
-                        # DEBUG: Log the error and raw content
-                        print(f"DEBUG: JSON parsing failed: {e}")
-                        print(
-                            f"DEBUG: Raw response content: '{response_content[:500]}...'"
+        parts = []
+        try:
+            for chunk in response:
+                text = self._chunk_text(chunk)
+                if text:
+                    parts.append(text)
+                    yield text
+        except Exception as e:
+            self._report_stream_error(config, e)
+            raise
+        finally:
+            record.network_seconds += time.monotonic() - sent
+
+        if cache_key is not None:
+            response_content = "".join(parts)
+            result = self._parse_recorded(model_input, response_content, record)
+            self._cache_store(cache_key, model_input, response_content, result)
+
+    async def astream_text(
+        self,
+        model_input: ModelInput,
+        model_config: Optional[ModelConfig] = None,
+        retries: int = 2,
+    ) -> AsyncIterator[str]:
+        """
+        Async counterpart of stream_text, bounded by the client's max_concurrency.
+
+        Args:
+            model_input: ModelInput object containing prompt and image parameters
+            model_config: Optional ModelConfig object for model configuration.
+            retries: Number of retries for opening the stream.
+
+        Yields:
+            str: Text deltas in order.
+
+        Raises:
+            Exception: The last error if the stream could not be opened.
+        """
+        config = self._resolve_config(model_config)
+        record = start_record(config.model, stream=True)
+        started = time.monotonic()
+        try:
+            async for delta in self._astream(model_input, config, retries, record):
+                yield delta
+        except Exception as e:
+            record.error = str(e)
+            raise
+        finally:
+            record.total_seconds = time.monotonic() - started
+            self._emit(record)
+
+    async def _astream(
+        self,
+        model_input: ModelInput,
+        config: ModelConfig,
+        retries: int,
+        record: CallRecord,
+    ) -> AsyncIterator[str]:
+        """Body of astream_text."""
+        waiting = time.monotonic()
+        async with self._get_semaphore():
+            record.queue_seconds += time.monotonic() - waiting
+            last_exception = None
+            for attempt in range(retries + 1):
+                record.attempts = attempt + 1
+                try:
+                    logger.info(
+                        f"Streaming async completion (attempt {attempt + 1}) with model: {config.model}"
+                    )
+                    messages = self.create_message(model_input)
+                    cache_key, cached_content = self._cache_lookup(config, model_input, messages)
+                    if cached_content is not None:
+                        record.cache_hit = True
+                        yield cached_content
+                        return
+
+                    install_async_http_client()
+                    waiting = time.monotonic()
+                    async with self._alimited(config, messages):
+                        sent = time.monotonic()
+                        record.queue_seconds += sent - waiting
+                        response = await acompletion(
+                            model=config.model,
+                            messages=messages,
+                            temperature=config.temperature,
+                            response_format=model_input.response_format,
+                            stream=True,
                         )
-                        return response_content
+                    break
+                except Exception as e:
+                    logger.error(f"Attempt {attempt + 1} failed: {e}")
+                    last_exception = e
+                    delay = self._retry_delay(config, attempt, retries, e)
+                    if delay:
+                        await asyncio.sleep(delay)
+            else:
+                raise last_exception or RuntimeError("Unknown error")
 
-                return response_content
+            parts = []
+            try:
+                async for chunk in response:
+                    text = self._chunk_text(chunk)
+                    if text:
+                        parts.append(text)
+                        yield text
             except Exception as e:
-                logger.error(f"Attempt {attempt + 1} failed: {e}")
-                last_exception = e
-                continue
-        has_image = bool(model_input.image_path or model_input.image_paths)
-        if isinstance(last_exception, FileNotFoundError):
-            message = f"File error: {last_exception}"
-            return {"error": message} if has_image else message
-        if isinstance(last_exception, ValueError):
-            message = str(last_exception)
-            return {"error": message} if has_image else message
-        if isinstance(last_exception, APIError):
-            message = f"API Error: {last_exception}"
-            return {"error": message} if has_image else message
-        if last_exception is not None:
-            message = str(last_exception)
-            return {"error": message} if has_image else message
-        return {"error": "Unknown error"} if has_image else "Unknown error"
+                self._report_stream_error(config, e)
+                raise
+            finally:
+                record.network_seconds += time.monotonic() - sent
+
+            if cache_key is not None:
+                response_content = "".join(parts)
+                result = self._parse_recorded(model_input, response_content, record)
+                self._cache_store(cache_key, model_input, response_content, result)
+
+    def stream_structured(
+        self,
+        model_input: ModelInput,
+        model_config: Optional[ModelConfig] = None,
+        retries: int = 2,
+    ) -> Iterator[PartialItem]:
+        """
+        Stream a structured completion, yielding list elements as soon as they close.
+
+        Each completed array element is validated against the element type declared
+        in model_input.response_format and yielded as a PartialItem. The last item
+        has the empty path () and holds the fully parsed response (or the raw text
+        if it does not match the schema), exactly as generate_text would return it.
+
+        Args:
+            model_input: ModelInput whose response_format is a Pydantic model
+            model_config: Optional ModelConfig object for model configuration.
+            retries: Number of retries for opening the stream.
+
+        Yields:
+            PartialItem: Completed elements, then the complete response.
+
+        Example:
+            >>> for item in client.stream_structured(model_input):
+            ...     if item.path and item.path[-2] == "chapters":
+            ...         writer.start(item.value)  # a validated ChapterSuggestion
+        """
+        parser = StreamingJSONParser(self._schema_for(model_input))
+        parts = []
+        for delta in self.stream_text(model_input, model_config, retries):
+            parts.append(delta)
+            yield from parser.feed(delta)
+        yield PartialItem(path=(), value=self._parse_response(model_input, "".join(parts)))
+
+    async def astream_structured(
+        self,
+        model_input: ModelInput,
+        model_config: Optional[ModelConfig] = None,
+        retries: int = 2,
+    ) -> AsyncIterator[PartialItem]:
+        """
+        Async counterpart of stream_structured.
+
+        Args:
+            model_input: ModelInput whose response_format is a Pydantic model
+            model_config: Optional ModelConfig object for model configuration.
+            retries: Number of retries for opening the stream.
+
+        Yields:
+            PartialItem: Completed elements, then the complete response.
+        """
+        parser = StreamingJSONParser(self._schema_for(model_input))
+        parts = []
+        async for delta in self.astream_text(model_input, model_config, retries):
+            parts.append(delta)
+            for item in parser.feed(delta):
+                yield item
+        yield PartialItem(path=(), value=self._parse_response(model_input, "".join(parts)))
+
+    @staticmethod
+    def _schema_for(model_input: ModelInput) -> Optional[type]:
+        """Return the Pydantic response_format of an input, if any."""
+        return model_input.response_format if LiteClient._wants_model(model_input) else None
@@ -0,0 +1,554 @@
+"""Process-wide adaptive rate limiting for LiteLLM calls.
+
+Every LiteClient in the process shares one AdaptiveLimiter per (provider,
+model). A limiter combines:
+
+* token buckets for requests and tokens per minute, filled at a fraction of
+  the quota (configured, or learned from x-ratelimit-limit-* headers) so the
+  scheduled rate settles just under it;
+* an AIMD concurrency limit: each success adds roughly one slot per window of
+  in-flight requests, and a 429 (or a sustained latency blow-up) cuts it
+  multiplicatively, at most once per cooldown so a burst of 429s from the same
+  window counts once;
+* a shared pause honoring Retry-After, so one 429 holds back every caller of
+  that model instead of each one discovering it separately.
+
+Retries of rate-limited and transient errors use jittered exponential
+backoff (see backoff_delay) instead of retrying immediately.
+"""
+
+import asyncio
+import collections
+import email.utils
+import functools
+import logging
+import random
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, Deque, Dict, Iterator, AsyncIterator, List, Optional, Tuple
+
+import litellm
+
+from .config import RateLimitConfig
+
+logger = logging.getLogger(__name__)
+
+# Bucket capacity, in seconds of quota, that may be spent in a burst
+BURST_SECONDS = 10.0
+# Rough token cost charged for an image until the real usage is known
+IMAGE_TOKEN_ESTIMATE = 765
+# Smoothing factor of the latency moving average
+LATENCY_EWMA_ALPHA = 0.2
+# Gentle multiplicative decrease applied when latency degrades
+LATENCY_DECREASE_FACTOR = 0.9
+# Window over which observed requests and tokens per minute are reported
+OBSERVATION_WINDOW = 60.0
+
+RATE_LIMIT_ERRORS = (litellm.RateLimitError,)
+TRANSIENT_ERRORS = (
+    litellm.RateLimitError,
+    litellm.Timeout,
+    litellm.APIConnectionError,
+    litellm.ServiceUnavailableError,
+    litellm.InternalServerError,
+)
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket refilled continuously at a per-minute rate.
+
+    reserve() always succeeds and returns how long the caller must wait for
+    its reservation to be covered. The balance may go negative, so callers are
+    served in reservation order and a request larger than the capacity is
+    delayed rather than starved.
+    """
+
+    def __init__(self, per_minute: float, burst_seconds: float = BURST_SECONDS):
+        self._lock = threading.Lock()
+        self.burst_seconds = burst_seconds
+        self.set_rate(per_minute)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+
+    def set_rate(self, per_minute: float) -> None:
+        """Change the refill rate, keeping the current balance."""
+        with self._lock:
+            self.per_minute = per_minute
+            self.rate = per_minute / 60.0
+            self.capacity = max(1.0, self.rate * self.burst_seconds)
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self, amount: float) -> float:
+        """
+        Take amount tokens from the bucket.
+
+        Returns:
+            float: Seconds until the reservation is covered (0 if immediately).
+        """
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens -= amount
+            return max(0.0, -self._tokens / self.rate)
+
+    def adjust(self, amount: float) -> None:
+        """Charge (positive) or refund (negative) tokens after the real cost is known."""
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens = min(self.capacity, self._tokens - amount)
+
+
+class Permit:
+    """A reserved slot in an AdaptiveLimiter, used to report the call's outcome."""
+
+    def __init__(self, limiter: "AdaptiveLimiter", estimated_tokens: int):
+        self.limiter = limiter
+        self.estimated_tokens = estimated_tokens
+        self.started = time.monotonic()
+        self.response: Any = None
+
+    def record(self, response: Any) -> None:
+        """Attach the completion response so its usage and headers are accounted for."""
+        self.response = response
+
+
+class AdaptiveLimiter:
+    """
+    Rate and concurrency limiter for a single provider model.
+
+    Use limit() around synchronous calls and alimit() around async ones;
+    both may be used at the same time from different threads and loops.
+
+    Example:
+        >>> limiter = get_rate_limiter("openai/gpt-4o-mini")
+        >>> with limiter.limit(estimate_tokens(messages)) as permit:
+        ...     permit.record(completion(model=model, messages=messages))
+    """
+
+    def __init__(self, key: str, config: Optional[RateLimitConfig] = None):
+        """
+        Initialize the limiter.
+
+        Args:
+            key: Name used in logs and stats, e.g. "openai/gpt-4o".
+            config: Quota and concurrency settings. Defaults to RateLimitConfig().
+        """
+        self.key = key
+        self._cond = threading.Condition()
+        self._async_waiters: Deque[Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = collections.deque()
+        self._in_flight = 0
+        self._blocked_until = 0.0
+        self._last_decrease = 0.0
+        self._latency_ewma: Optional[float] = None
+        self._latency_floor: Optional[float] = None
+        self._requests: Deque[float] = collections.deque()
+        self._tokens: Deque[Tuple[float, int]] = collections.deque()
+        self._rate_limited = 0
+        self.request_bucket: Optional[TokenBucket] = None
+        self.token_bucket: Optional[TokenBucket] = None
+        self._learned_rpm = False
+        self._learned_tpm = False
+        self.reconfigure(config or RateLimitConfig())
+
+    def reconfigure(self, config: RateLimitConfig) -> None:
+        """Apply new settings; the concurrency limit restarts at initial_concurrency."""
+        with self._cond:
+            self.config = config
+            self._limit = float(config.initial_concurrency)
+            self._learned_rpm = self._learned_tpm = False
+            self.request_bucket = self._bucket(config.requests_per_minute)
+            self.token_bucket = self._bucket(config.tokens_per_minute)
+            self._wake_locked()
+
+    def _bucket(self, per_minute: Optional[int]) -> Optional[TokenBucket]:
+        if per_minute is None:
+            return None
+        return TokenBucket(per_minute * self.config.utilization)
+
+    @property
+    def concurrency_limit(self) -> int:
+        """Current number of requests allowed in flight."""
+        return int(self._limit)
+
+    def _try_enter_locked(self) -> bool:
+        if self._in_flight < int(self._limit):
+            self._in_flight += 1
+            return True
+        return False
+
+    def _wake_locked(self) -> None:
+        """Wake as many sync and async waiters as there are free slots."""
+        free = max(1, int(self._limit) - self._in_flight)
+        self._cond.notify(free)
+        woken = 0
+        while self._async_waiters and woken < free:
+            loop, future = self._async_waiters.popleft()
+            try:
+                loop.call_soon_threadsafe(_resolve, future)
+                woken += 1
+            except RuntimeError:
+                # The waiter's loop is closed
+                continue
+
+    def _schedule_delay(self, estimated_tokens: int) -> float:
+        """Reserve quota for one request and return how long to wait before sending it."""
+        delay = 0.0
+        if self.request_bucket is not None:
+            delay = max(delay, self.request_bucket.reserve(1))
+        if self.token_bucket is not None and estimated_tokens:
+            delay = max(delay, self.token_bucket.reserve(estimated_tokens))
+        return max(delay, self._blocked_until - time.monotonic())
+
+    def acquire(self, estimated_tokens: int = 0) -> Permit:
+        """Block until a slot and quota are available, then return a Permit."""
+        with self._cond:
+            while not self._try_enter_locked():
+                self._cond.wait()
+        delay = self._schedule_delay(estimated_tokens)
+        if delay > 0:
+            time.sleep(delay)
+        return Permit(self, estimated_tokens)
+
+    async def aacquire(self, estimated_tokens: int = 0) -> Permit:
+        """Async counterpart of acquire() that never blocks the event loop."""
+        loop = asyncio.get_running_loop()
+        while True:
+            with self._cond:
+                if self._try_enter_locked():
+                    break
+                future = loop.create_future()
+                waiter = (loop, future)
+                self._async_waiters.append(waiter)
+            try:
+                await future
+            except asyncio.CancelledError:
+                with self._cond:
+                    if waiter in self._async_waiters:
+                        self._async_waiters.remove(waiter)
+                    else:
+                        # Pass on a wake-up this waiter can no longer use
+                        self._wake_locked()
+                raise
+        try:
+            delay = self._schedule_delay(estimated_tokens)
+            if delay > 0:
+                await asyncio.sleep(delay)
+        except BaseException:
+            # Cancelled while waiting for quota; give the slot back without feedback
+            with self._cond:
+                self._in_flight -= 1
+                self._wake_locked()
+            raise
+        return Permit(self, estimated_tokens)
+
+    def release(self, permit: Permit, error: Optional[BaseException] = None) -> None:
+        """
+        Free the permit's slot and feed its outcome into the adaptive limit.
+
+        Args:
+            permit: Permit returned by acquire() or aacquire().
+            error: Exception raised by the call, if it failed.
+        """
+        now = time.monotonic()
+        latency = now - permit.started
+        with self._cond:
+            self._in_flight -= 1
+            if isinstance(error, RATE_LIMIT_ERRORS):
+                self._on_rate_limited_locked(now, retry_after_seconds(error))
+            elif error is None:
+                self._on_success_locked(now, latency, permit)
+            self._wake_locked()
+
+    def report_error(self, error: BaseException) -> None:
+        """
+        Feed back an error raised after the permit was released, such as a
+        rate limit hit while consuming a stream. Other errors are ignored.
+        """
+        if isinstance(error, RATE_LIMIT_ERRORS):
+            with self._cond:
+                self._on_rate_limited_locked(time.monotonic(), retry_after_seconds(error))
+
+    def _decrease_locked(self, now: float, factor: float) -> bool:
+        """Cut the limit multiplicatively, at most once per cooldown window."""
+        cooldown = max(1.0, self._latency_ewma or 0.0)
+        if now - self._last_decrease < cooldown:
+            return False
+        self._limit = max(float(self.config.min_concurrency), self._limit * factor)
+        self._last_decrease = now
+        return True
+
+    def _on_rate_limited_locked(self, now: float, retry_after: Optional[float]) -> None:
+        self._rate_limited += 1
+        if self._decrease_locked(now, self.config.decrease_factor):
+            logger.warning(f"Rate limited on {self.key}; concurrency limit now {int(self._limit)}")
+        if retry_after:
+            self._blocked_until = max(self._blocked_until, now + retry_after)
+
+    def _on_success_locked(self, now: float, latency: float, permit: Permit) -> None:
+        self._requests.append(now)
+        tokens = _total_tokens(permit.response)
+        if tokens is not None:
+            self._tokens.append((now, tokens))
+            if self.token_bucket is not None:
+                self.token_bucket.adjust(tokens - permit.estimated_tokens)
+        self._learn_quota(_response_headers(permit.response))
+        self._trim_observations(now)
+
+        if self._latency_ewma is None:
+            self._latency_ewma = latency
+        else:
+            self._latency_ewma += LATENCY_EWMA_ALPHA * (latency - self._latency_ewma)
+        self._latency_floor = min(self._latency_floor or self._latency_ewma, self._latency_ewma)
+
+        tolerance = self.config.latency_tolerance
+        if tolerance is not None and self._latency_ewma > self._latency_floor * tolerance:
+            self._decrease_locked(now, LATENCY_DECREASE_FACTOR)
+        else:
+            # Additive increase: about one extra slot per window of completed requests
+            self._limit = min(float(self.config.max_concurrency), self._limit + 1.0 / self._limit)
+
+    def _learn_quota(self, headers: Dict[str, str]) -> None:
+        """Adopt quotas advertised in x-ratelimit-limit-* headers when none were configured."""
+        if not headers:
+            return
+        if self.config.requests_per_minute is None and not self._learned_rpm:
+            limit = _header_number(headers, "x-ratelimit-limit-requests")
+            if limit:
+                self.request_bucket = self._bucket(int(limit))
+                self._learned_rpm = True
+                logger.info(f"Learned request quota for {self.key}: {int(limit)}/min")
+        if self.config.tokens_per_minute is None and not self._learned_tpm:
+            limit = _header_number(headers, "x-ratelimit-limit-tokens")
+            if limit:
+                self.token_bucket = self._bucket(int(limit))
+                self._learned_tpm = True
+                logger.info(f"Learned token quota for {self.key}: {int(limit)}/min")
+
+    def _trim_observations(self, now: float) -> None:
+        cutoff = now - OBSERVATION_WINDOW
+        while self._requests and self._requests[0] < cutoff:
+            self._requests.popleft()
+        while self._tokens and self._tokens[0][0] < cutoff:
+            self._tokens.popleft()
+
+    @contextmanager
+    def limit(self, estimated_tokens: int = 0) -> Iterator[Permit]:
+        """Hold a slot for the duration of a synchronous call."""
+        permit = self.acquire(estimated_tokens)
+        try:
+            yield permit
+        except BaseException as e:
+            self.release(permit, error=e)
+            raise
+        self.release(permit)
+
+    @asynccontextmanager
+    async def alimit(self, estimated_tokens: int = 0) -> AsyncIterator[Permit]:
+        """Hold a slot for the duration of an async call."""
+        permit = await self.aacquire(estimated_tokens)
+        try:
+            yield permit
+        except BaseException as e:
+            self.release(permit, error=e)
+            raise
+        self.release(permit)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the current limit and the throughput observed over the last minute."""
+        with self._cond:
+            self._trim_observations(time.monotonic())
+            return {
+                "concurrency_limit": int(self._limit),
+                "in_flight": self._in_flight,
+                "requests_per_minute": len(self._requests),
+                "tokens_per_minute": sum(tokens for _, tokens in self._tokens),
+                "rate_limited": self._rate_limited,
+                "quota_requests_per_minute": self.request_bucket.per_minute if self.request_bucket else None,
+                "quota_tokens_per_minute": self.token_bucket.per_minute if self.token_bucket else None,
+                "latency_ewma": self._latency_ewma,
+            }
+
+
+def _resolve(future: asyncio.Future) -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+def _total_tokens(response: Any) -> Optional[int]:
+    """Return the total token usage of a completion response, if it reports one."""
+    tokens = getattr(getattr(response, "usage", None), "total_tokens", None)
+    return tokens if isinstance(tokens, int) else None
+
+
+def _response_headers(response: Any) -> Dict[str, str]:
+    """Return the provider headers LiteLLM attaches to a response."""
+    hidden = getattr(response, "_hidden_params", None)
+    if not isinstance(hidden, dict):
+        return {}
+    headers = hidden.get("additional_headers")
+    return headers if isinstance(headers, dict) else {}
+
+
+def _header_number(headers: Dict[str, Any], name: str) -> Optional[float]:
+    """Find a numeric header, also under LiteLLM's llm_provider- prefix."""
+    for key, value in headers.items():
+        if str(key).lower().endswith(name):
+            try:
+                return float(value)
+            except (TypeError, ValueError):
+                return None
+    return None
+
+
+def retry_after_seconds(error: BaseException) -> Optional[float]:
+    """
+    Extract the server-requested delay from a rate-limit error.
+
+    Reads retry-after-ms and retry-after (seconds or an HTTP date) from the
+    error's response headers.
+
+    Returns:
+        float or None: Seconds to wait, or None if the server did not say.
+    """
+    headers: Dict[str, Any] = {}
+    response = getattr(error, "response", None)
+    if response is not None and getattr(response, "headers", None) is not None:
+        headers.update(response.headers)
+    if isinstance(getattr(error, "litellm_response_headers", None), dict):
+        headers.update(error.litellm_response_headers)
+    if isinstance(getattr(error, "headers", None), dict):
+        headers.update(error.headers)
+    headers = {str(key).lower(): value for key, value in headers.items()}
+
+    if "retry-after-ms" in headers:
+        try:
+            return max(0.0, float(headers["retry-after-ms"]) / 1000.0)
+        except (TypeError, ValueError):
+            pass
+    value = headers.get("retry-after")
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        pass
+    try:
+        when = email.utils.parsedate_to_datetime(str(value))
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, when.timestamp() - time.time())
+
+
+def backoff_delay(
+    attempt: int,
+    error: Optional[BaseException] = None,
+    config: Optional[RateLimitConfig] = None,
+) -> float:
+    """
+    Delay before retrying a failed call.
+
+    Rate-limited and transient provider errors back off exponentially with
+    full jitter, or wait what Retry-After asks for. Other errors (bad input,
+    unparseable output) are retried immediately, as before.
+
+    Args:
+        attempt: Zero-based number of the attempt that failed.
+        error: Exception raised by that attempt.
+        config: Settings providing backoff_base and backoff_max.
+
+    Returns:
+        float: Seconds to sleep before the next attempt.
+    """
+    if not isinstance(error, TRANSIENT_ERRORS):
+        return 0.0
+    config = config or RateLimitConfig()
+    retry_after = retry_after_seconds(error)
+    if retry_after is not None:
+        # A little jitter keeps callers released together from colliding again
+        return min(config.backoff_max, retry_after) + random.uniform(0, config.backoff_base)
+    return random.uniform(0, min(config.backoff_max, config.backoff_base * (2 ** attempt)))
+
+
+def estimate_tokens(messages: List[Dict[str, Any]]) -> int:
+    """Estimate the prompt tokens of a message list (about four characters per token)."""
+    chars = 0
+    images = 0
+    for message in messages:
+        content = message.get("content")
+        if isinstance(content, str):
+            chars += len(content)
+            continue
+        for part in content or []:
+            if part.get("type") == "text":
+                chars += len(part.get("text") or "")
+            elif part.get("type") == "image_url":
+                images += 1
+    return chars // 4 + 1 + images * IMAGE_TOKEN_ESTIMATE
+
+
+@functools.lru_cache(maxsize=256)
+def _limiter_key(model: str) -> Tuple[str, str]:
+    """Split a model name into (provider, model), asking LiteLLM when there is no prefix."""
+    if "/" in model:
+        provider, name = model.split("/", 1)
+        return provider, name
+    try:
+        _, provider, _, _ = litellm.get_llm_provider(model)
+    except Exception:
+        provider = ""
+    return provider, model
+
+
+_limiters: Dict[Tuple[str, str], AdaptiveLimiter] = {}
+_configs: Dict[str, RateLimitConfig] = {}
+_registry_lock = threading.Lock()
+
+
+def _config_for(provider: str, name: str) -> RateLimitConfig:
+    """Model-specific settings win over provider-wide ones."""
+    return _configs.get(f"{provider}/{name}") or _configs.get(provider) or RateLimitConfig()
+
+
+def configure_rate_limit(name: str, config: RateLimitConfig) -> None:
+    """
+    Set quotas for a provider ("openai") or a single model ("openai/gpt-4o").
+
+    Limiters already created for matching models are reconfigured in place.
+
+    Example:
+        >>> configure_rate_limit("openai/gpt-4o-mini",
+        ...                      RateLimitConfig(requests_per_minute=500, tokens_per_minute=200_000))
+    """
+    with _registry_lock:
+        _configs[name] = config
+        for (provider, model), limiter in _limiters.items():
+            if name in (provider, f"{provider}/{model}"):
+                limiter.reconfigure(_config_for(provider, model))
+
+
+def get_rate_limiter(model: str) -> AdaptiveLimiter:
+    """Return the process-wide limiter for a model, creating it on first use."""
+    key = _limiter_key(model)
+    with _registry_lock:
+        limiter = _limiters.get(key)
+        if limiter is None:
+            limiter = _limiters[key] = AdaptiveLimiter("/".join(filter(None, key)), _config_for(*key))
+        return limiter
+
+
+def rate_limit_stats() -> Dict[str, Dict[str, Any]]:
+    """Return stats() for every limiter in the process, keyed by provider/model."""
+    with _registry_lock:
+        limiters = list(_limiters.values())
+    return {limiter.key: limiter.stats() for limiter in limiters}
+
+
+def reset_rate_limiters() -> None:
+    """Forget all limiters and configured quotas."""
+    with _registry_lock:
+        _limiters.clear()
+        _configs.clear()
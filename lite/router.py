@@ -0,0 +1,286 @@
+"""Multi-model failover and hedged requests on top of LiteClient."""
+
+import asyncio
+import bisect
+import logging
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+from pydantic import BaseModel
+
+from .config import ModelConfig, ModelInput
+from .instrumentation import call_labels, caller_module, current_labels
+from .lite_client import LiteClient
+
+logger = logging.getLogger(__name__)
+
+# Hedge delay used until a model has enough latency samples
+DEFAULT_HEDGE_DELAY = 5.0
+DEFAULT_HEDGE_PERCENTILE = 0.95
+# Samples a histogram needs before its percentile drives the hedge delay
+MIN_HEDGE_SAMPLES = 20
+# Histogram buckets grow geometrically from 10 ms to about 15 minutes
+HISTOGRAM_START = 0.01
+HISTOGRAM_FACTOR = 1.25
+HISTOGRAM_BUCKETS = 52
+
+
+class LatencyHistogram:
+    """
+    Thread-safe latency histogram with geometric buckets.
+
+    Percentiles are estimated by linear interpolation inside the bucket, which
+    keeps memory constant while staying within one bucket width (25%) of the
+    true value.
+    """
+
+    def __init__(self):
+        self.bounds: List[float] = [
+            HISTOGRAM_START * HISTOGRAM_FACTOR ** i for i in range(HISTOGRAM_BUCKETS)
+        ]
+        self.counts: List[int] = [0] * (HISTOGRAM_BUCKETS + 1)
+        self.count = 0
+        self.total = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float) -> None:
+        """Record one latency sample."""
+        with self._lock:
+            self.counts[bisect.bisect_left(self.bounds, seconds)] += 1
+            self.count += 1
+            self.total += seconds
+
+    def percentile(self, q: float) -> Optional[float]:
+        """
+        Estimate a latency percentile.
+
+        Args:
+            q: Quantile between 0 and 1, e.g. 0.95.
+
+        Returns:
+            float or None: Estimated latency in seconds, or None without samples.
+        """
+        with self._lock:
+            if self.count == 0:
+                return None
+            rank = q * self.count
+            seen = 0
+            for index, bucket_count in enumerate(self.counts):
+                if bucket_count and seen + bucket_count >= rank:
+                    lower = self.bounds[index - 1] if index > 0 else 0.0
+                    upper = self.bounds[index] if index < len(self.bounds) else self.bounds[-1] * HISTOGRAM_FACTOR
+                    return lower + (upper - lower) * (rank - seen) / bucket_count
+                seen += bucket_count
+            return self.bounds[-1]
+
+
+class ModelRouter:
+    """
+    Route a request over an ordered list of models with hedging and failover.
+
+    The first model is tried first. If it has not answered once its latency
+    passes the configured percentile of its own history, a hedged request is
+    sent to the next model, and the first valid answer wins; the other request
+    is cancelled. A model that fails or returns output that does not match the
+    requested schema hands over to the next one immediately. With a single
+    model, the hedge is a second request to the same model.
+
+    Example:
+        >>> router = ModelRouter(["ollama/gemma3", "gemini/gemini-2.5-flash"])
+        >>> router.generate_text(ModelInput(user_prompt="Define asthma"))
+        >>> router.stats()["ollama/gemma3"]["p95"]
+    """
+
+    def __init__(
+        self,
+        models: Sequence[Union[str, ModelConfig]],
+        client: Optional[LiteClient] = None,
+        hedge_percentile: float = DEFAULT_HEDGE_PERCENTILE,
+        default_hedge_delay: float = DEFAULT_HEDGE_DELAY,
+        min_hedge_delay: float = 0.0,
+        hedge: bool = True,
+    ):
+        """
+        Initialize the router.
+
+        Args:
+            models: Models in order of preference, as names or ModelConfig objects.
+            client: LiteClient used for the calls, sharing its cache, rate
+                limiting and concurrency bound. A new one is created by default.
+            hedge_percentile: Latency percentile of a model after which a hedged
+                request is sent.
+            default_hedge_delay: Hedge delay in seconds until a model has
+                MIN_HEDGE_SAMPLES latency samples.
+            min_hedge_delay: Lower bound for the hedge delay.
+            hedge: If False, only fail over on errors and never hedge.
+        """
+        if not models:
+            raise ValueError("ModelRouter needs at least one model")
+        if not (0.0 < hedge_percentile < 1.0):
+            raise ValueError("hedge_percentile must be between 0 and 1")
+        self.models: List[ModelConfig] = [
+            m if isinstance(m, ModelConfig) else ModelConfig(model=m) for m in models
+        ]
+        self.client = client or LiteClient(self.models[0])
+        self.hedge_percentile = hedge_percentile
+        self.default_hedge_delay = default_hedge_delay
+        self.min_hedge_delay = min_hedge_delay
+        self.hedge = hedge
+        self.histograms: Dict[str, LatencyHistogram] = {
+            config.model: LatencyHistogram() for config in self.models
+        }
+        self._counters: Dict[str, Dict[str, int]] = {
+            config.model: {"requests": 0, "wins": 0, "failures": 0, "hedges": 0, "cancelled": 0}
+            for config in self.models
+        }
+        self._counter_lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_lock = threading.Lock()
+
+    def hedge_delay(self, model: str) -> float:
+        """Seconds to wait for a model before sending a hedged request."""
+        histogram = self.histograms[model]
+        if histogram.count < MIN_HEDGE_SAMPLES:
+            return max(self.min_hedge_delay, self.default_hedge_delay)
+        return max(self.min_hedge_delay, histogram.percentile(self.hedge_percentile))
+
+    def _count(self, model: str, counter: str) -> None:
+        with self._counter_lock:
+            self._counters[model][counter] += 1
+
+    def _plan(self) -> List[ModelConfig]:
+        """Order in which models are tried; a single model hedges against itself."""
+        return self.models if len(self.models) > 1 else self.models * 2
+
+    def _is_valid(self, model_input: ModelInput, result: Any) -> bool:
+        """Whether a result is usable: a parsed model when a schema was requested, else non-empty text."""
+        if LiteClient._wants_model(model_input):
+            return isinstance(result, BaseModel)
+        return isinstance(result, str) and bool(result.strip())
+
+    async def _attempt(self, config: ModelConfig, model_input: ModelInput, coalesce: bool) -> Any:
+        """
+        Call one model once, recording its latency on success.
+
+        Only the first attempt may join an identical request in flight; a hedge
+        of the same model would otherwise just wait on the call it hedges.
+        """
+        self._count(config.model, "requests")
+        start = time.monotonic()
+        result = await self.client._agenerate(model_input, config, retries=0, coalesce=coalesce)
+        if not self._is_valid(model_input, result):
+            raise ValueError(f"{config.model} returned output that does not match the requested format")
+        self.histograms[config.model].observe(time.monotonic() - start)
+        return result
+
+    async def agenerate_text(self, model_input: ModelInput) -> Union[str, BaseModel, Dict[str, Any]]:
+        """
+        Generate a response from the fastest valid model.
+
+        Args:
+            model_input: ModelInput object containing prompt and image parameters.
+
+        Returns:
+            Parsed Pydantic model or text from the winning model, or the error
+            value of the last failure (as LiteClient.generate_text returns it)
+            if every model failed.
+        """
+        return await self._run(model_input, {"caller": caller_module(), **current_labels()})
+
+    async def _run(self, model_input: ModelInput, labels: Dict[str, str]) -> Any:
+        """Route under the caller's instrumentation labels, which hedged tasks cannot see on their stack."""
+        try:
+            with call_labels(**labels):
+                return await self._route(model_input)
+        except Exception as e:
+            return LiteClient._format_error(model_input, e)
+
+    async def _route(self, model_input: ModelInput) -> Any:
+        plan = self._plan()
+        pending: Dict[asyncio.Task, ModelConfig] = {}
+        next_index = 0
+        last_error: Optional[Exception] = None
+
+        def launch() -> None:
+            nonlocal next_index
+            config = plan[next_index]
+            attempt = self._attempt(config, model_input, coalesce=next_index == 0)
+            next_index += 1
+            pending[asyncio.ensure_future(attempt)] = config
+
+        launch()
+        try:
+            while pending:
+                timeout = None
+                if self.hedge and next_index < len(plan):
+                    newest = list(pending.values())[-1]
+                    timeout = self.hedge_delay(newest.model)
+                done, _ = await asyncio.wait(
+                    list(pending), timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    logger.info(f"Hedging {list(pending.values())[-1].model} after {timeout:.2f}s")
+                    self._count(plan[next_index].model, "hedges")
+                    launch()
+                    continue
+                for task in done:
+                    config = pending.pop(task)
+                    if task.exception() is None:
+                        self._count(config.model, "wins")
+                        return task.result()
+                    last_error = task.exception()
+                    self._count(config.model, "failures")
+                    logger.warning(f"{config.model} failed: {last_error}")
+                if not pending and next_index < len(plan):
+                    launch()
+        finally:
+            for task, config in pending.items():
+                task.cancel()
+                self._count(config.model, "cancelled")
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+        raise last_error or RuntimeError("All models failed")
+
+    def _background_loop(self) -> asyncio.AbstractEventLoop:
+        """Event loop running in a daemon thread, serving the synchronous API."""
+        with self._loop_lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name="lite-router", daemon=True).start()
+                self._loop = loop
+            return self._loop
+
+    def generate_text(self, model_input: ModelInput) -> Union[str, BaseModel, Dict[str, Any]]:
+        """
+        Synchronous counterpart of agenerate_text.
+
+        Calls run on a background event loop owned by the router, so losing
+        requests can be cancelled and connections are reused across calls.
+        """
+        labels = {"caller": caller_module(), **current_labels()}
+        future = asyncio.run_coroutine_threadsafe(
+            self._run(model_input, labels), self._background_loop()
+        )
+        return future.result()
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Return per-model counters, latency percentiles and the current hedge delay."""
+        with self._counter_lock:
+            counters = {model: dict(values) for model, values in self._counters.items()}
+        for model, values in counters.items():
+            histogram = self.histograms[model]
+            values.update(
+                p50=histogram.percentile(0.5),
+                p95=histogram.percentile(0.95),
+                p99=histogram.percentile(0.99),
+                hedge_delay=self.hedge_delay(model),
+            )
+        return counters
+
+    def close(self) -> None:
+        """Stop the background event loop used by generate_text."""
+        with self._loop_lock:
+            loop, self._loop = self._loop, None
+        if loop is not None:
+            loop.call_soon_threadsafe(loop.stop)
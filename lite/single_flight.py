@@ -0,0 +1,117 @@
+"""Single-flight deduplication of identical in-flight requests."""
+
+import asyncio
+import logging
+import threading
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Tuple, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class CoalescedCallCancelled(RuntimeError):
+    """Raised to callers that were waiting on a leader whose call was cancelled."""
+
+
+class SingleFlight:
+    """
+    Run one call per key at a time and share its outcome with concurrent callers.
+
+    The first caller for a key (the leader) runs the function; callers arriving
+    with the same key while it is in flight wait for it and receive the same
+    result, or the same exception. Once the call finishes the key is forgotten,
+    so later callers start a fresh call. Sync and async callers, on any thread
+    or event loop, can share one flight.
+
+    Example:
+        >>> flights = SingleFlight()
+        >>> value, shared = flights.do(key, lambda: completion(...))
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flights: Dict[str, Future] = {}
+        self._calls = 0
+        self._coalesced = 0
+
+    def _join(self, key: str) -> Tuple[Future, bool]:
+        """Return the flight for key and whether the caller is its leader."""
+        with self._lock:
+            future = self._flights.get(key)
+            if future is not None:
+                self._coalesced += 1
+                return future, False
+            future = self._flights[key] = Future()
+            self._calls += 1
+            return future, True
+
+    def _land(self, key: str, future: Future, value: Any = None, error: BaseException = None) -> None:
+        """Publish the leader's outcome and forget the key."""
+        with self._lock:
+            self._flights.pop(key, None)
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(value)
+
+    def do(self, key: str, fn: Callable[[], T]) -> Tuple[T, bool]:
+        """
+        Run fn unless an identical call is in flight, then return its result.
+
+        Args:
+            key: Identity of the call.
+            fn: Function performing the call.
+
+        Returns:
+            Tuple of (result, shared) where shared is True if the result came
+            from another caller's call.
+        """
+        future, leader = self._join(key)
+        if not leader:
+            return future.result(), True
+        try:
+            value = fn()
+        except BaseException as e:
+            self._land(key, future, error=_for_followers(e))
+            raise
+        self._land(key, future, value)
+        return value, False
+
+    async def ado(self, key: str, fn: Callable[[], Awaitable[T]]) -> Tuple[T, bool]:
+        """Async counterpart of do(); fn is a coroutine function."""
+        future, leader = self._join(key)
+        if not leader:
+            return await asyncio.wrap_future(future), True
+        try:
+            value = await fn()
+        except BaseException as e:
+            self._land(key, future, error=_for_followers(e))
+            raise
+        self._land(key, future, value)
+        return value, False
+
+    def stats(self) -> Dict[str, int]:
+        """Return upstream calls made, callers served by another call, and flights in progress."""
+        with self._lock:
+            return {
+                "calls": self._calls,
+                "coalesced": self._coalesced,
+                "in_flight": len(self._flights),
+            }
+
+
+def _for_followers(error: BaseException) -> BaseException:
+    """Cancellation belongs to the leader; followers see a regular, retryable error."""
+    if isinstance(error, (asyncio.CancelledError, KeyboardInterrupt, SystemExit, GeneratorExit)):
+        return CoalescedCallCancelled("The coalesced request was cancelled by its leader")
+    return error
+
+
+_default_flights = SingleFlight()
+
+
+def default_flights() -> SingleFlight:
+    """Return the process-wide group shared by every LiteClient that coalesces requests."""
+    return _default_flights
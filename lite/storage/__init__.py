@@ -0,0 +1,4 @@
+from .lmdb_storage import LMDBStorage, LMDBConfig
+from .storage_config import StorageConfig
+from .codecs import GzipCodec, ZstdCodec, LZ4Codec, ZstdDictCodec, get_codec
+from .shared_env import acquire_environment, release_environment, open_environments
@@ -0,0 +1,218 @@
+"""Compression codecs for LMDBStorage values.
+
+Every stored value starts with a one-byte flag naming the codec that produced
+it, so databases written with different codecs (or before codecs were
+pluggable) stay readable:
+
+    0x00  uncompressed
+    0x01  gzip
+    0x02  zstd
+    0x03  lz4
+    0x04  zstd with a trained dictionary
+
+zstd and lz4 are optional dependencies, imported the first time they are used
+(pip install zstandard lz4).
+"""
+
+import gzip
+import importlib
+import threading
+from typing import Dict, Optional
+
+FLAG_UNCOMPRESSED = b'\x00'
+FLAG_GZIP = b'\x01'
+FLAG_ZSTD = b'\x02'
+FLAG_LZ4 = b'\x03'
+FLAG_ZSTD_DICT = b'\x04'
+
+
+def _require(module_name: str, package: str):
+    """Import an optional compression module, with an install hint on failure."""
+    try:
+        return importlib.import_module(module_name)
+    except ImportError as e:
+        raise ImportError(
+            f"The '{package}' package is required for this codec. Install it with: pip install {package}"
+        ) from e
+
+
+class GzipCodec:
+    """gzip compression. Always available and the default for compatibility."""
+
+    name = "gzip"
+    flag = FLAG_GZIP
+
+    def __init__(self, level: Optional[int] = None):
+        self.level = 9 if level is None else level
+
+    def compress(self, data: bytes) -> bytes:
+        return gzip.compress(data, compresslevel=self.level)
+
+    def decompress(self, data: bytes) -> bytes:
+        return gzip.decompress(data)
+
+
+class ZstdCodec:
+    """Zstandard compression, much faster than gzip at a similar ratio."""
+
+    name = "zstd"
+    flag = FLAG_ZSTD
+
+    def __init__(self, level: Optional[int] = None):
+        self._zstd = _require("zstandard", "zstandard")
+        self.level = 3 if level is None else level
+        # zstandard (de)compressor objects must not be shared across threads
+        self._local = threading.local()
+
+    def _compressor(self):
+        compressor = getattr(self._local, "compressor", None)
+        if compressor is None:
+            compressor = self._local.compressor = self._zstd.ZstdCompressor(level=self.level)
+        return compressor
+
+    def _decompressor(self):
+        decompressor = getattr(self._local, "decompressor", None)
+        if decompressor is None:
+            decompressor = self._local.decompressor = self._zstd.ZstdDecompressor()
+        return decompressor
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor().compress(data)
+
+    def decompress(self, data: bytes) -> bytes:
+        return self._decompressor().decompress(data)
+
+
+class LZ4Codec:
+    """LZ4 frame compression, the fastest option with a lower ratio."""
+
+    name = "lz4"
+    flag = FLAG_LZ4
+
+    def __init__(self, level: Optional[int] = None):
+        self._frame = _require("lz4.frame", "lz4")
+        self.level = 0 if level is None else level
+
+    def compress(self, data: bytes) -> bytes:
+        return self._frame.compress(data, compression_level=self.level)
+
+    def decompress(self, data: bytes) -> bytes:
+        return self._frame.decompress(data)
+
+
+class ZstdDictCodec:
+    """
+    Zstandard compression with a trained dictionary.
+
+    Short, similar values (such as JSON completions sharing a schema) compress
+    poorly on their own because each one has to rebuild the same vocabulary.
+    A dictionary trained on a sample of stored values supplies that vocabulary
+    up front. Frames record the dictionary id, so values written with an older
+    dictionary decode as long as that dictionary is still registered.
+
+    Example:
+        >>> codec = ZstdDictCodec(ZstdDictCodec.train(samples))
+        >>> codec.decompress(codec.compress(b'{"name": "asthma"}'))
+        b'{"name": "asthma"}'
+    """
+
+    name = "zstd-dict"
+    flag = FLAG_ZSTD_DICT
+
+    def __init__(self, dictionary: Optional[bytes] = None, level: Optional[int] = None):
+        """
+        Initialize the codec.
+
+        Args:
+            dictionary: Raw dictionary used for compression. Without one the
+                codec can only decompress.
+            level: zstd compression level. Defaults to 3.
+        """
+        self._zstd = _require("zstandard", "zstandard")
+        self.level = 3 if level is None else level
+        self._dicts: Dict[int, object] = {}
+        self._active = None
+        self._local = threading.local()
+        if dictionary is not None:
+            self._active = self.add_dictionary(dictionary)
+
+    @staticmethod
+    def train(samples, dict_size: int = 112640) -> bytes:
+        """
+        Train a dictionary from sample values.
+
+        Args:
+            samples: List of byte strings representative of stored values.
+            dict_size: Maximum dictionary size in bytes.
+
+        Returns:
+            bytes: Raw dictionary data.
+        """
+        zstd = _require("zstandard", "zstandard")
+        return zstd.train_dictionary(dict_size, list(samples)).as_bytes()
+
+    @property
+    def dict_id(self) -> Optional[int]:
+        """Id of the dictionary used for compression, or None if there is none."""
+        return self._active.dict_id() if self._active is not None else None
+
+    def add_dictionary(self, dictionary: bytes):
+        """Register a dictionary for decompression and return it."""
+        zdict = self._zstd.ZstdCompressionDict(dictionary)
+        self._dicts[zdict.dict_id()] = zdict
+        return zdict
+
+    def activate(self, dict_id: int) -> None:
+        """Compress with a registered dictionary from now on."""
+        if dict_id not in self._dicts:
+            raise ValueError(f"Compression dictionary {dict_id} is not available")
+        self._active = self._dicts[dict_id]
+        self._local = threading.local()
+
+    def compress(self, data: bytes) -> bytes:
+        if self._active is None:
+            raise ValueError("No compression dictionary has been trained or loaded")
+        compressor = getattr(self._local, "compressor", None)
+        if compressor is None:
+            compressor = self._local.compressor = self._zstd.ZstdCompressor(
+                level=self.level, dict_data=self._active
+            )
+        return compressor.compress(data)
+
+    def decompress(self, data: bytes) -> bytes:
+        dict_id = self._zstd.get_frame_parameters(data).dict_id
+        zdict = self._dicts.get(dict_id)
+        if zdict is None:
+            raise ValueError(f"Compression dictionary {dict_id} is not available")
+        decompressors = getattr(self._local, "decompressors", None)
+        if decompressors is None:
+            decompressors = self._local.decompressors = {}
+        decompressor = decompressors.get(dict_id)
+        if decompressor is None:
+            decompressor = decompressors[dict_id] = self._zstd.ZstdDecompressor(dict_data=zdict)
+        return decompressor.decompress(data)
+
+
+CODECS = {
+    codec.name: codec for codec in (GzipCodec, ZstdCodec, LZ4Codec, ZstdDictCodec)
+}
+
+
+def get_codec(name: str, level: Optional[int] = None):
+    """
+    Create a codec by name.
+
+    Args:
+        name: One of "gzip", "zstd", "lz4" or "zstd-dict".
+        level: Optional compression level for the codec.
+
+    Returns:
+        A codec instance with compress() and decompress() methods.
+
+    Raises:
+        ValueError: If the name is unknown.
+        ImportError: If the codec's optional dependency is not installed.
+    """
+    if name not in CODECS:
+        raise ValueError(f"Unknown codec '{name}'. Available: {', '.join(CODECS)}")
+    return CODECS[name](level=level)
@@ -2,11 +2,45 @@ import gzip
 import json
 import logging
 import os
-from dataclasses import dataclass
-from typing import Optional
+import random
+import shutil
+import struct
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass, replace
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
 
 import lmdb
 
+from .codecs import (
+    CODECS,
+    FLAG_GZIP,
+    FLAG_LZ4,
+    FLAG_UNCOMPRESSED,
+    FLAG_ZSTD,
+    FLAG_ZSTD_DICT,
+    ZstdDictCodec,
+    get_codec,
+)
+from .shared_env import acquire_environment, release_environment
+
+# Trained zstd dictionaries live next to the data file
+DICTIONARY_FILE_TEMPLATE = "zstd_dict_{}.bin"
+ACTIVE_DICTIONARY_FILE = "zstd_dict.active"
+
+# Binary snapshot layout: magic, dictionary count, then length-prefixed
+# dictionaries, then (key length, value length, key, stored value) records
+SNAPSHOT_MAGIC = b"LMDBSNAP1\n"
+SNAPSHOT_LENGTHS = struct.Struct(">II")
+
+# Sub-database listing every namespace created in the file, by any process
+NAMESPACE_REGISTRY = "__namespaces__"
+
+# Reference counts of the per-database loggers, so the shared log file is closed
+# only when the last instance using it goes away
+_logger_refs: Dict[str, int] = {}
+_logger_lock = threading.Lock()
+
 
 @dataclass
 class LMDBConfig:
@@ -15,11 +49,38 @@ class LMDBConfig:
 
     Attributes:
         db_path (str): Path to the LMDB database file. Defaults to "storage.lmdb".
-        capacity_mb (int): Maximum database capacity in megabytes. Defaults to 100 MB.
+        capacity_mb (int): Initial database capacity (LMDB map size) in megabytes.
+            Defaults to 100 MB.
         enable_logging (bool): Whether to enable logging for this instance. Defaults to True.
         compression_threshold (int): Size in bytes above which values will be compressed.
             Defaults to 100 bytes.
         max_key_size (int): Maximum allowed key size in bytes. Defaults to 511 (LMDB default).
+        write_batch_size (int): Number of entries committed per write transaction by
+            put_many() and delete_many(). Defaults to 10000.
+        codec (str): Compression codec for values above the threshold: "gzip", "zstd",
+            "lz4" or "zstd-dict". Defaults to "gzip". Values written with any codec stay
+            readable regardless of this setting.
+        compression_level (int, optional): Codec-specific compression level.
+        namespace (str, optional): Name of a sub-database holding this instance's keys.
+            Different namespaces in one database file are independent keyspaces.
+            Defaults to None, the unnamed main database.
+        max_dbs (int): Maximum number of namespaces in the database file. Defaults to 16.
+        max_readers (int): Maximum number of concurrent read transactions across all
+            processes. Defaults to 126 (LMDB default).
+        readahead (bool): Whether the OS should read ahead on the memory map. Disable it
+            for random access to databases larger than RAM. Defaults to True.
+        writemap (bool): Write through a writable memory map. Faster writes, but a stray
+            pointer in the process can corrupt the database. Defaults to False.
+        coalesce_writes (bool): Route put() through a background writer thread that
+            commits the puts of concurrent threads in one transaction. Defaults to False.
+        auto_grow (bool): Double the map size and retry when a write fails because the
+            map is full. Defaults to True.
+        max_capacity_mb (int, optional): Upper bound for automatic growth in megabytes.
+            Defaults to None (unbounded).
+
+    The environment options (capacity_mb, max_dbs, max_readers, readahead, writemap,
+    auto_grow, max_capacity_mb) apply when a database is first opened in the process; later instances on the same
+    path share that environment.
 
     Example:
         >>> config = LMDBConfig(
@@ -34,6 +95,17 @@ class LMDBConfig:
     enable_logging: bool = True
     compression_threshold: int = 100
     max_key_size: int = 511
+    write_batch_size: int = 10000
+    codec: str = "gzip"
+    compression_level: Optional[int] = None
+    namespace: Optional[str] = None
+    max_dbs: int = 16
+    max_readers: int = 126
+    readahead: bool = True
+    writemap: bool = False
+    coalesce_writes: bool = False
+    auto_grow: bool = True
+    max_capacity_mb: Optional[int] = None
 
     def __post_init__(self):
         """Validate configuration parameters after initialization."""
@@ -43,6 +115,20 @@ class LMDBConfig:
             raise ValueError("compression_threshold must be non-negative")
         if self.max_key_size <= 0:
             raise ValueError("max_key_size must be greater than 0")
+        if self.write_batch_size <= 0:
+            raise ValueError("write_batch_size must be greater than 0")
+        if self.codec not in CODECS:
+            raise ValueError(f"codec must be one of: {', '.join(CODECS)}")
+        if self.max_dbs < 0:
+            raise ValueError("max_dbs must be non-negative")
+        if self.max_readers <= 0:
+            raise ValueError("max_readers must be greater than 0")
+        if self.max_capacity_mb is not None and self.max_capacity_mb < self.capacity_mb:
+            raise ValueError("max_capacity_mb must be at least capacity_mb")
+        if self.namespace is not None and not self.namespace.strip():
+            raise ValueError("namespace must be a non-empty string")
+        if self.namespace == NAMESPACE_REGISTRY:
+            raise ValueError(f"namespace '{NAMESPACE_REGISTRY}' is reserved")
         if not self.db_path or self.db_path.strip() == "":
             raise ValueError("db_path must be a non-empty string")
 
@@ -55,11 +141,18 @@ class LMDBStorage:
     built-in logging for monitoring operations.
 
     Features:
-        - Automatic compression for values exceeding a configurable threshold
-        - Built-in logging with per-instance log files
+        - Automatic compression for values exceeding a configurable threshold, with
+          pluggable gzip, zstd, lz4 and dictionary-trained zstd codecs
+        - Built-in logging with one shared log file per database
+        - One shared environment per database path in each process, so any number of
+          instances (and threads) can open the same database
+        - Optional write coalescing: concurrent puts are group-committed by a writer thread
         - Context manager support for automatic cleanup
-        - JSON import/export capabilities
+        - JSON import/export, streaming JSONL import/export and binary snapshots
         - Memory-efficient key iteration with generator support
+        - Prefix and range scans that only touch the matching keys
+        - Named namespaces (LMDB sub-databases) sharing one database file
+        - Bulk put_many/get_many/delete_many with batched commits
 
     Example:
         Basic usage with context manager:
@@ -98,14 +191,15 @@ class LMDBStorage:
         env (lmdb.Environment): LMDB environment handle
     """
     # Compression flag constants
-    COMPRESSION_FLAG_COMPRESSED = b'\x01'
-    COMPRESSION_FLAG_UNCOMPRESSED = b'\x00'
+    COMPRESSION_FLAG_COMPRESSED = FLAG_GZIP
+    COMPRESSION_FLAG_UNCOMPRESSED = FLAG_UNCOMPRESSED
 
     # LMDB has a default max key size of 511 bytes
     DEFAULT_MAX_KEY_SIZE = 511
 
     def __init__(self, db_path=None, capacity_mb=None, enable_logging=None,
-                 compression_threshold=None, config: Optional[LMDBConfig] = None):
+                 compression_threshold=None, config: Optional[LMDBConfig] = None,
+                 namespace: Optional[str] = None):
         """
         Initializes the LMDB storage manager.
 
@@ -117,6 +211,7 @@ class LMDBStorage:
                 Defaults to 100 bytes.
             config (LMDBConfig, optional): Configuration dataclass. If provided, individual parameters
                 are ignored. Defaults to None.
+            namespace (str, optional): Sub-database to use. Overrides config.namespace when given.
 
         Raises:
             Exception: If the LMDB database cannot be opened (e.g., permission denied, disk full).
@@ -139,22 +234,35 @@ class LMDBStorage:
                 enable_logging=enable_logging if enable_logging is not None else True,
                 compression_threshold=compression_threshold if compression_threshold is not None else 100
             )
+        if namespace is not None:
+            self.config = replace(self.config, namespace=namespace)
 
         # Set instance attributes from config
         self.db_path = self.config.db_path
         self.compression_threshold = self.config.compression_threshold
         self.capacity_mb = self.config.capacity_mb
         self.max_key_size = self.config.max_key_size
+        self.write_batch_size = self.config.write_batch_size
 
+        self.namespace = self.config.namespace
+
+        self._shared = None
+        self._writer = None
         self.logger = self._setup_logger(self.config.enable_logging)
         self.env = self._open_database(self.config.capacity_mb)
+        self.db = self._open_namespace(self.namespace)
+        if self.config.coalesce_writes:
+            self._writer = self._shared.get_writer()
+        self._decoders = {}
+        self.codec = self._create_codec()
 
     def _setup_logger(self, enable_logging):
         """
         Internal method to set up logging for this instance.
 
-        Creates a unique logger for this storage instance with a file handler.
-        The log file is named after the database file with underscores replacing dots.
+        All instances on the same database share one logger and file handler, so
+        opening many instances does not open many log files. The log file is named
+        after the database file with underscores replacing dots.
 
         Args:
             enable_logging (bool): Whether to create a logger.
@@ -165,14 +273,18 @@ class LMDBStorage:
         if not enable_logging:
             return None
 
-        # Use a unique logger name for each instance
-        logger_name = f"{__name__}.{self.__class__.__name__}.{id(self)}"
+        # One logger per log file, shared by every instance writing to it
+        log_name = os.path.basename(self.db_path).replace('.', '_')
+        logger_name = f"{__name__}.{self.__class__.__name__}.{log_name}"
         logger = logging.getLogger(logger_name)
         logger.setLevel(logging.INFO)
 
-        # Ensure no duplicate handlers are added
-        if not logger.handlers:
-            file_handler = logging.FileHandler(f"{os.path.basename(self.db_path).replace('.', '_')}.log")
+        with _logger_lock:
+            _logger_refs[logger_name] = _logger_refs.get(logger_name, 0) + 1
+            if logger.handlers:
+                return logger
+
+            file_handler = logging.FileHandler(f"{log_name}.log")
             file_handler.setFormatter(logging.Formatter(
                 '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
                 datefmt='%Y-%m-%d %H:%M:%S'
@@ -188,6 +300,9 @@ class LMDBStorage:
         """
         Internal method to open LMDB database connection.
 
+        The environment comes from the process-wide registry, so instances on the
+        same path share a single environment.
+
         Args:
             capacity_mb (int): Capacity in MB for the database size.
 
@@ -200,7 +315,19 @@ class LMDBStorage:
         # LMDB map_size needs to be in bytes (1 MB = 1024 * 1024 bytes)
         map_size = 1024 * 1024 * capacity_mb
         try:
-            env = lmdb.open(self.db_path, map_size=map_size)
+            max_map_size = self.config.max_capacity_mb
+            self._shared = acquire_environment(
+                self.db_path,
+                auto_grow=self.config.auto_grow,
+                max_map_size=1024 * 1024 * max_map_size if max_map_size is not None else None,
+                map_size=map_size,
+                # One more sub-database for the namespace registry
+                max_dbs=self.config.max_dbs + 1 if self.config.max_dbs else 0,
+                max_readers=self.config.max_readers,
+                readahead=self.config.readahead,
+                writemap=self.config.writemap,
+            )
+            env = self._shared.env
             if self.logger:
                 self.logger.info(f"LMDB database opened successfully: {self.db_path} (capacity: {capacity_mb}MB)")
             return env
@@ -209,6 +336,326 @@ class LMDBStorage:
                 self.logger.error(f"Failed to open LMDB database {self.db_path}: {e}")
             raise
 
+    @contextmanager
+    def _begin(self, **kwargs) -> Iterator[lmdb.Transaction]:
+        """
+        Internal helper opening a transaction that holds off map resizes until it ends.
+
+        If another process has grown the map, LMDB refuses new transactions with
+        MapResizedError until the new size is adopted; the size is adopted and the
+        transaction opened once more. Inside another transaction of this thread the
+        error is raised instead, for the enclosing write() to handle.
+        Args:
+            **kwargs: Keyword arguments for env.begin().
+        Yields:
+            lmdb.Transaction: The open transaction.
+        """
+        nested = self._shared.transactions.held()
+        retried = False
+        while True:
+            with self._shared.transactions.shared():
+                try:
+                    txn = self.env.begin(**kwargs)
+                except lmdb.MapResizedError:
+                    if retried or nested:
+                        raise
+                    txn = None
+                if txn is not None:
+                    with txn:
+                        yield txn
+                    return
+            if not self._shared.adopt_map_size():
+                raise lmdb.MapResizedError("could not adopt the new map size")
+            retried = True
+
+    def _open_namespace(self, namespace: Optional[str]):
+        """
+        Internal method to open (creating if needed) the sub-database for a namespace.
+
+        Args:
+            namespace (str or None): Namespace name, or None for the main database.
+
+        Returns:
+            lmdb._Database or None: Handle passed to env.begin(db=...), None for the main database.
+        """
+        if namespace is None:
+            return None
+        if namespace == NAMESPACE_REGISTRY:
+            raise ValueError(f"namespace '{NAMESPACE_REGISTRY}' is reserved")
+        name = namespace.encode('utf-8')
+
+        def create():
+            with self._begin(write=True) as txn:
+                db = self.env.open_db(name, txn=txn)
+                registry = self.env.open_db(NAMESPACE_REGISTRY.encode('utf-8'), txn=txn)
+                txn.put(name, b"", db=registry, overwrite=False)
+            return db
+
+        try:
+            return self._shared.write(create)
+        except Exception as e:
+            if self.logger:
+                self.logger.error(f"Failed to open namespace '{namespace}': {e}")
+            raise
+
+    def namespace_view(self, namespace: str) -> "LMDBStorage":
+        """
+        Returns a storage bound to another namespace of the same database file.
+
+        The view shares this instance's environment, logger and codecs, so any number
+        of keyspaces can be used without opening the file again. Each view must be
+        closed like any other instance; the environment stays open until all are.
+
+        Args:
+            namespace (str): Name of the sub-database.
+
+        Returns:
+            LMDBStorage: Storage whose operations are confined to the namespace.
+
+        Example:
+            >>> storage = LMDBStorage("medkit.lmdb")
+            >>> diseases = storage.namespace_view("disease_info")
+            >>> drugs = storage.namespace_view("drug_drug")
+            >>> diseases.put("asthma", "...")
+            >>> drugs.get("asthma")  # None, separate keyspace
+        """
+        view = object.__new__(self.__class__)
+        view.__dict__.update(self.__dict__)
+        view.namespace = namespace
+        view._shared = acquire_environment(self.db_path)
+        if self.logger:
+            with _logger_lock:
+                _logger_refs[self.logger.name] += 1
+        view.db = view._open_namespace(namespace)
+        return view
+
+    def scan_prefix(self, prefix: str, keys_only: bool = False,
+                    limit: Optional[int] = None) -> Iterator:
+        """
+        Iterates over entries whose key starts with prefix, in key order.
+
+        The cursor seeks straight to the first matching key with set_range and stops
+        at the first key past the prefix, so the cost depends on the number of
+        matches, not the size of the database.
+
+        Args:
+            prefix (str): Key prefix, e.g. "completion:" or "ac".
+            keys_only (bool): Yield keys only, without reading or decoding values.
+            limit (int, optional): Maximum number of entries to yield.
+
+        Yields:
+            tuple or str: (key, value) pairs, or keys when keys_only is True.
+
+        Example:
+            >>> for name, info in storage.scan_prefix("ac", limit=10):
+            ...     print(name)
+        """
+        prefix_bytes = prefix.encode('utf-8')
+        for key_bytes, stored_value in self._scan(prefix_bytes, keys_only, limit,
+                                                   lambda k: k.startswith(prefix_bytes)):
+            yield self._scan_item(key_bytes, stored_value, keys_only)
+
+    def scan_range(self, start: Optional[str] = None, end: Optional[str] = None,
+                   keys_only: bool = False, limit: Optional[int] = None) -> Iterator:
+        """
+        Iterates over entries with start <= key < end, in key order.
+
+        Args:
+            start (str, optional): Inclusive lower bound. Defaults to the first key.
+            end (str, optional): Exclusive upper bound. Defaults to the last key.
+            keys_only (bool): Yield keys only, without reading or decoding values.
+            limit (int, optional): Maximum number of entries to yield.
+
+        Yields:
+            tuple or str: (key, value) pairs, or keys when keys_only is True.
+        """
+        end_bytes = end.encode('utf-8') if end is not None else None
+        start_bytes = start.encode('utf-8') if start is not None else None
+        in_range = (lambda k: k < end_bytes) if end_bytes is not None else (lambda k: True)
+        for key_bytes, stored_value in self._scan(start_bytes, keys_only, limit, in_range):
+            yield self._scan_item(key_bytes, stored_value, keys_only)
+
+    def _scan(self, start: Optional[bytes], keys_only: bool, limit: Optional[int],
+              in_range) -> Iterator[Tuple[bytes, Optional[bytes]]]:
+        """
+        Internal generator walking the cursor from start while in_range(key) holds.
+
+        Values are only copied out of the memory map for the entries actually yielded,
+        and never when keys_only is True. The read transaction stays open until the
+        generator is exhausted or closed.
+        """
+        if limit is not None and limit <= 0:
+            return
+        count = 0
+        try:
+            with self._begin(db=self.db, buffers=True) as txn:
+                cursor = txn.cursor()
+                positioned = cursor.set_range(start) if start is not None else cursor.first()
+                if not positioned:
+                    return
+                while True:
+                    key_bytes = bytes(cursor.key())
+                    if not in_range(key_bytes):
+                        break
+                    yield key_bytes, None if keys_only else bytes(cursor.value())
+                    count += 1
+                    if (limit is not None and count >= limit) or not cursor.next():
+                        break
+        except Exception as e:
+            if self.logger:
+                self.logger.error(f"Failed to scan database: {e}")
+
+    def _scan_item(self, key_bytes: bytes, stored_value: Optional[bytes], keys_only: bool):
+        """Internal helper turning a raw scan entry into a key or (key, value) pair."""
+        key = key_bytes.decode('utf-8')
+        if keys_only:
+            return key
+        return key, self._decode_value(stored_value)
+
+    def _create_codec(self):
+        """
+        Internal method to create the configured compression codec.
+
+        For "zstd-dict", previously trained dictionaries are loaded from the database
+        directory. Until a dictionary has been trained, plain zstd is used instead.
+
+        Returns:
+            Codec instance used by _encode_value().
+        """
+        if self.config.codec == "zstd-dict":
+            dict_codec = self._dictionary_codec()
+            if dict_codec.dict_id is not None:
+                return dict_codec
+            return self._decoder_for(FLAG_ZSTD)
+
+        codec = get_codec(self.config.codec, self.config.compression_level)
+        self._decoders[codec.flag] = codec
+        return codec
+
+    def _dictionary_codec(self) -> ZstdDictCodec:
+        """
+        Internal method to load trained dictionaries from the database directory.
+
+        Returns:
+            ZstdDictCodec: Codec that can decode every stored dictionary and compresses
+            with the active one, if any.
+        """
+        codec = self._decoders.get(FLAG_ZSTD_DICT)
+        if codec is not None:
+            return codec
+
+        codec = ZstdDictCodec(level=self.config.compression_level)
+        active_id = None
+        active_path = os.path.join(self.db_path, ACTIVE_DICTIONARY_FILE)
+        if os.path.exists(active_path):
+            with open(active_path, 'r', encoding='utf-8') as f:
+                active_id = int(f.read().strip())
+
+        for dictionary in self._stored_dictionaries():
+            codec.add_dictionary(dictionary)
+        if active_id is not None:
+            codec.activate(active_id)
+
+        self._decoders[FLAG_ZSTD_DICT] = codec
+        return codec
+
+    def _decoder_for(self, flag: bytes):
+        """
+        Internal method returning the codec for a flag byte, creating it on first use.
+        """
+        codec = self._decoders.get(flag)
+        if codec is None:
+            if flag == FLAG_ZSTD_DICT:
+                return self._dictionary_codec()
+            names = {FLAG_GZIP: "gzip", FLAG_ZSTD: "zstd", FLAG_LZ4: "lz4"}
+            codec = self._decoders[flag] = get_codec(names[flag], self.config.compression_level)
+        return codec
+
+    def train_compression_dictionary(self, sample_size: int = 1000,
+                                     dict_size: int = 112640) -> Optional[int]:
+        """
+        Trains a zstd dictionary from a random sample of stored values and starts
+        compressing new values with it.
+
+        The dictionary is saved in the database directory, so it is picked up again
+        when the storage is reopened with codec="zstd-dict". Existing values keep
+        their codec and remain readable; only values written afterwards use the
+        dictionary.
+
+        Args:
+            sample_size (int): Number of values sampled for training. Defaults to 1000.
+            dict_size (int): Maximum dictionary size in bytes. Defaults to 112640.
+
+        Returns:
+            int or None: Id of the new dictionary, or None if training failed
+            (for example, because the database holds too little data).
+
+        Example:
+            >>> storage = LMDBStorage(config=LMDBConfig(db_path="cache.lmdb", codec="zstd-dict"))
+            >>> storage.import_from_json("completions.json")
+            >>> storage.train_compression_dictionary()
+        """
+        samples = []
+        seen = 0
+        try:
+            with self._begin(db=self.db) as txn:
+                for _, stored_value in txn.cursor().iternext():
+                    value = self._decode_value(stored_value)
+                    if not value:
+                        continue
+                    seen += 1
+                    # Reservoir sampling keeps memory bounded on large databases
+                    if len(samples) < sample_size:
+                        samples.append(value.encode('utf-8'))
+                    else:
+                        index = random.randrange(seen)
+                        if index < sample_size:
+                            samples[index] = value.encode('utf-8')
+
+            dictionary = ZstdDictCodec.train(samples, dict_size=dict_size)
+        except Exception as e:
+            if self.logger:
+                self.logger.error(f"Failed to train compression dictionary: {e}")
+            return None
+
+        dict_id = self._save_dictionary(dictionary, activate=True)
+        if self.logger:
+            self.logger.info(f"Trained compression dictionary {dict_id} from {len(samples)} samples")
+        return dict_id
+
+    def _save_dictionary(self, dictionary: bytes, activate: bool = False) -> int:
+        """
+        Internal helper to register a zstd dictionary and persist it in the database directory.
+        Args:
+            dictionary (bytes): Raw dictionary data.
+            activate (bool): Whether new values should be compressed with it.
+        Returns:
+            int: The dictionary id.
+        """
+        codec = self._dictionary_codec()
+        dict_id = codec.add_dictionary(dictionary).dict_id()
+        with open(os.path.join(self.db_path, DICTIONARY_FILE_TEMPLATE.format(dict_id)), 'wb') as f:
+            f.write(dictionary)
+        if activate:
+            codec.activate(dict_id)
+            with open(os.path.join(self.db_path, ACTIVE_DICTIONARY_FILE), 'w', encoding='utf-8') as f:
+                f.write(str(dict_id))
+            self.codec = codec
+        return dict_id
+
+    def _stored_dictionaries(self) -> List[bytes]:
+        """
+        Internal helper returning the raw data of every dictionary file in the database directory.
+        """
+        dictionaries = []
+        if os.path.isdir(self.db_path):
+            prefix, suffix = DICTIONARY_FILE_TEMPLATE.split("{}")
+            for name in sorted(os.listdir(self.db_path)):
+                if name.startswith(prefix) and name.endswith(suffix):
+                    with open(os.path.join(self.db_path, name), 'rb') as f:
+                        dictionaries.append(f.read())
+        return dictionaries
+
     def put(self, key: str, value: str) -> bool:
         """
         Stores a key-value pair in the LMDB database with optional compression.
@@ -240,16 +687,151 @@ class LMDBStorage:
             final_value = self._encode_value(value)
 
             # Store in database
-            with self.env.begin(write=True) as txn:
-                txn.put(key_bytes, final_value)
-                if self.logger:
-                    self.logger.info(f"Successfully stored key '{key}' ({len(final_value)} bytes)")
-                return True
+            if self._writer is not None:
+                # Wait for the group commit so the write is visible on return
+                self._writer.submit(self.db, key_bytes, final_value).result()
+            else:
+                def write():
+                    with self._begin(db=self.db, write=True) as txn:
+                        txn.put(key_bytes, final_value)
+                self._shared.write(write)
+            if self.logger:
+                self.logger.debug(f"Successfully stored key '{key}' ({len(final_value)} bytes)")
+            return True
         except Exception as e:
             if self.logger:
                 self.logger.error(f"Failed to store key '{key}': {e}")
             return False
 
+    def put_many(self, items: Union[Dict[str, str], Iterable[Tuple[str, str]]],
+                 batch_size: Optional[int] = None) -> int:
+        """
+        Stores many key-value pairs using one write transaction per batch.
+
+        Entries are validated and encoded like put(), then written with the
+        cursor-level putmulti. A transaction is committed every batch_size entries,
+        so a large load does not hold a single huge transaction open. Invalid
+        entries are skipped.
+
+        Args:
+            items (dict or iterable): Mapping or iterable of (key, value) pairs.
+            batch_size (int, optional): Entries per commit. Defaults to write_batch_size.
+
+        Returns:
+            int: Number of entries stored.
+
+        Example:
+            >>> storage = LMDBStorage()
+            >>> storage.put_many({"user:1": "Alice", "user:2": "Bob"})
+            2
+        """
+        if isinstance(items, dict):
+            items = items.items()
+        batch_size = batch_size or self.write_batch_size
+
+        stored = 0
+        batch: List[Tuple[bytes, bytes]] = []
+        try:
+            for key, value in items:
+                if not self._validate_key_value(key, value):
+                    continue
+                batch.append((key.encode('utf-8'), self._encode_value(value)))
+                if len(batch) >= batch_size:
+                    stored += self._write_batch(batch)
+                    batch = []
+            if batch:
+                stored += self._write_batch(batch)
+        except Exception as e:
+            if self.logger:
+                self.logger.error(f"Failed to store batch after {stored} entries: {e}")
+
+        if self.logger:
+            self.logger.info(f"Stored {stored} entries in bulk")
+        return stored
+
+    def _write_batch(self, batch: List[Tuple[bytes, bytes]]) -> int:
+        """
+        Internal helper to write encoded pairs in a single transaction.
+        Args:
+            batch (list): Encoded (key, value) pairs.
+        Returns:
+            int: Number of pairs written.
+        """
+        def write():
+            with self._begin(db=self.db, write=True) as txn:
+                consumed, _ = txn.cursor().putmulti(batch)
+            return consumed
+        return self._shared.write(write)
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Optional[str]]:
+        """
+        Retrieves many values within a single read transaction.
+
+        Args:
+            keys (iterable): Keys to look up.
+
+        Returns:
+            dict: Mapping of each requested key to its value, or None if missing.
+
+        Example:
+            >>> storage.get_many(["user:1", "user:3"])
+            {'user:1': 'Alice', 'user:3': None}
+        """
+        results: Dict[str, Optional[str]] = {}
+        try:
+            with self._begin(db=self.db) as txn:
+                for key in keys:
+                    stored_value = txn.get(key.encode('utf-8')) if key else None
+                    results[key] = self._decode_value(stored_value) if stored_value else None
+        except Exception as e:
+            if self.logger:
+                self.logger.error(f"Failed to retrieve keys in bulk: {e}")
+        return results
+
+    def delete_many(self, keys: Iterable[str], batch_size: Optional[int] = None) -> int:
+        """
+        Deletes many keys using one write transaction per batch.
+
+        Args:
+            keys (iterable): Keys to delete.
+            batch_size (int, optional): Deletions per commit. Defaults to write_batch_size.
+
+        Returns:
+            int: Number of keys that existed and were deleted.
+        """
+        batch_size = batch_size or self.write_batch_size
+        deleted = 0
+        batch: List[bytes] = []
+        try:
+            for key in keys:
+                if key:
+                    batch.append(key.encode('utf-8'))
+                if len(batch) >= batch_size:
+                    deleted += self._delete_batch(batch)
+                    batch = []
+            if batch:
+                deleted += self._delete_batch(batch)
+        except Exception as e:
+            if self.logger:
+                self.logger.error(f"Failed to delete batch after {deleted} entries: {e}")
+
+        if self.logger:
+            self.logger.info(f"Deleted {deleted} entries in bulk")
+        return deleted
+
+    def _delete_batch(self, batch: List[bytes]) -> int:
+        """
+        Internal helper to delete encoded keys in a single transaction.
+        Args:
+            batch (list): Encoded keys.
+        Returns:
+            int: Number of keys deleted.
+        """
+        def write():
+            with self._begin(db=self.db, write=True) as txn:
+                return sum(1 for key_bytes in batch if txn.delete(key_bytes))
+        return self._shared.write(write)
+
     def _validate_key_value(self, key: str, value: str) -> bool:
         """
         Internal helper to validate key and value before storage.
@@ -290,11 +872,11 @@ class LMDBStorage:
         # Check if value is larger than the compression threshold
         if len(value_bytes) > self.compression_threshold:
             # Compress the value
-            compressed_value = gzip.compress(value_bytes)
+            compressed_value = self.codec.compress(value_bytes)
             if self.logger:
                 compression_ratio = len(value_bytes) / len(compressed_value) if len(compressed_value) > 0 else 0
-                self.logger.debug(f"Compressed value (ratio: {compression_ratio:.2f})")
-            return self.COMPRESSION_FLAG_COMPRESSED + compressed_value
+                self.logger.debug(f"Compressed value with {self.codec.name} (ratio: {compression_ratio:.2f})")
+            return self.codec.flag + compressed_value
         else:
             # No compression needed
             if self.logger:
@@ -314,12 +896,12 @@ class LMDBStorage:
 
         compression_flag = stored_value[0:1]
 
-        if compression_flag == self.COMPRESSION_FLAG_COMPRESSED:
-            # Compressed data
-            return gzip.decompress(stored_value[1:]).decode('utf-8')
-        elif compression_flag == self.COMPRESSION_FLAG_UNCOMPRESSED:
+        if compression_flag == self.COMPRESSION_FLAG_UNCOMPRESSED:
             # Uncompressed data
             return stored_value[1:].decode('utf-8')
+        elif compression_flag in (FLAG_GZIP, FLAG_ZSTD, FLAG_LZ4, FLAG_ZSTD_DICT):
+            # Compressed data
+            return self._decoder_for(compression_flag).decompress(stored_value[1:]).decode('utf-8')
         else:
             # Fallback for old data format (no flag byte)
             try:
@@ -352,7 +934,7 @@ class LMDBStorage:
             return None
 
         try:
-            with self.env.begin() as txn:
+            with self._begin(db=self.db) as txn:
                 stored_value = txn.get(key.encode('utf-8'))
                 if stored_value is None:
                     if self.logger:
@@ -370,24 +952,131 @@ class LMDBStorage:
 
     def clear(self) -> int:
         """
-        Deletes all entries from the database.
+        Deletes all entries from the database (or namespace) with a single drop.
+
+        The main database also holds the records of the namespaces, including those
+        created by other processes. Clearing it keeps every registered namespace
+        and its entries.
+
         Returns:
             int: Number of entries deleted.
         """
         count = 0
         try:
-            with self.env.begin(write=True) as txn:
-                cursor = txn.cursor()
-                while cursor.first():
-                    cursor.delete()
-                    count += 1
+            def write():
+                with self._begin(db=self.db, write=True) as txn:
+                    if self.db is None:
+                        return self._clear_main(txn)
+                    entries = txn.stat()['entries']
+                    txn.drop(self.db, delete=False)
+                    return entries
+            count = self._shared.write(write)
             if self.logger:
                 self.logger.info(f"Cleared {count} entries from database")
         except Exception as e:
             if self.logger:
                 self.logger.error(f"Failed to clear database: {e}")
         return count
-            
+
+    def _clear_main(self, txn) -> int:
+        """
+        Internal helper dropping the main database while keeping the namespaces.
+
+        LMDB writes the record of every sub-database modified in a transaction back
+        into the main database when it commits, so each registered namespace (and
+        the registry) is touched before the main database is dropped.
+        Args:
+            txn (lmdb.Transaction): Write transaction on the main database.
+        Returns:
+            int: Number of keys deleted.
+        """
+        try:
+            registry = self.env.open_db(NAMESPACE_REGISTRY.encode('utf-8'), txn=txn, create=False)
+        except lmdb.NotFoundError:
+            registry = None
+        kept = []
+        if registry is not None:
+            names = [bytes(name) for name in txn.cursor(db=registry).iternext(values=False)]
+            kept = [registry] + [self.env.open_db(name, txn=txn) for name in names]
+        entries = txn.stat()['entries'] - len(kept)
+        for db in kept:
+            self._touch(txn, db)
+        txn.drop(self.env.open_db(txn=txn), delete=False)
+        return entries
+
+    @staticmethod
+    def _touch(txn, db) -> None:
+        """Internal helper marking a sub-database modified without changing its entries."""
+        cursor = txn.cursor(db=db)
+        if cursor.first():
+            txn.put(bytes(cursor.key()), bytes(cursor.value()), db=db)
+        else:
+            txn.put(b"\x00", b"", db=db)
+            txn.delete(b"\x00", db=db)
+
+    def compact(self, dest_path: Optional[str] = None) -> bool:
+        """
+        Rewrites the database without free pages to reclaim space after mass deletes.
+
+        LMDB never shrinks its data file; deleted pages are only reused by later
+        writes. compact() copies the environment with compaction and, unless a
+        destination is given, swaps the compacted file in place. In-place compaction
+        reopens the environment, so it requires that no other instance or namespace
+        view in this process is using the database.
+
+        Args:
+            dest_path (str, optional): Write the compacted copy to this directory
+                instead of replacing the database.
+
+        Returns:
+            bool: True if compaction succeeded, False otherwise.
+
+        Example:
+            >>> storage.delete_many(stale_keys)
+            >>> storage.compact()
+            True
+        """
+        try:
+            if dest_path is not None:
+                os.makedirs(dest_path, exist_ok=True)
+                with self._shared.transactions.shared():
+                    self.env.copy(dest_path, compact=True)
+                if self.logger:
+                    self.logger.info(f"Wrote compacted copy of {self.db_path} to '{dest_path}'")
+                return True
+
+            if self._shared.refcount > 1:
+                if self.logger:
+                    self.logger.warning("Cannot compact in place while other instances use the database")
+                return False
+
+            data_file = os.path.join(self.db_path, "data.mdb")
+            size_before = os.path.getsize(data_file)
+            tmp_path = f"{self.db_path}.compact"
+            shutil.rmtree(tmp_path, ignore_errors=True)
+            os.makedirs(tmp_path)
+            with self._shared.transactions.shared():
+                self.env.copy(tmp_path, compact=True)
+
+            def swap_data_file():
+                os.replace(os.path.join(tmp_path, "data.mdb"), data_file)
+                shutil.rmtree(tmp_path, ignore_errors=True)
+
+            self._shared.reopen(swap_data_file)
+            self.env = self._shared.env
+            self.db = self._open_namespace(self.namespace)
+            if self._writer is not None:
+                self._writer = self._shared.get_writer()
+
+            if self.logger:
+                size_after = os.path.getsize(data_file)
+                self.logger.info(f"Compacted {self.db_path} from {size_before} to {size_after} bytes")
+            return True
+        except Exception as e:
+            if self.logger:
+                self.logger.error(f"Failed to compact database: {e}")
+            return False
+
     def num_keys(self) -> int:
         """
         Returns the total number of keys in the database.
@@ -395,7 +1084,7 @@ class LMDBStorage:
             int: Number of stored keys.
         """
         try:
-            with self.env.begin() as txn:
+            with self._begin(db=self.db) as txn:
                 stat = txn.stat()
                 count = stat['entries']
             if self.logger:
@@ -420,7 +1109,7 @@ class LMDBStorage:
         else:
             keys = []
             try:
-                with self.env.begin() as txn:
+                with self._begin(db=self.db) as txn:
                     cursor = txn.cursor()
                     for key in cursor.iternext(keys=True, values=False):
                         keys.append(key.decode('utf-8'))
@@ -439,7 +1128,7 @@ class LMDBStorage:
             str: Individual keys from the database.
         """
         try:
-            with self.env.begin() as txn:
+            with self._begin(db=self.db) as txn:
                 cursor = txn.cursor()
                 for key in cursor.iternext(keys=True, values=False):
                     yield key.decode('utf-8')
@@ -456,7 +1145,7 @@ class LMDBStorage:
             bool: True if key exists, False otherwise.
         """
         try:
-            with self.env.begin() as txn:
+            with self._begin(db=self.db) as txn:
                 exists = txn.get(key.encode('utf-8'), default=None) is not None
                 if self.logger:
                     self.logger.debug(f"Key '{key}' exists: {exists}")
@@ -475,15 +1164,17 @@ class LMDBStorage:
             bool: True if deletion was successful, False if key not found or error occurred.
         """
         try:
-            with self.env.begin(write=True) as txn:
-                success = txn.delete(key.encode('utf-8'))
-                if success:
-                    if self.logger:
-                        self.logger.info(f"Successfully deleted key '{key}'")
-                else:
-                    if self.logger:
-                        self.logger.warning(f"Key '{key}' not found for deletion")
-                return success
+            def write():
+                with self._begin(db=self.db, write=True) as txn:
+                    return txn.delete(key.encode('utf-8'))
+            success = self._shared.write(write)
+            if success:
+                if self.logger:
+                    self.logger.info(f"Successfully deleted key '{key}'")
+            else:
+                if self.logger:
+                    self.logger.warning(f"Key '{key}' not found for deletion")
+            return success
         except Exception as e:
             if self.logger:
                 self.logger.error(f"Failed to delete key '{key}': {e}")
@@ -496,7 +1187,7 @@ class LMDBStorage:
             dict: Dictionary containing database statistics.
         """
         try:
-            with self.env.begin() as txn:
+            with self._begin(db=self.db) as txn:
                 stats = txn.stat()
                 if self.logger:
                     self.logger.debug(f"Database stats retrieved: {stats}")
@@ -508,13 +1199,20 @@ class LMDBStorage:
             
     def _close_log_handlers(self):
         """
-        Internal helper to close and remove all log handlers.
+        Internal helper to release this instance's reference to the shared logger.
 
-        Safely closes file handlers and removes them from the logger to prevent
-        resource leaks. Errors during cleanup are silently ignored.
+        The file handlers are closed and removed once no instance uses the logger,
+        to prevent resource leaks. Errors during cleanup are silently ignored.
         """
         try:
-            if hasattr(self, 'logger') and self.logger and self.logger.handlers:
+            if not (hasattr(self, 'logger') and self.logger):
+                return
+            with _logger_lock:
+                remaining = _logger_refs.get(self.logger.name, 1) - 1
+                if remaining > 0:
+                    _logger_refs[self.logger.name] = remaining
+                    return
+                _logger_refs.pop(self.logger.name, None)
                 for handler in self.logger.handlers[:]:
                     handler.close()
                     self.logger.removeHandler(handler)
@@ -530,18 +1228,25 @@ class LMDBStorage:
         proper cleanup of the database connection and log file handlers.
         If using a context manager, this is called automatically.
 
+        The shared environment is closed when the last instance using it is closed.
+        Calling close() more than once is harmless.
+
         Note:
             After calling close(), the storage instance should not be used.
         """
+        if getattr(self, '_shared', None) is None:
+            return
+        self._shared = None
+        self._writer = None
         try:
-            self.env.close()
-            if self.logger:
+            if release_environment(self.db_path) and self.logger:
                 self.logger.info("LMDB environment closed successfully")
         except Exception as e:
             if self.logger:
                 self.logger.error(f"Error closing LMDB environment: {e}")
 
         self._close_log_handlers()
+        self.logger = None
 
     def __del__(self):
         """
@@ -556,20 +1261,18 @@ class LMDBStorage:
             garbage collection.
         """
         try:
-            if hasattr(self, 'env') and self.env:
-                self.env.close()
+            self.close()
         except Exception:
             # Silently ignore errors during cleanup
             pass
 
-        self._close_log_handlers()
-
     def export_to_json(self, json_file_path: str) -> bool:
         """
         Exports all key-value pairs to a JSON file.
 
-        The JSON file will contain an array of objects with 'key' and 'value' fields.
-        Values are automatically decompressed during export.
+        The JSON file will contain an array of objects with 'key' and 'value' fields,
+        one per line. Values are automatically decompressed during export. Entries are
+        written as the cursor advances, so memory use does not grow with the database.
 
         Args:
             json_file_path (str): The path to the output JSON file.
@@ -590,34 +1293,217 @@ class LMDBStorage:
                 {"key": "config:lang", "value": "en"}
             ]
         """
-        data = []
+        count = 0
         try:
-            with self.env.begin() as txn:
-                cursor = txn.cursor()
-                for key_bytes, stored_value in cursor.iternext():
-                    key = key_bytes.decode('utf-8')
-                    value = self._decode_value(stored_value)
-                    if value is not None:
-                        data.append({"key": key, "value": value})
-
             with open(json_file_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=4)
+                f.write("[")
+                for entry in self._iter_entries():
+                    f.write(",\n    " if count else "\n    ")
+                    f.write(json.dumps(entry, ensure_ascii=False))
+                    count += 1
+                f.write("\n]\n" if count else "]\n")
 
             if self.logger:
-                self.logger.info(f"Successfully exported {len(data)} entries to '{json_file_path}'")
+                self.logger.info(f"Successfully exported {count} entries to '{json_file_path}'")
             return True
         except Exception as e:
             if self.logger:
                 self.logger.error(f"Failed to export data to JSON: {e}")
             return False
 
+    def _iter_entries(self) -> Iterator[dict]:
+        """
+        Internal generator yielding {"key", "value"} dicts in key order from one read transaction.
+        """
+        with self._begin(db=self.db) as txn:
+            for key_bytes, stored_value in txn.cursor().iternext():
+                value = self._decode_value(stored_value)
+                if value is not None:
+                    yield {"key": key_bytes.decode('utf-8'), "value": value}
+
+    @staticmethod
+    def _open_text(file_path: str, mode: str):
+        """Internal helper to open a text file, gzip-compressed if the path ends in .gz."""
+        if file_path.endswith(".gz"):
+            return gzip.open(file_path, mode + 't', encoding='utf-8')
+        return open(file_path, mode, encoding='utf-8')
+
+    def export_to_jsonl(self, jsonl_file_path: str) -> bool:
+        """
+        Exports all key-value pairs to a JSON Lines file, one entry per line.
+
+        Entries are streamed from the cursor, so memory use is constant regardless
+        of the database size. A path ending in ".gz" is gzip-compressed.
+
+        Args:
+            jsonl_file_path (str): The path to the output file.
+
+        Returns:
+            bool: True if the export was successful, False otherwise.
+
+        Example:
+            >>> storage.export_to_jsonl("backup.jsonl.gz")
+            True
+
+            Each line of the file holds one entry:
+            {"key": "config:lang", "value": "en"}
+        """
+        count = 0
+        try:
+            with self._open_text(jsonl_file_path, 'w') as f:
+                for entry in self._iter_entries():
+                    f.write(json.dumps(entry, ensure_ascii=False))
+                    f.write("\n")
+                    count += 1
+
+            if self.logger:
+                self.logger.info(f"Successfully exported {count} entries to '{jsonl_file_path}'")
+            return True
+        except Exception as e:
+            if self.logger:
+                self.logger.error(f"Failed to export data to JSONL: {e}")
+            return False
+
+    def import_from_jsonl(self, jsonl_file_path: str) -> bool:
+        """
+        Imports key-value pairs from a JSON Lines file written by export_to_jsonl().
+
+        The file is parsed one line at a time and written through put_many(), so
+        memory use is constant. Blank lines are ignored; malformed lines and invalid
+        entries are skipped and logged. A path ending in ".gz" is read as gzip.
+
+        Args:
+            jsonl_file_path (str): The path to the input file.
+
+        Returns:
+            bool: True if the import completed (even with some failures), False if
+                  the file couldn't be opened or read.
+        """
+        def records(f):
+            for line_number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError as e:
+                    if self.logger:
+                        self.logger.warning(f"Skipping malformed line {line_number} in '{jsonl_file_path}': {e}")
+                    yield None
+
+        try:
+            with self._open_text(jsonl_file_path, 'r') as f:
+                imported_count, failed_count = self._import_entries(records(f))
+        except Exception as e:
+            if self.logger:
+                self.logger.error(f"Failed to import JSONL file '{jsonl_file_path}': {e}")
+            return False
+
+        if self.logger:
+            self.logger.info(f"Successfully imported {imported_count} entries from '{jsonl_file_path}'")
+            if failed_count > 0:
+                self.logger.warning(f"Failed to import {failed_count} entries")
+        return True
+
+    def export_snapshot(self, snapshot_path: str) -> bool:
+        """
+        Writes a binary snapshot of the database.
+
+        Values are copied exactly as stored, without decompressing and recompressing
+        them, together with any trained compression dictionaries. This is much faster
+        than a JSON export and about as small as the database itself. Records are
+        streamed from the cursor, so memory use is constant.
+
+        Args:
+            snapshot_path (str): The path to the output file.
+
+        Returns:
+            bool: True if the snapshot was written, False otherwise.
+        """
+        count = 0
+        try:
+            with open(snapshot_path, 'wb') as f:
+                f.write(SNAPSHOT_MAGIC)
+                dictionaries = self._stored_dictionaries()
+                f.write(struct.pack(">I", len(dictionaries)))
+                for dictionary in dictionaries:
+                    f.write(struct.pack(">I", len(dictionary)))
+                    f.write(dictionary)
+
+                with self._begin(db=self.db) as txn:
+                    for key_bytes, stored_value in txn.cursor().iternext():
+                        f.write(SNAPSHOT_LENGTHS.pack(len(key_bytes), len(stored_value)))
+                        f.write(key_bytes)
+                        f.write(stored_value)
+                        count += 1
+
+            if self.logger:
+                self.logger.info(f"Successfully wrote snapshot of {count} entries to '{snapshot_path}'")
+            return True
+        except Exception as e:
+            if self.logger:
+                self.logger.error(f"Failed to write snapshot: {e}")
+            return False
+
+    def import_snapshot(self, snapshot_path: str) -> bool:
+        """
+        Loads a binary snapshot written by export_snapshot().
+
+        Stored values are written back unchanged in batches of write_batch_size, and
+        the snapshot's compression dictionaries are registered so every value decodes.
+
+        Args:
+            snapshot_path (str): The path to the snapshot file.
+
+        Returns:
+            bool: True if the snapshot was loaded, False if it is missing or malformed.
+        """
+        def read_exact(f, size):
+            data = f.read(size)
+            if len(data) != size:
+                raise ValueError("Snapshot file is truncated")
+            return data
+
+        count = 0
+        try:
+            with open(snapshot_path, 'rb') as f:
+                if f.read(len(SNAPSHOT_MAGIC)) != SNAPSHOT_MAGIC:
+                    raise ValueError("Not an LMDBStorage snapshot")
+                (num_dictionaries,) = struct.unpack(">I", read_exact(f, 4))
+                for _ in range(num_dictionaries):
+                    (size,) = struct.unpack(">I", read_exact(f, 4))
+                    self._save_dictionary(read_exact(f, size))
+
+                batch: List[Tuple[bytes, bytes]] = []
+                while True:
+                    header = f.read(SNAPSHOT_LENGTHS.size)
+                    if not header:
+                        break
+                    if len(header) != SNAPSHOT_LENGTHS.size:
+                        raise ValueError("Snapshot file is truncated")
+                    key_length, value_length = SNAPSHOT_LENGTHS.unpack(header)
+                    batch.append((read_exact(f, key_length), read_exact(f, value_length)))
+                    if len(batch) >= self.write_batch_size:
+                        count += self._write_batch(batch)
+                        batch = []
+                if batch:
+                    count += self._write_batch(batch)
+
+            if self.logger:
+                self.logger.info(f"Successfully loaded {count} entries from snapshot '{snapshot_path}'")
+            return True
+        except Exception as e:
+            if self.logger:
+                self.logger.error(f"Failed to load snapshot '{snapshot_path}' after {count} entries: {e}")
+            return False
+
     def import_from_json(self, json_file_path: str) -> bool:
         """
         Imports key-value pairs from a JSON file and stores them in the database.
 
         The JSON file should contain an array of objects with 'key' and 'value' fields.
         Invalid entries are skipped and logged. Values are automatically compressed
-        if they exceed the compression threshold.
+        if they exceed the compression threshold. The whole file is parsed at once;
+        use import_from_jsonl() for large backups.
 
         Args:
             json_file_path (str): The path to the input JSON file.
@@ -686,31 +1572,30 @@ class LMDBStorage:
                 self.logger.error(f"Failed to load JSON file: {e}")
             return None
 
-    def _import_entries(self, data: list) -> tuple:
+    def _import_entries(self, data: Iterable) -> tuple:
         """
         Internal helper to validate and import entries from parsed JSON data.
         Args:
-            data (list): List of dictionaries with 'key' and 'value' fields.
+            data (iterable): Dictionaries with 'key' and 'value' fields. May be a
+                generator; entries are consumed one at a time.
         Returns:
             tuple: (imported_count, failed_count)
         """
-        imported_count = 0
-        failed_count = 0
+        total = 0
 
-        for item in data:
-            if not isinstance(item, dict) or 'key' not in item or 'value' not in item:
-                if self.logger:
-                    self.logger.warning(f"Skipping invalid entry in JSON file: {item}")
-                failed_count += 1
-                continue
-
-            # Use the put method to handle validation, compression, and storage
-            if self.put(item['key'], item['value']):
-                imported_count += 1
-            else:
-                failed_count += 1
+        def valid_items():
+            nonlocal total
+            for item in data:
+                total += 1
+                if not isinstance(item, dict) or 'key' not in item or 'value' not in item:
+                    if self.logger:
+                        self.logger.warning(f"Skipping invalid entry in JSON file: {item}")
+                    continue
+                yield item['key'], item['value']
 
-        return imported_count, failed_count
+        # put_many handles validation and compression, committing in batches
+        imported_count = self.put_many(valid_items())
+        return imported_count, total - imported_count
 
             
     def __enter__(self):
@@ -0,0 +1,417 @@
+"""Process-wide registry of shared LMDB environments.
+
+LMDB allows a database to be opened only once per process, and py-lmdb
+refuses a second lmdb.open() on the same path. Instances therefore acquire
+environments from this registry, which opens each path once, counts
+references and closes the environment when the last user releases it.
+
+Entries are tied to the process that opened them. After a fork (gunicorn
+workers, process pools) the child closes the inherited handles and opens its
+own environments on demand, as LMDB requires.
+"""
+
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Tuple, TypeVar
+
+import lmdb
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Maximum number of entries written in one group commit
+DEFAULT_COALESCE_MAX_BATCH = 1000
+# The map size is multiplied by this factor each time it fills up
+MAP_GROWTH_FACTOR = 2
+# Seconds a resize waits for open transactions to finish before giving up
+RESIZE_WAIT_SECONDS = 10.0
+
+
+class TransactionLock:
+    """
+    Shared/exclusive lock between the transactions of an environment and map resizes.
+
+    LMDB forbids changing the map size while any transaction of the process is
+    open. Transactions hold the lock shared; set_mapsize() holds it exclusively.
+    A thread that already holds it shared re-enters without waiting, so nested
+    transactions (a put inside a scan) cannot deadlock against a pending resize.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._active = 0
+        self._waiting = 0
+        self._exclusive = False
+        self._local = threading.local()
+
+    def held(self) -> bool:
+        """True if the calling thread holds the lock shared."""
+        return getattr(self._local, "depth", 0) > 0
+
+    @contextmanager
+    def shared(self) -> Iterator[None]:
+        """
+        Hold the lock shared for the duration of a transaction.
+
+        Each thread counts the transactions it holds open and the lock is released
+        when the count drops to zero, so transactions may end in any order (e.g.
+        two interleaved scan generators).
+        """
+        if getattr(self._local, "depth", 0) == 0:
+            with self._cond:
+                # New transactions queue behind a waiting resize so it cannot starve
+                while self._exclusive or self._waiting:
+                    self._cond.wait()
+                self._active += 1
+        self._local.depth = getattr(self._local, "depth", 0) + 1
+        try:
+            yield
+        finally:
+            self._local.depth -= 1
+            if self._local.depth == 0:
+                with self._cond:
+                    self._active -= 1
+                    if not self._active:
+                        self._cond.notify_all()
+
+    def acquire_exclusive(self, timeout: float = RESIZE_WAIT_SECONDS) -> bool:
+        """
+        Wait until no transaction is open and take the lock exclusively.
+
+        Returns:
+            bool: False if the calling thread holds the lock shared itself or the
+            open transactions did not finish within timeout.
+        """
+        if self.held():
+            return False
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            self._waiting += 1
+            try:
+                while self._exclusive or self._active:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        return False
+                    self._cond.wait(remaining)
+                self._exclusive = True
+                return True
+            finally:
+                self._waiting -= 1
+                self._cond.notify_all()
+
+    def release_exclusive(self) -> None:
+        """Release the exclusive lock and wake the waiting transactions."""
+        with self._cond:
+            self._exclusive = False
+            self._cond.notify_all()
+
+
+class WriteCoalescer:
+    """
+    Background writer that commits queued puts from many threads together.
+
+    Each put() enqueues its encoded entry and returns a Future. The writer
+    thread takes everything queued (up to max_batch entries), writes it in a
+    single transaction and resolves all the futures, so N concurrent writers
+    cost one commit instead of N serialized ones.
+    """
+
+    def __init__(self, shared: "SharedEnvironment", max_batch: int = DEFAULT_COALESCE_MAX_BATCH):
+        self.shared = shared
+        self.max_batch = max_batch
+        self._queue: "queue.Queue" = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="lmdb-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, db, key: bytes, value: bytes) -> Future:
+        """
+        Queue an encoded entry for the next group commit.
+
+        Args:
+            db: Sub-database handle, or None for the main database.
+            key: Encoded key.
+            value: Encoded value.
+
+        Returns:
+            Future: Resolves to True once the entry is committed.
+        """
+        future: Future = Future()
+        self._queue.put((db, key, value, future))
+        return future
+
+    def _run(self) -> None:
+        """Writer loop: block for one entry, drain the rest and commit them together."""
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            batch = [item]
+            stop = False
+            while len(batch) < self.max_batch:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+            self._commit(batch)
+            if stop:
+                return
+
+    def _commit(self, batch: List[Tuple]) -> None:
+        """Write a batch in one transaction and resolve its futures."""
+        def write():
+            with self.shared.env.begin(write=True) as txn:
+                for db, key, value, _ in batch:
+                    txn.put(key, value, db=db)
+
+        try:
+            self.shared.write(write)
+        except Exception as e:
+            logger.error(f"Group commit of {len(batch)} entries failed: {e}")
+            for _, _, _, future in batch:
+                future.set_exception(e)
+            return
+        for _, _, _, future in batch:
+            future.set_result(True)
+
+    def close(self) -> None:
+        """Commit everything already queued and stop the writer thread."""
+        self._queue.put(None)
+        self._thread.join()
+
+
+class SharedEnvironment:
+    """
+    An LMDB environment shared by every LMDBStorage opened on the same path.
+
+    Args:
+        path: Database path.
+        open_kwargs: Keyword arguments for lmdb.open(), reused when reopening.
+        auto_grow: Grow the map when a write fails with MapFullError.
+        max_map_size: Upper bound in bytes for automatic growth. None means unbounded.
+    """
+
+    def __init__(self, path: str, open_kwargs: dict, auto_grow: bool = True,
+                 max_map_size: Optional[int] = None):
+        self.path = path
+        self.open_kwargs = dict(open_kwargs)
+        self.auto_grow = auto_grow
+        self.max_map_size = max_map_size
+        self.env = lmdb.open(path, **self.open_kwargs)
+        self.refcount = 0
+        self.writer: Optional[WriteCoalescer] = None
+        self._lock = threading.Lock()
+        self._resize_lock = threading.Lock()
+        self.transactions = TransactionLock()
+
+    def get_writer(self, max_batch: int = DEFAULT_COALESCE_MAX_BATCH) -> WriteCoalescer:
+        """Return the environment's write coalescer, starting it on first use."""
+        with self._lock:
+            if self.writer is None:
+                self.writer = WriteCoalescer(self, max_batch=max_batch)
+            return self.writer
+
+    def write(self, fn: Callable[[], T]) -> T:
+        """
+        Run a function that performs one write transaction, growing the map if it fills.
+
+        The transaction is aborted by LMDB when it hits MapFullError, so it is safe
+        to run fn again after the map has been enlarged. fn must open its
+        transaction on this environment; write() holds off resizes meanwhile.
+
+        Args:
+            fn: Function opening, filling and committing a write transaction.
+
+        Returns:
+            Whatever fn returns.
+
+        Raises:
+            lmdb.MapFullError: If auto_grow is off, max_map_size has been reached or
+                the map could not be resized (see grow()).
+            lmdb.MapResizedError: If the size set by another process could not be
+                adopted because this thread is inside a transaction.
+        """
+        while True:
+            map_size = self.env.info()["map_size"]
+            try:
+                with self.transactions.shared():
+                    return fn()
+            except lmdb.MapResizedError:
+                # Another process grew the map; adopt its size and retry
+                if not self.adopt_map_size():
+                    raise
+            except lmdb.MapFullError:
+                if not self.grow(map_size):
+                    raise
+
+    def adopt_map_size(self) -> bool:
+        """
+        Take the map size set by another process after a transaction failed
+        with MapResizedError.
+
+        Returns:
+            bool: False if the calling thread is inside a transaction itself or
+            open transactions did not finish within RESIZE_WAIT_SECONDS.
+        """
+        if not self.transactions.acquire_exclusive():
+            return False
+        try:
+            self.env.set_mapsize(0)
+        finally:
+            self.transactions.release_exclusive()
+        self.open_kwargs["map_size"] = self.env.info()["map_size"]
+        logger.info(f"Adopted LMDB map size {self.open_kwargs['map_size']} for {self.path}")
+        return True
+
+    def grow(self, failed_size: int) -> bool:
+        """
+        Enlarge the map geometrically after a write failed at failed_size bytes.
+
+        The resize waits until every transaction of the process has ended. It is
+        refused when the calling thread is itself inside a transaction (e.g. a put
+        made while iterating a scan) or other transactions stay open longer than
+        RESIZE_WAIT_SECONDS.
+
+        Returns:
+            bool: True if the map is now larger than failed_size.
+        """
+        if not self.auto_grow:
+            return False
+        with self._resize_lock:
+            current = self.env.info()["map_size"]
+            if current > failed_size:
+                # Another thread grew it while we waited
+                return True
+            new_size = current * MAP_GROWTH_FACTOR
+            if self.max_map_size is not None:
+                new_size = min(new_size, self.max_map_size)
+            if new_size <= current:
+                logger.error(f"LMDB map for {self.path} is full at its {current} byte limit")
+                return False
+            if not self.transactions.acquire_exclusive():
+                logger.error(f"Cannot grow LMDB map for {self.path} while transactions are open")
+                return False
+            try:
+                self.env.set_mapsize(new_size)
+            finally:
+                self.transactions.release_exclusive()
+            self.open_kwargs["map_size"] = new_size
+            logger.info(f"Grew LMDB map for {self.path} from {current} to {new_size} bytes")
+            return True
+
+    def reopen(self, while_closed: Optional[Callable[[], None]] = None) -> None:
+        """
+        Close and reopen the environment.
+
+        Args:
+            while_closed: Optional function run after pending writes are flushed and
+                the environment is closed, e.g. to replace its data file.
+        """
+        with self._lock:
+            writer, self.writer = self.writer, None
+        if writer is not None:
+            writer.close()
+        self.env.close()
+        try:
+            if while_closed is not None:
+                while_closed()
+        finally:
+            self.env = lmdb.open(self.path, **self.open_kwargs)
+        if writer is not None:
+            self.get_writer(writer.max_batch)
+
+    def close(self) -> None:
+        """Stop the writer (flushing pending writes) and close the environment."""
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+        self.env.close()
+
+
+_registry: Dict[str, SharedEnvironment] = {}
+_registry_lock = threading.Lock()
+
+
+def _registry_key(path: str) -> str:
+    return os.path.realpath(path)
+
+
+def acquire_environment(path: str, auto_grow: bool = True, max_map_size: Optional[int] = None,
+                        **open_kwargs) -> SharedEnvironment:
+    """
+    Return the shared environment for path, opening it if needed.
+
+    Options such as map_size, max_readers, readahead or writemap (and the
+    growth settings) only take effect when this call opens the environment;
+    later callers share the environment as first opened.
+
+    Args:
+        path: Database path.
+        auto_grow: Grow the map when it fills up.
+        max_map_size: Upper bound in bytes for automatic growth.
+        **open_kwargs: Keyword arguments for lmdb.open().
+
+    Returns:
+        SharedEnvironment: Entry whose reference count now includes the caller.
+    """
+    key = _registry_key(path)
+    with _registry_lock:
+        shared = _registry.get(key)
+        if shared is None:
+            shared = SharedEnvironment(path, open_kwargs, auto_grow, max_map_size)
+            _registry[key] = shared
+        shared.refcount += 1
+        return shared
+
+
+def release_environment(path: str) -> bool:
+    """
+    Drop one reference to the shared environment for path.
+
+    Returns:
+        bool: True if this was the last reference and the environment was closed.
+    """
+    key = _registry_key(path)
+    with _registry_lock:
+        shared = _registry.get(key)
+        if shared is None:
+            return False
+        shared.refcount -= 1
+        if shared.refcount > 0:
+            return False
+        del _registry[key]
+    shared.close()
+    return True
+
+
+def open_environments() -> Dict[str, int]:
+    """Return the reference count of every environment open in this process."""
+    with _registry_lock:
+        return {path: shared.refcount for path, shared in _registry.items()}
+
+
+def _reset_after_fork() -> None:
+    """Drop environments inherited from the parent process."""
+    global _registry_lock
+    # The lock may have been held by another parent thread at fork time
+    _registry_lock = threading.Lock()
+    for shared in _registry.values():
+        # The writer thread does not exist in the child; only the handle is closed
+        try:
+            shared.env.close()
+        except Exception:
+            pass
+    _registry.clear()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
@@ -1,2 +1,4 @@
 from .print_response import print_response, print_simple_result
 from .save_response import save_model_response
+from .streaming_json import PartialItem, StreamingJSONParser
+from .json_repair import loads_tolerant, parse_structured, repair_stats
@@ -0,0 +1,420 @@
+"""Cheap repair of structured output that fails schema validation.
+
+Models often return JSON that is almost right: a trailing comma, single
+quotes, a raw newline inside a string, an array cut off by the token limit,
+a number where the schema wants a string. Regenerating the whole response for
+such defects costs a full prompt and completion. The repair pipeline instead
+tries, in order:
+
+1. strict parsing (JSONCleaner + model_validate_json),
+2. a tolerant parser that fixes the syntax (loads_tolerant),
+3. field-level coercion of the parsed data against the schema (coerce_to_schema).
+
+LiteClient adds a last stage that sends only the broken output and the schema
+back to the model (build_fix_messages) before giving up. Every stage that
+rescues a response is counted in repair_stats().
+"""
+
+import enum
+import json
+import logging
+import re
+import threading
+import typing
+from typing import Any, Dict, List, Optional, Tuple, Type, Union
+
+from pydantic import BaseModel, ValidationError
+
+from .json_cleaner import JSONCleaner
+from .streaming_json import _unwrap_optional
+
+logger = logging.getLogger(__name__)
+
+# Repair stages, in the order they are tried
+STRICT = "strict"
+TOLERANT = "tolerant"
+COERCED = "coerced"
+MODEL_FIX = "model_fix"
+REPAIR_STAGES = (TOLERANT, COERCED, MODEL_FIX)
+
+# Truncation points tried, newest first, when closing a cut-off document
+MAX_CUT_CANDIDATES = 16
+# Characters of validation errors quoted in the fix-up prompt
+MAX_ERROR_CHARS = 2000
+
+_LITERALS = {
+    "true": "true", "false": "false", "null": "null",
+    "True": "true", "False": "false", "None": "null",
+    "NaN": "null", "Infinity": "null", "undefined": "null",
+}
+_PAIRS = {"{": "}", "[": "]"}
+_WORD = re.compile(r"[A-Za-z_][A-Za-z0-9_\-]*")
+# A whole number as models write it, including forms JSON rejects (+1, .5, 1.)
+_NUMBER = re.compile(r"[-+]?(?:(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?|Infinity|NaN)")
+_JSON_NUMBER = re.compile(r"-?(?:0|[1-9]\d*)(?:\.\d+)?(?:[eE][-+]?\d+)?")
+
+
+def _next_significant(text: str, pos: int) -> str:
+    """First non-whitespace character at or after pos, or "" at the end."""
+    while pos < len(text) and text[pos].isspace():
+        pos += 1
+    return text[pos] if pos < len(text) else ""
+
+
+def _drop_trailing_comma(out: List[str]) -> None:
+    index = len(out) - 1
+    while index >= 0 and out[index].isspace():
+        index -= 1
+    if index >= 0 and out[index] == ",":
+        del out[index:]
+
+
+def _scan(text: str) -> Tuple[str, List[str], bool, List[Tuple[int, Tuple[str, ...]]]]:
+    """
+    Rewrite model output into strict JSON syntax as far as it goes.
+
+    Returns:
+        Tuple of (rewritten text, brackets still open, whether a string is
+        still open, cut points). A cut point is an output length after which
+        the document can be closed with the brackets open at that point.
+    """
+    out: List[str] = []
+    stack: List[str] = []
+    cuts: List[Tuple[int, Tuple[str, ...]]] = []
+    in_string = False
+    quote = '"'
+    escape = False
+    pos = 0
+    while pos < len(text):
+        char = text[pos]
+        pos += 1
+        if in_string:
+            if escape:
+                out.append(char)
+                escape = False
+            elif char == "\\":
+                out.append(char)
+                escape = True
+            elif char == quote:
+                # A quote not followed by a delimiter is part of the text
+                if _next_significant(text, pos) not in ("", ",", "}", "]", ":"):
+                    out.append('\\"' if quote == '"' else "'")
+                    continue
+                out.append('"')
+                in_string = False
+                cuts.append((len(out), tuple(stack)))
+            elif char == '"':
+                out.append('\\"')
+            elif char == "\n":
+                out.append("\\n")
+            elif char == "\r":
+                out.append("\\r")
+            elif char == "\t":
+                out.append("\\t")
+            elif ord(char) < 0x20:
+                out.append(f"\\u{ord(char):04x}")
+            else:
+                out.append(char)
+            continue
+
+        if char in ('"', "'"):
+            in_string, quote = True, char
+            out.append('"')
+        elif char in _PAIRS:
+            stack.append(char)
+            out.append(char)
+        elif char in ("}", "]"):
+            _drop_trailing_comma(out)
+            # Close anything left open inside, e.g. an array missing its "]"
+            while stack and _PAIRS[stack[-1]] != char:
+                out.append(_PAIRS[stack.pop()])
+            if not stack:
+                break
+            stack.pop()
+            out.append(char)
+            cuts.append((len(out), tuple(stack)))
+            if not stack:
+                break
+        elif char == ",":
+            cuts.append((len(out), tuple(stack)))
+            out.append(char)
+        elif char == "/" and text.startswith("//", pos - 1):
+            end = text.find("\n", pos)
+            pos = len(text) if end == -1 else end
+        elif char in "+-.0123456789" and _NUMBER.match(text, pos - 1):
+            number = _NUMBER.match(text, pos - 1).group(0)
+            pos += len(number) - 1
+            if number.lstrip("+-") in ("Infinity", "NaN"):
+                out.append("null")
+            elif _JSON_NUMBER.fullmatch(number.lstrip("+")):
+                out.append(number.lstrip("+"))
+            else:
+                out.append(json.dumps(float(number)))
+        elif char.isalpha() or char == "_":
+            word = _WORD.match(text, pos - 1).group(0)
+            pos += len(word) - 1
+            if stack and stack[-1] == "{" and _next_significant(text, pos) == ":":
+                out.append(json.dumps(word))
+            elif word in _LITERALS:
+                out.append(_LITERALS[word])
+            else:
+                out.append(json.dumps(word))
+        else:
+            out.append(char)
+    return "".join(out), stack, in_string, cuts
+
+
+def _close(text: str, stack: Any) -> str:
+    """Append the closing brackets for the open ones, dropping a dangling comma or key."""
+    text = text.rstrip()
+    if text.endswith(","):
+        text = text[:-1]
+    elif text.endswith(":"):
+        text += " null"
+    return text + "".join(_PAIRS[bracket] for bracket in reversed(stack))
+
+
+def loads_tolerant(text: str) -> Any:
+    """
+    Parse JSON written by a language model, repairing common defects.
+
+    Handles markdown fences and surrounding prose, trailing commas, single
+    quotes, unescaped newlines and quotes inside strings, unquoted keys,
+    Python literals, // comments, and documents truncated mid-way (open
+    strings and brackets are closed, an incomplete last element is dropped).
+
+    Args:
+        text: Raw model output.
+
+    Returns:
+        The decoded value.
+
+    Raises:
+        ValueError: If no JSON object or array can be recovered.
+    """
+    if not isinstance(text, str):
+        raise ValueError("Model output is not text")
+    starts = [index for index in (text.find("{"), text.find("[")) if index != -1]
+    if not starts:
+        raise ValueError("No JSON object or array found")
+    start = min(starts)
+    try:
+        return json.loads(text[start:])
+    except json.JSONDecodeError:
+        pass
+
+    out, stack, in_string, cuts = _scan(text[start:])
+    candidates = [_close(out + ('"' if in_string else ""), stack)]
+    candidates += [_close(out[:length], open_stack) for length, open_stack in reversed(cuts[-MAX_CUT_CANDIDATES:])]
+    for candidate in candidates:
+        try:
+            return json.loads(candidate)
+        except json.JSONDecodeError:
+            continue
+    raise ValueError("Could not repair JSON")
+
+
+def _normalize_key(key: str) -> str:
+    return re.sub(r"[\s_\-]", "", str(key)).lower()
+
+
+def _is_model(annotation: Any) -> bool:
+    return isinstance(annotation, type) and issubclass(annotation, BaseModel)
+
+
+def coerce_to_schema(data: Any, model: Type[BaseModel]) -> Any:
+    """
+    Coerce decoded JSON towards a Pydantic model, field by field.
+
+    Unwraps a single wrapper key ({"result": {...}}), maps keys that differ
+    only in case or separators (camelCase, kebab-case) to field names, turns
+    numbers into strings and numeric strings into numbers, wraps scalars in a
+    list where a list is expected, joins lists where a string is expected and
+    matches enum and literal values case-insensitively. Anything it cannot
+    improve is passed through unchanged for Pydantic to judge.
+
+    Args:
+        data: Decoded JSON value.
+        model: Target Pydantic model.
+
+    Returns:
+        The coerced value, ready for model.model_validate.
+    """
+    fields = model.model_fields
+    if isinstance(data, list):
+        list_fields = [
+            name for name, field in fields.items()
+            if typing.get_origin(_unwrap_optional(field.annotation)) in (list, tuple, set, frozenset)
+        ]
+        if len(list_fields) == 1:
+            data = {list_fields[0]: data}
+    if not isinstance(data, dict):
+        return data
+
+    by_key: Dict[str, str] = {}
+    for name, field in fields.items():
+        by_key[_normalize_key(name)] = name
+        if field.alias:
+            by_key[_normalize_key(field.alias)] = name
+    if len(data) == 1:
+        (key, value), = data.items()
+        if isinstance(value, dict) and _normalize_key(key) not in by_key:
+            data = value
+
+    coerced: Dict[str, Any] = {}
+    for key, value in data.items():
+        name = key if key in fields else by_key.get(_normalize_key(key))
+        if name is None:
+            coerced[key] = value
+            continue
+        field = fields[name]
+        coerced[field.alias or name] = _coerce_value(value, field.annotation)
+    return coerced
+
+
+def _coerce_value(value: Any, annotation: Any) -> Any:
+    annotation = _unwrap_optional(annotation)
+    origin = typing.get_origin(annotation)
+    if value is None:
+        return None
+    if _is_model(annotation):
+        return coerce_to_schema(value, annotation)
+    if origin in (list, tuple, set, frozenset):
+        if not isinstance(value, list):
+            value = [value]
+        args = typing.get_args(annotation)
+        if origin is list and args:
+            return [_coerce_value(item, args[0]) for item in value]
+        return value
+    if origin is typing.Literal:
+        if isinstance(value, str):
+            for option in typing.get_args(annotation):
+                if isinstance(option, str) and option.lower() == value.strip().lower():
+                    return option
+        return value
+    if isinstance(annotation, type) and issubclass(annotation, enum.Enum):
+        if isinstance(value, str):
+            for member in annotation:
+                if value.strip().lower() in (str(member.value).lower(), member.name.lower()):
+                    return member.value
+        return value
+    if annotation is str:
+        if isinstance(value, (int, float, bool)):
+            return str(value).lower() if isinstance(value, bool) else str(value)
+        if isinstance(value, list) and all(isinstance(item, (str, int, float)) for item in value):
+            return "\n".join(str(item) for item in value)
+        if isinstance(value, dict):
+            return json.dumps(value, ensure_ascii=False)
+        return value
+    if annotation is bool and isinstance(value, str):
+        lowered = value.strip().lower()
+        if lowered in ("true", "yes", "y", "1"):
+            return True
+        if lowered in ("false", "no", "n", "0"):
+            return False
+        return value
+    if annotation in (int, float) and isinstance(value, str):
+        cleaned = value.strip().replace(",", "").rstrip("%")
+        try:
+            number = float(cleaned)
+        except ValueError:
+            return value
+        if annotation is int and number.is_integer():
+            return int(number)
+        return number if annotation is float else value
+    if annotation is int and isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+def parse_structured(
+    text: str, model: Type[BaseModel]
+) -> Tuple[Optional[BaseModel], Optional[str], Optional[str]]:
+    """
+    Parse model output into a Pydantic model with the local repair stages.
+
+    Args:
+        text: Raw model output.
+        model: Target Pydantic model.
+
+    Returns:
+        Tuple of (parsed model or None, stage that succeeded or None, last
+        error message or None). The stage is STRICT, TOLERANT or COERCED.
+    """
+    try:
+        return model.model_validate_json(JSONCleaner.extract_json(text)), STRICT, None
+    except (ValidationError, ValueError, TypeError) as e:
+        error = str(e)
+
+    try:
+        data = loads_tolerant(text)
+    except ValueError as e:
+        return None, None, f"{error}\n{e}"
+    try:
+        return model.model_validate(data), TOLERANT, None
+    except ValidationError:
+        pass
+
+    try:
+        return model.model_validate(coerce_to_schema(data, model)), COERCED, None
+    except ValidationError as e:
+        return None, None, str(e)
+
+
+def build_fix_messages(
+    text: str, model: Type[BaseModel], error: Optional[str] = None
+) -> List[Dict[str, Any]]:
+    """
+    Build a short follow-up request asking the model to fix its own output.
+
+    Only the broken output, the JSON schema and the validation errors are
+    sent, not the original prompt, so the fix costs a fraction of a full
+    regeneration.
+    """
+    schema = json.dumps(model.model_json_schema(), ensure_ascii=False)
+    parts = [f"JSON schema:\n{schema}"]
+    if error:
+        parts.append(f"Validation errors:\n{error[:MAX_ERROR_CHARS]}")
+    parts.append(f"Broken JSON:\n{text}")
+    return [
+        {
+            "role": "system",
+            "content": "Fix the JSON so that it validates against the schema. "
+                       "Keep every value that is already valid. Reply with the JSON only.",
+        },
+        {"role": "user", "content": "\n\n".join(parts)},
+    ]
+
+
+_stats: Dict[str, int] = {stage: 0 for stage in REPAIR_STAGES + ("failed",)}
+_stats_lock = threading.Lock()
+
+
+def record_repair(stage: Optional[str]) -> None:
+    """Count the outcome of parsing a response; None counts a failure, STRICT is not counted."""
+    if stage == STRICT:
+        return
+    with _stats_lock:
+        _stats[stage or "failed"] += 1
+
+
+def repair_stats() -> Dict[str, int]:
+    """
+    Return process-wide repair counters.
+
+    Returns:
+        dict: Responses rescued by each stage ("tolerant", "coerced",
+        "model_fix"), responses that could not be repaired ("failed"), and
+        "regenerations_saved", the number of full regenerations avoided.
+    """
+    with _stats_lock:
+        stats = dict(_stats)
+    stats["regenerations_saved"] = sum(stats[stage] for stage in REPAIR_STAGES)
+    return stats
+
+
+def reset_repair_stats() -> None:
+    """Reset the counters returned by repair_stats()."""
+    with _stats_lock:
+        for stage in _stats:
+            _stats[stage] = 0
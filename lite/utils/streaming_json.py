@@ -0,0 +1,253 @@
+import json
+import logging
+import typing
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple, Type, Union
+
+from pydantic import BaseModel, TypeAdapter, ValidationError
+
+logger = logging.getLogger(__name__)
+
+PathType = Tuple[Union[str, int], ...]
+
+
+@dataclass
+class PartialItem:
+    """A value that became complete while a JSON document was streaming in.
+
+    Attributes:
+        path: Location of the value, e.g. ("levels", 0, "chapters", 2).
+            The empty path () denotes the complete top-level document.
+        value: The decoded value, validated against the schema when its type is known.
+    """
+
+    path: PathType
+    value: Any
+
+
+class StreamingJSONParser:
+    """Incremental JSON parser that emits list elements as soon as they close.
+
+    Text is fed in arbitrary chunks (e.g. streamed completion deltas). Any text
+    before the first '{' or '[' (such as a markdown fence) is skipped. Every time
+    an element of an array is complete, it is decoded and, when a response_format
+    is given, validated against the element type declared in the schema, so
+    downstream consumers can start on early items before the model finishes.
+
+    Example:
+        >>> parser = StreamingJSONParser(BookChaptersModel)
+        >>> for delta in client.stream_text(model_input):
+        ...     for item in parser.feed(delta):
+        ...         if item.path[-2:-1] == ("chapters",):
+        ...             write_chapter(item.value)
+    """
+
+    def __init__(self, response_format: Optional[Type[BaseModel]] = None):
+        """
+        Initialize the parser.
+
+        Args:
+            response_format: Optional Pydantic model describing the document.
+        """
+        self.response_format = response_format
+        self._buffer: List[str] = []
+        self._pos = 0
+        self._stack: List[Dict[str, Any]] = []
+        self._started = False
+        self._done = False
+        self._in_string = False
+        self._escape = False
+        self._string_start = 0
+        self._adapters: Dict[Any, Optional[TypeAdapter]] = {}
+
+    @property
+    def done(self) -> bool:
+        """Whether the top-level JSON value has been closed."""
+        return self._done
+
+    @property
+    def text(self) -> str:
+        """The JSON text consumed so far, starting at the top-level value."""
+        return "".join(self._buffer)
+
+    def feed(self, chunk: str) -> List[PartialItem]:
+        """
+        Consume a chunk of text.
+
+        Args:
+            chunk: Next piece of the streamed response.
+
+        Returns:
+            list: PartialItem for every array element completed by this chunk.
+        """
+        items: List[PartialItem] = []
+        for char in chunk:
+            if self._done:
+                break
+            if not self._started:
+                if char not in "{[":
+                    continue
+                self._started = True
+            self._buffer.append(char)
+            self._consume(char, items)
+            self._pos += 1
+        return items
+
+    def _consume(self, char: str, items: List[PartialItem]) -> None:
+        """Advance the state machine by one character at buffer offset self._pos."""
+        pos = self._pos
+        if self._in_string:
+            if self._escape:
+                self._escape = False
+            elif char == "\\":
+                self._escape = True
+            elif char == '"':
+                self._in_string = False
+                self._end_string(pos, items)
+            return
+
+        frame = self._stack[-1] if self._stack else None
+        if char == '"':
+            self._begin_value(pos)
+            self._in_string = True
+            self._string_start = pos
+        elif char in "{[":
+            self._begin_value(pos)
+            self._stack.append({
+                "type": "object" if char == "{" else "array",
+                "key": None,
+                "expect": "key" if char == "{" else "value",
+                "index": 0,
+                "start": None,
+                "emitted": False,
+            })
+        elif char in "}]":
+            self._end_scalar(pos, items)
+            self._stack.pop()
+            if not self._stack:
+                self._done = True
+                return
+            parent = self._stack[-1]
+            if parent["type"] == "array":
+                self._emit(parent, pos + 1, items)
+        elif frame is None:
+            return
+        elif char == ":" and frame["type"] == "object":
+            frame["expect"] = "value"
+        elif char == ",":
+            self._end_scalar(pos, items)
+            if frame["type"] == "object":
+                frame["expect"] = "key"
+            else:
+                frame["index"] += 1
+            frame["start"] = None
+            frame["emitted"] = False
+        elif not char.isspace():
+            self._begin_value(pos)
+
+    def _begin_value(self, pos: int) -> None:
+        """Record where a value starts inside the current array frame."""
+        if not self._stack:
+            return
+        frame = self._stack[-1]
+        if frame["type"] == "array" and frame["start"] is None:
+            frame["start"] = pos
+
+    def _end_string(self, pos: int, items: List[PartialItem]) -> None:
+        """Handle a closing quote: store an object key or emit an array string."""
+        if not self._stack:
+            return
+        frame = self._stack[-1]
+        if frame["type"] == "object" and frame["expect"] == "key":
+            frame["key"] = json.loads("".join(self._buffer[self._string_start:pos + 1]))
+        elif frame["type"] == "array":
+            self._emit(frame, pos + 1, items)
+
+    def _end_scalar(self, pos: int, items: List[PartialItem]) -> None:
+        """Emit a pending number or literal element terminated by ',' or a closing bracket."""
+        frame = self._stack[-1] if self._stack else None
+        if frame is not None and frame["type"] == "array":
+            self._emit(frame, pos, items)
+
+    def _emit(self, frame: Dict[str, Any], end: int, items: List[PartialItem]) -> None:
+        """Decode the element of an array frame ending at buffer offset end."""
+        if frame["start"] is None or frame["emitted"]:
+            return
+        frame["emitted"] = True
+        raw = "".join(self._buffer[frame["start"]:end]).strip()
+        try:
+            value = json.loads(raw)
+        except json.JSONDecodeError:
+            logger.debug(f"Skipping undecodable array element: {raw[:100]}")
+            return
+
+        path = self._current_path()
+        adapter = self._adapter_for(path)
+        if adapter is not None:
+            try:
+                value = adapter.validate_python(value)
+            except ValidationError as e:
+                logger.debug(f"Array element at {path} failed validation: {e}")
+                return
+        items.append(PartialItem(path=path, value=value))
+
+    def _current_path(self) -> PathType:
+        """Return the path of the value currently being parsed."""
+        path: List[Union[str, int]] = []
+        for frame in self._stack:
+            path.append(frame["key"] if frame["type"] == "object" else frame["index"])
+        return tuple(path)
+
+    def _adapter_for(self, path: PathType) -> Optional[TypeAdapter]:
+        """Return a TypeAdapter for the schema type at path, or None if unknown."""
+        if self.response_format is None:
+            return None
+        annotation = _resolve_type(self.response_format, path)
+        if annotation is None:
+            return None
+        if annotation not in self._adapters:
+            try:
+                self._adapters[annotation] = TypeAdapter(annotation)
+            except Exception:
+                self._adapters[annotation] = None
+        return self._adapters[annotation]
+
+
+def _unwrap_optional(annotation: Any) -> Any:
+    """Strip Optional[...] from an annotation."""
+    if typing.get_origin(annotation) is Union:
+        args = [arg for arg in typing.get_args(annotation) if arg is not type(None)]
+        if len(args) == 1:
+            return args[0]
+    return annotation
+
+
+def _resolve_type(model: Type[BaseModel], path: PathType) -> Any:
+    """
+    Walk a Pydantic model's annotations along a path of field names and indices.
+
+    Returns:
+        The annotation at the end of the path, or None if it cannot be resolved.
+    """
+    annotation: Any = model
+    for step in path:
+        annotation = _unwrap_optional(annotation)
+        if isinstance(step, str):
+            if not (isinstance(annotation, type) and issubclass(annotation, BaseModel)):
+                return None
+            field = annotation.model_fields.get(step)
+            if field is None:
+                field = next(
+                    (f for f in annotation.model_fields.values() if f.alias == step), None
+                )
+            if field is None:
+                return None
+            annotation = field.annotation
+        else:
+            if typing.get_origin(annotation) not in (list, tuple, set, frozenset):
+                return None
+            args = typing.get_args(annotation)
+            if not args:
+                return None
+            annotation = args[0]
+    return _unwrap_optional(annotation)
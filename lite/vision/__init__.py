@@ -15,6 +15,8 @@ from .validation import (
 )
 from .io import (
     encode_to_base64,
+    clear_encode_cache,
+    encode_cache_stats,
     b64_to_pil,
     pil_to_b64,
     cv2_to_pil,
@@ -27,6 +29,7 @@ from .processing import (
     create_blank_image,
     create_random_image,
     create_gradient_image,
+    fit_images_to_payload,
     resize_images_to_fit,
     square_image,
     resize_to_dimensions,
@@ -52,6 +55,8 @@ __all__ = [
     "is_valid_size",
     "is_valid_dimensions",
     "encode_to_base64",
+    "clear_encode_cache",
+    "encode_cache_stats",
     "b64_to_pil",
     "pil_to_b64",
     "cv2_to_pil",
@@ -62,6 +67,7 @@ __all__ = [
     "create_blank_image",
     "create_random_image",
     "create_gradient_image",
+    "fit_images_to_payload",
     "resize_images_to_fit",
     "square_image",
     "resize_to_dimensions",
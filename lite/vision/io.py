@@ -1,8 +1,11 @@
 """Image I/O and base64 conversion utilities."""
 
 import base64
+import hashlib
 import io
 import logging
+import threading
+from collections import OrderedDict
 from pathlib import Path
 from typing import List, Literal, Union, Dict, Optional
 import cv2
@@ -10,21 +13,41 @@ import numpy as np
 from PIL import Image
 from datetime import datetime
 
+from ..cache import LRUCache
 from .core import (
-    IMAGE_MIME_TYPE, 
+    IMAGE_MIME_TYPE,
+    MAX_IMAGE_SIZE_BYTES,
     _is_url, 
     _download_from_url, 
     _convert_to_rgb,
     _validate_file_exists
 )
-from .validation import is_valid_image, is_valid_dimensions, is_valid_size
+from .validation import is_valid_image, is_valid_dimensions
 
 logger = logging.getLogger(__name__)
 
-def encode_to_base64(image_path: str) -> str:
+# Cache of encoded data URIs keyed by SHA-256 of the file contents
+ENCODE_CACHE_MAX_BYTES = 256 * 1024 * 1024
+# Number of file paths whose (mtime, size, digest) are remembered
+ENCODE_INDEX_MAX_ENTRIES = 4096
+
+_encode_cache = LRUCache(max_bytes=ENCODE_CACHE_MAX_BYTES)
+_encode_index: "OrderedDict[str, tuple]" = OrderedDict()
+_encode_index_lock = threading.Lock()
+
+def encode_to_base64(image_path: str, use_cache: bool = True) -> str:
     """
     Convert an image file to base64 encoding.
+
+    The file is read once and validated from the same bytes. Encoded data URIs
+    are cached by content hash; a path is only re-read when its mtime or size
+    changes, so repeated encodes of the same image (multi-turn chats, batch runs)
+    skip both the decode and the base64 step.
     """
+    if image_path.startswith("data:image/"):
+        # Already encoded, e.g. by resize_images_to_fit
+        return image_path
+
     if _is_url(image_path):
         image_path = _download_from_url(image_path)
 
@@ -36,18 +59,51 @@ def encode_to_base64(image_path: str) -> str:
     if not is_valid_image(path):
         raise ValueError(f"File is not a valid image: {image_path}")
 
-    if not is_valid_dimensions(path):
-        raise ValueError(f"Image dimensions too small: {image_path}")
-
-    if not is_valid_size(path):
+    stat = path.stat()
+    if stat.st_size > MAX_IMAGE_SIZE_BYTES:
         raise ValueError(f"Image file too large: {image_path}")
 
-    with open(path, "rb") as file:
-        file_data = file.read()
+    index_key = str(path.resolve())
+    if use_cache:
+        with _encode_index_lock:
+            entry = _encode_index.get(index_key)
+        if entry is not None and entry[:2] == (stat.st_mtime_ns, stat.st_size):
+            base64_url = _encode_cache.get(entry[2])
+            if base64_url is not None:
+                return base64_url
+
+    file_data = path.read_bytes()
+    if not is_valid_dimensions(file_data):
+        raise ValueError(f"Image dimensions too small: {image_path}")
+
+    digest = hashlib.sha256(file_data).hexdigest()
+    base64_url = _encode_cache.get(digest) if use_cache else None
+    if base64_url is None:
         encoded_file = base64.b64encode(file_data).decode("utf-8")
         base64_url = f"data:{IMAGE_MIME_TYPE};base64,{encoded_file}"
+
+    if use_cache:
+        _encode_cache.put(digest, base64_url)
+        with _encode_index_lock:
+            _encode_index[index_key] = (stat.st_mtime_ns, stat.st_size, digest)
+            _encode_index.move_to_end(index_key)
+            while len(_encode_index) > ENCODE_INDEX_MAX_ENTRIES:
+                _encode_index.popitem(last=False)
     return base64_url
 
+def clear_encode_cache() -> None:
+    """Drop all cached base64 encodings."""
+    _encode_cache.clear()
+    with _encode_index_lock:
+        _encode_index.clear()
+
+def encode_cache_stats() -> Dict:
+    """Return hit/miss and size counters of the base64 encoding cache."""
+    stats = _encode_cache.stats()
+    with _encode_index_lock:
+        stats["indexed_paths"] = len(_encode_index)
+    return stats
+
 def b64_to_pil(b64_string: str) -> Image.Image:
     """
     Convert base64 encoded image to PIL Image object.
@@ -1,14 +1,21 @@
 """Image transformation and processing functions."""
 
+import base64
 import logging
 import io
 import numpy as np
+import os
 import random
+import threading
+from collections import OrderedDict
+from concurrent.futures import Executor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
-from typing import List, Literal, Tuple, Union
+from typing import Dict, List, Literal, Optional, Tuple, Union
 from PIL import Image
 
 from .core import (
+    IMAGE_MIME_TYPE,
     MIN_IMAGE_DIMENSION,
     MAX_TOTAL_IMAGE_PAYLOAD_BYTES,
     _convert_to_rgb
@@ -75,51 +82,244 @@ def _estimate_base64_size(data: bytes) -> int:
     """Estimate the base64 encoded size of binary data."""
     return int(len(data) * 4 / 3) + 50
 
+# Search bounds for fitting images into the request payload
+MAX_FIT_QUALITY = 85
+MIN_FIT_QUALITY = 10
+MIN_FIT_SCALE = 0.1
+FIT_SCALE_TOLERANCE = 0.02
+
+# Upper bound on the decoded pixels each process keeps between encodes
+DECODED_CACHE_MAX_BYTES = 256 * 1024 * 1024
+# Seconds a pool worker keeps its decoded images after its last encode
+DECODED_IDLE_SECONDS = 2.0
+
+# Decoded source images per process, keyed by (path, mtime, size), least recently used first
+_decoded_images: "OrderedDict[Tuple[str, int, int], Image.Image]" = OrderedDict()
+_decoded_bytes = 0
+_decoded_lock = threading.Lock()
+
+def _decoded_size(img: Image.Image) -> int:
+    return img.width * img.height * len(img.getbands())
+
+def _load_rgb(image_path: str) -> Image.Image:
+    """
+    Decode an image in RGB, reusing recent decodes for repeated encodes.
+
+    The cache holds at most DECODED_CACHE_MAX_BYTES of pixels (always the
+    image just decoded), so a worker that sees every image of a large batch
+    does not keep them all.
+    """
+    global _decoded_bytes
+    stat = os.stat(image_path)
+    key = (image_path, stat.st_mtime_ns, stat.st_size)
+    with _decoded_lock:
+        img = _decoded_images.get(key)
+        if img is not None:
+            _decoded_images.move_to_end(key)
+            return img
+    with Image.open(image_path) as source:
+        img = _convert_to_rgb(source)
+        img.load()
+    with _decoded_lock:
+        if key not in _decoded_images:
+            _decoded_images[key] = img
+            _decoded_bytes += _decoded_size(img)
+        while _decoded_bytes > DECODED_CACHE_MAX_BYTES and len(_decoded_images) > 1:
+            _, evicted = _decoded_images.popitem(last=False)
+            _decoded_bytes -= _decoded_size(evicted)
+    return img
+
+def _clear_decoded() -> None:
+    """Drop this process's decoded images."""
+    global _decoded_bytes
+    with _decoded_lock:
+        _decoded_images.clear()
+        _decoded_bytes = 0
+
+# Timer in a pool worker that drops its decoded images once the worker is idle
+_idle_timer: Optional[threading.Timer] = None
+
+def _encode_in_worker(image_path: str, quality: int, scale_factor: float) -> bytes:
+    """
+    _resize_image_to_quality for pool workers.
+
+    The probes of one fit run back to back and reuse the worker's decodes; once
+    no task has arrived for DECODED_IDLE_SECONDS the worker frees them, so the
+    long-lived pool does not hold decoded pixels between calls.
+    """
+    global _idle_timer
+    if _idle_timer is not None:
+        _idle_timer.cancel()
+    try:
+        return _resize_image_to_quality(image_path, quality, scale_factor)
+    finally:
+        _idle_timer = threading.Timer(DECODED_IDLE_SECONDS, _clear_decoded)
+        _idle_timer.daemon = True
+        _idle_timer.start()
+
+# Encoding pools reused across calls, keyed by max_workers, so workers (and
+# their imports on spawn platforms) are started once per process
+_pools: Dict[Optional[int], ProcessPoolExecutor] = {}
+_pools_lock = threading.Lock()
+
+def _get_pool(max_workers: Optional[int]) -> ProcessPoolExecutor:
+    """Return the shared encoding pool for a worker count, starting it on first use."""
+    with _pools_lock:
+        pool = _pools.get(max_workers)
+        if pool is None:
+            pool = ProcessPoolExecutor(max_workers=max_workers)
+            _pools[max_workers] = pool
+        return pool
+
+def _discard_pool(max_workers: Optional[int], pool: ProcessPoolExecutor) -> None:
+    """Forget a broken pool so the next call starts a new one."""
+    with _pools_lock:
+        if _pools.get(max_workers) is pool:
+            del _pools[max_workers]
+    pool.shutdown(wait=False)
+
+def shutdown_encoding_pools() -> None:
+    """Stop the shared encoding worker processes."""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.shutdown()
+
+def _reset_after_fork() -> None:
+    """Pools and timers inherited from the parent cannot be used in a forked child."""
+    global _pools_lock, _decoded_lock, _idle_timer
+    _pools_lock = threading.Lock()
+    _decoded_lock = threading.Lock()
+    _idle_timer = None
+    _pools.clear()
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
 def _resize_image_to_quality(image_path: str, quality: int = 85, scale_factor: float = 1.0) -> bytes:
     """Resize and compress an image to specified quality and dimensions."""
-    with Image.open(image_path) as img:
-        if scale_factor < 1.0:
-            new_width = max(MIN_IMAGE_DIMENSION, int(img.width * scale_factor))
-            new_height = max(MIN_IMAGE_DIMENSION, int(img.height * scale_factor))
-            img = img.resize((new_width, new_height), Image.Resampling.LANCZOS)
-        
-        img = _convert_to_rgb(img)
-        output = io.BytesIO()
-        img.save(output, format="JPEG", quality=quality, optimize=True)
-        return output.getvalue()
+    img = _load_rgb(image_path)
+    if scale_factor < 1.0:
+        new_width = max(MIN_IMAGE_DIMENSION, int(img.width * scale_factor))
+        new_height = max(MIN_IMAGE_DIMENSION, int(img.height * scale_factor))
+        img = img.resize((new_width, new_height), Image.Resampling.LANCZOS)
+
+    output = io.BytesIO()
+    img.save(output, format="JPEG", quality=quality, optimize=True)
+    return output.getvalue()
+
+def _encode_all(
+    image_paths: List[str], quality: int, scale_factor: float, executor: Optional[Executor]
+) -> List[bytes]:
+    """Re-encode every image at one quality/scale setting, in parallel if an executor is given."""
+    n = len(image_paths)
+    if executor is None:
+        return [_resize_image_to_quality(path, quality, scale_factor) for path in image_paths]
+    return list(executor.map(_encode_in_worker, image_paths, [quality] * n, [scale_factor] * n))
+
+def _payload_size(images: List[bytes]) -> int:
+    """Return the estimated base64 payload size of encoded images."""
+    return sum(_estimate_base64_size(data) for data in images)
+
+def fit_images_to_payload(
+    image_paths: List[str],
+    max_payload_bytes: int = MAX_TOTAL_IMAGE_PAYLOAD_BYTES,
+    max_workers: Optional[int] = None,
+) -> List[bytes]:
+    """
+    Re-encode images as JPEG so their combined base64 payload fits the limit.
+
+    The highest JPEG quality that fits is found by bisection at full scale. If
+    even the minimum quality is too large, the largest scale factor that fits at
+    minimum quality is bisected instead. Each probe encodes all images in a
+    process pool shared by every call, and results stay in memory.
 
-def resize_images_to_fit(image_paths: List[str]) -> List[str]:
-    """Automatically resize images so total payload doesn't exceed limit."""
+    Args:
+        image_paths: Paths of the images to encode.
+        max_payload_bytes: Limit on the combined base64 size.
+        max_workers: Worker processes for encoding. 1 encodes in-process.
+
+    Returns:
+        list: Encoded JPEG bytes, one entry per input path.
+
+    Raises:
+        ValueError: If the images cannot fit even at minimum quality and scale.
+    """
+    if not image_paths:
+        return []
+
+    use_pool = len(image_paths) > 1 and max_workers != 1
+    executor = _get_pool(max_workers) if use_pool else None
+    try:
+        def probe(quality: int, scale_factor: float) -> Optional[List[bytes]]:
+            images = _encode_all(image_paths, quality, scale_factor, executor)
+            return images if _payload_size(images) <= max_payload_bytes else None
+
+        best = probe(MAX_FIT_QUALITY, 1.0)
+        if best is not None:
+            return best
+
+        best = probe(MIN_FIT_QUALITY, 1.0)
+        if best is not None:
+            # Largest quality in (MIN, MAX) that still fits
+            low, high = MIN_FIT_QUALITY, MAX_FIT_QUALITY
+            while high - low > 1:
+                mid = (low + high) // 2
+                images = probe(mid, 1.0)
+                if images is not None:
+                    low, best = mid, images
+                else:
+                    high = mid
+            return best
+
+        best = probe(MIN_FIT_QUALITY, MIN_FIT_SCALE)
+        if best is None:
+            raise ValueError("Cannot resize images to fit within limit.")
+        # Largest scale in (MIN_FIT_SCALE, 1.0) that fits at minimum quality
+        low, high = MIN_FIT_SCALE, 1.0
+        while high - low > FIT_SCALE_TOLERANCE:
+            mid = (low + high) / 2
+            images = probe(MIN_FIT_QUALITY, mid)
+            if images is not None:
+                low, best = mid, images
+            else:
+                high = mid
+        return best
+    except BrokenProcessPool:
+        _discard_pool(max_workers, executor)
+        raise
+    finally:
+        # In-process encodes cached their decodes here; workers free theirs when idle
+        _clear_decoded()
+
+def resize_images_to_fit(image_paths: List[str], max_workers: Optional[int] = None) -> List[str]:
+    """
+    Automatically resize images so total payload doesn't exceed limit.
+
+    Returns the original paths when they already fit. Otherwise the images are
+    re-encoded in memory (see fit_images_to_payload) and returned as JPEG data
+    URIs, which encode_to_base64 and ModelInput.image_paths accept as-is. No
+    files are written.
+    """
     total_size = 0
     for path in image_paths:
-        with open(path, "rb") as f:
-            total_size += _estimate_base64_size(f.read())
+        total_size += _estimate_base64_size_of_file(path)
 
     if total_size <= MAX_TOTAL_IMAGE_PAYLOAD_BYTES:
         return image_paths
 
-    quality = 85
-    scale_factor = 1.0
-    while quality > 10 or scale_factor < 1.0:
-        resized_data = []
-        total_resized_size = 0
-        for path in image_paths:
-            compressed = _resize_image_to_quality(path, quality, scale_factor)
-            resized_data.append(compressed)
-            total_resized_size += _estimate_base64_size(compressed)
-
-        if total_resized_size <= MAX_TOTAL_IMAGE_PAYLOAD_BYTES:
-            temp_paths = []
-            for i, data in enumerate(resized_data):
-                temp_path = Path(image_paths[i]).parent / f".{Path(image_paths[i]).stem}_resized_{quality}.jpg"
-                with open(temp_path, "wb") as f:
-                    f.write(data)
-                temp_paths.append(str(temp_path))
-            return temp_paths
-
-        if quality > 10: quality -= 5
-        else: scale_factor -= 0.1
-    raise ValueError("Cannot resize images to fit within limit.")
+    images = fit_images_to_payload(
+        image_paths, max_payload_bytes=MAX_TOTAL_IMAGE_PAYLOAD_BYTES, max_workers=max_workers
+    )
+    return [
+        f"data:{IMAGE_MIME_TYPE};base64,{base64.b64encode(data).decode('utf-8')}"
+        for data in images
+    ]
+
+def _estimate_base64_size_of_file(path: str) -> int:
+    """Estimate the base64 encoded size of a file from its size on disk."""
+    return int(Path(path).stat().st_size * 4 / 3) + 50
 
 def square_image(image_path: str, max_size: int, background_color: Tuple[int, int, int], position: Literal["top-left", "center"] = "center") -> Image.Image:
     """Create a square image with specified background color and positioned image."""
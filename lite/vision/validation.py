@@ -1,7 +1,9 @@
 """Validation functions for image files and data."""
 
+import io
 import logging
 from pathlib import Path
+from typing import Union
 from PIL import Image
 from .core import MAX_IMAGE_SIZE_BYTES, MIN_IMAGE_DIMENSION
 
@@ -20,12 +22,16 @@ def is_valid_size(path: Path) -> bool:
     """
     return path.stat().st_size <= MAX_IMAGE_SIZE_BYTES
 
-def is_valid_dimensions(path: Path) -> bool:
+def is_valid_dimensions(path: Union[Path, bytes]) -> bool:
     """
     Check if image dimensions meet minimum requirement.
+
+    Accepts a file path or the already-read file contents; only the image
+    header is decoded.
     """
     try:
-        with Image.open(path) as img:
+        source = io.BytesIO(path) if isinstance(path, (bytes, bytearray)) else path
+        with Image.open(source) as img:
             width, height = img.size
             return width >= MIN_IMAGE_DIMENSION and height >= MIN_IMAGE_DIMENSION
     except Exception as e:
@@ -0,0 +1,177 @@
+import time
+import pytest
+from unittest.mock import patch, MagicMock
+from pydantic import BaseModel
+
+from lite.cache import CompletionCache, LRUCache, TieredCache, make_cache_key
+from lite.config import ModelConfig, ModelInput
+from lite.lite_client import LiteClient
+
+class Answer(BaseModel):
+    answer: str
+
+class OtherAnswer(BaseModel):
+    text: str
+
+@pytest.fixture
+def cache(tmp_path):
+    c = CompletionCache(db_path=str(tmp_path / "cache.lmdb"), capacity_mb=10)
+    yield c
+    c.close()
+
+def _response(content):
+    response = MagicMock()
+    response.choices[0].message.content = content
+    return response
+
+def test_cache_key_is_stable_and_sensitive():
+    messages = [{"role": "user", "content": "hi"}]
+    key = make_cache_key("gpt-4", 0.2, messages, Answer)
+    assert key == make_cache_key("gpt-4", 0.2, [{"role": "user", "content": "hi"}], Answer)
+    assert key != make_cache_key("gpt-4", 0.3, messages, Answer)
+    assert key != make_cache_key("gpt-3.5", 0.2, messages, Answer)
+    assert key != make_cache_key("gpt-4", 0.2, messages, OtherAnswer)
+    assert key != make_cache_key("gpt-4", 0.2, messages, None)
+
+def test_get_put_and_counters(cache):
+    assert cache.get("k") is None
+    assert cache.put("k", "value") is True
+    assert cache.get("k") == "value"
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["entries"] == 1
+    assert stats["hit_rate"] == 0.5
+
+def test_ttl_expiry(tmp_path):
+    with CompletionCache(db_path=str(tmp_path / "ttl.lmdb"), ttl_seconds=10) as cache:
+        cache.put("k", "value")
+        with patch("lite.cache.time.time", return_value=time.time() + 60):
+            assert cache.get("k") is None
+        assert cache.stats()["expired"] == 1
+        assert cache.stats()["entries"] == 0
+
+def test_eviction_removes_oldest(tmp_path):
+    with CompletionCache(db_path=str(tmp_path / "evict.lmdb"), max_entries=5) as cache:
+        for i in range(6):
+            with patch("lite.cache.time.time", return_value=1000.0 + i):
+                cache.put(f"k{i}", f"v{i}")
+        stats = cache.stats()
+        assert stats["entries"] <= 5
+        assert stats["evictions"] >= 1
+        assert cache.get("k0") is None
+        assert cache.get("k5") == "v5"
+
+def test_invalid_config(tmp_path):
+    with pytest.raises(ValueError, match="ttl_seconds"):
+        CompletionCache(db_path=str(tmp_path / "a.lmdb"), ttl_seconds=0)
+    with pytest.raises(ValueError, match="max_entries"):
+        CompletionCache(db_path=str(tmp_path / "b.lmdb"), max_entries=0)
+
+@patch("lite.lite_client.completion")
+def test_client_serves_repeated_prompt_from_cache(mock_completion, cache):
+    mock_completion.return_value = _response('{"answer": "Paris"}')
+    client = LiteClient(model_config=ModelConfig(model="gpt-4"), cache=cache)
+    model_input = ModelInput(user_prompt="Capital of France?", response_format=Answer)
+
+    first = client.generate_text(model_input)
+    second = client.generate_text(model_input)
+    assert first == second == Answer(answer="Paris")
+    assert mock_completion.call_count == 1
+    assert cache.stats()["hits"] == 1
+
+@patch("lite.lite_client.completion")
+def test_client_does_not_cache_unparseable_output(mock_completion, cache):
+    mock_completion.return_value = _response("not json")
+    client = LiteClient(model_config=ModelConfig(model="gpt-4"), cache=cache, repair_json=False)
+    model_input = ModelInput(user_prompt="Capital of France?", response_format=Answer)
+
+    assert client.generate_text(model_input) == "not json"
+    assert client.generate_text(model_input) == "not json"
+    assert mock_completion.call_count == 2
+    assert cache.stats()["entries"] == 0
+
+@patch("lite.lite_client.completion")
+def test_client_does_not_cache_errors(mock_completion, cache):
+    mock_completion.side_effect = Exception("API Error")
+    client = LiteClient(model_config=ModelConfig(model="gpt-4"), cache=cache)
+
+    assert client.generate_text(ModelInput(user_prompt="hi"), retries=0) == "API Error"
+    assert cache.stats()["entries"] == 0
+
+def test_lru_evicts_by_bytes():
+    memory = LRUCache(max_bytes=30)
+    assert memory.put("a", "x" * 9) is True  # 10 bytes
+    assert memory.put("b", "y" * 9) is True
+    assert memory.get("a") == "x" * 9  # "a" becomes most recently used
+    assert memory.put("c", "z" * 14) is True  # needs to evict "b"
+    assert memory.get("b") is None
+    assert memory.get("a") == "x" * 9
+    stats = memory.stats()
+    assert stats["bytes"] <= 30
+    assert stats["evictions"] == 1
+    assert memory.put("huge", "h" * 100) is False
+
+def test_lru_replace_updates_size():
+    memory = LRUCache(max_bytes=100)
+    memory.put("k", "short")
+    memory.put("k", "a much longer value")
+    assert memory.stats()["bytes"] == len("k") + len("a much longer value")
+    assert len(memory) == 1
+
+def test_tiered_cache_promotes_and_skips_persistent(cache):
+    tiered = TieredCache(cache, LRUCache(max_bytes=1024))
+    cache.put("k", "value")
+    assert tiered.get("k") == "value"  # persistent hit, promoted
+    with patch.object(cache.storage, "get", side_effect=AssertionError("LMDB touched")):
+        assert tiered.get("k") == "value"
+    stats = tiered.stats()
+    assert stats["memory"]["hits"] == 1
+    assert stats["persistent"]["hits"] == 1
+
+def test_tiered_cache_memory_hits_follow_persistent_ttl(tmp_path):
+    with CompletionCache(db_path=str(tmp_path / "ttl.lmdb"), ttl_seconds=10) as persistent:
+        tiered = TieredCache(persistent, LRUCache(max_bytes=1024))
+        tiered.put("k", "value")
+        assert tiered.get("k") == "value"
+        with patch("lite.cache.time.time", return_value=time.time() + 60):
+            assert tiered.get("k") is None
+        assert len(tiered.memory) == 0
+        assert persistent.stats()["expired"] == 1
+
+def test_tiered_cache_drops_entries_evicted_from_persistent(tmp_path):
+    with CompletionCache(db_path=str(tmp_path / "evict.lmdb"), max_entries=5) as persistent:
+        tiered = TieredCache(persistent, LRUCache(max_bytes=1024))
+        for i in range(6):
+            with patch("lite.cache.time.time", return_value=1000.0 + i):
+                tiered.put(f"k{i}", f"v{i}")
+        assert persistent.get("k0") is None
+        assert tiered.get("k0") is None
+        assert tiered.get("k5") == "v5"
+
+@patch("lite.lite_client.completion")
+def test_client_with_tiered_cache(mock_completion, cache):
+    mock_completion.return_value = _response("Paris")
+    tiered = TieredCache(cache)
+    client = LiteClient(model_config=ModelConfig(model="gpt-4"), cache=tiered)
+    model_input = ModelInput(user_prompt="Capital of France?")
+
+    assert client.generate_text(model_input) == "Paris"
+    assert client.generate_text(model_input) == "Paris"
+    assert mock_completion.call_count == 1
+    assert tiered.stats()["memory"]["hits"] == 1
+
+@patch("lite.lite_client.completion")
+def test_stream_populates_and_reads_cache(mock_completion, cache):
+    chunks = []
+    for text in ["Pa", "ris"]:
+        chunk = MagicMock()
+        chunk.choices[0].delta.content = text
+        chunks.append(chunk)
+    mock_completion.return_value = iter(chunks)
+    client = LiteClient(model_config=ModelConfig(model="gpt-4"), cache=cache)
+    model_input = ModelInput(user_prompt="Capital of France?")
+
+    assert list(client.stream_text(model_input)) == ["Pa", "ris"]
+    assert list(client.stream_text(model_input)) == ["Paris"]
+    assert mock_completion.call_count == 1
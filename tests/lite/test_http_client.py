@@ -0,0 +1,132 @@
+import asyncio
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+import litellm
+import pytest
+
+from lite import LiteClient, ModelConfig
+from lite.config import HTTPClientConfig, ModelInput
+from lite.http_client import (
+    close_http_clients,
+    configure_http_client,
+    install_async_http_client,
+    install_http_client,
+)
+
+
+@pytest.fixture(autouse=True)
+def reset_sessions():
+    close_http_clients()
+    litellm.client_session = None
+    litellm.aclient_session = None
+    yield
+    close_http_clients()
+    litellm.client_session = None
+    litellm.aclient_session = None
+
+
+def test_install_is_idempotent():
+    first = install_http_client()
+    assert isinstance(first, httpx.Client)
+    assert install_http_client() is first
+    assert litellm.client_session is first
+
+
+def test_install_keeps_application_session():
+    own = httpx.Client()
+    litellm.client_session = own
+    assert install_http_client() is None
+    assert litellm.client_session is own
+    own.close()
+
+
+def test_configure_replaces_client():
+    first = install_http_client()
+    second = configure_http_client(HTTPClientConfig(max_keepalive_connections=5, http2=False))
+    assert second is not first
+    assert first.is_closed
+    assert litellm.client_session is second
+    assert install_http_client() is second
+
+
+def test_config_validation():
+    with pytest.raises(ValueError):
+        HTTPClientConfig(max_connections=0)
+    with pytest.raises(ValueError):
+        HTTPClientConfig(max_connections=10, max_keepalive_connections=20)
+
+
+def test_async_client_per_event_loop():
+    async def install():
+        first = install_async_http_client()
+        assert install_async_http_client() is first
+        return first
+
+    clients = [asyncio.run(install()), asyncio.run(install())]
+    assert all(isinstance(client, httpx.AsyncClient) for client in clients)
+    assert clients[0] is not clients[1]
+
+
+def test_async_keeps_application_session():
+    own = httpx.AsyncClient()
+    litellm.aclient_session = own
+
+    async def install():
+        return install_async_http_client()
+
+    assert asyncio.run(install()) is None
+    assert litellm.aclient_session is own
+
+
+class _CountingServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), _CompletionHandler)
+        self.connections = 0
+
+    def get_request(self):
+        self.connections += 1
+        return super().get_request()
+
+
+class _CompletionHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        body = json.dumps({
+            "id": "stub", "object": "chat.completion", "created": 0, "model": "stub",
+            "choices": [{"index": 0, "finish_reason": "stop",
+                         "message": {"role": "assistant", "content": "ok"}}],
+            "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2},
+        }).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def test_lite_clients_reuse_connection(monkeypatch):
+    server = _CountingServer()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    monkeypatch.setenv("OPENAI_API_BASE", f"http://127.0.0.1:{server.server_port}/v1")
+    monkeypatch.setenv("OPENAI_API_KEY", "stub")
+    try:
+        configure_http_client(HTTPClientConfig(http2=False))
+        for _ in range(2):
+            client = LiteClient(ModelConfig(model="openai/stub", temperature=0.0))
+            for i in range(3):
+                assert client.generate_text(ModelInput(user_prompt=f"ping {i}")) == "ok"
+        assert server.connections == 1
+    finally:
+        server.shutdown()
+        server.server_close()
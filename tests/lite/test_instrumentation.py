@@ -0,0 +1,201 @@
+import asyncio
+import json
+from unittest.mock import MagicMock, patch
+
+import pytest
+from pydantic import BaseModel
+
+from lite import LiteClient, LRUCache, ModelConfig
+from lite.config import ChatConfig, ModelInput
+from lite.lite_chat import LiteChat
+from lite.instrumentation import (
+    CallRecord,
+    InMemoryAggregator,
+    JSONLSink,
+    PrometheusSink,
+    add_sink,
+    call_labels,
+    remove_sink,
+)
+
+
+class Answer(BaseModel):
+    answer: str
+
+
+def completion_response(content="ok", prompt_tokens=12, completion_tokens=3):
+    response = MagicMock()
+    response.choices[0].message.content = content
+    response.usage.prompt_tokens = prompt_tokens
+    response.usage.completion_tokens = completion_tokens
+    return response
+
+
+@pytest.fixture
+def aggregator():
+    sink = InMemoryAggregator()
+    add_sink(sink)
+    yield sink
+    remove_sink(sink)
+
+
+def make_client(**kwargs):
+    return LiteClient(ModelConfig(model="gpt-4o"), rate_limit=False, **kwargs)
+
+
+@patch("lite.lite_client.completion")
+def test_record_usage_and_timing(mock_completion, aggregator):
+    mock_completion.return_value = completion_response()
+    make_client().generate_text(ModelInput(user_prompt="hi"))
+
+    [record] = aggregator.records
+    assert record.model == "gpt-4o"
+    assert (record.prompt_tokens, record.completion_tokens, record.total_tokens) == (12, 3, 15)
+    assert record.attempts == 1 and record.retries == 0
+    assert record.ok and not record.cache_hit
+    assert record.parsed is None
+    assert record.network_seconds >= 0 and record.total_seconds >= record.network_seconds
+    assert record.labels["caller"] == __name__
+
+
+@patch("lite.lite_client.completion")
+def test_record_retries_parse_and_cache(mock_completion, aggregator):
+    mock_completion.side_effect = [Exception("boom"), completion_response('{"answer": "42"}')]
+    client = make_client(cache=LRUCache())
+    model_input = ModelInput(user_prompt="hi", response_format=Answer)
+
+    assert client.generate_text(model_input) == Answer(answer="42")
+    assert client.generate_text(model_input) == Answer(answer="42")
+
+    first, second = aggregator.records
+    assert first.retries == 1 and first.parsed is True and not first.cache_hit
+    assert second.cache_hit and second.parsed is True and second.total_tokens == 0
+
+
+@patch("lite.lite_client.completion")
+def test_failed_call_and_parse_failure(mock_completion, aggregator):
+    mock_completion.return_value = completion_response("not json")
+    client = make_client()
+    client.generate_text(ModelInput(user_prompt="hi", response_format=Answer))
+    mock_completion.side_effect = Exception("down")
+    client.generate_text(ModelInput(user_prompt="hi"), retries=1)
+
+    parsed, failed = aggregator.records
+    assert parsed.parsed is False and parsed.ok
+    assert failed.error == "down" and failed.attempts == 2
+
+
+@patch("lite.lite_client.acompletion")
+@patch("lite.lite_client.completion")
+def test_labels_follow_batches_and_async(mock_completion, mock_acompletion, aggregator):
+    mock_completion.return_value = completion_response()
+    mock_acompletion.return_value = completion_response()
+    client = make_client()
+
+    with call_labels(module="med_dictionary"):
+        list(client.generate_many([ModelInput(user_prompt=str(i)) for i in range(3)]))
+    with call_labels(module="med_codes"):
+        asyncio.run(client.agenerate_text(ModelInput(user_prompt="x")))
+
+    by_module = aggregator.summary(by="module")
+    assert by_module["med_dictionary"]["calls"] == 3
+    assert by_module["med_dictionary"]["total_tokens"] == 45
+    assert by_module["med_codes"]["calls"] == 1
+    assert set(aggregator.summary(by="caller")) == {__name__}
+
+
+@patch("lite.lite_client.completion")
+def test_stream_record(mock_completion, aggregator):
+    chunk = MagicMock()
+    chunk.choices[0].delta.content = "hello"
+    mock_completion.return_value = iter([chunk, chunk])
+    assert "".join(make_client().stream_text(ModelInput(user_prompt="hi"))) == "hellohello"
+
+    [record] = aggregator.records
+    assert record.stream and record.ok and record.attempts == 1
+
+
+@patch("lite.lite_client.completion")
+def test_failing_sink_does_not_break_calls(mock_completion, aggregator):
+    def broken(record):
+        raise RuntimeError("sink down")
+
+    add_sink(broken)
+    try:
+        mock_completion.return_value = completion_response()
+        assert make_client().generate_text(ModelInput(user_prompt="hi")) == "ok"
+    finally:
+        remove_sink(broken)
+    assert len(aggregator.records) == 1
+
+
+@patch("lite.lite_chat.completion")
+def test_lite_chat_calls_are_recorded(mock_completion, aggregator, tmp_path):
+    chat = LiteChat(ModelConfig(model="gpt-4o"), ChatConfig(save_dir=str(tmp_path)))
+    mock_completion.return_value = completion_response()
+    assert chat.generate_text(ModelInput(user_prompt="hi")) == "ok"
+    chunk = MagicMock()
+    chunk.choices[0].delta.content = "hello"
+    mock_completion.return_value = iter([chunk])
+    assert list(chat.stream_text(ModelInput(user_prompt="again"))) == ["hello"]
+    mock_completion.side_effect = Exception("down")
+    chat.generate_text(ModelInput(user_prompt="once more"))
+
+    plain, streamed, failed = aggregator.records
+    assert plain.total_tokens == 15 and plain.ok and not plain.stream
+    assert streamed.stream and streamed.ok and streamed.attempts == 1
+    assert failed.error == "down"
+    assert all(record.labels["caller"] == __name__ for record in aggregator.records)
+
+
+def test_aggregator_keeps_totals_not_records():
+    aggregator = InMemoryAggregator(max_records=2)
+    aggregator(CallRecord(model="a", prompt_tokens=1, attempts=1))
+    aggregator(CallRecord(model="a", labels={"module": "x"}, prompt_tokens=2, attempts=1))
+    aggregator(CallRecord(model="b", labels={"module": "x"}, error="down", attempts=3))
+
+    assert len(aggregator.records) == 2
+    by_model = aggregator.summary()
+    assert by_model["a"]["calls"] == 2 and by_model["a"]["prompt_tokens"] == 3
+    assert by_model["b"]["errors"] == 1 and by_model["b"]["retries"] == 2
+    by_module = aggregator.summary(by="module")
+    assert by_module["unknown"]["calls"] == 1
+    assert by_module["x"]["calls"] == 2
+    assert list(aggregator.summary(by="team")) == ["unknown"]
+    assert aggregator.summary(by="team")["unknown"]["calls"] == 3
+    aggregator.clear()
+    assert aggregator.summary() == {}
+
+
+def test_jsonl_sink(tmp_path):
+    path = tmp_path / "calls.jsonl"
+    sink = JSONLSink(str(path))
+    sink(CallRecord(model="gpt-4o", prompt_tokens=5, completion_tokens=2, attempts=2))
+    sink.close()
+
+    [line] = path.read_text().splitlines()
+    data = json.loads(line)
+    assert data["model"] == "gpt-4o"
+    assert data["total_tokens"] == 7
+    assert data["retries"] == 1
+
+
+def test_prometheus_sink(tmp_path):
+    sink = PrometheusSink()
+    sink(CallRecord(model="gpt-4o", labels={"caller": "app.x"}, prompt_tokens=5,
+                    completion_tokens=2, network_seconds=0.3, attempts=1))
+    sink(CallRecord(model="gpt-4o", labels={"caller": "app.x"}, error="down", attempts=3, parsed=False))
+    text = sink.render()
+
+    assert '# TYPE lite_llm_calls_total counter' in text
+    assert 'lite_llm_calls_total{model="gpt-4o",caller="app.x",status="ok",cache="false"} 1' in text
+    assert 'lite_llm_calls_total{model="gpt-4o",caller="app.x",status="error",cache="false"} 1' in text
+    assert 'lite_llm_tokens_total{model="gpt-4o",caller="app.x",type="prompt"} 5' in text
+    assert 'lite_llm_retries_total{model="gpt-4o",caller="app.x"} 2' in text
+    assert 'lite_llm_parse_failures_total{model="gpt-4o",caller="app.x"} 1' in text
+    assert 'lite_llm_call_seconds_bucket{model="gpt-4o",caller="app.x",phase="network",le="0.25"} 1' in text
+    assert 'lite_llm_call_seconds_bucket{model="gpt-4o",caller="app.x",phase="network",le="0.5"} 2' in text
+    assert 'lite_llm_call_seconds_count{model="gpt-4o",caller="app.x",phase="network"} 2' in text
+
+    sink.write(str(tmp_path / "lite.prom"))
+    assert (tmp_path / "lite.prom").read_text() == text
@@ -0,0 +1,142 @@
+import asyncio
+from typing import List, Literal, Optional
+from unittest.mock import MagicMock, patch
+
+import pytest
+from pydantic import BaseModel
+
+from lite import LiteClient, LRUCache, ModelConfig
+from lite.config import ModelInput
+from lite.instrumentation import InMemoryAggregator, add_sink, remove_sink
+from lite.utils.json_repair import (
+    coerce_to_schema,
+    loads_tolerant,
+    parse_structured,
+    repair_stats,
+    reset_repair_stats,
+)
+
+
+class Chapter(BaseModel):
+    title: str
+    pages: int
+
+
+class Book(BaseModel):
+    title: str
+    tags: List[str]
+    level: Literal["beginner", "advanced"]
+    chapters: List[Chapter] = []
+    illustrated: Optional[bool] = None
+
+
+def completion_response(content):
+    response = MagicMock()
+    response.choices[0].message.content = content
+    response.usage.prompt_tokens = 10
+    response.usage.completion_tokens = 5
+    return response
+
+
+@pytest.fixture(autouse=True)
+def clean_stats():
+    reset_repair_stats()
+    yield
+    reset_repair_stats()
+
+
+@pytest.mark.parametrize("text, expected", [
+    ('{"a": [1, 2, 3,],}', {"a": [1, 2, 3]}),
+    ("{'a': 'it's fine', 'b': None}", {"a": "it's fine", "b": None}),
+    ('{"a": "line one\nline two"}', {"a": "line one\nline two"}),
+    ('{a: True, // note\n "b": "say "hi" now"}', {"a": True, "b": 'say "hi" now'}),
+    ('```json\n{"a": [1, 2, {"b": "cut', {"a": [1, 2, {"b": "cut"}]}),
+    ('{"items": [{"x": 1}, {"x": 2}, {"x"', {"items": [{"x": 1}, {"x": 2}]}),
+    ('Here you go: [1, 2', [1, 2]),
+    ('{"a": 1e5, "b": [1,2,],}', {"a": 1e5, "b": [1, 2]}),
+    ('{"a": 2.5E-3, "b": "x",}', {"a": 2.5e-3, "b": "x"}),
+    ('{"a": +1, "b": .5, "c": 1.,}', {"a": 1, "b": 0.5, "c": 1.0}),
+    ('{"a":"x","b":-Infinity,"c": NaN,}', {"a": "x", "b": None, "c": None}),
+])
+def test_loads_tolerant(text, expected):
+    assert loads_tolerant(text) == expected
+
+
+def test_loads_tolerant_without_json():
+    with pytest.raises(ValueError):
+        loads_tolerant("I cannot help with that.")
+
+
+def test_coerce_to_schema():
+    data = {"result": {"Title": 7, "tags": "intro", "level": "Advanced",
+                       "chapters": [{"title": 1, "pages": "1,200"}], "illustrated": "yes"}}
+    assert Book.model_validate(coerce_to_schema(data, Book)) == Book(
+        title="7", tags=["intro"], level="advanced",
+        chapters=[Chapter(title="1", pages=1200)], illustrated=True,
+    )
+
+
+def test_parse_structured_stages():
+    strict = '{"title": "T", "tags": [], "level": "beginner"}'
+    assert parse_structured(strict, Book)[1] == "strict"
+    assert parse_structured('{"title": "T", "tags": ["a",], "level": "beginner"', Book)[1] == "tolerant"
+    assert parse_structured('{"title": 3, "tags": "a", "level": "BEGINNER"}', Book)[1] == "coerced"
+    result, stage, error = parse_structured('{"title": "T"}', Book)
+    assert result is None and stage is None and "tags" in error
+
+
+@patch("lite.lite_client.completion")
+def test_client_repairs_locally_without_extra_calls(mock_completion):
+    mock_completion.return_value = completion_response('{"title": "T", "tags": ["a"], "level": "beginner",')
+    client = LiteClient(ModelConfig(model="gpt-4o"), rate_limit=False)
+
+    result = client.generate_text(ModelInput(user_prompt="Outline", response_format=Book))
+    assert result == Book(title="T", tags=["a"], level="beginner")
+    assert mock_completion.call_count == 1
+    assert repair_stats()["tolerant"] == 1 and repair_stats()["regenerations_saved"] == 1
+
+
+@patch("lite.lite_client.completion")
+def test_client_asks_model_to_fix_and_caches_the_fix(mock_completion):
+    mock_completion.side_effect = [
+        completion_response('{"title": "T"}'),
+        completion_response('{"title": "T", "tags": [], "level": "beginner"}'),
+    ]
+    aggregator = InMemoryAggregator()
+    add_sink(aggregator)
+    cache = LRUCache()
+    client = LiteClient(ModelConfig(model="gpt-4o"), rate_limit=False, cache=cache)
+    model_input = ModelInput(user_prompt="A long original prompt", response_format=Book)
+    try:
+        assert client.generate_text(model_input) == Book(title="T", tags=[], level="beginner")
+        assert client.generate_text(model_input) == Book(title="T", tags=[], level="beginner")
+    finally:
+        remove_sink(aggregator)
+
+    fix_messages = mock_completion.call_args_list[1].kwargs["messages"]
+    assert "A long original prompt" not in str(fix_messages)
+    assert '{"title": "T"}' in fix_messages[-1]["content"]
+    assert mock_completion.call_count == 2
+    record = aggregator.records[0]
+    assert record.repair == "model_fix" and record.parsed and record.total_tokens == 30
+    assert repair_stats()["model_fix"] == 1
+
+
+@patch("lite.lite_client.acompletion")
+def test_async_fix_failure_returns_raw_content(mock_acompletion):
+    mock_acompletion.return_value = completion_response("no json here")
+    client = LiteClient(ModelConfig(model="gpt-4o"), rate_limit=False)
+
+    result = asyncio.run(client.agenerate_text(ModelInput(user_prompt="x", response_format=Book)))
+    assert result == "no json here"
+    assert mock_acompletion.call_count == 2
+    assert repair_stats()["failed"] == 1 and repair_stats()["regenerations_saved"] == 0
+
+
+@patch("lite.lite_client.completion")
+def test_model_fix_can_be_disabled(mock_completion):
+    mock_completion.return_value = completion_response("no json here")
+    client = LiteClient(ModelConfig(model="gpt-4o"), rate_limit=False, repair_json=False)
+
+    assert client.generate_text(ModelInput(user_prompt="x", response_format=Book)) == "no json here"
+    assert mock_completion.call_count == 1
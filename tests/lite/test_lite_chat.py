@@ -1,9 +1,14 @@
+import asyncio
 import os
+import time
 import pytest
 from pathlib import Path
 from unittest.mock import patch, MagicMock
+import httpx
+import litellm
 from lite.lite_chat import LiteChat
 from lite.config import ModelConfig, ChatConfig, ModelInput
+from lite.rate_limiter import get_rate_limiter, reset_rate_limiters
 
 @pytest.fixture
 def model_config():
@@ -174,3 +179,138 @@ def test_get_conversation_history(lite_chat):
     # Check it's a copy
     history.append({"role": "assistant", "content": "bye"})
     assert len(lite_chat.conversation_history) == 1
+
+def _stream_chunks(*texts):
+    chunks = []
+    for text in texts:
+        chunk = MagicMock()
+        chunk.choices[0].delta.content = text
+        chunks.append(chunk)
+    return chunks
+
+@patch("lite.lite_chat.completion")
+def test_generate_text_stream(mock_completion, lite_chat):
+    mock_completion.return_value = iter(_stream_chunks("Hel", "lo", None, "!"))
+    deltas = lite_chat.generate_text(ModelInput(user_prompt="hi"), stream=True)
+
+    # Nothing is recorded until the stream has been consumed
+    assert list(deltas) == ["Hel", "lo", "!"]
+    assert mock_completion.call_args.kwargs["stream"] is True
+    assert lite_chat.conversation_history[-1] == {"role": "assistant", "content": "Hello!"}
+    assert "Hello!" in Path(lite_chat.conversation_file).read_text()
+
+@patch("lite.lite_chat.completion")
+def test_stream_text_error(mock_completion, lite_chat):
+    mock_completion.side_effect = Exception("API Error")
+    deltas = list(lite_chat.stream_text(ModelInput(user_prompt="hi")))
+    assert deltas == ["Error: API Error"]
+    # The error is not recorded as an assistant turn, as in generate_text
+    assert lite_chat.conversation_history == [{"role": "user", "content": "hi"}]
+
+@patch("lite.lite_chat.completion")
+def test_stream_text_error_after_partial_reply(mock_completion, lite_chat):
+    def broken_stream():
+        yield from _stream_chunks("Hel")
+        raise Exception("connection reset")
+
+    mock_completion.return_value = broken_stream()
+    assert list(lite_chat.stream_text(ModelInput(user_prompt="hi"))) == ["Hel", "Error: connection reset"]
+    # The truncated reply is not recorded as an assistant turn
+    assert lite_chat.conversation_history == [{"role": "user", "content": "hi"}]
+
+@patch("lite.lite_chat.completion")
+def test_stream_text_stopped_early_keeps_partial_reply(mock_completion, lite_chat):
+    mock_completion.return_value = iter(_stream_chunks("Hel", "lo"))
+    deltas = lite_chat.stream_text(ModelInput(user_prompt="hi"))
+    assert next(deltas) == "Hel"
+    deltas.close()
+    assert lite_chat.conversation_history[-1] == {"role": "assistant", "content": "Hel"}
+
+@patch("lite.lite_chat.acompletion")
+def test_astream_text_error(mock_acompletion, lite_chat):
+    mock_acompletion.side_effect = Exception("API Error")
+
+    async def collect():
+        return [delta async for delta in lite_chat.astream_text(ModelInput(user_prompt="hi"))]
+
+    assert asyncio.run(collect()) == ["Error: API Error"]
+    assert lite_chat.conversation_history == [{"role": "user", "content": "hi"}]
+
+@patch("lite.lite_chat.acompletion")
+def test_astream_text(mock_acompletion, lite_chat):
+    async def agen():
+        for chunk in _stream_chunks("a", "b"):
+            yield chunk
+
+    mock_acompletion.return_value = agen()
+
+    async def collect():
+        return [delta async for delta in lite_chat.astream_text(ModelInput(user_prompt="hi"))]
+
+    assert asyncio.run(collect()) == ["a", "b"]
+    assert lite_chat.conversation_history[-1]["content"] == "ab"
+
+@pytest.fixture
+def fresh_limiters():
+    reset_rate_limiters()
+    yield
+    reset_rate_limiters()
+
+def _rate_limit_error(retry_after="5"):
+    response = httpx.Response(429, headers={"retry-after": retry_after}, request=httpx.Request("POST", "http://stub"))
+    return litellm.RateLimitError("slow down", llm_provider="openai", model="gpt-4", response=response)
+
+@patch("lite.lite_chat.completion")
+def test_stream_text_open_is_rate_limited(mock_completion, lite_chat, fresh_limiters):
+    limiter = get_rate_limiter("gpt-4")
+
+    def open_stream(**kwargs):
+        # The stream is opened while holding a limiter slot
+        assert limiter.stats()["in_flight"] == 1
+        return iter(_stream_chunks("ok"))
+
+    mock_completion.side_effect = open_stream
+    assert list(lite_chat.stream_text(ModelInput(user_prompt="hi"))) == ["ok"]
+    assert limiter.stats()["in_flight"] == 0
+
+    mock_completion.side_effect = _rate_limit_error()
+    assert list(lite_chat.stream_text(ModelInput(user_prompt="hi")))[0].startswith("Error:")
+    assert limiter.stats()["rate_limited"] == 1
+    assert limiter._blocked_until > time.monotonic() + 4
+
+@patch("lite.lite_chat.completion")
+def test_stream_text_reports_rate_limit_mid_stream(mock_completion, lite_chat, fresh_limiters):
+    def broken_stream():
+        yield from _stream_chunks("Hel")
+        raise _rate_limit_error()
+
+    mock_completion.return_value = broken_stream()
+    deltas = list(lite_chat.stream_text(ModelInput(user_prompt="hi")))
+    assert deltas[0] == "Hel" and deltas[1].startswith("Error:")
+    limiter = get_rate_limiter("gpt-4")
+    assert limiter.stats()["rate_limited"] == 1
+    assert limiter.stats()["in_flight"] == 0
+    assert limiter._blocked_until > time.monotonic() + 4
+
+@patch("lite.lite_chat.acompletion")
+def test_astream_text_is_rate_limited(mock_acompletion, lite_chat, fresh_limiters):
+    limiter = get_rate_limiter("gpt-4")
+
+    async def agen():
+        yield _stream_chunks("a")[0]
+        raise _rate_limit_error()
+
+    async def open_stream(**kwargs):
+        assert limiter.stats()["in_flight"] == 1
+        return agen()
+
+    mock_acompletion.side_effect = open_stream
+
+    async def collect():
+        return [delta async for delta in lite_chat.astream_text(ModelInput(user_prompt="hi"))]
+
+    deltas = asyncio.run(collect())
+    assert deltas[0] == "a" and deltas[1].startswith("Error:")
+    assert lite_chat.conversation_history == [{"role": "user", "content": "hi"}]
+    assert limiter.stats()["in_flight"] == 0
+    assert limiter.stats()["rate_limited"] == 1
@@ -1,3 +1,4 @@
+import asyncio
 from unittest.mock import patch, MagicMock
 import pytest
 from lite.lite_client import LiteClient
@@ -101,3 +102,133 @@ def test_generate_text_image_error(mock_completion):
         result = client.generate_text(model_input)
         assert isinstance(result, dict)
         assert result["error"] == "Vision Error"
+
+@patch("lite.lite_client.acompletion")
+def test_agenerate_text_structured(mock_acompletion):
+    mock_response = MagicMock()
+    mock_response.choices[0].message.content = '{"answer": "Rome"}'
+    mock_acompletion.return_value = mock_response
+
+    client = LiteClient(model_config=ModelConfig(model="gpt-4"))
+    model_input = ModelInput(user_prompt="Capital of Italy?", response_format=SampleResponse)
+
+    result = asyncio.run(client.agenerate_text(model_input))
+    assert isinstance(result, SampleResponse)
+    assert result.answer == "Rome"
+    mock_acompletion.assert_awaited_once()
+
+@patch("lite.lite_client.acompletion")
+def test_agenerate_text_error(mock_acompletion):
+    mock_acompletion.side_effect = Exception("API Error")
+    client = LiteClient(model_config=ModelConfig(model="gpt-4"))
+
+    result = asyncio.run(client.agenerate_text(ModelInput(user_prompt="hi"), retries=1))
+    assert result == "API Error"
+    assert mock_acompletion.await_count == 2
+
+@patch("lite.lite_client.acompletion")
+def test_agenerate_text_bounded_concurrency(mock_acompletion):
+    in_flight = 0
+    peak = 0
+
+    async def fake_acompletion(**kwargs):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        response = MagicMock()
+        response.choices[0].message.content = "ok"
+        return response
+
+    mock_acompletion.side_effect = fake_acompletion
+    client = LiteClient(model_config=ModelConfig(model="gpt-4"), max_concurrency=3)
+
+    async def run_all():
+        return await asyncio.gather(
+            *(client.agenerate_text(ModelInput(user_prompt=f"q{i}")) for i in range(10))
+        )
+
+    results = asyncio.run(run_all())
+    assert results == ["ok"] * 10
+    assert peak == 3
+    # The client stays usable from a fresh event loop
+    assert asyncio.run(client.agenerate_text(ModelInput(user_prompt="again"))) == "ok"
+
+def test_invalid_max_concurrency():
+    with pytest.raises(ValueError, match="max_concurrency must be greater than 0"):
+        LiteClient(max_concurrency=0)
+
+@patch("lite.lite_client.completion")
+def test_generate_many_ordered_with_errors(mock_completion):
+    def fake_completion(**kwargs):
+        prompt = kwargs["messages"][-1]["content"][0]["text"]
+        if prompt == "bad":
+            raise Exception("boom")
+        response = MagicMock()
+        response.choices[0].message.content = prompt.upper()
+        return response
+
+    mock_completion.side_effect = fake_completion
+    client = LiteClient(model_config=ModelConfig(model="gpt-4"))
+    inputs = [ModelInput(user_prompt=p) for p in ["a", "bad", "c"]]
+
+    results = list(client.generate_many(inputs, max_concurrency=2, retries=0))
+    assert [r.index for r in results] == [0, 1, 2]
+    assert [r.ok for r in results] == [True, False, True]
+    assert results[0].result == "A"
+    assert results[1].error == "boom"
+    assert results[2].result == "C"
+
+@patch("lite.lite_client.completion")
+def test_generate_many_unordered(mock_completion):
+    mock_response = MagicMock()
+    mock_response.choices[0].message.content = "ok"
+    mock_completion.return_value = mock_response
+    client = LiteClient(model_config=ModelConfig(model="gpt-4"))
+    inputs = [ModelInput(user_prompt=f"q{i}") for i in range(5)]
+
+    results = list(client.generate_many(inputs, ordered=False))
+    assert sorted(r.index for r in results) == list(range(5))
+    assert all(r.result == "ok" for r in results)
+
+def _stream_chunks(*texts):
+    chunks = []
+    for text in texts:
+        chunk = MagicMock()
+        chunk.choices[0].delta.content = text
+        chunks.append(chunk)
+    return chunks
+
+@patch("lite.lite_client.completion")
+def test_generate_text_stream(mock_completion):
+    mock_completion.return_value = iter(_stream_chunks("Pa", "ris"))
+    client = LiteClient(model_config=ModelConfig(model="gpt-4"))
+
+    deltas = client.generate_text(ModelInput(user_prompt="Capital?"), stream=True)
+    assert list(deltas) == ["Pa", "ris"]
+    assert mock_completion.call_args.kwargs["stream"] is True
+
+@patch("lite.lite_client.completion")
+def test_stream_text_open_failure_raises(mock_completion):
+    mock_completion.side_effect = Exception("API Error")
+    client = LiteClient(model_config=ModelConfig(model="gpt-4"))
+
+    with pytest.raises(Exception, match="API Error"):
+        list(client.stream_text(ModelInput(user_prompt="hi"), retries=1))
+    assert mock_completion.call_count == 2
+
+@patch("lite.lite_client.acompletion")
+def test_agenerate_text_stream(mock_acompletion):
+    async def agen():
+        for chunk in _stream_chunks("a", "b", "c"):
+            yield chunk
+
+    mock_acompletion.return_value = agen()
+    client = LiteClient(model_config=ModelConfig(model="gpt-4"))
+
+    async def collect():
+        deltas = await client.agenerate_text(ModelInput(user_prompt="hi"), stream=True)
+        return [delta async for delta in deltas]
+
+    assert asyncio.run(collect()) == ["a", "b", "c"]
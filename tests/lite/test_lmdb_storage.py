@@ -108,6 +108,172 @@ def test_import_json_invalid(storage, tmp_path):
         f.write("not a json")
     assert storage.import_from_json(json_path) is False
 
+def test_put_many_get_many(storage):
+    items = {f"k{i}": "long value " * i for i in range(25)}
+    assert storage.put_many(items, batch_size=10) == 25
+    assert storage.num_keys() == 25
+    assert storage.get_many(["k3", "k24", "missing"]) == {
+        "k3": items["k3"], "k24": items["k24"], "missing": None
+    }
+
+def test_put_many_batches_commits(storage):
+    with patch.object(storage, "_write_batch", wraps=storage._write_batch) as write_batch:
+        assert storage.put_many(((f"k{i}", "v") for i in range(25)), batch_size=10) == 25
+    assert [len(call.args[0]) for call in write_batch.call_args_list] == [10, 10, 5]
+
+def test_put_many_skips_invalid(storage):
+    assert storage.put_many([("good", "v"), ("", "v"), ("none", None), ("k" * 600, "v")]) == 1
+    assert storage.get("good") == "v"
+
+def test_delete_many(storage):
+    storage.put_many({f"k{i}": "v" for i in range(5)})
+    assert storage.delete_many(["k0", "k1", "missing"], batch_size=2) == 2
+    assert storage.get_keys() == ["k2", "k3", "k4"]
+
+def test_import_json_counts_failures(storage, tmp_path):
+    json_path = str(tmp_path / "mixed.json")
+    with open(json_path, "w") as f:
+        json.dump([{"key": "a", "value": "1"}, {"key": "b"}, "junk", {"key": "", "value": "x"}], f)
+    with patch.object(storage, "put_many", wraps=storage.put_many) as put_many:
+        assert storage._import_entries(json.load(open(json_path))) == (1, 3)
+    put_many.assert_called_once()
+    assert storage.get("a") == "1"
+
+def test_write_batch_size_validation():
+    with pytest.raises(ValueError, match="write_batch_size must be greater than 0"):
+        LMDBConfig(write_batch_size=0)
+
+def test_export_json_is_valid_array(storage, tmp_path):
+    json_path = str(tmp_path / "empty.json")
+    assert storage.export_to_json(json_path) is True
+    assert json.load(open(json_path)) == []
+    storage.put_many({"a": "1", "b": "x" * 50})
+    assert storage.export_to_json(json_path) is True
+    assert json.load(open(json_path)) == [{"key": "a", "value": "1"}, {"key": "b", "value": "x" * 50}]
+
+@pytest.mark.parametrize("name", ["backup.jsonl", "backup.jsonl.gz"])
+def test_export_import_jsonl(storage, tmp_path, name):
+    items = {f"k{i}": f"value {i} " * i for i in range(30)}
+    storage.put_many(items)
+    jsonl_path = str(tmp_path / name)
+    assert storage.export_to_jsonl(jsonl_path) is True
+
+    with LMDBStorage(db_path=str(tmp_path / "copy.lmdb"), enable_logging=False) as copy:
+        assert copy.import_from_jsonl(jsonl_path) is True
+        assert copy.get_many(items) == items
+
+def test_import_jsonl_skips_bad_lines(storage, tmp_path):
+    jsonl_path = tmp_path / "mixed.jsonl"
+    jsonl_path.write_text('{"key": "a", "value": "1"}\nnot json\n\n{"key": "b"}\n{"key": "c", "value": "3"}\n')
+    assert storage.import_from_jsonl(str(jsonl_path)) is True
+    assert storage.get_keys() == ["a", "c"]
+    assert storage.import_from_jsonl(str(tmp_path / "missing.jsonl")) is False
+
+def test_export_import_snapshot(storage, tmp_path):
+    items = {f"k{i}": f"value {i} " * i for i in range(30)}
+    storage.put_many(items)
+    snapshot_path = str(tmp_path / "backup.snap")
+    assert storage.export_snapshot(snapshot_path) is True
+
+    with LMDBStorage(db_path=str(tmp_path / "copy.lmdb"), enable_logging=False) as copy:
+        with patch.object(copy, "_encode_value") as encode:
+            assert copy.import_snapshot(snapshot_path) is True
+        encode.assert_not_called()
+        assert copy.get_many(items) == items
+
+def test_import_snapshot_invalid(storage, tmp_path):
+    bad = tmp_path / "bad.snap"
+    bad.write_bytes(b"something else")
+    assert storage.import_snapshot(str(bad)) is False
+    storage.put("k", "v")
+    snapshot_path = str(tmp_path / "good.snap")
+    storage.export_snapshot(snapshot_path)
+    truncated = tmp_path / "truncated.snap"
+    truncated.write_bytes(open(snapshot_path, "rb").read()[:-1])
+    assert storage.import_snapshot(str(truncated)) is False
+
+def test_scan_prefix(storage):
+    storage.put_many({"acne": "skin", "achalasia": "esophagus", "asthma": "lungs",
+                      "ab": "x", "ad": "y"})
+    assert list(storage.scan_prefix("ac")) == [("achalasia", "esophagus"), ("acne", "skin")]
+    assert list(storage.scan_prefix("ac", keys_only=True)) == ["achalasia", "acne"]
+    assert list(storage.scan_prefix("a", keys_only=True, limit=2)) == ["ab", "achalasia"]
+    assert list(storage.scan_prefix("zz")) == []
+
+def test_scan_prefix_does_not_decode_other_keys(storage):
+    storage.put_many({f"model-a:{i}": "v" for i in range(5)})
+    storage.put_many({f"model-b:{i}": "v" for i in range(50)})
+    with patch.object(storage, "_decode_value", wraps=storage._decode_value) as decode:
+        assert len(list(storage.scan_prefix("model-a:"))) == 5
+    assert decode.call_count == 5
+    with patch.object(storage, "_decode_value") as decode:
+        list(storage.scan_prefix("model-b:", keys_only=True))
+    decode.assert_not_called()
+
+def test_scan_range(storage):
+    storage.put_many({k: k.upper() for k in ["a", "b", "c", "d"]})
+    assert list(storage.scan_range("b", "d")) == [("b", "B"), ("c", "C")]
+    assert list(storage.scan_range(end="b", keys_only=True)) == ["a"]
+    assert list(storage.scan_range("bb", keys_only=True)) == ["c", "d"]
+    assert list(storage.scan_range(keys_only=True, limit=0)) == []
+
+def test_namespaces(tmp_path):
+    db_path = str(tmp_path / "ns.lmdb")
+    with LMDBStorage(db_path=db_path, namespace="disease_info", enable_logging=False) as diseases:
+        drugs = diseases.namespace_view("drug_drug")
+        diseases.put("asthma", "lungs")
+        drugs.put("aspirin", "nsaid")
+        assert drugs.get("asthma") is None
+        assert diseases.num_keys() == 1
+        assert list(drugs.scan_prefix("as")) == [("aspirin", "nsaid")]
+        drugs.close()
+        assert diseases.get("asthma") == "lungs"
+
+    with LMDBStorage(config=LMDBConfig(db_path=db_path, namespace="drug_drug", enable_logging=False)) as drugs:
+        assert drugs.get_keys() == ["aspirin"]
+
+def test_namespace_validation():
+    with pytest.raises(ValueError, match="namespace must be a non-empty string"):
+        LMDBConfig(namespace=" ")
+
+def test_clear_uses_single_drop(storage):
+    storage.put_many({f"k{i}": "v" for i in range(100)})
+    assert storage.clear() == 100
+    assert storage.num_keys() == 0
+    assert storage.put("k", "v") is True
+
+def test_clear_keeps_namespaces(tmp_path):
+    with LMDBStorage(db_path=str(tmp_path / "ns.lmdb"), enable_logging=False) as main:
+        drugs = main.namespace_view("drug_drug")
+        drugs.put("aspirin", "nsaid")
+        main.put_many({"a": "1", "b": "2"})
+        assert main.clear() == 2
+        assert drugs.get("aspirin") == "nsaid"
+        assert drugs.clear() == 1
+        assert drugs.num_keys() == 0
+        drugs.close()
+
+def test_compact(storage, db_path, tmp_path):
+    storage.put_many({f"k{i}": os.urandom(2000).hex() for i in range(500)})
+    storage.delete_many([f"k{i}" for i in range(10, 500)])
+    data_file = os.path.join(db_path, "data.mdb")
+    size_before = os.path.getsize(data_file)
+
+    copy_path = str(tmp_path / "copy.lmdb")
+    assert storage.compact(copy_path) is True
+    assert os.path.getsize(os.path.join(copy_path, "data.mdb")) < size_before
+
+    assert storage.compact() is True
+    assert os.path.getsize(data_file) < size_before
+    assert storage.num_keys() == 10
+    assert storage.get("k3") is not None
+    assert storage.put("new", "value") is True
+
+def test_compact_in_place_refused_when_shared(storage, db_path):
+    other = LMDBStorage(db_path=db_path, enable_logging=False)
+    assert storage.compact() is False
+    other.close()
+
 def test_context_manager(db_path):
     with LMDBStorage(db_path=db_path) as s:
         s.put("k", "v")
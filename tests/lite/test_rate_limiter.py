@@ -0,0 +1,254 @@
+import asyncio
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
+import httpx
+import litellm
+import pytest
+
+from lite import LiteClient, ModelConfig
+from lite.config import ModelInput, RateLimitConfig
+from lite.rate_limiter import (
+    AdaptiveLimiter,
+    TokenBucket,
+    backoff_delay,
+    configure_rate_limit,
+    estimate_tokens,
+    get_rate_limiter,
+    rate_limit_stats,
+    reset_rate_limiters,
+    retry_after_seconds,
+)
+
+
+@pytest.fixture(autouse=True)
+def fresh_limiters():
+    reset_rate_limiters()
+    yield
+    reset_rate_limiters()
+
+
+def rate_limit_error(headers=None):
+    response = httpx.Response(429, headers=headers or {}, request=httpx.Request("POST", "http://stub"))
+    return litellm.RateLimitError("slow down", llm_provider="openai", model="gpt-4o", response=response)
+
+
+def completion_response(total_tokens=10, headers=None):
+    response = MagicMock()
+    response.choices[0].message.content = "ok"
+    response.usage.total_tokens = total_tokens
+    response._hidden_params = {"additional_headers": headers or {}}
+    return response
+
+
+def test_token_bucket_delays_after_burst():
+    bucket = TokenBucket(per_minute=60, burst_seconds=2)
+    assert bucket.reserve(1) == 0
+    assert bucket.reserve(1) == 0
+    # Bucket is empty; the next token arrives in about a second
+    assert bucket.reserve(1) == pytest.approx(1.0, abs=0.05)
+    bucket.adjust(-10)
+    assert bucket.reserve(1) == 0
+
+
+def test_rate_limit_config_validation():
+    with pytest.raises(ValueError):
+        RateLimitConfig(min_concurrency=4, initial_concurrency=2)
+    with pytest.raises(ValueError):
+        RateLimitConfig(decrease_factor=1.5)
+    with pytest.raises(ValueError):
+        RateLimitConfig(requests_per_minute=0)
+
+
+def test_additive_increase_multiplicative_decrease():
+    limiter = AdaptiveLimiter("openai/gpt-4o", RateLimitConfig(initial_concurrency=4, latency_tolerance=None))
+    for _ in range(8):
+        with limiter.limit():
+            pass
+    assert limiter.concurrency_limit == 5
+
+    for _ in range(3):
+        with pytest.raises(litellm.RateLimitError):
+            with limiter.limit():
+                raise rate_limit_error()
+    # A burst of 429s from the same window halves the limit once
+    assert limiter.concurrency_limit == 2
+    assert limiter.stats()["rate_limited"] == 3
+
+
+def test_concurrency_limit_bounds_threads():
+    limiter = AdaptiveLimiter("openai/gpt-4o", RateLimitConfig(
+        initial_concurrency=2, max_concurrency=2, latency_tolerance=None))
+    active, peak = [0], [0]
+    lock = threading.Lock()
+
+    def call():
+        with limiter.limit():
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            time.sleep(0.02)
+            with lock:
+                active[0] -= 1
+
+    threads = [threading.Thread(target=call) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert peak[0] == 2
+
+
+def test_async_waiters_share_limit():
+    limiter = AdaptiveLimiter("openai/gpt-4o", RateLimitConfig(
+        initial_concurrency=1, max_concurrency=1, latency_tolerance=None))
+    order = []
+
+    async def call(i):
+        async with limiter.alimit():
+            order.append(("start", i))
+            await asyncio.sleep(0.01)
+            order.append(("end", i))
+
+    async def main():
+        await asyncio.gather(*(call(i) for i in range(3)))
+
+    asyncio.run(main())
+    # With a single slot, calls never overlap
+    assert [event for event, _ in order] == ["start", "end"] * 3
+
+
+def test_retry_after_blocks_every_caller():
+    limiter = AdaptiveLimiter("openai/gpt-4o")
+    with pytest.raises(litellm.RateLimitError):
+        with limiter.limit():
+            raise rate_limit_error({"retry-after": "0.2"})
+    start = time.monotonic()
+    with limiter.limit():
+        pass
+    assert time.monotonic() - start >= 0.15
+
+
+def test_quota_learned_from_headers():
+    limiter = AdaptiveLimiter("openai/gpt-4o")
+    with limiter.limit(5) as permit:
+        permit.record(completion_response(
+            total_tokens=42,
+            headers={"llm_provider-x-ratelimit-limit-requests": "600",
+                     "x-ratelimit-limit-tokens": "100000"},
+        ))
+    stats = limiter.stats()
+    assert stats["quota_requests_per_minute"] == pytest.approx(600 * 0.95)
+    assert stats["quota_tokens_per_minute"] == pytest.approx(100000 * 0.95)
+    assert stats["requests_per_minute"] == 1
+    assert stats["tokens_per_minute"] == 42
+
+
+def test_retry_after_parsing():
+    assert retry_after_seconds(rate_limit_error({"retry-after": "3"})) == 3.0
+    assert retry_after_seconds(rate_limit_error({"retry-after-ms": "250"})) == 0.25
+    assert retry_after_seconds(rate_limit_error({"retry-after": "Wed, 21 Oct 2015 07:28:00 GMT"})) == 0.0
+    assert retry_after_seconds(rate_limit_error()) is None
+
+
+def test_backoff_delay():
+    assert backoff_delay(3, ValueError("bad schema")) == 0.0
+    config = RateLimitConfig(backoff_base=1.0, backoff_max=5.0)
+    for attempt in range(6):
+        delay = backoff_delay(attempt, rate_limit_error(), config)
+        assert 0.0 <= delay <= min(5.0, 2 ** attempt)
+    delay = backoff_delay(0, rate_limit_error({"retry-after": "2"}), config)
+    assert 2.0 <= delay <= 3.0
+
+
+def test_estimate_tokens_counts_text_and_images():
+    messages = [
+        {"role": "system", "content": "x" * 40},
+        {"role": "user", "content": [
+            {"type": "text", "text": "y" * 40},
+            {"type": "image_url", "image_url": {"url": "data:image/jpeg;base64," + "A" * 10000}},
+        ]},
+    ]
+    assert estimate_tokens(messages) == 20 + 1 + 765
+
+
+def test_limiters_shared_and_configurable():
+    configure_rate_limit("openai", RateLimitConfig(requests_per_minute=100))
+    limiter = get_rate_limiter("openai/gpt-4o")
+    assert get_rate_limiter("openai/gpt-4o") is limiter
+    assert limiter.config.requests_per_minute == 100
+
+    configure_rate_limit("openai/gpt-4o", RateLimitConfig(requests_per_minute=50))
+    assert limiter.config.requests_per_minute == 50
+    assert get_rate_limiter("openai/gpt-4o-mini").config.requests_per_minute == 100
+    assert set(rate_limit_stats()) == {"openai/gpt-4o", "openai/gpt-4o-mini"}
+
+
+@patch("lite.lite_client.time.sleep")
+@patch("lite.lite_client.completion")
+def test_client_backs_off_on_rate_limit(mock_completion, mock_sleep):
+    mock_completion.side_effect = [rate_limit_error({"retry-after": "1"}), completion_response()]
+    client = LiteClient(ModelConfig(model="openai/gpt-4o"))
+
+    assert client.generate_text(ModelInput(user_prompt="Hi")) == "ok"
+    assert mock_completion.call_count == 2
+    # Backoff honors Retry-After (time.sleep is also the limiter's, so only check the first wait)
+    assert mock_sleep.call_args_list[0][0][0] >= 1.0
+
+
+def stream_chunk(text):
+    chunk = MagicMock()
+    chunk.choices[0].delta.content = text
+    return chunk
+
+
+@patch("lite.lite_client.completion")
+def test_client_reports_rate_limit_mid_stream(mock_completion):
+    def broken_stream():
+        yield stream_chunk("Pa")
+        raise rate_limit_error({"retry-after": "5"})
+
+    mock_completion.return_value = broken_stream()
+    client = LiteClient(ModelConfig(model="openai/gpt-4o"))
+
+    deltas = []
+    with pytest.raises(litellm.RateLimitError):
+        for delta in client.stream_text(ModelInput(user_prompt="Hi")):
+            deltas.append(delta)
+    assert deltas == ["Pa"]
+    limiter = get_rate_limiter("openai/gpt-4o")
+    assert limiter.stats()["rate_limited"] == 1
+    assert limiter._blocked_until > time.monotonic() + 4
+
+
+@patch("lite.lite_client.acompletion")
+def test_client_reports_rate_limit_mid_async_stream(mock_acompletion):
+    async def broken_stream():
+        yield stream_chunk("Pa")
+        raise rate_limit_error()
+
+    mock_acompletion.return_value = broken_stream()
+    client = LiteClient(ModelConfig(model="openai/gpt-4o"))
+
+    async def collect():
+        deltas = []
+        with pytest.raises(litellm.RateLimitError):
+            async for delta in client.astream_text(ModelInput(user_prompt="Hi")):
+                deltas.append(delta)
+        return deltas
+
+    assert asyncio.run(collect()) == ["Pa"]
+    assert get_rate_limiter("openai/gpt-4o").stats()["rate_limited"] == 1
+
+
+@patch("lite.lite_client.time.sleep")
+@patch("lite.lite_client.completion")
+def test_client_retries_other_errors_immediately(mock_completion, mock_sleep):
+    mock_completion.side_effect = Exception("API Error")
+    client = LiteClient(ModelConfig(model="openai/gpt-4o"), rate_limit=False)
+
+    assert client.generate_text(ModelInput(user_prompt="Hi"), retries=2) == "API Error"
+    assert mock_completion.call_count == 3
+    mock_sleep.assert_not_called()
+    assert rate_limit_stats() == {}
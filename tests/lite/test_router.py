@@ -0,0 +1,143 @@
+import asyncio
+from unittest.mock import MagicMock, patch
+
+import pytest
+from pydantic import BaseModel
+
+from lite import LiteClient, ModelConfig, ModelRouter
+from lite.config import ModelInput
+from lite.router import MIN_HEDGE_SAMPLES, LatencyHistogram
+from lite.single_flight import SingleFlight
+
+
+class Answer(BaseModel):
+    answer: str
+
+
+def completion_response(content):
+    response = MagicMock()
+    response.choices[0].message.content = content
+    return response
+
+
+def fake_models(behaviour, calls=None):
+    """Build an acompletion stub; behaviour maps model -> (delay, content or exception)."""
+    async def fake_acompletion(model, **kwargs):
+        delay, outcome = behaviour[model]
+        if calls is not None:
+            calls.append(model)
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            if calls is not None:
+                calls.append(f"cancelled:{model}")
+            raise
+        if isinstance(outcome, Exception):
+            raise outcome
+        return completion_response(outcome)
+    return fake_acompletion
+
+
+def make_router(models, **kwargs):
+    client = LiteClient(ModelConfig(model=models[0]), rate_limit=False)
+    return ModelRouter(models, client=client, **kwargs)
+
+
+def test_histogram_percentiles():
+    histogram = LatencyHistogram()
+    assert histogram.percentile(0.95) is None
+    for i in range(1, 101):
+        histogram.observe(i / 100)
+    assert histogram.percentile(0.5) == pytest.approx(0.5, rel=0.25)
+    assert histogram.percentile(0.95) == pytest.approx(0.95, rel=0.25)
+
+
+@patch("lite.lite_client.acompletion")
+def test_failover_to_next_model(mock_acompletion):
+    mock_acompletion.side_effect = fake_models({
+        "ollama/gemma3": (0, Exception("connection refused")),
+        "gemini/gemini-2.5-flash": (0, "from gemini"),
+    })
+    router = make_router(["ollama/gemma3", "gemini/gemini-2.5-flash"])
+    assert asyncio.run(router.agenerate_text(ModelInput(user_prompt="hi"))) == "from gemini"
+    stats = router.stats()
+    assert stats["ollama/gemma3"]["failures"] == 1
+    assert stats["gemini/gemini-2.5-flash"]["wins"] == 1
+
+
+@patch("lite.lite_client.acompletion")
+def test_invalid_schema_fails_over(mock_acompletion):
+    mock_acompletion.side_effect = fake_models({
+        "ollama/gemma3": (0, "not json at all"),
+        "gemini/gemini-2.5-flash": (0, '{"answer": "42"}'),
+    })
+    router = make_router(["ollama/gemma3", "gemini/gemini-2.5-flash"])
+    result = asyncio.run(router.agenerate_text(ModelInput(user_prompt="hi", response_format=Answer)))
+    assert result == Answer(answer="42")
+
+
+@patch("lite.lite_client.acompletion")
+def test_hedge_wins_and_cancels_slow_primary(mock_acompletion):
+    calls = []
+    mock_acompletion.side_effect = fake_models({
+        "ollama/gemma3": (5, "slow"),
+        "gemini/gemini-2.5-flash": (0.01, "fast"),
+    }, calls)
+    router = make_router(["ollama/gemma3", "gemini/gemini-2.5-flash"], default_hedge_delay=0.05)
+    assert asyncio.run(router.agenerate_text(ModelInput(user_prompt="hi"))) == "fast"
+    assert "cancelled:ollama/gemma3" in calls
+    stats = router.stats()
+    assert stats["gemini/gemini-2.5-flash"]["hedges"] == 1
+    assert stats["ollama/gemma3"]["cancelled"] == 1
+
+
+@patch("lite.lite_client.acompletion")
+def test_hedge_delay_follows_latency_histogram(mock_acompletion):
+    mock_acompletion.side_effect = fake_models({"openai/gpt-4o": (0, "ok")})
+    router = make_router(["openai/gpt-4o"], default_hedge_delay=30.0)
+    assert router.hedge_delay("openai/gpt-4o") == 30.0
+    for _ in range(MIN_HEDGE_SAMPLES):
+        router.histograms["openai/gpt-4o"].observe(0.2)
+    assert router.hedge_delay("openai/gpt-4o") == pytest.approx(0.2, rel=0.25)
+
+
+@patch("lite.lite_client.acompletion")
+def test_all_models_fail(mock_acompletion):
+    mock_acompletion.side_effect = fake_models({"openai/gpt-4o": (0, Exception("down"))})
+    router = make_router(["openai/gpt-4o"], hedge=False)
+    assert asyncio.run(router.agenerate_text(ModelInput(user_prompt="hi"))) == "down"
+    # A single model is retried once as its own fallback
+    assert router.stats()["openai/gpt-4o"]["failures"] == 2
+
+
+@patch("lite.lite_client.acompletion")
+def test_sync_generate_text(mock_acompletion):
+    mock_acompletion.side_effect = fake_models({"openai/gpt-4o": (0, "ok")})
+    router = make_router(["openai/gpt-4o"])
+    try:
+        assert router.generate_text(ModelInput(user_prompt="hi")) == "ok"
+        assert router.generate_text(ModelInput(user_prompt="again")) == "ok"
+    finally:
+        router.close()
+
+
+@patch("lite.lite_client.acompletion")
+def test_single_model_hedge_skips_coalescing(mock_acompletion):
+    delays = [5, 0.01]
+    calls = []
+
+    async def fake_acompletion(model, **kwargs):
+        delay = delays[len(calls)]
+        calls.append(model)
+        await asyncio.sleep(delay)
+        return completion_response(f"after {delay}s")
+
+    mock_acompletion.side_effect = fake_acompletion
+    client = LiteClient(ModelConfig(model="openai/gpt-4o"), rate_limit=False,
+                        coalesce_requests=True, flights=SingleFlight())
+    router = ModelRouter(["openai/gpt-4o"], client=client, default_hedge_delay=0.05)
+    assert asyncio.run(router.agenerate_text(ModelInput(user_prompt="hi"))) == "after 0.01s"
+    # The hedge made its own upstream call instead of joining the slow one
+    assert calls == ["openai/gpt-4o", "openai/gpt-4o"]
+    assert client.coalesce_stats()["coalesced"] == 0
+    assert router.stats()["openai/gpt-4o"]["cancelled"] == 1
@@ -0,0 +1,273 @@
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from unittest.mock import MagicMock
+
+import pytest
+from lite.storage import LMDBStorage, LMDBConfig, open_environments
+from lite.storage.shared_env import WriteCoalescer, _registry_key
+
+
+def test_instances_share_environment(tmp_path):
+    db_path = str(tmp_path / "shared.lmdb")
+    first = LMDBStorage(db_path=db_path, enable_logging=False)
+    second = LMDBStorage(db_path=db_path, enable_logging=False)
+    assert first.env is second.env
+    assert open_environments()[_registry_key(db_path)] == 2
+
+    first.put("k", "v")
+    first.close()
+    first.close()  # idempotent
+    assert second.get("k") == "v"
+    second.close()
+    assert _registry_key(db_path) not in open_environments()
+
+
+def test_namespace_view_holds_reference(tmp_path):
+    db_path = str(tmp_path / "views.lmdb")
+    storage = LMDBStorage(db_path=db_path, enable_logging=False)
+    view = storage.namespace_view("drug_drug")
+    storage.close()
+    assert view.put("aspirin", "nsaid") is True
+    view.close()
+    assert _registry_key(db_path) not in open_environments()
+
+
+def test_logger_shared_per_database(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    db_path = str(tmp_path / "logged.lmdb")
+    first = LMDBStorage(db_path=db_path)
+    second = LMDBStorage(db_path=db_path)
+    assert first.logger is second.logger
+    assert len(first.logger.handlers) == 1
+    logger = first.logger
+    first.close()
+    assert len(logger.handlers) == 1
+    second.close()
+    assert logger.handlers == []
+
+
+def test_environment_options(tmp_path):
+    config = LMDBConfig(db_path=str(tmp_path / "opts.lmdb"), max_readers=8,
+                        readahead=False, enable_logging=False)
+    with LMDBStorage(config=config) as storage:
+        assert storage.env.max_readers() == 8
+    with pytest.raises(ValueError, match="max_readers"):
+        LMDBConfig(max_readers=0)
+
+
+def test_coalesced_puts_from_many_threads(tmp_path):
+    config = LMDBConfig(db_path=str(tmp_path / "coalesce.lmdb"), coalesce_writes=True,
+                        enable_logging=False)
+    with LMDBStorage(config=config) as storage:
+        def worker(n):
+            for i in range(50):
+                assert storage.put(f"t{n}:{i}", "value " * 30)
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert storage.num_keys() == 400
+        assert storage.get("t7:49") == "value " * 30
+
+
+def test_write_coalescer_commits_queued_entries_together():
+    coalescer = object.__new__(WriteCoalescer)
+    coalescer.shared = MagicMock()
+    coalescer.shared.write.side_effect = lambda fn: fn()
+    coalescer.max_batch = 3
+    coalescer._queue = queue.Queue()
+    futures = []
+    for i in range(5):
+        future = Future()
+        futures.append(future)
+        coalescer._queue.put((None, f"k{i}".encode(), b"v", future))
+    coalescer._queue.put(None)
+
+    coalescer._run()
+    txn = coalescer.shared.env.begin.return_value.__enter__.return_value
+    assert coalescer.shared.env.begin.call_count == 2  # 3 + 2 entries
+    assert txn.put.call_count == 5
+    assert all(future.result() is True for future in futures)
+
+
+def test_write_coalescer_propagates_failure():
+    coalescer = object.__new__(WriteCoalescer)
+    coalescer.shared = MagicMock()
+    coalescer.shared.write.side_effect = RuntimeError("map full")
+    future = Future()
+    coalescer._commit([(None, b"k", b"v", future)])
+    with pytest.raises(RuntimeError):
+        future.result()
+
+
+def _child_put(db_path):
+    with LMDBStorage(db_path=db_path, enable_logging=False) as storage:
+        storage.put("from-child", "ok")
+
+
+def test_forked_child_opens_its_own_environment(tmp_path):
+    db_path = str(tmp_path / "forked.lmdb")
+    with LMDBStorage(db_path=db_path, enable_logging=False) as storage:
+        process = multiprocessing.get_context("fork").Process(target=_child_put, args=(db_path,))
+        process.start()
+        process.join(30)
+        assert process.exitcode == 0
+        assert storage.get("from-child") == "ok"
+
+
+def test_map_grows_when_full(tmp_path):
+    config = LMDBConfig(db_path=str(tmp_path / "grow.lmdb"), capacity_mb=1, enable_logging=False)
+    with LMDBStorage(config=config) as storage:
+        assert storage.put_many({f"k{i}": os.urandom(2000).hex() for i in range(600)},
+                                batch_size=600) == 600
+        assert storage.put("one-more", os.urandom(2000).hex()) is True
+        assert storage.env.info()["map_size"] > 1024 * 1024
+        assert storage.num_keys() == 601
+
+
+def test_map_growth_respects_limit(tmp_path):
+    config = LMDBConfig(db_path=str(tmp_path / "capped.lmdb"), capacity_mb=1,
+                        max_capacity_mb=2, enable_logging=False)
+    with LMDBStorage(config=config) as storage:
+        stored = sum(storage.put(f"k{i}", os.urandom(2000).hex()) for i in range(1000))
+        assert 0 < stored < 1000
+        assert storage.env.info()["map_size"] == 2 * 1024 * 1024
+    with pytest.raises(ValueError, match="max_capacity_mb"):
+        LMDBConfig(capacity_mb=10, max_capacity_mb=5)
+
+
+def test_coalesced_writes_grow_map(tmp_path):
+    config = LMDBConfig(db_path=str(tmp_path / "grow-coalesced.lmdb"), capacity_mb=1,
+                        coalesce_writes=True, enable_logging=False)
+    with LMDBStorage(config=config) as storage:
+        assert all(storage.put(f"k{i}", os.urandom(2000).hex()) for i in range(400))
+        assert storage.num_keys() == 400
+
+
+def test_map_grows_while_another_thread_reads(tmp_path):
+    config = LMDBConfig(db_path=str(tmp_path / "grow-reading.lmdb"), capacity_mb=1, enable_logging=False)
+    with LMDBStorage(config=config) as storage:
+        storage.put_many({f"a{i}": "v" for i in range(10)})
+        reading, release = threading.Event(), threading.Event()
+
+        def reader():
+            for _ in storage.scan_prefix("a"):
+                reading.set()
+                release.wait()
+
+        reader_thread = threading.Thread(target=reader)
+        reader_thread.start()
+        reading.wait()
+        stored = []
+        writer_thread = threading.Thread(target=lambda: stored.append(
+            storage.put_many({f"k{i}": os.urandom(2000).hex() for i in range(600)}, batch_size=600)))
+        writer_thread.start()
+        # The resize waits for the scan's read transaction instead of running under it
+        transactions = storage._shared.transactions
+        deadline = time.monotonic() + 10
+        while not transactions._waiting and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert transactions._waiting == 1
+        assert storage.env.info()["map_size"] == 1024 * 1024
+        release.set()
+        reader_thread.join()
+        writer_thread.join()
+        assert stored == [600]
+        assert storage.env.info()["map_size"] > 1024 * 1024
+
+
+def test_map_does_not_grow_inside_own_transaction(tmp_path):
+    config = LMDBConfig(db_path=str(tmp_path / "grow-nested.lmdb"), capacity_mb=1, enable_logging=False)
+    with LMDBStorage(config=config) as storage:
+        storage.put("a", "v")
+        for _ in storage.scan_prefix("a"):
+            big = {f"k{i}": os.urandom(2000).hex() for i in range(600)}
+            assert storage.put_many(big, batch_size=600) == 0
+        assert storage.env.info()["map_size"] == 1024 * 1024
+        assert storage.put_many(big, batch_size=600) == 600
+
+
+def _child_create_namespace(db_path):
+    with LMDBStorage(db_path=db_path, namespace="from_child", enable_logging=False) as storage:
+        storage.put("aspirin", "nsaid")
+
+
+def test_clear_keeps_namespaces_of_other_processes(tmp_path):
+    db_path = str(tmp_path / "ns-child.lmdb")
+    process = multiprocessing.get_context("fork").Process(target=_child_create_namespace, args=(db_path,))
+    process.start()
+    process.join()
+    assert process.exitcode == 0
+    with LMDBStorage(db_path=db_path, enable_logging=False) as storage:
+        storage.put_many({"a": "1", "b": "2"})
+        assert storage.clear() == 2
+        with storage.namespace_view("from_child") as child:
+            assert child.get("aspirin") == "nsaid"
+
+
+def test_interleaved_scans_release_lock(tmp_path):
+    config = LMDBConfig(db_path=str(tmp_path / "interleaved.lmdb"), capacity_mb=1, enable_logging=False)
+    with LMDBStorage(config=config) as storage:
+        storage.put_many({"a1": "v", "b1": "v", "b2": "v"})
+        transactions = storage._shared.transactions
+        a_scan, b_scan = storage.scan_prefix("a"), storage.scan_prefix("b")
+        next(a_scan)
+        next(b_scan)
+        # "a" finishes first while "b" is still open
+        assert list(a_scan) == []
+        assert transactions._active == 1 and transactions.held()
+        assert not transactions.acquire_exclusive(timeout=0)
+        assert list(b_scan) == [("b2", "v")]
+        assert transactions._active == 0 and not transactions.held()
+        big = {f"k{i}": os.urandom(2000).hex() for i in range(600)}
+        assert storage.put_many(big, batch_size=600) == 600
+        assert storage.env.info()["map_size"] > 1024 * 1024
+
+
+def _child_grow(db_path):
+    config = LMDBConfig(db_path=db_path, capacity_mb=1, enable_logging=False)
+    with LMDBStorage(config=config) as storage:
+        assert storage.put_many({f"k{i}": os.urandom(2000).hex() for i in range(3000)},
+                                batch_size=500) == 3000
+
+
+def test_reads_adopt_map_grown_by_another_process(tmp_path):
+    db_path = str(tmp_path / "grown-elsewhere.lmdb")
+    config = LMDBConfig(db_path=db_path, capacity_mb=1, enable_logging=False)
+    with LMDBStorage(config=config) as storage:
+        storage.put("hello", "world")
+        process = multiprocessing.get_context("spawn").Process(target=_child_grow, args=(db_path,))
+        process.start()
+        process.join(60)
+        assert process.exitcode == 0
+        assert storage.get("hello") == "world"
+        assert storage.env.info()["map_size"] > 1024 * 1024
+        assert storage.get("k5") is not None
+        assert storage.num_keys() == 3001
+        assert len(storage.get_many(["k1", "k2"])) == 2
+        assert sum(1 for _ in storage.scan_prefix("k")) == 3000
+        assert len(storage.get_keys()) == 3001
+
+
+def test_clear_drops_main_database_values_of_any_size(tmp_path):
+    db_path = str(tmp_path / "clear-main.lmdb")
+    with LMDBStorage(db_path=db_path, enable_logging=False) as storage:
+        with storage.namespace_view("drugs") as drugs:
+            drugs.put("aspirin", "nsaid")
+            empty = storage.namespace_view("empty")
+            # Values the size of a sub-database record are ordinary keys
+            storage.put_many({"a": "x" * 48, "b": "2"})
+            assert storage.clear() == 2
+            assert storage.get_keys() == ["__namespaces__", "drugs", "empty"]
+            assert drugs.get("aspirin") == "nsaid"
+            assert empty.num_keys() == 0
+            empty.put("k", "v")
+            assert empty.get("k") == "v"
+            empty.close()
+    with pytest.raises(ValueError, match="reserved"):
+        LMDBConfig(db_path=db_path, namespace="__namespaces__")
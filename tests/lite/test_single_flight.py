@@ -0,0 +1,172 @@
+import asyncio
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+from pydantic import BaseModel
+
+from lite import LiteClient, LRUCache, ModelConfig
+from lite.config import ModelInput
+from lite.single_flight import CoalescedCallCancelled, SingleFlight
+
+
+def completion_response(content="ok"):
+    response = MagicMock()
+    response.choices[0].message.content = content
+    return response
+
+
+def test_concurrent_callers_share_one_call():
+    flights = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def slow():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return "answer"
+
+    results = []
+    leader = threading.Thread(target=lambda: results.append(flights.do("k", slow)))
+    leader.start()
+    started.wait(5)
+    followers = [threading.Thread(target=lambda: results.append(flights.do("k", slow))) for _ in range(3)]
+    for thread in followers:
+        thread.start()
+    while flights.stats()["coalesced"] < 3:
+        time.sleep(0.001)
+    release.set()
+    for thread in [leader, *followers]:
+        thread.join()
+
+    assert len(calls) == 1
+    assert sorted(results, key=lambda r: r[1]) == [("answer", False)] + [("answer", True)] * 3
+    assert flights.stats() == {"calls": 1, "coalesced": 3, "in_flight": 0}
+
+    # The key is forgotten once the call lands
+    assert flights.do("k", lambda: "fresh") == ("fresh", False)
+
+
+def test_errors_reach_every_caller():
+    flights = SingleFlight()
+
+    async def main():
+        async def failing():
+            await asyncio.sleep(0.01)
+            raise ValueError("upstream failed")
+
+        return await asyncio.gather(
+            *(flights.ado("k", failing) for _ in range(3)), return_exceptions=True
+        )
+
+    results = asyncio.run(main())
+    assert all(isinstance(r, ValueError) for r in results)
+    assert flights.stats()["calls"] == 1
+
+
+def test_leader_cancellation_is_retryable_for_followers():
+    flights = SingleFlight()
+
+    async def main():
+        async def slow():
+            await asyncio.sleep(10)
+
+        leader = asyncio.ensure_future(flights.ado("k", slow))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(flights.ado("k", slow))
+        await asyncio.sleep(0)
+        leader.cancel()
+        with pytest.raises(CoalescedCallCancelled):
+            await follower
+
+    asyncio.run(main())
+
+
+@patch("lite.lite_client.acompletion")
+def test_client_coalesces_identical_async_requests(mock_acompletion):
+    async def fake_acompletion(**kwargs):
+        await asyncio.sleep(0.02)
+        return completion_response()
+
+    mock_acompletion.side_effect = fake_acompletion
+    client = LiteClient(
+        ModelConfig(model="gpt-4o", temperature=0.0),
+        coalesce_requests=True,
+        flights=SingleFlight(),
+        rate_limit=False,
+    )
+
+    async def main():
+        return await asyncio.gather(
+            *(client.agenerate_text(ModelInput(user_prompt="Define asthma")) for _ in range(5)),
+            client.agenerate_text(ModelInput(user_prompt="Define gout")),
+        )
+
+    results = asyncio.run(main())
+    assert results == ["ok"] * 6
+    assert mock_acompletion.call_count == 2
+    assert client.coalesce_stats()["coalesced"] == 4
+
+
+@patch("lite.lite_client.completion")
+def test_client_coalesces_with_cache(mock_completion):
+    release = threading.Event()
+
+    def fake_completion(**kwargs):
+        release.wait(5)
+        return completion_response()
+
+    mock_completion.side_effect = fake_completion
+    cache = LRUCache()
+    flights = SingleFlight()
+    clients = [
+        LiteClient(ModelConfig(model="gpt-4o", temperature=0.0), cache=cache,
+                   coalesce_requests=True, flights=flights, rate_limit=False)
+        for _ in range(3)
+    ]
+    results = []
+    threads = [
+        threading.Thread(target=lambda c=c: results.append(c.generate_text(ModelInput(user_prompt="Hi"))))
+        for c in clients
+    ]
+    for thread in threads:
+        thread.start()
+    while flights.stats()["coalesced"] < 2:
+        time.sleep(0.001)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert results == ["ok"] * 3
+    assert mock_completion.call_count == 1
+    assert len(cache) == 1
+
+
+class Answer(BaseModel):
+    answer: str
+
+
+@patch("lite.lite_client.acompletion")
+def test_coalesced_callers_share_one_fix_up(mock_acompletion):
+    async def fake_acompletion(messages, **kwargs):
+        await asyncio.sleep(0.02)
+        fixing = "fix" in str(messages[0]["content"]).lower()
+        return completion_response('{"answer": "42"}' if fixing else "The answer is 42")
+
+    mock_acompletion.side_effect = fake_acompletion
+    client = LiteClient(ModelConfig(model="gpt-4o", temperature=0.0),
+                        coalesce_requests=True, flights=SingleFlight(), rate_limit=False)
+    model_input = ModelInput(user_prompt="What is the answer?", response_format=Answer)
+
+    async def main():
+        return await asyncio.gather(*(client.agenerate_text(model_input) for _ in range(4)))
+
+    results = asyncio.run(main())
+    assert results == [Answer(answer="42")] * 4
+    # Followers get their own copy of the leader's parsed result
+    assert len({id(result) for result in results}) == 4
+    # One request for the answer and one fix-up, not one fix-up per caller
+    assert mock_acompletion.call_count == 2
@@ -0,0 +1,107 @@
+import json
+import pytest
+from lite.storage import LMDBStorage, LMDBConfig, GzipCodec, get_codec
+from lite.storage.codecs import FLAG_GZIP, FLAG_UNCOMPRESSED
+
+DOC = json.dumps({"name": "asthma", "symptoms": ["wheezing", "cough"], "severity": "moderate", "notes": "Chronic airway inflammation."})
+
+def _records(n):
+    return {
+        f"rec:{i}": json.dumps({
+            "id": i,
+            "name": f"condition {i}",
+            "symptoms": ["fever", "cough", "fatigue"][: i % 3 + 1],
+            "summary": "A common condition treated with rest and fluids. " * (i % 4 + 1),
+        })
+        for i in range(n)
+    }
+
+@pytest.mark.parametrize("name", ["gzip", "zstd", "lz4"])
+def test_codec_round_trip(name):
+    if name == "zstd":
+        pytest.importorskip("zstandard")
+    if name == "lz4":
+        pytest.importorskip("lz4")
+    codec = get_codec(name)
+    assert codec.decompress(codec.compress(DOC.encode())) == DOC.encode()
+
+def test_unknown_codec():
+    with pytest.raises(ValueError, match="Unknown codec"):
+        get_codec("brotli")
+    with pytest.raises(ValueError, match="codec must be one of"):
+        LMDBConfig(codec="brotli")
+
+@pytest.mark.parametrize("name", ["zstd", "lz4"])
+def test_storage_with_codec(tmp_path, name):
+    pytest.importorskip("zstandard" if name == "zstd" else "lz4")
+    config = LMDBConfig(db_path=str(tmp_path / "db.lmdb"), codec=name, enable_logging=False)
+    with LMDBStorage(config=config) as storage:
+        assert storage.put("doc", DOC)
+        assert storage.put("short", "tiny")
+        assert storage.get("doc") == DOC
+        assert storage.get("short") == "tiny"
+        with storage.env.begin() as txn:
+            assert txn.get(b"doc")[:1] == storage.codec.flag
+            assert txn.get(b"short")[:1] == FLAG_UNCOMPRESSED
+
+def test_mixed_codecs_stay_readable(tmp_path):
+    pytest.importorskip("zstandard")
+    db_path = str(tmp_path / "db.lmdb")
+    with LMDBStorage(db_path=db_path, enable_logging=False) as storage:
+        storage.put("old", DOC)
+    with LMDBStorage(config=LMDBConfig(db_path=db_path, codec="zstd", enable_logging=False)) as storage:
+        storage.put("new", DOC)
+        with storage.env.begin() as txn:
+            assert txn.get(b"old")[:1] == FLAG_GZIP
+        assert storage.get_many(["old", "new"]) == {"old": DOC, "new": DOC}
+
+def test_gzip_matches_legacy_format():
+    assert GzipCodec().decompress(GzipCodec().compress(b"x" * 200)) == b"x" * 200
+
+def test_train_compression_dictionary(tmp_path):
+    pytest.importorskip("zstandard")
+    db_path = str(tmp_path / "db.lmdb")
+    records = _records(500)
+    config = LMDBConfig(db_path=db_path, codec="zstd-dict", enable_logging=False)
+    with LMDBStorage(config=config) as storage:
+        storage.put_many(records)
+        plain_size = sum(len(storage.codec.compress(v.encode())) for v in records.values())
+
+        dict_id = storage.train_compression_dictionary(sample_size=200, dict_size=4096)
+        assert dict_id is not None
+        assert storage.codec.dict_id == dict_id
+        dict_size = sum(len(storage.codec.compress(v.encode())) for v in records.values())
+        assert dict_size < plain_size
+
+        storage.put("after", records["rec:7"])
+        with storage.env.begin() as txn:
+            assert txn.get(b"after")[:1] == storage.codec.flag
+
+    # The dictionary is reloaded from the database directory
+    with LMDBStorage(config=config) as storage:
+        assert storage.codec.dict_id == dict_id
+        assert storage.get("after") == records["rec:7"]
+        assert storage.get("rec:3") == records["rec:3"]
+    with LMDBStorage(db_path=db_path, enable_logging=False) as storage:
+        assert storage.get("after") == records["rec:7"]
+
+def test_train_compression_dictionary_too_little_data(tmp_path):
+    pytest.importorskip("zstandard")
+    with LMDBStorage(db_path=str(tmp_path / "db.lmdb"), enable_logging=False) as storage:
+        storage.put("only", "one value")
+        assert storage.train_compression_dictionary() is None
+
+def test_snapshot_carries_dictionaries(tmp_path):
+    pytest.importorskip("zstandard")
+    records = _records(300)
+    config = LMDBConfig(db_path=str(tmp_path / "db.lmdb"), codec="zstd-dict", enable_logging=False)
+    with LMDBStorage(config=config) as storage:
+        storage.put_many(records)
+        storage.train_compression_dictionary(sample_size=200, dict_size=4096)
+        storage.put("after", records["rec:5"])
+        snapshot_path = str(tmp_path / "db.snap")
+        assert storage.export_snapshot(snapshot_path)
+
+    with LMDBStorage(db_path=str(tmp_path / "copy.lmdb"), enable_logging=False) as copy:
+        assert copy.import_snapshot(snapshot_path)
+        assert copy.get("after") == records["rec:5"]
@@ -0,0 +1,104 @@
+import asyncio
+from typing import List, Optional
+from unittest.mock import patch, MagicMock
+from pydantic import BaseModel
+
+from lite.config import ModelConfig, ModelInput
+from lite.lite_client import LiteClient
+from lite.utils.streaming_json import StreamingJSONParser, PartialItem
+
+class Chapter(BaseModel):
+    title: str
+    pages: int
+
+class Level(BaseModel):
+    level: str
+    chapters: List[Chapter]
+
+class Book(BaseModel):
+    subject: str
+    tags: Optional[List[str]] = None
+    levels: List[Level]
+
+DOCUMENT = (
+    '```json\n{"subject": "Physics", "tags": ["a", "b\\"q"], "levels": ['
+    '{"level": "intro", "chapters": [{"title": "Motion", "pages": 3}, {"title": "Heat [1]", "pages": 4}]}'
+    ']}\n```'
+)
+
+def _feed_all(parser, text, size):
+    items = []
+    for i in range(0, len(text), size):
+        items.extend(parser.feed(text[i:i + size]))
+    return items
+
+def test_emits_validated_elements_in_order():
+    for size in (1, 3, 7, len(DOCUMENT)):
+        parser = StreamingJSONParser(Book)
+        items = _feed_all(parser, DOCUMENT, size)
+        paths = [item.path for item in items]
+        assert paths == [
+            ("tags", 0),
+            ("tags", 1),
+            ("levels", 0, "chapters", 0),
+            ("levels", 0, "chapters", 1),
+            ("levels", 0),
+        ]
+        assert items[1].value == 'b"q'
+        assert items[2].value == Chapter(title="Motion", pages=3)
+        assert isinstance(items[4].value, Level)
+        assert parser.done
+
+def test_element_is_emitted_before_document_ends():
+    parser = StreamingJSONParser(Book)
+    prefix = '{"subject": "x", "levels": [{"level": "a", "chapters": [{"title": "t", "pages": 1}'
+    items = parser.feed(prefix)
+    assert [item.path for item in items] == [("levels", 0, "chapters", 0)]
+    assert not parser.done
+
+def test_scalars_and_untyped_documents():
+    parser = StreamingJSONParser()
+    items = parser.feed('[1, 2.5, true, null, "s", [3]]')
+    assert [item.value for item in items] == [1, 2.5, True, None, "s", 3, [3]]
+    assert parser.done
+
+def test_invalid_elements_are_skipped():
+    parser = StreamingJSONParser(Book)
+    items = parser.feed('{"levels": [{"level": "a", "chapters": [{"title": "t"}]}]}')
+    assert all(not isinstance(item.value, Chapter) for item in items)
+
+@patch("lite.lite_client.completion")
+def test_client_stream_structured(mock_completion):
+    chunks = []
+    for i in range(0, len(DOCUMENT), 5):
+        chunk = MagicMock()
+        chunk.choices[0].delta.content = DOCUMENT[i:i + 5]
+        chunks.append(chunk)
+    mock_completion.return_value = iter(chunks)
+
+    client = LiteClient(model_config=ModelConfig(model="gpt-4"))
+    model_input = ModelInput(user_prompt="book", response_format=Book)
+    items = list(client.stream_structured(model_input))
+
+    assert items[-1].path == ()
+    assert isinstance(items[-1].value, Book)
+    assert items[-1].value.levels[0].chapters[1].title == "Heat [1]"
+    assert sum(isinstance(item.value, Chapter) for item in items) == 2
+
+@patch("lite.lite_client.acompletion")
+def test_client_astream_structured(mock_acompletion):
+    async def agen():
+        chunk = MagicMock()
+        chunk.choices[0].delta.content = DOCUMENT
+        yield chunk
+
+    mock_acompletion.return_value = agen()
+    client = LiteClient(model_config=ModelConfig(model="gpt-4"))
+    model_input = ModelInput(user_prompt="book", response_format=Book)
+
+    async def collect():
+        return [item async for item in client.astream_structured(model_input)]
+
+    items = asyncio.run(collect())
+    assert isinstance(items[-1].value, Book)
+    assert len(items) == 6
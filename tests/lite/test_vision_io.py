@@ -2,7 +2,11 @@ import pytest
 import numpy as np
 from PIL import Image
 from pathlib import Path
-from lite.vision.io import save_image, get_image_info, save_images_batch, cv2_to_pil, pil_to_cv2
+from unittest.mock import patch
+from lite.vision.io import (
+    save_image, get_image_info, save_images_batch, cv2_to_pil, pil_to_cv2,
+    encode_to_base64, clear_encode_cache, encode_cache_stats, b64_to_pil,
+)
 
 @pytest.fixture
 def test_img_path(tmp_path):
@@ -54,3 +58,41 @@ def test_save_images_batch(test_img_path, tmp_path):
     assert len(saved) == 2
     assert Path(saved[0]).name == "batch_0000.png"
     assert Path(saved[1]).name == "batch_0001.png"
+
+def test_encode_to_base64_cached(test_img_path):
+    clear_encode_cache()
+    first = encode_to_base64(test_img_path)
+    with patch.object(Path, "read_bytes", side_effect=AssertionError("file re-read")):
+        assert encode_to_base64(test_img_path) == first
+    assert encode_cache_stats()["hits"] >= 1
+
+def test_encode_to_base64_invalidated_on_change(test_img_path):
+    clear_encode_cache()
+    first = encode_to_base64(test_img_path)
+    Image.new("RGB", (120, 80), color="red").save(test_img_path)
+    second = encode_to_base64(test_img_path)
+    assert second != first
+    assert b64_to_pil(second).size == (120, 80)
+
+def test_encode_to_base64_shares_identical_content(test_img_path, tmp_path):
+    clear_encode_cache()
+    copy_path = tmp_path / "copy.jpg"
+    copy_path.write_bytes(Path(test_img_path).read_bytes())
+    assert encode_to_base64(test_img_path) == encode_to_base64(str(copy_path))
+    assert encode_cache_stats()["entries"] == 1
+
+def test_encode_to_base64_validation(tmp_path):
+    small = tmp_path / "small.png"
+    Image.new("RGB", (10, 10)).save(small)
+    with pytest.raises(ValueError, match="dimensions too small"):
+        encode_to_base64(str(small))
+    with pytest.raises(FileNotFoundError):
+        encode_to_base64(str(tmp_path / "missing.jpg"))
+    text_file = tmp_path / "notes.txt"
+    text_file.write_text("hello")
+    with pytest.raises(ValueError, match="not a valid image"):
+        encode_to_base64(str(text_file))
+
+def test_encode_to_base64_passes_through_data_uri():
+    data_uri = "data:image/jpeg;base64,/9j/4AAQ"
+    assert encode_to_base64(data_uri) == data_uri
@@ -1,3 +1,4 @@
+import io
 import pytest
 from PIL import Image
 from pathlib import Path
@@ -7,8 +8,11 @@ from lite.vision.processing import (
     resize_to_dimensions, 
     crop, 
     remove_exif,
-    resize_images_to_fit
+    resize_images_to_fit,
+    fit_images_to_payload,
 )
+import lite.vision.processing as processing
+import numpy as np
 
 @pytest.fixture
 def sample_image_path(tmp_path):
@@ -56,3 +60,77 @@ def test_resize_images_to_fit(tmp_path):
     result_paths = resize_images_to_fit(paths)
     assert len(result_paths) == 1
     assert Path(result_paths[0]).exists()
+
+
+def _noise_image(path, size=(400, 400)):
+    data = np.random.default_rng(0).integers(0, 256, (size[1], size[0], 3), dtype=np.uint8)
+    Image.fromarray(data, mode="RGB").save(path, quality=95)
+    return str(path)
+
+def test_fit_images_to_payload_reduces_quality(tmp_path):
+    paths = [_noise_image(tmp_path / f"noise{i}.jpg") for i in range(2)]
+    full = sum(len(processing._resize_image_to_quality(p, 85)) for p in paths)
+    limit = int(full * 4 / 3 * 0.6)
+
+    images = fit_images_to_payload(paths, max_payload_bytes=limit, max_workers=2)
+    assert len(images) == 2
+    assert processing._payload_size(images) <= limit
+    assert all(data[:2] == b"\xff\xd8" for data in images)
+    # Results stay in memory
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["noise0.jpg", "noise1.jpg"]
+
+def test_fit_images_to_payload_downscales(tmp_path):
+    path = _noise_image(tmp_path / "noise.jpg")
+    minimum = len(processing._resize_image_to_quality(path, processing.MIN_FIT_QUALITY))
+    limit = int(minimum * 4 / 3 * 0.5)
+
+    images = fit_images_to_payload([path], max_payload_bytes=limit, max_workers=1)
+    assert processing._payload_size(images) <= limit
+    with Image.open(io.BytesIO(images[0])) as img:
+        assert img.width < 400
+
+def test_fit_images_to_payload_impossible(tmp_path):
+    path = _noise_image(tmp_path / "noise.jpg")
+    with pytest.raises(ValueError):
+        fit_images_to_payload([path], max_payload_bytes=100, max_workers=1)
+
+def test_resize_images_to_fit_returns_data_uris(tmp_path, monkeypatch):
+    path = _noise_image(tmp_path / "noise.jpg")
+    monkeypatch.setattr(processing, "MAX_TOTAL_IMAGE_PAYLOAD_BYTES", Path(path).stat().st_size)
+
+    result = resize_images_to_fit([path])
+    assert len(result) == 1
+    assert result[0].startswith("data:image/jpeg;base64,")
+    assert [p.name for p in tmp_path.iterdir()] == ["noise.jpg"]
+
+def test_fit_images_to_payload_reuses_pool(tmp_path):
+    paths = [_noise_image(tmp_path / f"noise{i}.jpg") for i in range(2)]
+    limit = 10 * 1024 * 1024
+
+    fit_images_to_payload(paths, max_payload_bytes=limit, max_workers=2)
+    pool = processing._pools[2]
+    fit_images_to_payload(paths, max_payload_bytes=limit, max_workers=2)
+    assert processing._pools[2] is pool
+
+def test_decoded_image_cache_is_bounded(tmp_path, monkeypatch):
+    paths = [_noise_image(tmp_path / f"noise{i}.jpg") for i in range(3)]
+    monkeypatch.setattr(processing, "DECODED_CACHE_MAX_BYTES", 400 * 400 * 3)
+    processing._clear_decoded()
+
+    for path in paths:
+        processing._resize_image_to_quality(path, 50)
+    assert [key[0] for key in processing._decoded_images] == [paths[-1]]
+    assert processing._decoded_bytes == 400 * 400 * 3
+    processing._clear_decoded()
+
+def test_worker_frees_decoded_images_when_idle(tmp_path, monkeypatch):
+    path = _noise_image(tmp_path / "noise.jpg")
+    monkeypatch.setattr(processing, "DECODED_IDLE_SECONDS", 0.05)
+    processing._clear_decoded()
+
+    processing._encode_in_worker(path, 50, 1.0)
+    processing._encode_in_worker(path, 40, 1.0)
+    assert len(processing._decoded_images) == 1
+    processing._idle_timer.join(5)
+    assert len(processing._decoded_images) == 0
+    assert processing._decoded_bytes == 0
@@ -0,0 +1,73 @@
+import json
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from app.cli.dictionary_builder import DictConfig, DictionaryBuilder
+from lite.config import ModelConfig
+
+
+def completion_response(content):
+    response = MagicMock()
+    response.choices[0].message.content = content
+    return response
+
+
+def define(**kwargs):
+    term = kwargs["messages"][-1]["content"][0]["text"].removeprefix("Define ")
+    if term == "gout":
+        raise RuntimeError("provider down")
+    return completion_response(f"**{term}**: A condition called {term}.\n\nLet me know if you need more.")
+
+
+@pytest.fixture
+def dict_config(tmp_path):
+    return DictConfig(
+        system_prompt_template="You are a medical dictionary.",
+        user_prompt_template="Define {term}",
+        file_name="medical",
+        output_dir=tmp_path,
+    )
+
+
+def make_builder(dict_config, **kwargs):
+    return DictionaryBuilder(dict_config, ModelConfig(model="gpt-4o"), **kwargs)
+
+
+@patch("lite.lite_client.completion")
+def test_pipeline_fetches_cleans_and_compacts(mock_completion, dict_config, tmp_path):
+    mock_completion.side_effect = define
+    builder = make_builder(dict_config, max_concurrency=4, compact_every=2)
+
+    saved = builder.process_and_save_terms({"asthma", "gout", "anemia", "angina", "acne"})
+
+    assert saved == 4
+    definitions = json.loads((tmp_path / "medical_gpt-4o.json").read_text())
+    assert [d["term"] for d in definitions] == ["acne", "anemia", "angina", "asthma"]
+    assert definitions[0]["definition"] == "A condition called acne."
+    assert not (tmp_path / "medical_gpt-4o.jsonl").exists()
+
+
+@patch("lite.lite_client.completion")
+def test_interrupted_run_resumes_from_journal(mock_completion, dict_config, tmp_path):
+    journal = tmp_path / "medical_gpt-4o.jsonl"
+    journal.write_text(
+        json.dumps({"term": "asthma", "definition": "A lung condition."}) + "\n"
+        + '{"term": "acn'
+    )
+    mock_completion.side_effect = define
+    builder = make_builder(dict_config)
+    assert builder.existing_terms == {"asthma"}
+
+    builder.build(str(_terms_file(tmp_path, ["asthma", "acne"])))
+
+    assert mock_completion.call_count == 1
+    definitions = json.loads((tmp_path / "medical_gpt-4o.json").read_text())
+    assert [d["term"] for d in definitions] == ["acne", "asthma"]
+    assert not journal.exists()
+
+
+def _terms_file(tmp_path, terms):
+    path = tmp_path / "terms.txt"
+    path.write_text("\n".join(terms))
+    return path